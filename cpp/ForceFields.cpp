@@ -11,7 +11,8 @@ inline double getCoulomb(Vec3d dpos, Vec3d& fpos, double qq ){
     double r = dpos.norm();
     double inv_r = 1.0 / r;
     double E = COULOMB_CONST * qq * inv_r;
-    fpos = dpos * (-E * inv_r);
+    double dE_r = -E * inv_r;   // dE/dr
+    fpos = dpos * (-dE_r * inv_r);
     return E;
 }
 
@@ -34,12 +35,12 @@ inline double _varCoulomb(double r, const double* par,  double* dpar ){  return
 inline double getLJ(Vec3d dpos, Vec3d& fpos, double E0, double R0 ){
     double r = dpos.norm();
     double inv_r = 1.0 / r;
-    double u   = E0 * inv_r;
-    double u2  = inv_r * inv_r;
+    double u   = R0 * inv_r;
+    double u2  = u * u;
     double u6  = u2 * u2 * u2;
     double u12 = u6 * u6;
     double E   = E0 *        ( u12 - 2* u6 );
-    double dE_r = E0 * 12.0 * ( u12 -    u6 ) * inv_r;
+    double dE_r = -E0 * 12.0 * ( u12 -    u6 ) * inv_r;   // dE/dr
     fpos = dpos * (-dE_r * inv_r);
     return E;
 }
@@ -51,8 +52,8 @@ inline double _getLJ(Vec3d dpos, Vec3d& fpos, const double* par ){
 // Lennard-Jones potential  - derivatives according to parameters (for fitting parameters)
 inline double varLJ(double r, double R0, double E0,  double& dE_E0, double& dE_R0 ){                                                                                                                                                                                                                                                                                                                                                         
     double inv_r = 1.0 / r;                                                                                                                                                                                                                                                                                                                                                                                                                   
-    double u     = E0 * inv_r;                                                                                                                                                                                                                                                                                                                                                                                                                    
-    double u2    = inv_r * inv_r;                                                                                                                                                                                                                                                                                                                                                                                                                
+    double u     = R0 * inv_r;                                                                                                                                                                                                                                                                                                                                                                                                                    
+    double u2    = u * u;                                                                                                                                                                                                                                                                                                                                                                                                                
     double u6    = u2 * u2 * u2;                                                                                                                                                                                                                                                                                                                                                                                                                 
     double u12   = u6 * u6;                                                                                                                                                                                                                                                                                                                                                                                                                     
     dE_E0        =      ( u12 - 2* u6 );   
@@ -69,12 +70,12 @@ inline double _varLJ(double r, const double* par,  double* dpar ){  return varLJ
 inline double getLJQ(Vec3d dpos, Vec3d& fpos, double R0, double E0, double qq ){
     double r = dpos.norm();
     double inv_r = 1.0 / r;
-    double u     = E0 * inv_r;
-    double u2    = inv_r * inv_r;
+    double u     = R0 * inv_r;
+    double u2    = u * u;
     double u6    = u2 * u2 * u2;
     double u12   = u6 * u6;
     double E_lj  = E0 * (u12 - 2 * u6);
-    double dE_r_lj = E0 * 12.0 * (u12 - u6) * inv_r;
+    double dE_r_lj = -E0 * 12.0 * (u12 - u6) * inv_r;
 
     double E_coul    = COULOMB_CONST * qq * inv_r;
     double dE_r_coul = -E_coul * inv_r;
@@ -87,8 +88,8 @@ inline double getLJQ(Vec3d dpos, Vec3d& fpos, double R0, double E0, double qq ){
 // Variational derivatives for LonearJones+Coulomb potential
 inline double varLJQ(double r, double R0, double E0,  double qq, double& dE_R0, double& dE_E0, double& dE_qq ){
     double inv_r = 1.0 / r;
-    double u     = E0 * inv_r;
-    double u2    = inv_r * inv_r;
+    double u     = R0 * inv_r;
+    double u2    = u * u;
     double u6    = u2 * u2 * u2;
     double u12   = u6 * u6;
     double E_lj  = E0 * (u12 - 2 * u6);
@@ -125,7 +126,7 @@ inline double getMorse(Vec3d dpos, Vec3d& fpos, double R0, double E0, double k )
     double inv_r = 1.0 / r;
     double e = std::exp(-k * (r - R0));
     double E = E0 * ( e*e - 2*e );
-    double dE_r  = 2 * E0 * k * ( e*e - e );
+    double dE_r  = -2 * E0 * k * ( e*e - e );   // dE/dr
     fpos = dpos * (-dE_r * inv_r);
     return E;
 }
@@ -138,7 +139,8 @@ inline double _getMorse(Vec3d dpos, Vec3d& fpos, const double* par ){
 inline double varMorse(double r, double R0, double E0, double k,  double& dE_R0, double& dE_E0, double& dE_k ){
     double e = std::exp(-k * (r - R0));
     dE_E0 = (e*e - 2*e);
-    dE_k  = 2*E0 * (e*e - e) * (r - R0);
+    dE_R0 =  2*E0 * k * (e*e - e);
+    dE_k  = -2*E0 * (e*e - e) * (r - R0);
     return E0*dE_E0;
 }
 
@@ -152,7 +154,7 @@ inline double getMorseQ(Vec3d dpos, Vec3d& fpos, double R0, double E0, double qq
     double e = std::exp(-k * (r - R0));
     double e2 = e*e;
     double E_morse     =    E0 *     (e2 - 2*e);
-    double dE_r_morse = 2 * E0 * k * (e2 -   e);
+    double dE_r_morse = -2 * E0 * k * (e2 -   e);
 
     double inv_r = 1.0 / r;
     double E_coul = COULOMB_CONST * qq * inv_r;
@@ -169,8 +171,8 @@ inline double varMorseQ(double r, double R0, double E0, double qq, double k,  do
     double e2 = e*e;
     double inv_r = 1.0 / r;
     dE_E0 = (e*e - 2*e);
-    dE_R0 = -2 * E0 * k * (e2 - e);
-    dE_k  =  2 * E0 *     (e2 - e) * (r - R0);
+    dE_R0 =  2 * E0 * k * (e2 - e);
+    dE_k  = -2 * E0 *     (e2 - e) * (r - R0);
     dE_qq = COULOMB_CONST * inv_r;
     return E0*dE_E0 + qq*dE_qq;
 }
@@ -201,9 +203,11 @@ template<
     void(*mixPar )(const double*,const double*,double*),
     void(*dmixPar)(const double*,const double*,const double*,double*)
 >
-double getVarDerivs( int npar, int na1, const Vec3d* apos1, const double* pars1, int na2, const Vec3d* apos2, const double* pars2, double* dE_par1, FuncFF ff ){   //  , FuncMix mixPar, dFuncMix dmixPar ) {
-    double  parij[na1*npar];
-    double dparij[na1*npar];
+double getVarDerivs( int npar, int na1, const Vec3d* apos1, const double* pars1, int na2, const Vec3d* apos2, const double* pars2, double* dE_par1, FuncFF ff ){
+    // dE_par1[na1*npar] is accumulated (+=), caller should clear it
+    double  parij[npar];
+    double dparij[npar];
+    double   dpi [npar];
     double E=0;
     for (int ia=0; ia<na1; ia++){
         const double* pari = pars1   + ia*npar;
@@ -213,8 +217,44 @@ double getVarDerivs( int npar, int na1, const Vec3d* apos1, const double* pars1,
             double r = d.norm();
             const double* parj = pars2   + ja*npar;
             mixPar( pari, parj, parij );
-            E += ff(r, parij, dpari );
-            dmixPar( pari, parj, dparij, dpari );
+            E += ff(r, parij, dparij );
+            dmixPar( pari, parj, dparij, dpi );
+            for (int k=0; k<npar; k++){ dpari[k] += dpi[k]; }
+        }
+    }
+    return E;
+}
+
+// Same as getVarDerivs() but atomic parameters are taken from per-type table tpars[ntype*npar] and dE/dpar is accumulated per type into dE_tpar[ntype*npar]
+// if bBoth==false only parameters of fragment 1 are differentiated (fragment 2 is treated as fixed environment)
+template<
+    typename FuncFF, 
+    void(*mixPar )(const double*,const double*,double*),
+    void(*dmixPar)(const double*,const double*,const double*,double*)
+>
+double getVarDerivsTyped( int npar, int na1, const Vec3d* apos1, const int* types1, int na2, const Vec3d* apos2, const int* types2, const double* tpars, double* dE_tpar, bool bBoth, FuncFF ff ){
+    double  parij[npar];
+    double dparij[npar];
+    double   dpi [npar];
+    double E=0;
+    for (int ia=0; ia<na1; ia++){
+        const int     ti   = types1[ia];
+        const double* pari = tpars   + ti*npar;
+        double*      dpari = dE_tpar + ti*npar;
+        for (int ja=0; ja<na2; ja++){
+            Vec3d d = apos1[ia] - apos2[ja];
+            double r = d.norm();
+            const int     tj   = types2[ja];
+            const double* parj = tpars + tj*npar;
+            mixPar( pari, parj, parij );
+            E += ff(r, parij, dparij );
+            dmixPar( pari, parj, dparij, dpi );
+            for (int k=0; k<npar; k++){ dpari[k] += dpi[k]; }
+            if(bBoth){
+                double* dparj = dE_tpar + tj*npar;
+                dmixPar( parj, pari, dparij, dpi );   // mixing rules are symmetric in (i,j)
+                for (int k=0; k<npar; k++){ dparj[k] += dpi[k]; }
+            }
         }
     }
     return E;
@@ -222,18 +262,30 @@ double getVarDerivs( int npar, int na1, const Vec3d* apos1, const double* pars1,
 
 // =========== Fitting Derivatives ==========
 
-// Specialization for Lennard-Jones potential
+// Specialization for Lennard-Jones + Coulomb potential
 double getVarDerivsLJQ( int na1, const Vec3d* apos1, const double* pars1, int na2, const Vec3d* apos2, const double* pars2, double* dE_par1 ){
-    int npar=2; // 2 parameters: R0 E0
+    int npar=3; // 3 parameters: R0 E0 qq
     auto ff = [&](double r, const double* par, double* dpar ){  return varLJQ( r, par[0], par[1], par[2],  dpar[0], dpar[1], dpar[2]  ); };
     return getVarDerivs< decltype(ff), mix_LJQ, dmix_LJQ >( npar, na1, apos1, pars1, na2, apos2, pars2, dE_par1, ff );
 };
 
-// Specialization for Lennard-Jones potential
+// Specialization for Morse + Coulomb potential
 double getVarDerivsMorseQ( int na1, const Vec3d* apos1, const double* pars1, int na2, const Vec3d* apos2, const double* pars2, double* dE_par1 ){
-    int npar=2; // 2 parameters: R0 E0
+    int npar=4; // 4 parameters: R0 E0 qq k
     auto ff = [&](double r, const double* par, double* dpar ){  return varMorseQ( r, par[0], par[1], par[2],par[3],  dpar[0], dpar[1], dpar[2], dpar[3]  ); };
-    return getVarDerivs< decltype(ff), mix_LJQ, dmix_LJQ >( npar, na1, apos1, pars1, na2, apos2, pars2, dE_par1, ff );
+    return getVarDerivs< decltype(ff), mix_varMorseQ, dmix_varMorseQ >( npar, na1, apos1, pars1, na2, apos2, pars2, dE_par1, ff );
+};
+
+double getVarDerivsTypedLJQ( int na1, const Vec3d* apos1, const int* types1, int na2, const Vec3d* apos2, const int* types2, const double* tpars, double* dE_tpar, bool bBoth ){
+    int npar=3; // 3 parameters: R0 E0 qq
+    auto ff = [&](double r, const double* par, double* dpar ){  return varLJQ( r, par[0], par[1], par[2],  dpar[0], dpar[1], dpar[2]  ); };
+    return getVarDerivsTyped< decltype(ff), mix_LJQ, dmix_LJQ >( npar, na1, apos1, types1, na2, apos2, types2, tpars, dE_tpar, bBoth, ff );
+};
+
+double getVarDerivsTypedMorseQ( int na1, const Vec3d* apos1, const int* types1, int na2, const Vec3d* apos2, const int* types2, const double* tpars, double* dE_tpar, bool bBoth ){
+    int npar=4; // 4 parameters: R0 E0 qq k
+    auto ff = [&](double r, const double* par, double* dpar ){  return varMorseQ( r, par[0], par[1], par[2],par[3],  dpar[0], dpar[1], dpar[2], dpar[3]  ); };
+    return getVarDerivsTyped< decltype(ff), mix_varMorseQ, dmix_varMorseQ >( npar, na1, apos1, types1, na2, apos2, types2, tpars, dE_tpar, bBoth, ff );
 };
 
 
@@ -0,0 +1,59 @@
+// ForceFields_lib.cpp - plain C interface to ForceFields.cpp for ctypes
+// Compiled to a shared library by pyCruncher2/scientific/forcefields_lib.py
+// Arrays of Vec3d are passed as contiguous double[n*3], parameters as double[n*npar]
+// Build with -fopenmp to parallelize getVarDerivsSystems_c() over systems
+
+#include "ForceFields.cpp"
+
+// evaluate variational derivatives at scalar distances rs[n], params[n*npar] -> Es[n], dpars[n*npar]
+template<typename Func>
+void evalVarPotential( int npar, int n, const double* rs, const double* params, double* Es, double* dpars, Func func ) {
+    for (int i = 0; i < n; ++i) {
+        Es[i] = func( rs[i], params + i*npar, dpars + i*npar );
+    }
+}
+
+extern "C"{
+
+// ========== Energy and force at points
+
+void evaluateCoulomb_c( int n, const double* ps, double* Es, double* fs, double* params ){ evaluateCoulomb( n, (const Vec3d*)ps, Es, (Vec3d*)fs, params ); }
+void evaluateLJ_c     ( int n, const double* ps, double* Es, double* fs, double* params ){ evaluateLJ     ( n, (const Vec3d*)ps, Es, (Vec3d*)fs, params ); }
+void evaluateLJQ_c    ( int n, const double* ps, double* Es, double* fs, double* params ){ evaluateLJQ    ( n, (const Vec3d*)ps, Es, (Vec3d*)fs, params ); }
+void evaluateMorse_c  ( int n, const double* ps, double* Es, double* fs, double* params ){ evaluateMorse  ( n, (const Vec3d*)ps, Es, (Vec3d*)fs, params ); }
+void evaluateMorseQ_c ( int n, const double* ps, double* Es, double* fs, double* params ){ evaluateMorseQ ( n, (const Vec3d*)ps, Es, (Vec3d*)fs, params ); }
+
+// ========== Derivatives according to parameters
+
+void varCoulomb_c( int n, const double* rs, const double* params, double* Es, double* dpars ){ evalVarPotential( 1, n, rs, params, Es, dpars, _varCoulomb ); }
+void varLJ_c     ( int n, const double* rs, const double* params, double* Es, double* dpars ){ evalVarPotential( 2, n, rs, params, Es, dpars, _varLJ      ); }
+void varLJQ_c    ( int n, const double* rs, const double* params, double* Es, double* dpars ){ evalVarPotential( 3, n, rs, params, Es, dpars, _varLJQ     ); }
+void varMorse_c  ( int n, const double* rs, const double* params, double* Es, double* dpars ){ evalVarPotential( 3, n, rs, params, Es, dpars, _varMorse   ); }
+void varMorseQ_c ( int n, const double* rs, const double* params, double* Es, double* dpars ){ evalVarPotential( 4, n, rs, params, Es, dpars, _varMorseQ  ); }
+
+// ========== Fitting derivatives, kind: 0=LJQ (npar=3), 1=MorseQ (npar=4)
+
+double getVarDerivs_c( int kind, int na1, const double* apos1, const double* pars1, int na2, const double* apos2, const double* pars2, double* dE_par1 ){
+    if(kind==0){ return getVarDerivsLJQ   ( na1, (const Vec3d*)apos1, pars1, na2, (const Vec3d*)apos2, pars2, dE_par1 ); }
+    else       { return getVarDerivsMorseQ( na1, (const Vec3d*)apos1, pars1, na2, (const Vec3d*)apos2, pars2, dE_par1 ); }
+}
+
+// Energies Es[nsys] and Jacobian J[nsys,ntype*npar] = dE/dtpar for a packed training set
+// sys[isys*4+{0,1,2,3}] = { first atom of fragment 1, na1, first atom of fragment 2, na2 } indexing apos[natom*3], atypes[natom]
+int getVarDerivsSystems_c( int kind, int nsys, const int* sys, const double* apos, const int* atypes, int ntype, const double* tpars, double* Es, double* J, int bBoth ){
+    const int npar = (kind==0) ? 3 : 4;
+    const int nJ   = ntype*npar;
+    #pragma omp parallel for schedule(dynamic,16)
+    for (int isys=0; isys<nsys; isys++){
+        const int*    s  = sys + isys*4;
+        const Vec3d*  p1 = ((const Vec3d*)apos) + s[0];
+        const Vec3d*  p2 = ((const Vec3d*)apos) + s[2];
+        double*       Ji = J + (long)isys*nJ;
+        for (int k=0; k<nJ; k++){ Ji[k]=0; }
+        if(kind==0){ Es[isys] = getVarDerivsTypedLJQ   ( s[1], p1, atypes+s[0], s[3], p2, atypes+s[2], tpars, Ji, bBoth ); }
+        else       { Es[isys] = getVarDerivsTypedMorseQ( s[1], p1, atypes+s[0], s[3], p2, atypes+s[2], tpars, Ji, bBoth ); }
+    }
+    return npar;
+}
+
+}
@@ -67,10 +67,11 @@ class PaperDB:
 
     def search(self, query: str, required_tags: list | None = None, preferred_tags: list | None = None,
                excluded_tags: list | None = None, year_range: tuple | None = None,
-               limit: int = 20, explain: bool = False) -> list[dict]:
+               limit: int = 20, explain: bool = False, mode: str = "lexical", embedder=None) -> list[dict]:
         from paperdb.search.ranking import search as _search
         results = _search(query, self.repo, required_tags=required_tags, preferred_tags=preferred_tags,
-                          excluded_tags=excluded_tags, year_range=year_range, limit=limit, explain=explain)
+                          excluded_tags=excluded_tags, year_range=year_range, limit=limit, explain=explain,
+                          mode=mode, embedder=embedder)
         # Convert SearchResult dataclass objects to dicts for CLI/MCP consumers
         out = []
         for r in results:
@@ -99,12 +100,29 @@ class PaperDB:
         return out
 
     def retrieve_context(self, query: str, token_budget: int = 24000, include: list | None = None,
-                         filters: dict | None = None, save: bool = False):
+                         filters: dict | None = None, save: bool = False, tokenizer=None):
         from paperdb.search.context import assemble_context_pack
-        pack = assemble_context_pack(query, self.repo, token_budget=token_budget, include=include, filters=filters)
+        pack = assemble_context_pack(query, self.repo, token_budget=token_budget, include=include, filters=filters, tokenizer=tokenizer)
         if save: pack.id = self.repo.save_context_pack(query=pack.query, filters_json=pack.filters_json, selected_units_json=pack.selected_units_json, content=pack.content, output_path=pack.output_path)
         return pack
 
+    def retrieve_context_stream(self, query: str, token_budget: int = 24000, include: list | None = None,
+                                filters: dict | None = None, save: bool = False, tokenizer=None, pack=None):
+        """Yield the context pack in Markdown pieces as they are assembled; `pack` (ContextPack) gets the metadata.
+
+        With save=True the pieces are also collected and the pack is saved once the stream is exhausted.
+        """
+        from paperdb.search.context import ContextPack, assemble_context_pack_stream
+        pack = pack if pack is not None else ContextPack()
+        pieces = [] if save else None
+        for piece in assemble_context_pack_stream(query, self.repo, token_budget=token_budget, include=include,
+                                                  filters=filters, tokenizer=tokenizer, pack=pack):
+            if pieces is not None: pieces.append(piece)
+            yield piece
+        if save:
+            pack.content = ''.join(pieces)
+            pack.id = self.repo.save_context_pack(query=pack.query, filters_json=pack.filters_json, selected_units_json=pack.selected_units_json, content=pack.content, output_path=pack.output_path)
+
     # ── Processing (delegates to ingest/ module) ──────────────────────
 
     def scan_folder(self, path: str, recursive: bool = True):
@@ -279,11 +297,39 @@ class PaperDB:
                 parts.append(f"@article{{{key},\n  title = {{{p.title or ''}}},\n  author = {{{p.authors_text or ''}}},\n  year = {{{p.year or ''}}},\n}}\n")
         return '\n'.join(parts)
 
-    def reindex(self, operations: list, llm_config=None, force=True):
-        """Re-run specific operations on all papers."""
-        from paperdb.ingest.jobs import ingest_batch as _batch
+    def embed(self, paper: str | int | None = None, embedder=None, force: bool = False,
+              store: str | None = None, keep_float: bool = False) -> dict:
+        """Embed search units without a vector (all papers, or one) for hybrid search.
+
+        store="memmap" keeps vectors in the int8 memory-mapped store next to the database.
+        """
+        from paperdb.search.vectors import embed_search_units
+        paper_ids = None
+        if paper is not None:
+            p = self.get_paper(paper)
+            if p is None: return {"error": f"Paper not found: {paper}"}
+            paper_ids = [p.id]
+        return embed_search_units(self.repo, embedder=embedder, paper_ids=paper_ids, force=force,
+                                  store=store, keep_float=keep_float)
+
+    def compact_vectors(self, embedder=None) -> dict:
+        """Drop tombstoned rows from the memory-mapped vector store of an embedder."""
+        from paperdb.search.vectors import compact_vector_store
+        return compact_vector_store(self.repo, embedder=embedder)
+
+    def reindex(self, operations: list, llm_config=None, force=True, tag_batch_size: int = 0):
+        """Re-run specific operations on all papers.
+
+        With tag_batch_size > 0, "tag" runs from the active summaries, that many papers per LLM call.
+        """
+        from paperdb.ingest.jobs import ingest_batch as _batch, tag_batch
         all_papers = self.repo.list_papers(limit=100000)
         paper_ids = [p.id for p in all_papers]
+        if tag_batch_size > 0 and "tag" in operations:
+            others = [op for op in operations if op != "tag"]
+            result = _batch(paper_ids, self.repo, operations=others, llm_config=llm_config, force=force, data_dir=str(self.papers_dir)) if others else None
+            tagged = tag_batch(paper_ids, self.repo, llm_config=llm_config, batch_size=tag_batch_size, force=force)
+            return tagged if result is None else {**result, "tag": tagged}
         return _batch(paper_ids, self.repo, operations=operations, llm_config=llm_config, force=force, data_dir=str(self.papers_dir))
 
     # ── Status ──────────────────────────────────────────────────────────
@@ -115,13 +115,16 @@ def search(
     year: Optional[str] = typer.Option(None, "--year", help="Year range (e.g. 2015-2025 or 2020)"),
     explain: bool = typer.Option(False, "--explain", help="Show scoring breakdown"),
     limit: int = typer.Option(20, "--limit", help="Max results"),
+    mode: str = typer.Option("lexical", "--mode", help="lexical (FTS + tags) or hybrid (also embedding similarity; run 'embed' first)"),
+    embedder: Optional[str] = typer.Option(None, "--embedder", help="Embedder spec for hybrid mode (hash[:dim], st:<model>, openai[:<model>])"),
 ):
     """Search papers with explainable ranking."""
     db = get_db()
     required_tags = [t for t in (tag or []) if not t.startswith("!")]
     excluded_tags = [t[1:] for t in (tag or []) if t.startswith("!")]
     year_range = _parse_year_range(year)
-    results = db.search(query, required_tags=required_tags or None, excluded_tags=excluded_tags or None, year_range=year_range, limit=limit, explain=explain)
+    results = db.search(query, required_tags=required_tags or None, excluded_tags=excluded_tags or None, year_range=year_range, limit=limit, explain=explain,
+                        mode=mode, embedder=embedder)
     if _state["json"]:
         _out(results)
     else:
@@ -145,20 +148,27 @@ def context(
     out: Optional[str] = typer.Option(None, "--out", help="Write context pack to file"),
     save: bool = typer.Option(False, "--save", help="Save context pack to DB"),
     json_output: bool = typer.Option(False, "--json", help="Output as JSON"),
+    tokenizer: Optional[str] = typer.Option(None, "--tokenizer", help="Token counter for the budget: chars[:chars_per_token] (default), tiktoken[:<encoding>], hf:<model>"),
 ):
     """Assemble a compact, evidence-bearing context pack for an LLM agent."""
     db = get_db()
     include_types = include.split(",") if include else None
-    result = db.retrieve_context(query, token_budget=budget, include=include_types, save=save)
-    result_data = to_serializable(result)
-    content = result_data.get("content", "")
+    as_json = json_output or _state["json"]
+    if as_json and not out:
+        result = db.retrieve_context(query, token_budget=budget, include=include_types, save=save, tokenizer=tokenizer)
+        print(_json.dumps(to_serializable(result), indent=2, ensure_ascii=False))
+        return
+    # Markdown goes out piece by piece as papers are formatted, never held whole
+    stream = db.retrieve_context_stream(query, token_budget=budget, include=include_types, save=save, tokenizer=tokenizer)
     if out:
-        Path(out).write_text(content, encoding="utf-8")
-        _out(f"Context pack written to {out}" if not (json_output or _state["json"]) else {"out": out, "chars": len(content)})
-    elif json_output or _state["json"]:
-        print(_json.dumps(result_data, indent=2, ensure_ascii=False))
+        chars = 0
+        with open(out, "w", encoding="utf-8") as f:
+            for piece in stream:
+                f.write(piece); chars += len(piece)
+        _out(f"Context pack written to {out}" if not as_json else {"out": out, "chars": chars})
     else:
-        console.print(content)
+        for piece in stream:
+            sys.stdout.write(piece); sys.stdout.flush()
 
 # ── Inspection ────────────────────────────────────────────────────────────────
 @app.command()
@@ -334,6 +344,7 @@ def reindex(
     re_summarize: bool = typer.Option(False, "--re-summarize", help="Re-run summarization"),
     re_tag: bool = typer.Option(False, "--re-tag", help="Re-run tag extraction"),
     re_extract_equations: bool = typer.Option(False, "--re-extract-equations", help="Re-run equation extraction"),
+    tag_batch: int = typer.Option(0, "--tag-batch", help="With --re-tag: tag from summaries, N papers per LLM call"),
     llm_config: Optional[str] = typer.Option(None, "--llm-config", help="LLM config key"),
 ):
     """Re-process papers with updated settings."""
@@ -345,9 +356,27 @@ def reindex(
     if not operations:
         console.print("[red]Must specify at least one --re-* flag[/red]")
         raise typer.Exit(1)
-    result = db.reindex(operations, llm_config=llm_config or _state["llm_config"])
+    result = db.reindex(operations, llm_config=llm_config or _state["llm_config"], tag_batch_size=tag_batch)
     _out(f"Reindex complete: {result}" if not _state["json"] else {"result": result, "operations": operations})
 
+@app.command()
+def embed(
+    paper: Optional[str] = typer.Option(None, "--paper", help="Only this paper (key, DOI or id)"),
+    embedder: Optional[str] = typer.Option(None, "--embedder", help="hash[:dim] (default), st:<model>, openai[:<model>[@<base_url>]]"),
+    force: bool = typer.Option(False, "--force", help="Re-embed units that already have a vector"),
+    store: Optional[str] = typer.Option(None, "--store", help="sqlite (float32 blobs) or memmap (int8 memory-mapped files next to the DB)"),
+    keep_float: bool = typer.Option(False, "--keep-float", help="memmap: also keep float32 vectors for exact re-ranking"),
+    compact: bool = typer.Option(False, "--compact", help="Only compact the memmap store (drop tombstoned rows)"),
+):
+    """Embed search units that have no vector yet (for search --mode hybrid)."""
+    db = get_db()
+    if compact:
+        result = db.compact_vectors(embedder=embedder)
+        _out(f"Compacted vector store: {result}" if not _state["json"] else {"result": result})
+        return
+    result = db.embed(paper=paper, embedder=embedder, force=force, store=store, keep_float=keep_float)
+    _out(f"Embed complete: {result}" if not _state["json"] else {"result": result})
+
 # ── Status ────────────────────────────────────────────────────────────────────
 @app.command()
 def status(
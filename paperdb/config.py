@@ -1,10 +1,12 @@
 """LLM config loading via pyCruncher.Agent + config/LLMs.toml.
 
 Provides get_llm_config(key) that returns the provider settings dict.
-Default key from PAPERDB_LLM env var.
+Default key from PAPERDB_LLM env var. The file is parsed once per process
+and re-read only when it changes (pyCruncher.llm_templates), so resolving a
+key per operation per paper costs a stat(), not a TOML parse.
 """
+import importlib.util
 import os
-import toml
 from pathlib import Path
 
 def _get_llms_toml_path() -> Path:
@@ -13,11 +15,23 @@ def _get_llms_toml_path() -> Path:
     repo_root = here.parent  # AutoCrunchCoder/
     return repo_root / "config" / "LLMs.toml"
 
+def _load_registry():
+    """pyCruncher.llm_templates, shared with the Agents; loaded by path when only paperdb is installed."""
+    try:
+        from pyCruncher import llm_templates
+        return llm_templates
+    except ImportError:
+        path = Path(__file__).resolve().parent.parent / "pyCruncher" / "llm_templates.py"
+        spec = importlib.util.spec_from_file_location("_paperdb_llm_templates", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+llm_templates = _load_registry()
+
 def load_all_templates() -> dict:
-    """Load all templates from config/LLMs.toml."""
-    path = _get_llms_toml_path()
-    with open(path, "r") as f:
-        return toml.load(f)
+    """All templates from config/LLMs.toml (cached, treat as read-only)."""
+    return llm_templates.get_templates(_get_llms_toml_path())
 
 def get_llm_config(key: str | None = None) -> dict:
     """Return the provider settings dict for the given template key.
@@ -30,10 +44,7 @@ def get_llm_config(key: str | None = None) -> dict:
     if key is None:
         # fallback: first available template
         key = next(iter(templates))
-    if key not in templates:
-        available = ", ".join(templates.keys())
-        raise ValueError(f"Unknown LLM template '{key}'. Available: {available}")
-    return templates[key]
+    return llm_templates.get_template(key, _get_llms_toml_path())
 
 def make_agent(key: str | dict | None = None):
     """Create a pyCruncher Agent from an explicit or resolved-default template key."""
@@ -56,3 +56,14 @@ def init_schema(conn: sqlite3.Connection | None = None):
     schema_path = Path(__file__).parent / "schema.sql"
     with open(schema_path, "r") as f:
         conn.executescript(f.read())
+    _upgrade_schema(conn)
+
+# Columns added after the first release: CREATE TABLE IF NOT EXISTS does not add them to existing databases.
+_ADDED_COLUMNS = [("search_units", "section_key", "TEXT")]
+
+def _upgrade_schema(conn: sqlite3.Connection):
+    """Add missing columns (and the indexes that need them) to databases created by older schema.sql."""
+    for table, column, decl in _ADDED_COLUMNS:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns: conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_search_units_section ON search_units(paper_id, section_key)")
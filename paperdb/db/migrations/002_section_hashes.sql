@@ -0,0 +1,14 @@
+-- Migration 002: per-section hashes for incremental re-ingestion.
+-- init_schema() applies the column through _upgrade_schema(); this file records the change.
+
+ALTER TABLE search_units ADD COLUMN section_key TEXT;
+CREATE INDEX IF NOT EXISTS idx_search_units_section ON search_units(paper_id, section_key);
+
+CREATE TABLE IF NOT EXISTS run_sections(
+    run_id INTEGER NOT NULL REFERENCES processing_runs(id),
+    section_key TEXT NOT NULL,
+    section_path TEXT,
+    sha256 TEXT NOT NULL,
+    reused_from_run_id INTEGER REFERENCES processing_runs(id),
+    PRIMARY KEY(run_id, section_key)
+);
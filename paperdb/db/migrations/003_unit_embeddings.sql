@@ -0,0 +1,10 @@
+-- Migration 003: search-unit embeddings for vector / hybrid retrieval.
+
+CREATE TABLE IF NOT EXISTS unit_embeddings(
+    unit_id INTEGER PRIMARY KEY REFERENCES search_units(id) ON DELETE CASCADE,
+    run_id INTEGER REFERENCES processing_runs(id),
+    model TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_unit_embeddings_model ON unit_embeddings(model);
@@ -55,6 +55,14 @@ class SearchUnit(BaseModel):
     page_from: Optional[int] = None
     page_to: Optional[int] = None
     content: Optional[str] = None
+    section_key: Optional[str] = None
+
+class RunSection(BaseModel):
+    run_id: int
+    section_key: str
+    section_path: Optional[str] = None
+    sha256: str
+    reused_from_run_id: Optional[int] = None
 
 class ProcessingRun(BaseModel):
     id: Optional[int] = None
@@ -10,6 +10,7 @@ from paperdb.db.connection import db_transaction
 class Repository:
     def __init__(self, conn: sqlite3.Connection):
         self.conn = conn
+        self.tags_generation = 0   # bumped on tag/alias writes; invalidates taxonomy.aliases.alias_index
 
     def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
         return self.conn.execute(sql, params)
@@ -23,6 +24,14 @@ class Repository:
     def _fetchall(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
         return self.conn.execute(sql, params).fetchall()
 
+    def _fetchall_in(self, sql: str, ids, params: tuple = ()) -> list[sqlite3.Row]:
+        """Run `sql` with its "{ids}" placeholder bound to chunks of `ids` (SQLite caps host parameters)."""
+        ids, rows = list(ids), []
+        for i0 in range(0, len(ids), 900):
+            chunk = ids[i0:i0 + 900]
+            rows += self._fetchall(sql.format(ids=",".join("?" * len(chunk))), tuple(chunk) + tuple(params))
+        return rows
+
     # ── Papers ──────────────────────────────────────────────────────────
 
     def upsert_paper(self, paper: Paper | None = None, **kwargs) -> int:
@@ -127,28 +136,77 @@ class Repository:
 
     # ── Search Units ────────────────────────────────────────────────────
 
-    def replace_search_units(self, paper_id: int, units: list):
+    def replace_search_units(self, paper_id: int, units: list, keep_sections=None):
         """Transactional delete+insert for search units of a paper.
-        Accepts list of SearchUnit objects or list of dicts."""
+        Accepts list of SearchUnit objects or list of dicts. With keep_sections, units whose
+        section_key is in it stay untouched (incremental rebuild); all others are replaced."""
+        keep = list(keep_sections or [])
         with db_transaction(self.conn):
-            self._execute("DELETE FROM search_units WHERE paper_id = ?", (paper_id,))
+            if keep:
+                placeholders = ",".join("?" * len(keep))
+                self._execute(f"DELETE FROM search_units WHERE paper_id = ? AND (section_key IS NULL OR section_key NOT IN ({placeholders}))",
+                              (paper_id, *keep))
+            else:
+                self._execute("DELETE FROM search_units WHERE paper_id = ?", (paper_id,))
             for u in units:
                 if isinstance(u, dict):
                     u = SearchUnit(paper_id=paper_id, **{k: v for k, v in u.items() if k != 'paper_id'})
-                self._execute("""INSERT INTO search_units (paper_id, run_id, unit_type, source_type, source_id, section_path, page_from, page_to, content)
-                    VALUES (?,?,?,?,?,?,?,?,?)""",
-                    (paper_id, u.run_id, u.unit_type, u.source_type, u.source_id, u.section_path, u.page_from, u.page_to, u.content))
+                self._execute("""INSERT INTO search_units (paper_id, run_id, unit_type, source_type, source_id, section_path, page_from, page_to, content, section_key)
+                    VALUES (?,?,?,?,?,?,?,?,?,?)""",
+                    (paper_id, u.run_id, u.unit_type, u.source_type, u.source_id, u.section_path, u.page_from, u.page_to, u.content, getattr(u, "section_key", None) or None))
 
     def get_search_units_for_paper(self, paper_id: int) -> list[SearchUnit]:
         rows = self._fetchall("SELECT * FROM search_units WHERE paper_id = ? ORDER BY id", (paper_id,))
         return [SearchUnit(**dict(r)) for r in rows]
 
+    def get_search_units_by_ids(self, unit_ids: list) -> list[dict]:
+        """Rows shaped like fts_search results (unit_id, paper_id, content, ...) for the given ids."""
+        rows = self._fetchall_in("""SELECT id AS unit_id, paper_id, content, section_path, unit_type, source_type, source_id
+            FROM search_units WHERE id IN ({ids})""", unit_ids)
+        return [dict(r) for r in rows]
+
+    # ── Unit embeddings ─────────────────────────────────────────────────
+
+    def add_unit_embeddings(self, run_id: int | None, model: str, dim: int, rows: list):
+        """Store (unit_id, float32 bytes) pairs; replaces a unit's vector from any other embedder."""
+        with db_transaction(self.conn):
+            self._executemany("INSERT OR REPLACE INTO unit_embeddings (unit_id, run_id, model, dim, vector) VALUES (?,?,?,?,?)",
+                              [(uid, run_id, model, dim, blob) for uid, blob in rows])
+
+    def get_units_without_embedding(self, model: str, paper_ids: list | None = None, include_all: bool = False) -> list[tuple]:
+        """(unit_id, paper_id, content) of units with no vector from `model` (all units with include_all)."""
+        sql = """SELECT su.id, su.paper_id, su.content FROM search_units su
+            LEFT JOIN unit_embeddings e ON e.unit_id = su.id AND e.model = ?"""
+        if paper_ids is not None and not paper_ids: return []
+        where, params = ([] if include_all else ["e.unit_id IS NULL"]), [model]
+        if paper_ids is not None:
+            where.append(f"su.paper_id IN ({','.join('?' * len(paper_ids))})")
+            params += list(paper_ids)
+        if where: sql += " WHERE " + " AND ".join(where)
+        return [tuple(r) for r in self._fetchall(sql + " ORDER BY su.id", tuple(params))]
+
+    def get_unit_embeddings(self, model: str) -> list[tuple]:
+        """(unit_id, vector blob) of every unit embedded by `model` into SQLite (not the memmap store), by unit id."""
+        return [tuple(r) for r in self._fetchall("SELECT unit_id, vector FROM unit_embeddings WHERE model=? AND length(vector) > 0 ORDER BY unit_id", (model,))]
+
+    def clear_unit_embedding_blobs(self, model: str):
+        """Mark `model` vectors as living in the memmap store (empty blobs) after they were copied there."""
+        self._execute("UPDATE unit_embeddings SET vector=x'' WHERE model=?", (model,))
+
+    def get_unit_embedding_ids(self, model: str) -> list[int]:
+        """Unit ids that have a `model` vector, wherever it is stored."""
+        return [r[0] for r in self._fetchall("SELECT unit_id FROM unit_embeddings WHERE model=?", (model,))]
+
+    def get_unit_embedding_state(self, model: str) -> tuple:
+        """(count, max unit_id, sum unit_id) of `model` vectors — changes whenever vectors are added or removed."""
+        return tuple(self._fetchone("SELECT COUNT(*), MAX(unit_id), TOTAL(unit_id) FROM unit_embeddings WHERE model=?", (model,)))
+
     def add_search_unit(self, su: SearchUnit | None = None, **kwargs) -> int:
         if su is None:
             su = SearchUnit(**kwargs)
-        cur = self._execute("""INSERT INTO search_units (paper_id, run_id, unit_type, source_type, source_id, section_path, page_from, page_to, content)
-            VALUES (?,?,?,?,?,?,?,?,?)""",
-            (su.paper_id, su.run_id, su.unit_type, su.source_type, su.source_id, su.section_path, su.page_from, su.page_to, su.content))
+        cur = self._execute("""INSERT INTO search_units (paper_id, run_id, unit_type, source_type, source_id, section_path, page_from, page_to, content, section_key)
+            VALUES (?,?,?,?,?,?,?,?,?,?)""",
+            (su.paper_id, su.run_id, su.unit_type, su.source_type, su.source_id, su.section_path, su.page_from, su.page_to, su.content, su.section_key))
         return cur.lastrowid
 
     # ── Processing Runs ─────────────────────────────────────────────────
@@ -201,6 +259,17 @@ class Repository:
         row = self._fetchone("SELECT * FROM processing_runs WHERE id=?", (run_id,))
         return ProcessingRun(**dict(row)) if row else None
 
+    def add_run_sections(self, run_id: int, sections: list):
+        """Record per-section input hashes of a run: RunSection objects or dicts."""
+        rows = [s if isinstance(s, RunSection) else RunSection(run_id=run_id, **{k: v for k, v in s.items() if k != 'run_id'}) for s in sections]
+        with db_transaction(self.conn):
+            self._executemany("""INSERT OR REPLACE INTO run_sections (run_id, section_key, section_path, sha256, reused_from_run_id)
+                VALUES (?,?,?,?,?)""", [(run_id, r.section_key, r.section_path, r.sha256, r.reused_from_run_id) for r in rows])
+
+    def get_run_sections(self, run_id: int) -> list[RunSection]:
+        rows = self._fetchall("SELECT * FROM run_sections WHERE run_id=? ORDER BY rowid", (run_id,))
+        return [RunSection(**dict(r)) for r in rows]
+
     # ── Tags ────────────────────────────────────────────────────────────
 
     def upsert_tag(self, tag: Tag | None = None, **kwargs) -> int:
@@ -211,6 +280,7 @@ class Repository:
         row = self._fetchone("SELECT id FROM tags WHERE canonical_name=? AND category=?", (tag.canonical_name, tag.category))
         if row: return row["id"]
         cur = self._execute("INSERT INTO tags (canonical_name, category) VALUES (?,?)", (tag.canonical_name, tag.category))
+        self.tags_generation += 1
         return cur.lastrowid
 
     def add_tag(self, canonical_name: str, category: str) -> int:
@@ -219,7 +289,8 @@ class Repository:
 
     def add_alias(self, tag_id: int, alias: str, normalized_alias: str | None = None):
         if normalized_alias is None: normalized_alias = alias.lower().strip()
-        self._execute("INSERT OR IGNORE INTO tag_aliases (tag_id, alias, normalized_alias) VALUES (?,?,?)", (tag_id, alias, normalized_alias))
+        cur = self._execute("INSERT OR IGNORE INTO tag_aliases (tag_id, alias, normalized_alias) VALUES (?,?,?)", (tag_id, alias, normalized_alias))
+        if cur.rowcount: self.tags_generation += 1
 
     def add_tag_alias(self, tag_id: int, alias: str, normalized_alias: str | None = None):
         """Alias for add_alias — matches caller expectations in taxonomy/aliases.py."""
@@ -293,6 +364,11 @@ class Repository:
         row = self._fetchone("SELECT * FROM tags WHERE id=?", (tag_id,))
         return Tag(**dict(row)) if row else None
 
+    def list_tag_aliases(self) -> list[TagAlias]:
+        """Every alias row, in insertion order (for taxonomy.aliases.load_alias_map)."""
+        rows = self._fetchall("SELECT * FROM tag_aliases ORDER BY rowid")
+        return [TagAlias(**dict(r)) for r in rows]
+
     def get_tag_aliases_by_normalized(self, normalized_alias: str) -> list[dict]:
         """Find all tag_aliases matching a normalized alias. Returns list of dicts with tag info."""
         rows = self._fetchall("""SELECT a.*, t.canonical_name, t.category
@@ -317,10 +393,12 @@ class Repository:
     def delete_tag_aliases_by_tag(self, tag_id: int):
         """Delete all tag_aliases for a given tag."""
         self._execute("DELETE FROM tag_aliases WHERE tag_id=?", (tag_id,))
+        self.tags_generation += 1
 
     def delete_tag(self, tag_id: int):
         """Delete a tag."""
         self._execute("DELETE FROM tags WHERE id=?", (tag_id,))
+        self.tags_generation += 1
 
     def get_paper_tag_count(self, tag_id: int) -> int:
         """Count how many papers use this tag."""
@@ -347,6 +425,21 @@ class Repository:
              eq.section_path, eq.page_number, eq.bbox_json, eq.context_before, eq.context_after, eq.parser, eq.confidence, eq.verification_status))
         return cur.lastrowid
 
+    def copy_equations(self, equation_ids: list, run_id: int) -> dict:
+        """Carry equations (and their variables) over into a new run; returns {old_id: new_id}."""
+        mapping = {}
+        with db_transaction(self.conn):
+            for old_id in equation_ids:
+                cur = self._execute("""INSERT INTO equations (paper_id, run_id, latex_raw, latex_normalized, equation_number,
+                    section_path, page_number, bbox_json, context_before, context_after, parser, confidence, verification_status)
+                    SELECT paper_id, ?, latex_raw, latex_normalized, equation_number, section_path, page_number, bbox_json,
+                    context_before, context_after, parser, confidence, verification_status FROM equations WHERE id=?""", (run_id, old_id))
+                mapping[old_id] = cur.lastrowid
+                self._execute("""INSERT INTO equation_variables (equation_id, symbol, meaning, source_page, source_context)
+                    SELECT ?, symbol, meaning, source_page, source_context FROM equation_variables WHERE equation_id=? ORDER BY id""",
+                    (cur.lastrowid, old_id))
+        return mapping
+
     def get_equations_for_paper(self, paper_id: int, include_superseded: bool = False) -> list[Equation]:
         sql = """SELECT e.* FROM equations e LEFT JOIN processing_runs r ON r.id=e.run_id WHERE e.paper_id=?
             AND (? OR e.run_id IS NULL OR r.status='ok') ORDER BY e.id"""
@@ -364,6 +457,21 @@ class Repository:
         rows = self._fetchall("SELECT * FROM equation_variables WHERE equation_id = ?", (equation_id,))
         return [EquationVariable(**dict(r)) for r in rows]
 
+    def get_equations_for_papers(self, paper_ids: list) -> dict:
+        """{paper_id: [Equation]} of active equations, like get_equations_for_paper() for many papers."""
+        out = {}
+        for r in self._fetchall_in("""SELECT e.* FROM equations e LEFT JOIN processing_runs r ON r.id=e.run_id
+                WHERE e.paper_id IN ({ids}) AND (e.run_id IS NULL OR r.status='ok') ORDER BY e.id""", paper_ids):
+            out.setdefault(r["paper_id"], []).append(Equation(**dict(r)))
+        return out
+
+    def get_variables_for_equations(self, equation_ids: list) -> dict:
+        """{equation_id: [EquationVariable]}."""
+        out = {}
+        for r in self._fetchall_in("SELECT * FROM equation_variables WHERE equation_id IN ({ids}) ORDER BY id", equation_ids):
+            out.setdefault(r["equation_id"], []).append(EquationVariable(**dict(r)))
+        return out
+
     # ── Methods ─────────────────────────────────────────────────────────
 
     def upsert_method(self, m: Method | None = None, **kwargs) -> int:
@@ -384,6 +492,14 @@ class Repository:
         rows = self._fetchall(sql, (paper_id, int(include_superseded)))
         return [Method(**dict(r)) for r in rows]
 
+    def get_methods_for_papers(self, paper_ids: list) -> dict:
+        """{paper_id: [Method]} of active methods, like get_methods_for_paper() for many papers."""
+        out = {}
+        for r in self._fetchall_in("""SELECT m.* FROM methods m LEFT JOIN processing_runs r ON r.id=m.run_id
+                WHERE m.paper_id IN ({ids}) AND (m.run_id IS NULL OR r.status='ok') ORDER BY m.id""", paper_ids):
+            out.setdefault(r["paper_id"], []).append(Method(**dict(r)))
+        return out
+
     def get_methods(self, paper_id: int, method_type: str | None = None) -> list[Method]:
         """Get active methods for a paper, optionally filtered by method_type."""
         if method_type:
@@ -423,6 +539,14 @@ class Repository:
             WHERE s.paper_id=? AND s.is_active=1 AND (s.run_id IS NULL OR r.status='ok') ORDER BY s.id DESC LIMIT 1""", (paper_id,))
         return Summary(**dict(row)) if row else None
 
+    def get_active_summaries(self, paper_ids: list) -> dict:
+        """{paper_id: Summary} with the get_active_summary() choice for each paper that has one."""
+        out = {}
+        for r in self._fetchall_in("""SELECT s.* FROM summaries s LEFT JOIN processing_runs r ON r.id=s.run_id
+                WHERE s.paper_id IN ({ids}) AND s.is_active=1 AND (s.run_id IS NULL OR r.status='ok') ORDER BY s.id""", paper_ids):
+            out[r["paper_id"]] = Summary(**dict(r))       # ascending ids: the newest wins
+        return out
+
     def list_summaries(self, paper_id: int) -> list[Summary]:
         rows = self._fetchall("SELECT * FROM summaries WHERE paper_id=? ORDER BY id DESC", (paper_id,))
         return [Summary(**dict(r)) for r in rows]
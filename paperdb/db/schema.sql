@@ -65,6 +65,17 @@ CREATE TABLE IF NOT EXISTS processing_runs(
     message TEXT
 );
 
+-- Per-section input hashes of a run (see paperdb/ingest/sections.py). reused_from_run_id is set
+-- when the section was unchanged and its output was carried over from that earlier run.
+CREATE TABLE IF NOT EXISTS run_sections(
+    run_id INTEGER NOT NULL REFERENCES processing_runs(id),
+    section_key TEXT NOT NULL,
+    section_path TEXT,
+    sha256 TEXT NOT NULL,
+    reused_from_run_id INTEGER REFERENCES processing_runs(id),
+    PRIMARY KEY(run_id, section_key)
+);
+
 -- Searchable units — FTS at section/paragraph/equation/method level, NOT paper-level
 CREATE TABLE IF NOT EXISTS search_units(
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -76,7 +87,8 @@ CREATE TABLE IF NOT EXISTS search_units(
     section_path TEXT,                     -- e.g. "3.1 Compliance"
     page_from INTEGER,
     page_to INTEGER,
-    content TEXT
+    content TEXT,
+    section_key TEXT                       -- "source:3 Method > 3.1 Compliance" — unit of incremental rebuild
 );
 
 CREATE VIRTUAL TABLE IF NOT EXISTS search_units_fts USING fts5(
@@ -102,6 +114,18 @@ CREATE TRIGGER IF NOT EXISTS search_units_au AFTER UPDATE ON search_units BEGIN
     VALUES (new.id, new.content, new.section_path);
 END;
 
+-- Embeddings of search units (see paperdb/search/vectors.py): float32 blob per unit; deleting
+-- or rebuilding a unit drops its vector, so the next embed run only sees new units.
+-- An empty blob means the vector lives in the memory-mapped store (search/vector_store.py).
+CREATE TABLE IF NOT EXISTS unit_embeddings(
+    unit_id INTEGER PRIMARY KEY REFERENCES search_units(id) ON DELETE CASCADE,
+    run_id INTEGER REFERENCES processing_runs(id),
+    model TEXT NOT NULL,                   -- embedder name, e.g. "hash:384", "st:all-MiniLM-L6-v2"
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_unit_embeddings_model ON unit_embeddings(model);
+
 -- Tags — canonical names with categories
 CREATE TABLE IF NOT EXISTS tags(
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -70,7 +70,17 @@ def _extract_variable_defs(context_before: str, context_after: str, page: Option
     return unique
 
 
-def extract_equations(structured_json: dict, paper_id: int, run_id: int, repo) -> list:
+def equation_items(structured_json: dict) -> list[dict]:
+    """Equation records to store: structured_json['equations'] or, failing that, $$ blocks of its markdown."""
+    eq_items = structured_json.get("equations", [])
+    if not eq_items:
+        md = structured_json.get("markdown", "")
+        if md:
+            eq_items = _extract_from_markdown(md, structured_json.get("sections", []))
+    return eq_items
+
+
+def extract_equations(structured_json: dict, paper_id: int, run_id: int, repo, reuse=None) -> list:
     """Extract equations from Docling structured output and store via repository.
 
     Args:
@@ -78,25 +88,33 @@ def extract_equations(structured_json: dict, paper_id: int, run_id: int, repo) -
         paper_id: paper ID in the database
         run_id: processing_run ID for this extraction run
         repo: Repository instance with upsert_equation() and add_variable() methods
+        reuse: optional callable(item) -> equation id of an earlier run holding the same
+            equation from an unchanged section; that row (and its variables) is carried
+            over via repo.copy_equations() instead of being parsed and stored again
 
     Returns:
         list of equation dicts that were stored
     """
     # Equations may come from structured_json['equations'] (from DoclingParser)
     # or from markdown text as fallback
-    eq_items = structured_json.get("equations", [])
-    if not eq_items:
-        # Fallback: extract from markdown in structured_json
-        md = structured_json.get("markdown", "")
-        if md:
-            eq_items = _extract_from_markdown(md, structured_json.get("sections", []))
+    eq_items = equation_items(structured_json)
 
     stored = []
+    reused = 0
     for eq in eq_items:
         latex_raw = eq.get("latex_raw", "")
         if not latex_raw or len(latex_raw) < 3:
             continue
 
+        previous_id = reuse(eq) if reuse else None
+        if previous_id is not None:
+            eq_id = repo.copy_equations([previous_id], run_id)[previous_id]
+            stored.append({"id": eq_id, "paper_id": paper_id, "run_id": run_id, "latex_raw": latex_raw,
+                           "latex_normalized": eq.get("latex_normalized") or _normalize_latex(latex_raw),
+                           "equation_number": eq.get("equation_number"), "reused_from": previous_id})
+            reused += 1
+            continue
+
         latex_normalized = eq.get("latex_normalized") or _normalize_latex(latex_raw)
 
         eq_obj = Equation(
@@ -129,7 +147,7 @@ def extract_equations(structured_json: dict, paper_id: int, run_id: int, repo) -
         for var in variables:
             repo.add_variable(EquationVariable(equation_id=eq_id, **var))
 
-    logger.info(f"Extracted {len(stored)} equations for paper_id={paper_id}")
+    logger.info(f"Extracted {len(stored)} equations for paper_id={paper_id} ({reused} carried over)")
     return stored
 
 
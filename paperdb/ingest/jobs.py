@@ -78,3 +78,44 @@ def ingest_batch(paper_ids: list, repo, operations=None, llm_config=None,
             result["details"].append({"paper_id": pid, "error": str(exc)})
             logger.error("Batch ingest failed for paper %s: %s", pid, exc, exc_info=True)
     return result
+
+
+def tag_batch(paper_ids: list, repo, llm_config=None, batch_size: int = 8, force=False) -> dict:
+    """Tag papers from their active summaries, several papers per LLM request.
+
+    Each paper still gets its own "tag" processing run (input = summary hash), so
+    provenance, supersession and refresh_paper_tags work as for ingest_paper.
+    """
+    from ..taxonomy.extraction import extract_tags_batch
+    config = {"llm": _model_name(llm_config) or "default", "prompt_version": "v1", "input": "summary_batch"}
+    config_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+    result = {"processed": 0, "skipped": 0, "failed": 0, "details": []}
+    todo = []
+    for pid in paper_ids:
+        summary = repo.get_active_summary(pid)
+        content = summary.content if summary is not None else None
+        if not content:
+            result["failed"] += 1
+            result["details"].append({"paper_id": pid, "error": "tag: no active summary"})
+            continue
+        digest = hashlib.sha256(content.encode()).hexdigest()
+        if not force and find_equivalent_run(pid, "tag", digest, "llm", config_hash, _model_name(llm_config), "v1", repo):
+            result["skipped"] += 1
+            continue
+        todo.append((pid, run_job(pid, "tag", "llm", config, repo, llm_config, digest), content))
+    if not todo: return result
+    try:
+        tagged, errors = extract_tags_batch(todo, repo, llm_config, batch_size=batch_size)
+    except Exception as exc:
+        tagged, errors = {}, {pid: str(exc) for pid, _, _ in todo}
+        logger.error("Batch tagging failed: %s", exc, exc_info=True)
+    for pid, run_id, _ in todo:
+        if pid in tagged:
+            finish_job(run_id, "ok", repo)
+            result["processed"] += 1
+            result["details"].append({"paper_id": pid, "tags": len(tagged[pid])})
+        else:
+            finish_job(run_id, "failed", repo, message=errors.get(pid, "not tagged"))
+            result["failed"] += 1
+            result["details"].append({"paper_id": pid, "error": errors.get(pid, "not tagged")})
+    return result
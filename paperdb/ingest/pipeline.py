@@ -12,6 +12,7 @@ from ..extract.base import ExtractionResult
 from ..extract.docling_backend import DoclingParser
 from ..extract.equations import extract_equations
 from ..extract.methods import extract_methods
+from .sections import markdown_sections, sections_hash, section_for
 from ..synthesis.summaries import compile_markdown, source_markdown
 
 logger = logging.getLogger(__name__)
@@ -46,10 +47,48 @@ def _config_hash(config: Optional[dict]) -> str:
     return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
 
 
-def _equivalent(paper_id, operation, input_hash, backend, config, llm_config, prompt_version, repo, force):
+def _equivalent(paper_id, operation, input_hash, backend, config, llm_config, prompt_version, repo, force, legacy_hash=None):
+    """Equivalent prior run by input hash; legacy_hash also matches runs recorded before section hashing."""
     if force: return None
-    return find_equivalent_run(paper_id, operation, input_hash, backend, _config_hash(config),
-                               _model_name(llm_config), prompt_version, repo)
+    model = _model_name(llm_config)
+    for candidate in (input_hash, legacy_hash):
+        if not candidate: continue
+        run_id = find_equivalent_run(paper_id, operation, candidate, backend, _config_hash(config), model, prompt_version, repo)
+        if run_id: return run_id
+    return None
+
+
+def _prior_sections(repo, paper_id, operation):
+    """(run, {section_key: sha256}) of the current successful run of an operation, or (None, {})."""
+    prior = repo.get_current_run(paper_id, operation)
+    if prior is None: return None, {}
+    return prior, {row.section_key: row.sha256 for row in repo.get_run_sections(prior.id)}
+
+
+def _record_sections(repo, run_id, sections, prior=None, prior_hashes=None):
+    """Store the run's section hashes; with `prior`, unchanged sections point at the prior run they match.
+
+    Pass `prior` only from an operation that really skipped those sections (search-unit re-indexing);
+    operations that re-read the whole text record hashes without reuse provenance.
+    """
+    prior_hashes = prior_hashes or {}
+    repo.add_run_sections(run_id, [{"section_key": s.key, "section_path": s.path, "sha256": s.sha256,
+                                    "reused_from_run_id": prior.id if prior is not None and prior_hashes.get(s.key) == s.sha256 else None}
+                                   for s in sections.values()])
+
+
+def _equation_reuse(sections, prior, prior_hashes, prior_equations):
+    """reuse callback for extract_equations(): prior equation id for items of unchanged sections."""
+    if prior is None: return None
+    available = {}
+    for eq in prior_equations:
+        if eq.run_id == prior.id: available.setdefault(eq.latex_raw, []).append(eq.id)
+    def reuse(item):
+        key = section_for(sections, item.get("section_path"), item.get("latex_raw"))
+        if key is None or prior_hashes.get(key) != sections[key].sha256: return None
+        ids = available.get(item.get("latex_raw"))
+        return ids.pop(0) if ids else None
+    return reuse
 
 
 def _load_extraction(json_path: str, markdown: str) -> ExtractionResult | None:
@@ -129,7 +168,11 @@ def ingest_paper(paper_id: int, repo, operations=None, llm_config=None, force=Fa
     if extraction is None and source_text:
         extraction = ExtractionResult(markdown=source_text, structured_json={"markdown": source_text}, metadata={"backend": "markdown_fallback"})
 
-    source_hash = hashlib.sha256(source_text.encode()).hexdigest() if source_text else ""
+    # LLM inputs are keyed by section hashes, so re-conversions that only reflow text do not invalidate them;
+    # legacy_source_hash keeps runs recorded before section hashing equivalent.
+    sections = markdown_sections(source_text) if source_text else {}
+    source_hash = sections_hash(sections) if source_text else ""
+    legacy_source_hash = hashlib.sha256(source_text.encode()).hexdigest() if source_text else ""
     extraction_hash = hashlib.sha256(json.dumps(to_serializable(extraction), sort_keys=True, default=str).encode()).hexdigest() if extraction else ""
     equations = repo.get_equations_for_paper(paper_id)
     if "equations" in ops:
@@ -141,11 +184,13 @@ def ingest_paper(paper_id: int, repo, operations=None, llm_config=None, force=Fa
             if existing:
                 result["operations_skipped"].append("equations")
             else:
+                prior, prior_hashes = _prior_sections(repo, paper_id, "equations")
                 run_id = run_job(paper_id, "equations", "docling", config, repo, llm_config=False, input_sha256=extraction_hash, source_file_id=source_file_id, prompt_version=None)
                 try:
                     structured = dict(extraction.structured_json)
                     structured.update({"equations": extraction.equations, "markdown": source_text})
-                    extract_equations(structured, paper_id, run_id, repo)
+                    _record_sections(repo, run_id, sections)
+                    extract_equations(structured, paper_id, run_id, repo, reuse=_equation_reuse(sections, prior, prior_hashes, equations))
                     finish_job(run_id, "ok", repo)
                     equations = repo.get_equations_for_paper(paper_id)
                     result["operations_run"].append("equations")
@@ -153,7 +198,10 @@ def ingest_paper(paper_id: int, repo, operations=None, llm_config=None, force=Fa
                     finish_job(run_id, "failed", repo, message=str(exc))
                     result["errors"].append(f"equations: {exc}")
 
-    methods_input_hash = hashlib.sha256((source_hash + json.dumps(to_serializable(equations), sort_keys=True, default=str)).encode()).hexdigest()
+    # equation content only: carried-over equations get new ids but must not invalidate methods
+    equation_content = json.dumps([[e.latex_raw, e.latex_normalized, e.equation_number, e.section_path] for e in equations])
+    methods_input_hash = hashlib.sha256((source_hash + equation_content).encode()).hexdigest()
+    legacy_methods_hash = hashlib.sha256((legacy_source_hash + json.dumps(to_serializable(equations), sort_keys=True, default=str)).encode()).hexdigest()
     if "methods" in ops:
         if not source_text:
             result["errors"].append("methods: no Markdown source")
@@ -161,12 +209,13 @@ def ingest_paper(paper_id: int, repo, operations=None, llm_config=None, force=Fa
             model = _model_name(llm_config)
             backend = "llm" if llm_config is not False else "regex"
             config = {"llm": model or "default", "prompt_version": "v1"}
-            existing = _equivalent(paper_id, "methods", methods_input_hash, backend, config, llm_config, "v1", repo, force)
+            existing = _equivalent(paper_id, "methods", methods_input_hash, backend, config, llm_config, "v1", repo, force, legacy_methods_hash)
             if existing:
                 result["operations_skipped"].append("methods")
             else:
                 run_id = run_job(paper_id, "methods", backend, config, repo, llm_config, methods_input_hash, source_file_id)
                 try:
+                    _record_sections(repo, run_id, sections)
                     extract_methods(source_text, to_serializable(equations), paper_id, run_id, repo, llm_config)
                     finish_job(run_id, "ok", repo)
                     result["operations_run"].append("methods")
@@ -180,12 +229,13 @@ def ingest_paper(paper_id: int, repo, operations=None, llm_config=None, force=Fa
         else:
             from ..synthesis.summaries import generate_summary
             config = {"llm": _model_name(llm_config) or "default", "prompt_version": "v1"}
-            existing = _equivalent(paper_id, "summarize", source_hash, "llm", config, llm_config, "v1", repo, force)
+            existing = _equivalent(paper_id, "summarize", source_hash, "llm", config, llm_config, "v1", repo, force, legacy_source_hash)
             if existing:
                 result["operations_skipped"].append("summarize")
             else:
                 run_id = run_job(paper_id, "summarize", "llm", config, repo, llm_config, source_hash, source_file_id)
                 try:
+                    _record_sections(repo, run_id, sections)
                     summary = generate_summary(source_text, paper_id, run_id, repo, llm_config)
                     markdown = compile_markdown(source_text, summary)
                     _atomic_write(md_path, markdown)
@@ -203,12 +253,13 @@ def ingest_paper(paper_id: int, repo, operations=None, llm_config=None, force=Fa
         else:
             from ..taxonomy.extraction import extract_tags
             config = {"llm": _model_name(llm_config) or "default", "prompt_version": "v1"}
-            existing = _equivalent(paper_id, "tag", source_hash, "llm", config, llm_config, "v1", repo, force)
+            existing = _equivalent(paper_id, "tag", source_hash, "llm", config, llm_config, "v1", repo, force, legacy_source_hash)
             if existing:
                 result["operations_skipped"].append("tag")
             else:
                 run_id = run_job(paper_id, "tag", "llm", config, repo, llm_config, source_hash, source_file_id)
                 try:
+                    _record_sections(repo, run_id, sections)
                     extract_tags(source_text, paper_id, run_id, repo, llm_config)
                     finish_job(run_id, "ok", repo)
                     result["operations_run"].append("tag")
@@ -226,20 +277,37 @@ def ingest_paper(paper_id: int, repo, operations=None, llm_config=None, force=Fa
             active_methods = repo.get_methods_for_paper(paper_id)
             search_payload = markdown + json.dumps(to_serializable(active_equations), sort_keys=True, default=str) + json.dumps(to_serializable(active_methods), sort_keys=True, default=str)
             search_hash = hashlib.sha256(search_payload.encode()).hexdigest()
-            config = {"splitter": "markdown_and_structured_v2"}
+            config = {"splitter": "markdown_and_structured_v3", "structured_equations": bool(active_equations)}
             existing = _equivalent(paper_id, "search_units", search_hash, "internal", config, False, None, repo, force)
             if existing:
                 if "search_units" in ops: result["operations_skipped"].append("search_units")
             else:
+                # units of sections whose hash matches the current search_units run (same splitter config) stay in place
+                search_sections = markdown_sections(markdown)
+                prior, prior_hashes = _prior_sections(repo, paper_id, "search_units")
+                same_config = prior is not None and prior.config_hash == _config_hash(config)
+                keep = [] if force or not same_config else [k for k, sec in search_sections.items() if prior_hashes.get(k) == sec.sha256]
                 run_id = run_job(paper_id, "search_units", "internal", config, repo, llm_config=False, input_sha256=search_hash, prompt_version=None)
                 try:
-                    build_search_units_from_markdown(paper_id, markdown, run_id, repo, equations=active_equations, methods=active_methods)
+                    _record_sections(repo, run_id, search_sections, prior if keep else None, prior_hashes)
+                    build_search_units_from_markdown(paper_id, markdown, run_id, repo, equations=active_equations, methods=active_methods, keep_sections=keep)
                     finish_job(run_id, "ok", repo)
                     result["operations_run"].append("search_units")
                 except Exception as exc:
                     finish_job(run_id, "failed", repo, message=str(exc))
                     result["errors"].append(f"search_units: {exc}")
 
+    if "embed" in ops:
+        # optional stage (not in DEFAULT_OPERATIONS): vectors only for units that have none yet, see search/vectors.py
+        try:
+            from ..search.vectors import embed_search_units
+            embedded = embed_search_units(repo, paper_ids=[paper_id], force=force)
+            if embedded["errors"]: result["errors"].extend(f"embed: {e}" for e in embedded["errors"])
+            elif embedded["embedded"]: result["operations_run"].append("embed")
+            else: result["operations_skipped"].append("embed")
+        except Exception as exc:
+            result["errors"].append(f"embed: {exc}")
+
     artifacts_missing = not os.path.exists(json_path) or not os.path.exists(bib_path)
     knowledge_changed = bool(result["operations_run"])
     if "files" in ops or knowledge_changed:
@@ -0,0 +1,57 @@
+"""Section-level content hashes for incremental re-ingestion.
+
+A paper's Markdown is cut at the headings recognized by the search-unit splitter
+(paperdb.search.fts._split_markdown_to_units); each section gets a stable key
+("source:Methods > Relaxation", "summary:Essence", "#2" for repeated headings) and
+a SHA-256 of its whitespace-normalized text. Comparing these maps between two
+versions of the Markdown tells which sections a re-conversion actually changed,
+so search units and equations are rebuilt only there and LLM operations are keyed
+by the sections they read instead of by the raw file bytes.
+"""
+import hashlib
+import re
+from dataclasses import dataclass
+
+_WS_RE = re.compile(r"\s+")
+
+
+@dataclass
+class Section:
+    key: str
+    path: str
+    sha256: str
+    text: str
+
+
+def markdown_sections(markdown: str) -> dict:
+    """Return {section_key: Section} in document order (section and equation units only)."""
+    from paperdb.search.fts import _split_markdown_to_units
+    parts, paths = {}, {}
+    for unit in _split_markdown_to_units(0, markdown or "", None, paragraphs=False):
+        parts.setdefault(unit.section_key, []).append(unit.content)
+        paths.setdefault(unit.section_key, unit.section_path)
+    sections = {}
+    for key, contents in parts.items():
+        text = "\n\n".join(contents)
+        digest = hashlib.sha256(_WS_RE.sub(" ", text).strip().encode("utf-8")).hexdigest()
+        sections[key] = Section(key=key, path=paths[key], sha256=digest, text=text)
+    return sections
+
+
+def sections_hash(sections: dict, keys=None) -> str:
+    """One hash over (key, sha256) of the selected sections (all by default); '' when empty."""
+    selected = [sections[k] for k in (keys if keys is not None else sections) if k in sections]
+    if not selected: return ""
+    payload = "\n".join(f"{s.key}\t{s.sha256}" for s in selected)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def section_for(sections: dict, section_path: str | None, content: str | None = None) -> str | None:
+    """Key of the section holding an extracted item: by contained text first, then by heading path."""
+    if content:
+        hits = [k for k, s in sections.items() if content in s.text]
+        if len(hits) == 1: return hits[0]
+    if section_path:
+        hits = [k for k, s in sections.items() if s.path == section_path or s.path.endswith(" > " + section_path)]
+        if len(hits) == 1: return hits[0]
+    return None
@@ -6,11 +6,12 @@ Transport modes:
 
 Mutating tools are opt-in via --allow-mutations.
 """
+import asyncio
 import json as _json
 import os
 from typing import Optional
 
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 
 from paperdb.db.models import to_serializable
 
@@ -155,12 +156,29 @@ def explain_paper_match(paper_id: str, query: str) -> str:
 
 # ── Context pack tool ─────────────────────────────────────────────────────────
 @mcp.tool()
-def retrieve_context(query: str, token_budget: int = 24000, include: Optional[list[str]] = None, filters: Optional[dict] = None) -> str:
-    """Assemble a compact, evidence-bearing context package: select papers (stage A) → retrieve relevant units (stage B) → format with comparison matrix + bibliography."""
+def retrieve_context(query: str, token_budget: int = 24000, include: Optional[list[str]] = None, filters: Optional[dict] = None,
+                     tokenizer: Optional[str] = None) -> str:
+    """Assemble a compact, evidence-bearing context package: select papers (stage A) → retrieve relevant units (stage B) → pack the most valuable evidence per token (tokenizer: chars[:n], tiktoken[:enc], hf:<model>) → comparison matrix + bibliography."""
     db = _get_db()
-    result = db.retrieve_context(query, token_budget=token_budget, include=include, filters=filters)
+    result = db.retrieve_context(query, token_budget=token_budget, include=include, filters=filters, tokenizer=tokenizer)
     return _dumps(result)
 
+@mcp.tool()
+async def stream_context(query: str, ctx: Context, token_budget: int = 24000, include: Optional[list[str]] = None,
+                         filters: Optional[dict] = None, tokenizer: Optional[str] = None) -> str:
+    """retrieve_context, streamed: every Markdown piece is sent as soon as it is formatted, as a log message (logger "paperdb.context") with a progress update. Returns the pack metadata (paper_count, token_estimate, selected units, chars) without repeating the content."""
+    from paperdb.search.context import ContextPack
+    db = _get_db()
+    pack = ContextPack()
+    pieces = db.retrieve_context_stream(query, token_budget=token_budget, include=include, filters=filters, tokenizer=tokenizer, pack=pack)
+    sent = chars = 0
+    while (piece := await asyncio.to_thread(next, pieces, None)) is not None:   # DB work off the event loop
+        await ctx.log(piece, level="info", logger_name="paperdb.context")
+        sent += 1; chars += len(piece)
+        await ctx.report_progress(sent, message=f"{chars} chars")
+    return _dumps({"query": pack.query, "paper_count": pack.paper_count, "token_estimate": pack.token_estimate,
+                   "selected_units": _json.loads(pack.selected_units_json or "[]"), "pieces": sent, "chars": chars})
+
 # ── Taxonomy tools ────────────────────────────────────────────────────────────
 @mcp.tool()
 def list_tags(category: Optional[str] = None) -> str:
@@ -41,3 +41,9 @@ def get_reviews_dir(data_dir: str | Path | None = None) -> Path:
     p = (Path(data_dir).expanduser() if data_dir is not None else get_data_dir()) / "reviews"
     p.mkdir(parents=True, exist_ok=True)
     return p
+
+def get_cache_dir(data_dir: str | Path | None = None) -> Path:
+    """Directory for content-addressed intermediate results (e.g. per-chunk summaries)."""
+    p = (Path(data_dir).expanduser() if data_dir is not None else get_data_dir()) / "cache"
+    p.mkdir(parents=True, exist_ok=True)
+    return p
@@ -1,11 +1,21 @@
-'''Evidence-bearing context-pack assembly.'''
+'''Evidence-bearing context-pack assembly.
+
+Everything the formatter reads for the candidate papers (summaries, equations with
+their variables, methods) is loaded up front by prefetch_evidence() in a few
+bulk queries, and .bib files go through a reader cached by (path, mtime, size),
+so a 500-paper pack costs a handful of queries instead of thousands.
+'''
 
 import json
-from dataclasses import dataclass
+import math
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 from .fts import fts_search_for_papers
+from .packing import Block, CharTokenizer, count_tokens, make_tokenizer, pack_blocks
 from .ranking import _split_query, search
 
 
@@ -29,6 +39,42 @@ def _dict(value):
     return vars(value)
 
 
+@dataclass
+class Evidence:
+    '''Bulk-loaded inputs of the formatter, keyed by paper id (variables by equation id).'''
+    summaries: dict = field(default_factory=dict)
+    equations: dict = field(default_factory=dict)
+    variables: dict = field(default_factory=dict)
+    methods: dict = field(default_factory=dict)
+
+
+def prefetch_evidence(repo, paper_ids, include):
+    '''Load what `include` needs for all papers at once; methods always (comparison matrix).'''
+    paper_ids = list(paper_ids)
+    evidence = Evidence(methods=repo.get_methods_for_papers(paper_ids))
+    if 'summary' in include:
+        evidence.summaries = repo.get_active_summaries(paper_ids)
+    if 'equations' in include:
+        evidence.equations = {pid: eqs[:8] for pid, eqs in repo.get_equations_for_papers(paper_ids).items()}
+        equation_ids = [_dict(eq).get('id') for eqs in evidence.equations.values() for eq in eqs]
+        evidence.variables = repo.get_variables_for_equations([eid for eid in equation_ids if eid])
+    return evidence
+
+
+@lru_cache(maxsize=4096)
+def _read_text(path, mtime_ns, size):
+    return Path(path).read_text(encoding='utf-8')
+
+
+def read_bibtex(path):
+    '''Stripped text of a .bib file, or None; re-read only when its mtime or size changes.'''
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return _read_text(str(path), st.st_mtime_ns, st.st_size).strip()
+
+
 def _excerpt(text, limit=1600):
     '''Return a bounded excerpt at a paragraph/line boundary.'''
     text = (text or '').strip()
@@ -40,14 +86,48 @@ def _excerpt(text, limit=1600):
     return text[:cut].rstrip() + '\n[excerpt continues in source artifact]'
 
 
-def assemble_context_pack(query, repo, token_budget=24000, include=None, filters=None):
+# Value of a block per unit of paper relevance; the packer divides by its token cost.
+BLOCK_VALUES = {'summary': 3.0, 'methods': 3.0, 'equations': 2.0, 'sections': 2.0, 'markdown': 1.0, 'header': 1.0}
+
+
+def assemble_context_pack(query, repo, token_budget=24000, include=None, filters=None, tokenizer=None):
+    """Pack the most valuable evidence blocks of the ranked papers into `token_budget` tokens.
+
+    Every paper contributes candidate blocks (summary, equations, method cards, source passages,
+    Markdown), each measured with `tokenizer` (packing.make_tokenizer spec or callable) and valued
+    by paper relevance x BLOCK_VALUES. Selection is a value-per-token knapsack over all papers;
+    a paper's header, comparison-matrix row and bibliography entry are paid by its first block.
+    """
+    pack = ContextPack()
+    pack.content = ''.join(assemble_context_pack_stream(query, repo, token_budget=token_budget, include=include,
+                                                        filters=filters, tokenizer=tokenizer, pack=pack))
+    pack.token_estimate = count_tokens(pack.content, make_tokenizer(tokenizer))
+    return pack
+
+
+def assemble_context_pack_stream(query, repo, token_budget=24000, include=None, filters=None, tokenizer=None, pack=None):
+    """assemble_context_pack() as a generator of Markdown pieces, yielded as they are formatted.
+
+    The pack header comes before any search work, then one piece per selected paper (a full
+    compiled Markdown is read from disk in chunks, never held whole), the comparison matrix and
+    the bibliography. ''.join() of the pieces equals ContextPack.content. When the generator is
+    exhausted, `pack` (a ContextPack, optional) holds the query, filters, selected units, paper
+    count and the packer's token estimate; `content` is left to the caller.
+    """
     include = include or ['summary', 'equations', 'methods', 'assumptions', 'sections']
     filters = filters or {}
+    tokenizer = make_tokenizer(tokenizer)
+    pack = pack if pack is not None else ContextPack()
+    pack.query, pack.filters_json = query, json.dumps(filters)
+    header = f'# Context pack: {query}\n\n'
+    yield header
     results = search(query, repo, required_tags=filters.get('required_tags'),
                      preferred_tags=filters.get('preferred_tags'), excluded_tags=filters.get('excluded_tags'),
                      year_range=filters.get('year_range'), limit=500, explain=True)
     if not results:
-        return ContextPack(query=query, filters_json=json.dumps(filters), content=f'# Context pack: {query}\n\nNo papers found.\n')
+        yield 'No papers found.\n'
+        pack.token_estimate = count_tokens(header + 'No papers found.\n', tokenizer)
+        return
 
     text_query, _ = _split_query(query)
     paper_ids = [result.paper.id for result in results]
@@ -56,72 +136,141 @@ def assemble_context_pack(query, repo, token_budget=24000, include=None, filters
     for unit in stage_b:
         units_by_paper.setdefault(unit['paper_id'], []).append(unit)
 
-    max_chars = max(256, token_budget * 4)
-    header = f'# Context pack: {query}\n\n'
-    parts, selected, selected_units = [header], [], []
-    used = len(header)
+    fixed = sum(count_tokens(text + '\n', tokenizer) for text in (header, _comparison_matrix_head(), '## Bibliography\n'))
+    budget = max(64, token_budget) - fixed
+
+    evidence = prefetch_evidence(repo, paper_ids, include)
+    top = max((result.score for result in results), default=0)
+    blocks, by_index = [], {}
     for index, result in enumerate(results, 1):
-        remaining = max_chars - used
-        section, included_unit_ids = _format_paper_section(index, result, units_by_paper.get(result.paper.id, []), include, repo, remaining)
-        if not section or len(section) > remaining:
-            continue
-        parts.append(section)
-        selected.append(result)
-        selected_units.extend(included_unit_ids)
-        used += len(section)
+        weight = result.score / top if top > 0 else 1.0 / index
+        by_index[index] = result
+        for kind, text, unit_ids in _paper_blocks(result, units_by_paper.get(result.paper.id, []), include, evidence):
+            tokens = text.tokens(tokenizer) if isinstance(text, _FileText) else count_tokens(text, tokenizer)
+            blocks.append(Block(group=index, kind=kind, text=text, value=weight * BLOCK_VALUES[kind],
+                                tokens=tokens, unit_ids=unit_ids))
+
+    def open_cost(index):
+        result = by_index[index]
+        texts = (_paper_header(index, result) + '\n', _matrix_row(result, evidence.methods.get(result.paper.id, [])) + '\n',
+                 _bib_entry(result.paper) + '\n\n')
+        return sum(count_tokens(text, tokenizer) for text in texts)
+
+    chosen, _, used = pack_blocks(blocks, budget, open_cost)
+    del blocks
 
+    selected_units, by_paper = [], {}
+    for block in chosen:
+        by_paper.setdefault(block.group, []).append(block)
+    selected = [by_index[index] for index in sorted(by_paper)]
+    for index in sorted(by_paper):
+        yield '\n' + _paper_header(index, by_index[index])
+        for block in by_paper[index]:
+            selected_units.extend(block.unit_ids)
+            if isinstance(block.text, _FileText):
+                yield from block.text.chunks()
+            else:
+                yield block.text
     if len(selected) > 1:
-        matrix = _build_comparison_matrix(selected, repo)
-        if used + len(matrix) <= max_chars:
-            parts.append(matrix); used += len(matrix)
-    bibliography = _build_bibliography([result.paper for result in selected])
-    if used + len(bibliography) <= max_chars:
-        parts.append(bibliography); used += len(bibliography)
+        yield '\n' + _build_comparison_matrix(selected, repo, evidence.methods)
+    if selected:
+        yield '\n' + _build_bibliography([result.paper for result in selected])
+    pack.selected_units_json = json.dumps(selected_units)
+    pack.paper_count = len(selected)
+    pack.token_estimate = fixed + used
 
-    content = '\n'.join(parts)
-    return ContextPack(query=query, filters_json=json.dumps(filters),
-                       selected_units_json=json.dumps(selected_units),
-                       content=content, token_estimate=(len(content) + 3) // 4, paper_count=len(selected))
 
+class _FileText:
+    """A block whose text is `head` + the file at `path` + `tail`, measured and emitted without keeping it."""
 
-def _format_paper_section(index, result, units, include, repo, max_chars):
+    CHUNK_CHARS = 1 << 16
+
+    def __init__(self, head, path, tail):
+        self.head, self.path, self.tail = head, path, tail
+
+    def tokens(self, tokenizer):
+        st = os.stat(self.path)
+        return (count_tokens(self.head, tokenizer) + count_tokens(self.tail, tokenizer)
+                + _file_tokens(str(self.path), st.st_mtime_ns, st.st_size, tokenizer))
+
+    def chunks(self):
+        yield self.head
+        with open(self.path, encoding='utf-8') as f:
+            while chunk := f.read(self.CHUNK_CHARS):
+                yield chunk
+        yield self.tail
+
+
+_file_token_cache = {}    # (path, mtime_ns, size, tokenizer name) -> tokens
+
+
+def _file_tokens(path, mtime_ns, size, tokenizer):
+    """Tokens of a file read in _FileText.CHUNK_CHARS chunks. Exact for CharTokenizer (characters are
+    summed before rounding); other tokenizers count chunks cut at line ends, a close estimate."""
+    name = getattr(tokenizer, 'name', None)
+    key = (path, mtime_ns, size, name)
+    if name is None or key not in _file_token_cache:
+        n = _stream_tokens(path, tokenizer)
+        if name is None:
+            return n
+        if len(_file_token_cache) > 4096:
+            _file_token_cache.clear()
+        _file_token_cache[key] = n
+    return _file_token_cache[key]
+
+
+def _stream_tokens(path, tokenizer):
+    with open(path, encoding='utf-8') as f:
+        if isinstance(tokenizer, CharTokenizer):
+            chars = 0
+            while chunk := f.read(_FileText.CHUNK_CHARS):
+                chars += len(chunk)
+            return math.ceil(chars / tokenizer.chars_per_token)
+        n, rest = 0, ''
+        while chunk := f.read(_FileText.CHUNK_CHARS):
+            text, cut = rest + chunk, chunk.rfind('\n')
+            if cut < 0:
+                rest = text
+                continue
+            cut += len(rest) + 1
+            n += tokenizer(text[:cut])
+            rest = text[cut:]
+        return n + (tokenizer(rest) if rest else 0)
+
+
+def _paper_header(index, result):
     paper = result.paper
     breakdown = ', '.join(f'{key}: {value}' for key, value in result.breakdown.items())
-    base = f'## {index}. {paper.paper_key}\n\n**Title**: {paper.title or "Unknown"}\n\n**Year**: {paper.year or "Unknown"}\n\n**Score**: {result.score} ({breakdown})\n\n'
-    if len(base) > max_chars:
-        return '', []
-    blocks = [base]
-    used = len(base)
-    evidence_added = False
-    included_unit_ids = []
-
-    def add(block):
-        nonlocal used, evidence_added
-        if block and used + len(block) <= max_chars:
-            blocks.append(block); used += len(block); evidence_added = True
-            return True
-        return False
+    return f'## {index}. {paper.paper_key}\n\n**Title**: {paper.title or "Unknown"}\n\n**Year**: {paper.year or "Unknown"}\n\n**Score**: {result.score} ({breakdown})\n\n'
+
+
+def _paper_blocks(result, units, include, evidence):
+    """Candidate evidence blocks of one paper: [(kind, text, unit_ids)] in output order."""
+    paper = result.paper
+    methods = evidence.methods.get(paper.id, [])
+    blocks = []
+    if not include:
+        return [('header', '', [])]
 
     if 'summary' in include:
-        summary = repo.get_active_summary(paper.id)
+        summary = evidence.summaries.get(paper.id)
         if summary and summary.content:
-            add(f'### Scientific summary\n\n{summary.content.strip()}\n\n')
+            blocks.append(('summary', f'### Scientific summary\n\n{summary.content.strip()}\n\n', []))
 
     if 'equations' in include:
         lines = []
-        for equation in repo.get_equations_for_paper(paper.id)[:8]:
+        for equation in evidence.equations.get(paper.id, []):
             eq = _dict(equation)
             location = ', '.join(part for part in [f"page {eq.get('page_number')}" if eq.get('page_number') is not None else '', eq.get('section_path') or '', f"parser {eq.get('parser')}" if eq.get('parser') else '', f"run {eq.get('run_id')}" if eq.get('run_id') else ''] if part)
             lines.append(f"- Eq. {eq.get('equation_number') or '?'} ({location or 'location unavailable'}):\n\n  ```latex\n  {_excerpt(eq.get('latex_raw'), 1200)}\n  ```")
-            variables = repo.get_variables_for_equation(eq['id']) if eq.get('id') else []
+            variables = evidence.variables.get(eq.get('id'), [])
             for variable in variables:
                 var = _dict(variable)
                 lines.append(f"  - `{var.get('symbol')}` — {var.get('meaning')} (page {var.get('source_page') or '?'})")
         if lines:
-            add('### Equations and source coordinates\n\n' + '\n'.join(lines) + '\n\n')
+            blocks.append(('equations', '### Equations and source coordinates\n\n' + '\n'.join(lines) + '\n\n', []))
 
-    methods = repo.get_methods_for_paper(paper.id) if ('methods' in include or 'assumptions' in include) else []
-    if methods:
+    if methods and ('methods' in include or 'assumptions' in include):
         lines = []
         for method in methods[:5]:
             m = _dict(method)
@@ -141,7 +290,7 @@ def _format_paper_section(index, result, units, include, repo, max_chars):
                 passage = passage if isinstance(passage, dict) else {'text': str(passage)}
                 location = ', '.join(str(value) for value in [passage.get('section'), f"page {passage.get('page')}" if passage.get('page') is not None else None] if value)
                 lines.append(f"  - evidence[{passage_index}] ({location or 'location unavailable'}): {_excerpt(passage.get('text'), 900)}")
-        add('### Method cards and evidence\n\n' + '\n'.join(lines) + '\n\n')
+        blocks.append(('methods', '### Method cards and evidence\n\n' + '\n'.join(lines) + '\n\n', []))
 
     if 'sections' in include:
         relevant_units = [u for u in units if u.get('unit_type') in ('section', 'paragraph')][:8]
@@ -149,30 +298,38 @@ def _format_paper_section(index, result, units, include, repo, max_chars):
         for unit in relevant_units:
             location = ', '.join(part for part in [unit.get('section_path') or '', f"pages {unit.get('page_from')}-{unit.get('page_to')}" if unit.get('page_from') else ''] if part)
             lines.append(f"- [{location or 'section'}; unit {unit.get('unit_id')}] {_excerpt(unit.get('content'), 1400)}")
-        if lines and add('### Relevant source passages\n\n' + '\n\n'.join(lines) + '\n\n'):
-            included_unit_ids.extend(unit['unit_id'] for unit in relevant_units)
+        if lines:
+            blocks.append(('sections', '### Relevant source passages\n\n' + '\n\n'.join(lines) + '\n\n',
+                           [unit['unit_id'] for unit in relevant_units]))
 
     if 'markdown' in include and paper.markdown_path and Path(paper.markdown_path).exists():
-        markdown = Path(paper.markdown_path).read_text(encoding='utf-8')
-        add(f'### Full compiled Markdown\n\n{markdown}\n\n')
-    return (''.join(blocks), included_unit_ids) if evidence_added or not include else ('', [])
+        blocks.append(('markdown', _FileText('### Full compiled Markdown\n\n', paper.markdown_path, '\n\n'), []))
+    return blocks
+
+
+def _comparison_matrix_head():
+    return '## Comparison matrix\n\n| Paper | Method | Complexity | Year | Score |\n|---|---|---|---|---|\n'
+
+
+def _matrix_row(result, methods):
+    paper = result.paper
+    method = _dict(methods[0]) if methods else {}
+    return f"| {paper.paper_key} | {method.get('name', 'N/A')} | {method.get('complexity') or 'N/A'} | {paper.year or 'N/A'} | {result.score} |"
+
+
+def _build_comparison_matrix(results, repo, methods_by_paper=None):
+    if methods_by_paper is None:
+        methods_by_paper = repo.get_methods_for_papers([result.paper.id for result in results])
+    rows = [_matrix_row(result, methods_by_paper.get(result.paper.id, [])) for result in results]
+    return _comparison_matrix_head() + '\n'.join(rows) + '\n\n'
 
 
-def _build_comparison_matrix(results, repo):
-    lines = ['## Comparison matrix\n', '| Paper | Method | Complexity | Year | Score |', '|---|---|---|---|---|']
-    for result in results:
-        paper = result.paper
-        methods = repo.get_methods_for_paper(paper.id)
-        method = _dict(methods[0]) if methods else {}
-        lines.append(f"| {paper.paper_key} | {method.get('name', 'N/A')} | {method.get('complexity') or 'N/A'} | {paper.year or 'N/A'} | {result.score} |")
-    return '\n'.join(lines) + '\n\n'
+def _bib_entry(paper):
+    bibtex = read_bibtex(paper.bibtex_path) if paper.bibtex_path else None
+    if bibtex is not None:
+        return bibtex
+    return f"@article{{{paper.paper_key or f'paper_{paper.id}'},\n  title = {{{paper.title or 'Unknown'}}},\n  author = {{{paper.authors_text or ''}}},\n  year = {{{paper.year or ''}}},\n}}"
 
 
 def _build_bibliography(papers):
-    lines = ['## Bibliography\n']
-    for paper in papers:
-        if paper.bibtex_path and Path(paper.bibtex_path).exists():
-            lines.append(Path(paper.bibtex_path).read_text(encoding='utf-8').strip())
-        else:
-            lines.append(f"@article{{{paper.paper_key or f'paper_{paper.id}'},\n  title = {{{paper.title or 'Unknown'}}},\n  author = {{{paper.authors_text or ''}}},\n  year = {{{paper.year or ''}}},\n}}")
-    return '\n\n'.join(lines) + '\n'
+    return '\n\n'.join(['## Bibliography\n'] + [_bib_entry(paper) for paper in papers]) + '\n'
@@ -18,6 +18,7 @@ class SearchUnit:
     page_from: Optional[int] = None
     page_to: Optional[int] = None
     content: str = ""
+    section_key: str = ""        # stable per-heading key, see _split_markdown_to_units
 
 
 # --- FTS5 search ---
@@ -81,13 +82,17 @@ _EQUATION_RE = re.compile(r'^\$\$(.+?)\$\$$', re.DOTALL)
 _FRONTMATTER_DELIM = '---'
 
 
-def build_search_units_from_markdown(paper_id, markdown_text, run_id, repo, equations=None, methods=None):
+def build_search_units_from_markdown(paper_id, markdown_text, run_id, repo, equations=None, methods=None, keep_sections=None):
     """Split markdown into search units by headings/equations/paragraphs.
     Types: 'summary', 'section', 'paragraph', 'equation', 'method'.
     Store via repo.replace_search_units() (transactional delete+insert, FTS triggers auto-sync).
+    keep_sections: section keys whose stored units are still current (unchanged section
+    hash) — those are neither deleted nor re-inserted. Structured equation/method units
+    are always rebuilt.
     Returns list of created SearchUnit objects.
     """
-    units = _split_markdown_to_units(paper_id, markdown_text, run_id)
+    keep = set(keep_sections or [])
+    units = [unit for unit in _split_markdown_to_units(paper_id, markdown_text, run_id) if unit.section_key not in keep]
     if equations:
         units = [unit for unit in units if unit.unit_type != "equation"]
     for value in equations or []:
@@ -101,12 +106,20 @@ def build_search_units_from_markdown(paper_id, markdown_text, run_id, repo, equa
         content = "\n".join(part for part in [method.get("name"), method.get("purpose"), method.get("card_json"), method.get("source_passages_json")] if part)
         units.append(SearchUnit(paper_id=paper_id, run_id=run_id, unit_type="method", source_type="method",
                                 source_id=method.get("id"), section_path=method.get("name") or "", content=content))
-    repo.replace_search_units(paper_id, units)
+    if keep: repo.replace_search_units(paper_id, units, keep_sections=sorted(keep))
+    else: repo.replace_search_units(paper_id, units)
     return units
 
 
-def _split_markdown_to_units(paper_id, markdown_text, run_id):
-    """Parse markdown text and produce SearchUnit list."""
+def _split_markdown_to_units(paper_id, markdown_text, run_id, paragraphs=True):
+    """Parse markdown text and produce SearchUnit list.
+
+    With paragraphs=False only section-level and equation units are produced, in
+    document order, so their contents concatenate back to the document body.
+    Every unit carries section_key = "<summary|source>:<section_path>" of the heading
+    it belongs to ("#2", "#3"... appended for repeated paths) — the unit of incremental
+    re-indexing in paperdb.ingest.sections.
+    """
     lines = markdown_text.split('\n')
     units = []
 
@@ -124,6 +137,14 @@ def _split_markdown_to_units(paper_id, markdown_text, run_id):
     current_level = 0
     section_content = []
     section_start_line = 0
+    key_counts = {}
+    current_key = "source:"
+
+    def start_section():
+        nonlocal current_key
+        key = f"{'summary' if in_summary else 'source'}:{current_section_path}"
+        key_counts[key] = key_counts.get(key, 0) + 1
+        current_key = key if key_counts[key] == 1 else f"{key}#{key_counts[key]}"
 
     def flush_section():
         """Emit a section unit from accumulated content."""
@@ -145,17 +166,17 @@ def _split_markdown_to_units(paper_id, markdown_text, run_id):
         units.append(SearchUnit(
             paper_id=paper_id, run_id=run_id, unit_type=unit_type,
             source_type=source_type, section_path=current_section_path,
-            content=text
+            content=text, section_key=current_key
         ))
         # Also split into paragraphs
-        _split_paragraphs(units, paper_id, run_id, current_section_path, text, in_summary)
+        if paragraphs: _split_paragraphs(units, paper_id, run_id, current_section_path, text, in_summary, current_key)
         section_content = []
 
     def flush_equation(eq_text, section_path, line_num):
         units.append(SearchUnit(
             paper_id=paper_id, run_id=run_id, unit_type='equation',
             source_type='equation', section_path=section_path,
-            content=eq_text.strip()
+            content=eq_text.strip(), section_key=current_key
         ))
 
     while i < len(lines):
@@ -174,6 +195,7 @@ def _split_markdown_to_units(paper_id, markdown_text, run_id):
                 in_source_text = False
                 current_section_path = ""
                 current_level = level
+                start_section()
                 i += 1
                 continue
             elif 'extracted source text' in heading_text.lower():
@@ -181,6 +203,7 @@ def _split_markdown_to_units(paper_id, markdown_text, run_id):
                 in_source_text = True
                 current_section_path = ""
                 current_level = level
+                start_section()
                 i += 1
                 continue
             # Build section path
@@ -194,6 +217,7 @@ def _split_markdown_to_units(paper_id, markdown_text, run_id):
                     current_section_path = heading_text
             current_level = level
             section_start_line = i
+            start_section()
             i += 1
             continue
 
@@ -229,7 +253,7 @@ def _split_markdown_to_units(paper_id, markdown_text, run_id):
     return units
 
 
-def _split_paragraphs(units, paper_id, run_id, section_path, text, in_summary):
+def _split_paragraphs(units, paper_id, run_id, section_path, text, in_summary, section_key=""):
     """Split section text into paragraph-level search units."""
     paragraphs = re.split(r'\n\s*\n', text)
     for para in paragraphs:
@@ -249,5 +273,5 @@ def _split_paragraphs(units, paper_id, run_id, section_path, text, in_summary):
         units.append(SearchUnit(
             paper_id=paper_id, run_id=run_id, unit_type=unit_type,
             source_type=source_type, section_path=section_path,
-            content=para
+            content=para, section_key=section_key
         ))
@@ -0,0 +1,149 @@
+"""Token counting and budgeted block selection for context packs.
+
+    tokenizer = make_tokenizer("tiktoken")           # or "chars" (default), "hf:<model>", a callable
+    n = count_tokens(text, tokenizer)                 # cached per (tokenizer, text hash)
+    chosen = pack_blocks(blocks, budget, open_cost)   # greedy value-per-token knapsack
+
+Tokenizers are callables text -> int with a `.name` (make_tokenizer spec in parentheses):
+- CharTokenizer ("chars", "chars:3.5"): ceil(len / chars_per_token). No dependency;
+  the default, and the historical len/4 estimate.
+- TiktokenTokenizer ("tiktoken", "tiktoken:<encoding>"): optional `tiktoken`.
+- HFTokenizer ("hf:<model>"): a Hugging Face tokenizer, optional `transformers`.
+
+Non-obvious things:
+- Blocks belong to a group (a paper). The first block taken from a group also pays
+  the group's opening cost (paper header, comparison-matrix row, bibliography
+  entry), which is computed lazily, so only papers that reach the top of the
+  queue are ever costed that way.
+- The greedy keeps a max-heap of value / cost upper bounds: an entry is pushed
+  with the cost it had when pushed, re-pushed with the exact cost when it turns
+  out stale, and blocks of a group become cheaper once the group is open. A block
+  that does not fit is skipped, not the end of the packing, so the budget fills.
+- Per-block token sums are an upper bound of the tokens of the joined text for
+  the character tokenizer, and a close estimate for BPE tokenizers.
+"""
+import hashlib
+import heapq
+import math
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+DEFAULT_TOKENIZER = "chars"
+TOKEN_CACHE_SIZE = 65_536
+
+# ========== Tokenizers
+
+class CharTokenizer:
+    """ceil(len(text) / chars_per_token)."""
+
+    def __init__(self, chars_per_token: float = 4.0):
+        self.chars_per_token = chars_per_token
+        self.name = f"chars:{chars_per_token:g}"
+
+    def __call__(self, text: str) -> int:
+        return math.ceil(len(text or "") / self.chars_per_token)
+
+class TiktokenTokenizer:
+    """tiktoken BPE encoding (optional dependency, loaded on first use)."""
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        self.encoding = encoding
+        self.name = f"tiktoken:{encoding}"
+        self._enc = None
+
+    def __call__(self, text: str) -> int:
+        if self._enc is None:
+            try:
+                import tiktoken
+            except ImportError as exc:
+                raise ImportError("tiktoken tokenizer requires: pip install tiktoken") from exc
+            self._enc = tiktoken.get_encoding(self.encoding)
+        return len(self._enc.encode(text or "", disallowed_special=()))
+
+class HFTokenizer:
+    """Hugging Face tokenizer of a model (optional `transformers` dependency, loaded on first use)."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.name = f"hf:{model_name}"
+        self._tok = None
+
+    def __call__(self, text: str) -> int:
+        if self._tok is None:
+            try:
+                from transformers import AutoTokenizer
+            except ImportError as exc:
+                raise ImportError("hf tokenizer requires: pip install transformers") from exc
+            self._tok = AutoTokenizer.from_pretrained(self.model_name)
+        return len(self._tok.encode(text or "", add_special_tokens=False))
+
+def make_tokenizer(spec=None):
+    """Tokenizer from a spec string (see module docstring); callables pass through; None -> $PAPERDB_TOKENIZER or "chars"."""
+    if spec is not None and not isinstance(spec, str): return spec
+    spec = spec or os.environ.get("PAPERDB_TOKENIZER") or DEFAULT_TOKENIZER
+    kind, _, arg = spec.partition(":")
+    if kind == "chars": return CharTokenizer(float(arg) if arg else 4.0)
+    if kind == "tiktoken": return TiktokenTokenizer(arg or "cl100k_base")
+    if kind == "hf" and arg: return HFTokenizer(arg)
+    raise ValueError(f"Unknown tokenizer '{spec}'. Expected chars[:chars_per_token], tiktoken[:<encoding>] or hf:<model>")
+
+_token_cache = OrderedDict()      # (tokenizer name, text digest) -> count
+_token_lock = threading.Lock()
+
+def count_tokens(text: str, tokenizer) -> int:
+    """Token count of `text`, memoized per (tokenizer name, BLAKE2 of the text) in a bounded LRU."""
+    name = getattr(tokenizer, "name", None)
+    if name is None: return tokenizer(text)
+    key = (name, hashlib.blake2b((text or "").encode("utf-8"), digest_size=16).digest())
+    with _token_lock:
+        if key in _token_cache:
+            _token_cache.move_to_end(key)
+            return _token_cache[key]
+    n = tokenizer(text)
+    with _token_lock:
+        _token_cache[key] = n
+        if len(_token_cache) > TOKEN_CACHE_SIZE: _token_cache.popitem(last=False)
+    return n
+
+# ========== Packing
+
+@dataclass
+class Block:
+    group: object
+    kind: str
+    text: str
+    value: float
+    tokens: int = 0
+    unit_ids: list = field(default_factory=list)
+
+def pack_blocks(blocks: list, budget: int, open_cost) -> tuple:
+    """Greedy value-per-token selection of blocks within `budget` tokens.
+
+    open_cost(group) -> tokens paid once when the first block of a group is taken.
+    Returns (selected blocks in input order, {group: opening cost} of opened groups, tokens used).
+    """
+    opened, costs, taken, by_group = {}, {}, set(), {}
+    for i, b in enumerate(blocks): by_group.setdefault(b.group, []).append(i)
+    used = 0
+    heap = [(-b.value / max(b.tokens, 1), i, False) for i, b in enumerate(blocks)]
+    heapq.heapify(heap)
+    while heap:
+        key, i, with_open = heapq.heappop(heap)
+        if i in taken: continue
+        block = blocks[i]
+        is_open = block.group in opened
+        if not is_open and not with_open:
+            if block.group not in costs: costs[block.group] = open_cost(block.group)
+            heapq.heappush(heap, (-block.value / max(block.tokens + costs[block.group], 1), i, True))
+            continue
+        cost = block.tokens + (0 if is_open else costs[block.group])
+        if used + cost > budget: continue
+        used += cost
+        taken.add(i)
+        if not is_open:
+            opened[block.group] = costs[block.group]
+            for j in by_group[block.group]:              # the group is paid for: its other blocks get cheaper
+                if j not in taken: heapq.heappush(heap, (-blocks[j].value / max(blocks[j].tokens, 1), j, False))
+    return [b for i, b in enumerate(blocks) if i in taken], opened, used
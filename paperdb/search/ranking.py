@@ -3,6 +3,7 @@
 from dataclasses import dataclass, field
 
 from .fts import fts_search
+from ..taxonomy.aliases import alias_index
 
 
 @dataclass
@@ -19,6 +20,9 @@ SCORE_USER_TAG = 6
 SCORE_TITLE = 5
 SCORE_ABSTRACT = 2
 SCORE_FTS = 1
+SCORE_VECTOR = 1
+RRF_K = 60          # reciprocal rank fusion constant: fused = sum 1/(RRF_K + rank) over the FTS and vector lists
+VECTOR_MIN_SCORE = 0.2   # cosine floor for vector hits: top-k alone always returns k units, related or not
 
 
 def _split_query(query: str) -> tuple[str, list[str]]:
@@ -34,8 +38,22 @@ def _split_query(query: str) -> tuple[str, list[str]]:
     return ' '.join(text), tags
 
 
+def _fuse(fts_results, vector_results):
+    '''Reciprocal rank fusion of FTS (bm25, lower=better) and vector (cosine, higher=better) unit lists.
+    Returns unit rows (merged per unit_id) with a 'fused' score, best first.'''
+    fused = {}
+    for ranked in (sorted(fts_results, key=lambda r: r.get('rank', 0)), sorted(vector_results, key=lambda r: -r.get('score', 0))):
+        for position, row in enumerate(ranked, 1):
+            unit = fused.setdefault(row['unit_id'], {**row, 'fused': 0.0})
+            unit.update({k: v for k, v in row.items() if k in ('rank', 'score')})
+            unit['fused'] += 1.0 / (RRF_K + position)
+    return sorted(fused.values(), key=lambda r: -r['fused'])
+
+
 def rank_papers(query, fts_results, repo, required_tags=None, preferred_tags=None,
-                excluded_tags=None, year_range=None, explain=False):
+                excluded_tags=None, year_range=None, explain=False, vector_results=None, min_similarity=VECTOR_MIN_SCORE):
+    '''Score candidate papers; with vector_results (hybrid mode) matching units are fused by reciprocal rank.
+    Vector hits below `min_similarity` (cosine) are dropped before fusion.'''
     required_tags = required_tags or []
     preferred_tags = preferred_tags or []
     excluded_tags = excluded_tags or []
@@ -46,6 +64,15 @@ def rank_papers(query, fts_results, repo, required_tags=None, preferred_tags=Non
     for row in fts_results:
         fts_by_paper.setdefault(row['paper_id'], []).append(row)
     candidate_ids = set(fts_by_paper)
+    hybrid = vector_results is not None
+    fused_by_paper, vector_count = {}, {}
+    if hybrid:
+        vector_results = [row for row in vector_results if row.get('score', 0) >= min_similarity]
+        for row in _fuse(fts_results, vector_results):
+            fused_by_paper.setdefault(row['paper_id'], []).append(row)
+        for row in vector_results:
+            vector_count[row['paper_id']] = vector_count.get(row['paper_id'], 0) + 1
+        candidate_ids |= set(fused_by_paper)
     candidate_ids |= _metadata_candidates(text_query, repo)
     for tag in [*required_tags, *preferred_tags]:
         candidate_ids |= _get_paper_ids_with_tags([tag], repo, match_all=False)
@@ -100,21 +127,39 @@ def rank_papers(query, fts_results, repo, required_tags=None, preferred_tags=Non
         fts_score = min(len(fts_units), 3) * SCORE_FTS
         if fts_score:
             breakdown['fts'] = fts_score; score += fts_score
+        vector_score = min(vector_count.get(pid, 0), 3) * SCORE_VECTOR
+        if vector_score:
+            breakdown['vector'] = vector_score; score += vector_score
+        if hybrid:
+            fts_units = fused_by_paper.get(pid, [])
         if required_tags:
             breakdown['required_tags'] = len(required_tags) * SCORE_REQUIRED_TAG; score += breakdown['required_tags']
         results.append(SearchResult(paper=paper, score=score, breakdown=breakdown, matching_units=fts_units if explain else []))
 
-    results.sort(key=lambda result: (-result.score, result.matching_units[0].get('rank', 0) if result.matching_units else float('inf'), result.paper.paper_key or ''))
+    if hybrid:
+        best = {pid: units[0]['fused'] for pid, units in fused_by_paper.items()}
+        results.sort(key=lambda result: (-result.score, -best.get(result.paper.id, 0.0), result.paper.paper_key or ''))
+    else:
+        results.sort(key=lambda result: (-result.score, result.matching_units[0].get('rank', 0) if result.matching_units else float('inf'), result.paper.paper_key or ''))
     return results
 
 
 def search(query, repo, required_tags=None, preferred_tags=None, excluded_tags=None,
-           year_range=None, limit=20, explain=False):
+           year_range=None, limit=20, explain=False, mode="lexical", embedder=None, min_similarity=VECTOR_MIN_SCORE):
+    '''mode: "lexical" (FTS5 + metadata + tags) or "hybrid" (also nearest units from search/vectors.py with
+    cosine >= min_similarity, fused by rank).'''
+    if mode not in ("lexical", "hybrid"):
+        raise ValueError(f"Unknown search mode '{mode}', expected 'lexical' or 'hybrid'")
     text_query, _ = _split_query(query)
     fts_results = fts_search(text_query, repo, limit=max(limit * 10, 100)) if text_query else []
+    vector_results = None
+    if mode == "hybrid":
+        from .vectors import vector_search
+        vector_results = vector_search(text_query, repo, k=max(limit * 10, 100), embedder=embedder) if text_query else []
     results = rank_papers(query, fts_results, repo, required_tags=required_tags,
                           preferred_tags=preferred_tags, excluded_tags=excluded_tags,
-                          year_range=year_range, explain=explain)
+                          year_range=year_range, explain=explain, vector_results=vector_results,
+                          min_similarity=min_similarity)
     return results[:limit]
 
 
@@ -139,21 +184,14 @@ def _parse_tag_ref(tag):
 
 def _tag_ids(tag, repo):
     category, name = _parse_tag_ref(tag)
-    normalized = name.lower()
-    sql = "SELECT DISTINCT t.id FROM tags t LEFT JOIN tag_aliases a ON a.tag_id=t.id WHERE (lower(t.canonical_name)=? OR a.normalized_alias=?)"
-    params = [normalized, normalized]
-    if category:
-        sql += ' AND lower(t.category)=?'
-        params.append(category.lower())
-    return [row[0] for row in repo.conn.execute(sql, tuple(params)).fetchall()]
+    return alias_index(repo).tag_ids(name, category)
 
 
 def _resolve_tag_name(tag, repo):
     ids = _tag_ids(tag, repo)
     if not ids:
         return None
-    row = repo.conn.execute('SELECT canonical_name FROM tags WHERE id=?', (ids[0],)).fetchone()
-    return row[0] if row else None
+    return alias_index(repo).by_id[ids[0]]['canonical_name']
 
 
 def _get_paper_ids_with_tags(tags, repo, match_all=True):
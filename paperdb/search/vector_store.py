@@ -0,0 +1,215 @@
+"""Append-only, memory-mapped int8 store for search-unit embeddings.
+
+One directory per embedder next to the database (<db dir>/vectors/<embedder>/):
+
+    ids.i64     int64   [n]        search_units.id of each row
+    live.u8     uint8   [n]        1 = live, 0 = tombstone (deleted unit or superseded row)
+    q.i8        int8    [n, dim]   round(v / scale)
+    scale.f32   float32 [n]        max|v| / 127 per vector
+    f.f32       float32 [n, dim]   exact vectors, only with keep_float=True (for re-ranking)
+    meta.json   {"dim", "count", "keep_float", "generation"}
+
+Non-obvious things:
+- `count` in meta.json is the commit point: append() writes the data files
+  first and replaces meta.json last, readers map only `count` rows, and an
+  interrupted append leaves trailing bytes that the next append truncates.
+  `generation` is bumped on every meta.json write (append, compact), so
+  readers that cache a mapping can tell that rows were added or replaced
+  even when the SQLite rows pointing at them did not change.
+- Reads are np.memmap views; search() converts `block` rows at a time to
+  float32, so query memory is block*dim floats plus the top-k candidates,
+  independent of n. The OS page cache decides what stays resident.
+- Tombstones flip a byte in live.u8 in place; rows are only removed by
+  compact(), which rewrites the live rows into new files and swaps them in
+  with os.replace (open memmaps of old files stay valid until dropped).
+- Per-vector int8 quantization keeps cosine ranking within ~1e-2 of float32;
+  with keep_float the top `k*oversample` candidates are re-scored exactly,
+  and search(exact=True) scores every row with the float vectors.
+"""
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+STORE_BLOCK = 8192
+_FILES = ("ids.i64", "live.u8", "q.i8", "scale.f32", "f.f32")
+
+
+def store_dir(repo, model: str) -> Path:
+    """<directory of the SQLite file>/vectors/<model>; the store is tied to the database it indexes."""
+    row = repo.conn.execute("PRAGMA database_list").fetchone()
+    if not row or not row[2]: raise ValueError("The memory-mapped vector store needs a file-backed database")
+    return Path(row[2]).parent / "vectors" / re.sub(r"[^\w.-]+", "_", model)
+
+
+def quantize(vectors: np.ndarray) -> tuple:
+    """Per-vector symmetric int8: (q [n,dim] int8, scale [n] float32) with v ~= q * scale."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scale = np.abs(vectors).max(axis=1) / 127.0
+    scale[scale == 0] = 1.0
+    q = np.clip(np.rint(vectors / scale[:, None]), -127, 127).astype(np.int8)
+    return q, scale.astype(np.float32)
+
+
+class VectorStore:
+    """Memory-mapped int8 embedding matrix with a unit-id index and tombstones."""
+
+    def __init__(self, path, dim: int | None = None, keep_float: bool = False):
+        self.path = Path(path)
+        meta_path = self.path / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            self.dim, self.count, self.keep_float = meta["dim"], meta["count"], meta["keep_float"]
+            self.generation = meta.get("generation", 0)
+        else:
+            if dim is None: raise FileNotFoundError(f"No vector store at {self.path}")
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.dim, self.count, self.keep_float = dim, 0, keep_float
+            self.generation = -1
+            self._write_meta()
+        self._maps = None
+
+    @classmethod
+    def exists(cls, path) -> bool:
+        return (Path(path) / "meta.json").exists()
+
+    @staticmethod
+    def read_generation(path):
+        """`generation` of the store at `path` (None when there is none), without mapping anything."""
+        try:
+            return json.loads((Path(path) / "meta.json").read_text()).get("generation", 0)
+        except FileNotFoundError:
+            return None
+
+    # ---- files
+
+    def _write_meta(self):
+        self.generation += 1
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps({"dim": self.dim, "count": self.count, "keep_float": self.keep_float,
+                                   "generation": self.generation}))
+        os.replace(tmp, self.path / "meta.json")
+
+    def _map(self, name, dtype, cols=None, mode="r"):
+        shape = (self.count, cols) if cols else (self.count,)
+        return np.memmap(self.path / name, dtype=dtype, mode=mode, shape=shape)
+
+    def maps(self) -> dict:
+        """Read-only memmaps of the committed rows (re-created after append/compact)."""
+        if self._maps is None:
+            if self.count == 0: return {}
+            self._maps = {"ids": self._map("ids.i64", np.int64), "live": self._map("live.u8", np.uint8),
+                          "q": self._map("q.i8", np.int8, self.dim), "scale": self._map("scale.f32", np.float32)}
+            if self.keep_float: self._maps["f"] = self._map("f.f32", np.float32, self.dim)
+        return self._maps
+
+    def _row_sizes(self):
+        sizes = {"ids.i64": 8, "live.u8": 1, "q.i8": self.dim, "scale.f32": 4}
+        if self.keep_float: sizes["f.f32"] = 4 * self.dim
+        return sizes
+
+    # ---- writes
+
+    def append(self, unit_ids, vectors) -> None:
+        """Add vectors; earlier live rows of the same unit ids become tombstones."""
+        unit_ids = np.asarray(unit_ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(unit_ids) == 0: return
+        if vectors.shape != (len(unit_ids), self.dim):
+            raise ValueError(f"VectorStore.append(): expected vectors of shape ({len(unit_ids)}, {self.dim}), got {vectors.shape}")
+        self.tombstone(unit_ids)
+        q, scale = quantize(vectors)
+        parts = {"ids.i64": unit_ids, "live.u8": np.ones(len(unit_ids), dtype=np.uint8), "q.i8": q, "scale.f32": scale}
+        if self.keep_float: parts["f.f32"] = vectors
+        for name, row_bytes in self._row_sizes().items():
+            with open(self.path / name, "ab") as f:
+                f.truncate(self.count * row_bytes)            # drop bytes of an interrupted append
+                f.seek(self.count * row_bytes)
+                f.write(np.ascontiguousarray(parts[name]).tobytes())
+        self._maps = None
+        self.count += len(unit_ids)
+        self._write_meta()
+
+    def _set_dead(self, mask_fn) -> int:
+        if self.count == 0: return 0
+        ids = self._map("ids.i64", np.int64)
+        live = self._map("live.u8", np.uint8, mode="r+")
+        killed = 0
+        for i0 in range(0, self.count, STORE_BLOCK * 16):
+            dead = mask_fn(ids[i0:i0 + STORE_BLOCK * 16]) & (live[i0:i0 + STORE_BLOCK * 16] == 1)
+            if dead.any():
+                live[i0:i0 + STORE_BLOCK * 16][dead] = 0
+                killed += int(dead.sum())
+        live.flush()
+        self._maps = None
+        return killed
+
+    def tombstone(self, unit_ids) -> int:
+        """Mark live rows of these units deleted; returns the number of rows hit."""
+        unit_ids = np.asarray(unit_ids, dtype=np.int64)
+        return self._set_dead(lambda ids: np.isin(ids, unit_ids)) if len(unit_ids) else 0
+
+    def retain(self, unit_ids) -> int:
+        """Tombstone every live row whose unit id is not in `unit_ids` (e.g. units deleted from SQLite)."""
+        unit_ids = np.asarray(unit_ids, dtype=np.int64)
+        return self._set_dead(lambda ids: ~np.isin(ids, unit_ids))
+
+    def compact(self) -> dict:
+        """Rewrite only live rows; returns {"before", "after"} row counts."""
+        before = self.count
+        maps = self.maps()
+        keep = np.flatnonzero(maps["live"]) if maps else np.empty(0, dtype=np.int64)
+        tmp = {name: self.path / (name + ".compact") for name in self._row_sizes()}
+        sources = {"ids.i64": "ids", "live.u8": "live", "q.i8": "q", "scale.f32": "scale", "f.f32": "f"}
+        for name, tmp_path in tmp.items():
+            with open(tmp_path, "wb") as f:
+                for i0 in range(0, len(keep), STORE_BLOCK * 16):
+                    f.write(np.ascontiguousarray(maps[sources[name]][keep[i0:i0 + STORE_BLOCK * 16]]).tobytes())
+        self._maps = None
+        for name, tmp_path in tmp.items(): os.replace(tmp_path, self.path / name)
+        self.count = len(keep)
+        self._write_meta()
+        return {"before": before, "after": self.count}
+
+    # ---- reads
+
+    def live_count(self) -> int:
+        maps = self.maps()
+        return int(sum(int(maps["live"][i0:i0 + STORE_BLOCK * 16].sum()) for i0 in range(0, self.count, STORE_BLOCK * 16))) if maps else 0
+
+    def search(self, query: np.ndarray, k: int, rerank: bool = True, oversample: int = 4, block: int = STORE_BLOCK,
+               exact: bool = False):
+        """[(unit_id, score)] of the k best live rows by int8 dot product, re-scored with float vectors when stored.
+
+        exact: score every row with the float vectors (needs keep_float=True).
+        """
+        if exact and not self.keep_float:
+            raise ValueError(f"VectorStore.search(exact=True) needs float vectors; {self.path} was built without keep_float")
+        maps = self.maps()
+        if not maps or k <= 0: return []
+        query = np.asarray(query, dtype=np.float32)
+        rerank = rerank and self.keep_float and not exact
+        kk = k * oversample if rerank else k
+        cand_rows, cand_scores = [], []
+        for i0 in range(0, self.count, block):
+            i1 = min(i0 + block, self.count)
+            if exact:
+                scores = maps["f"][i0:i1] @ query
+            else:
+                scores = (maps["q"][i0:i1].astype(np.float32) @ query) * maps["scale"][i0:i1]
+            scores[maps["live"][i0:i1] == 0] = -np.inf
+            rows = np.arange(i0, i1)
+            if len(scores) > kk:
+                top = np.argpartition(-scores, kk - 1)[:kk]
+                rows, scores = rows[top], scores[top]
+            cand_rows.append(rows); cand_scores.append(scores)
+        rows, scores = np.concatenate(cand_rows), np.concatenate(cand_scores)
+        ok = np.isfinite(scores)
+        rows, scores = rows[ok], scores[ok]
+        if rerank and len(rows):
+            rows = np.sort(rows)
+            scores = maps["f"][rows] @ query
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(int(maps["ids"][r]), float(s)) for r, s in zip(rows[order], scores[order])]
@@ -0,0 +1,335 @@
+"""Embedding retrieval over search_units: pluggable embedders, exact/IVF search, incremental embedding.
+
+    embed_search_units(repo)                         # embeds only units that have no vector yet
+    hits = vector_search("gauss seidel on gpu", repo, k=50)
+    search("gauss seidel on gpu", repo, mode="hybrid")   # ranking.search fuses FTS + vectors
+
+Embedders are callables texts -> float32 [n, dim] with L2-normalized rows and a
+`.name` stored with every vector (make_embedder spec in parentheses):
+- HashingEmbedder ("hash", "hash:512"): signed feature hashing of words and word
+  bigrams. No model, no network; the default, so `embed` always works offline.
+- SentenceTransformerEmbedder ("st:<model>"): local model, optional
+  `sentence-transformers` dependency (the `vector` extra).
+- OpenAIEmbedder ("openai", "openai:<model>", "openai:<model>@<base_url>"): an
+  OpenAI-compatible /embeddings endpoint, by default LM Studio with the model of
+  pyCruncher.paper_pipeline.embed_text; texts are sent in batches, not one call each.
+
+Non-obvious things:
+- Every embedded unit has a unit_embeddings row (FK with ON DELETE CASCADE), so
+  replace_search_units() drops vectors of rebuilt sections and the next embed run
+  only sees the new units. A unit whose vector was made by another embedder
+  counts as missing.
+- Vectors are stored either as float32 blobs in that row (store="sqlite", the
+  default; queries use an in-memory matrix) or, for large corpora, in the
+  memory-mapped int8 store of search/vector_store.py (store="memmap" or
+  $PAPERDB_VECTOR_STORE=memmap; the row keeps an empty blob). Once a memmap store
+  exists for an embedder, queries use it.
+- Indexes are cached per (repository, embedder name) and refreshed when the
+  (count, max unit_id, sum unit_id) of unit_embeddings rows or the memmap
+  store's `generation` changes (a forced re-embed replaces rows without
+  changing the unit ids); for the memmap store that refresh tombstones rows
+  of units no longer in SQLite.
+- Exact search is a blocked matrix-vector product with a per-block argpartition,
+  so temporaries stay at `block` floats whatever the corpus size. From
+  IVF_MIN_UNITS vectors on, an IVF index (spherical k-means, ~4*sqrt(n) lists,
+  `nprobe` lists scanned per query) is built lazily and used unless exact=True.
+  The memmap store is always scanned in full (no IVF, so no `nprobe`);
+  exact=True there scores with its float vectors (keep_float stores only).
+- Cosine similarity = dot product because all stored and query vectors are unit length.
+"""
+import hashlib
+import os
+import re
+import threading
+import weakref
+import zlib
+
+import numpy as np
+
+DEFAULT_EMBEDDER = "hash"
+IVF_MIN_UNITS = 100_000
+EXACT_BLOCK = 65_536
+
+# ========== Embedders
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-_][a-z0-9]+)*")
+
+def _normalize_rows(m):
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (m / norms).astype(np.float32, copy=False)
+
+class HashingEmbedder:
+    """Signed feature hashing of lowercased words + word bigrams into `dim` buckets."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.name = f"hash:{dim}"
+
+    def __call__(self, texts: list) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            words = _TOKEN_RE.findall((text or "").lower())
+            for feature in [*words, *(a + " " + b for a, b in zip(words, words[1:]))]:
+                h = zlib.crc32(feature.encode("utf-8"))
+                out[i, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return _normalize_rows(out)
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model (optional dependency, loaded on first use)."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.name = f"st:{model_name}"
+        self._model = None
+
+    def __call__(self, texts: list) -> np.ndarray:
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError as exc:
+                raise ImportError("sentence-transformers embedder requires: pip install 'paperdb[vector]'") from exc
+            self._model = SentenceTransformer(self.model_name)
+        return _normalize_rows(np.asarray(self._model.encode(list(texts), convert_to_numpy=True), dtype=np.float32))
+
+class OpenAIEmbedder:
+    """OpenAI-compatible embeddings endpoint (LM Studio by default), batched requests."""
+
+    def __init__(self, model: str | None = None, base_url: str | None = None, max_chars: int = 8000):
+        from pyCruncher.paper_pipeline import DEFAULT_EMBED_MODEL, DEFAULT_LMSTUDIO_BASE_URL
+        self.model = model or DEFAULT_EMBED_MODEL
+        self.base_url = base_url or DEFAULT_LMSTUDIO_BASE_URL
+        self.max_chars = max_chars
+        self.name = f"openai:{self.model}"
+
+    def __call__(self, texts: list) -> np.ndarray:
+        from paperdb.config import llm_templates
+        from pyCruncher.paper_pipeline import openai_client_with_url
+        client = llm_templates.get_client(("openai", self.base_url, None), lambda: openai_client_with_url(self.base_url))
+        response = client.embeddings.create(model=self.model, input=[(t or " ")[:self.max_chars] for t in texts])
+        return _normalize_rows(np.asarray([d.embedding for d in response.data], dtype=np.float32))
+
+def make_embedder(spec=None):
+    """Embedder from a spec string (see module docstring); callables pass through; None -> $PAPERDB_EMBEDDER or "hash"."""
+    if spec is not None and not isinstance(spec, str): return spec
+    spec = spec or os.environ.get("PAPERDB_EMBEDDER") or DEFAULT_EMBEDDER
+    kind, _, arg = spec.partition(":")
+    if kind == "hash": return HashingEmbedder(int(arg) if arg else 384)
+    if kind == "st": return SentenceTransformerEmbedder(arg or "all-MiniLM-L6-v2")
+    if kind == "openai":
+        model, _, base_url = arg.partition("@")
+        return OpenAIEmbedder(model or None, base_url or None)
+    raise ValueError(f"Unknown embedder '{spec}'. Expected hash[:dim], st:<model> or openai[:<model>[@<base_url>]]")
+
+# ========== Incremental embedding job
+
+def embed_search_units(repo, embedder=None, paper_ids=None, batch_size: int = 64, force=False,
+                       store=None, keep_float: bool = False) -> dict:
+    """Embed search units that have no vector from this embedder yet; one "embed" run per paper touched.
+
+    store: "sqlite" (float32 blobs) or "memmap" (int8 store, `keep_float` also keeps float32 for re-ranking);
+    default $PAPERDB_VECTOR_STORE, else "memmap" if a store for this embedder exists, else "sqlite".
+    """
+    from paperdb.ingest.jobs import run_job, finish_job
+    embedder = make_embedder(embedder)
+    store = store or os.environ.get("PAPERDB_VECTOR_STORE") or ("memmap" if _memmap_store(repo, embedder.name) else "sqlite")
+    if store not in ("sqlite", "memmap"): raise ValueError(f"Unknown vector store '{store}', expected 'sqlite' or 'memmap'")
+    mm = _open_store(repo, embedder.name, None, keep_float) if store == "memmap" else None
+    pending = {}
+    for unit_id, paper_id, content in repo.get_units_without_embedding(embedder.name, paper_ids=paper_ids, include_all=force):
+        pending.setdefault(paper_id, []).append((unit_id, content))
+    result = {"embedded": 0, "papers": 0, "failed": 0, "errors": []}
+    config = {"embedder": embedder.name}
+    for paper_id, units in pending.items():
+        digest = hashlib.sha256("\n".join(f"{uid}\t{hashlib.sha256((c or '').encode()).hexdigest()}" for uid, c in units).encode()).hexdigest()
+        run_id = run_job(paper_id, "embed", "local", config, repo, llm_config=False, input_sha256=digest, prompt_version=None)
+        try:
+            vectors = np.concatenate([np.asarray(embedder([c for _, c in units[i0:i0 + batch_size]]), dtype=np.float32)
+                                      for i0 in range(0, len(units), batch_size)])
+            unit_ids = [uid for uid, _ in units]
+            if store == "memmap":
+                mm = mm or _open_store(repo, embedder.name, vectors.shape[1], keep_float)
+                mm.append(unit_ids, vectors)     # before the rows: a failed commit leaves rows that retain() drops
+                rows = [(uid, b"") for uid in unit_ids]
+            else:
+                rows = [(uid, vec.tobytes()) for uid, vec in zip(unit_ids, vectors)]
+            repo.add_unit_embeddings(run_id, embedder.name, vectors.shape[1], rows)
+            finish_job(run_id, "ok", repo)
+            result["embedded"] += len(rows); result["papers"] += 1
+        except Exception as exc:
+            finish_job(run_id, "failed", repo, message=str(exc))
+            result["failed"] += 1; result["errors"].append(f"paper {paper_id}: {exc}")
+    return result
+
+def _open_store(repo, model: str, dim: int | None, keep_float: bool):
+    """Open (or create) the memmap store; a new store first takes over the vectors already kept as SQLite blobs.
+
+    Returns None when there is no store, no blobs and no `dim` to create one with.
+    """
+    from .vector_store import VectorStore, store_dir
+    path = store_dir(repo, model)
+    if VectorStore.exists(path): return VectorStore(path)
+    legacy = repo.get_unit_embeddings(model)
+    matrix = np.frombuffer(b"".join(b for _, b in legacy), dtype=np.float32).reshape(len(legacy), -1) if legacy else None
+    if matrix is None and dim is None: return None
+    store = VectorStore(path, dim=matrix.shape[1] if matrix is not None else dim, keep_float=keep_float)
+    if matrix is not None:
+        store.append([uid for uid, _ in legacy], matrix)
+        repo.clear_unit_embedding_blobs(model)
+    return store
+
+# ========== Search kernels
+
+def exact_search(matrix: np.ndarray, query: np.ndarray, k: int, block: int = EXACT_BLOCK, rows=None):
+    """Top-k rows of matrix @ query (descending), scanning `block` rows at a time; returns (row_indices, scores)."""
+    n = len(matrix) if rows is None else len(rows)
+    if n == 0 or k <= 0: return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    cand_i, cand_s = [], []
+    for i0 in range(0, n, block):
+        idx = np.arange(i0, min(i0 + block, n)) if rows is None else rows[i0:i0 + block]
+        scores = (matrix[i0:i0 + block] if rows is None else matrix[idx]) @ query
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            idx, scores = idx[top], scores[top]
+        cand_i.append(idx); cand_s.append(scores)
+    idx, scores = np.concatenate(cand_i), np.concatenate(cand_s)
+    order = np.argsort(-scores, kind="stable")[:k]
+    return idx[order], scores[order]
+
+class IVFIndex:
+    """Inverted-file index: rows grouped by nearest of `nlist` spherical k-means centroids."""
+
+    def __init__(self, matrix: np.ndarray, nlist: int | None = None, niter: int = 10, seed: int = 0):
+        n = len(matrix)
+        self.nlist = max(1, min(n, nlist or int(4 * np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        sample = matrix[np.sort(rng.choice(n, size=min(n, 64 * self.nlist), replace=False))]
+        centroids = sample[rng.choice(len(sample), size=self.nlist, replace=False)].copy()
+        for _ in range(niter):
+            assign = self._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = np.bincount(assign, minlength=self.nlist) == 0
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]   # re-seed empty lists
+            centroids = _normalize_rows(sums)
+        self.centroids = centroids
+        assign = self._assign(matrix, centroids)
+        self.order = np.argsort(assign, kind="stable")
+        self.offsets = np.searchsorted(assign[self.order], np.arange(self.nlist + 1))
+
+    @staticmethod
+    def _assign(vectors, centroids, block: int = EXACT_BLOCK):
+        return np.concatenate([np.argmax(vectors[i0:i0 + block] @ centroids.T, axis=1) for i0 in range(0, len(vectors), block)])
+
+    def search(self, matrix: np.ndarray, query: np.ndarray, k: int, nprobe: int = 8):
+        probe = np.argsort(-(self.centroids @ query))[:nprobe]
+        rows = np.sort(np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in probe]))
+        return exact_search(matrix, query, k, rows=rows)
+
+# ========== Per-repository index cache
+
+class VectorIndex:
+    """All stored vectors of one embedder: unit ids [n] and a float32 matrix [n, dim]."""
+
+    def __init__(self, unit_ids, matrix, state=None):
+        self.unit_ids = unit_ids
+        self.matrix = matrix
+        self.state = state
+        self._ivf = None
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self.unit_ids)
+
+    @classmethod
+    def load(cls, repo, model: str):
+        rows = repo.get_unit_embeddings(model)
+        if not rows: return cls(np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32))
+        unit_ids = np.fromiter((uid for uid, _ in rows), dtype=np.int64, count=len(rows))
+        matrix = np.frombuffer(b"".join(blob for _, blob in rows), dtype=np.float32).reshape(len(rows), -1)
+        return cls(unit_ids, matrix)
+
+    def search(self, query: np.ndarray, k: int, exact: bool = False, nprobe: int = 8):
+        """[(unit_id, score)] of the k nearest units, best first."""
+        if exact or len(self.unit_ids) < IVF_MIN_UNITS:
+            rows, scores = exact_search(self.matrix, query, k)
+        else:
+            with self._lock:
+                if self._ivf is None: self._ivf = IVFIndex(self.matrix)
+            rows, scores = self._ivf.search(self.matrix, query, k, nprobe=nprobe)
+        return [(int(self.unit_ids[r]), float(s)) for r, s in zip(rows, scores)]
+
+class StoreIndex:
+    """VectorIndex interface over a memory-mapped VectorStore (nothing loaded into RAM)."""
+
+    def __init__(self, store, state=None):
+        self.store = store
+        self.state = state
+
+    @property
+    def size(self) -> int:
+        return self.store.count
+
+    def search(self, query: np.ndarray, k: int, exact: bool = False):
+        """[(unit_id, score)] of the k nearest units by a full scan; exact=True scores with the float vectors."""
+        return self.store.search(query, k, rerank=True, exact=exact)
+
+_indexes = weakref.WeakKeyDictionary()   # repo -> {model: VectorIndex | StoreIndex}
+_index_lock = threading.Lock()
+
+def _memmap_store(repo, model: str):
+    from .vector_store import VectorStore, store_dir
+    try:
+        path = store_dir(repo, model)
+    except ValueError:
+        return None
+    return VectorStore(path) if VectorStore.exists(path) else None
+
+def _store_generation(repo, model: str):
+    from .vector_store import VectorStore, store_dir
+    try:
+        return VectorStore.read_generation(store_dir(repo, model))
+    except ValueError:
+        return None
+
+def vector_index(repo, model: str):
+    """Cached index of `repo` for embedder `model` (memmap store if one exists, else SQLite blobs), refreshed when vectors changed."""
+    state = (repo.get_unit_embedding_state(model), _store_generation(repo, model))
+    with _index_lock:
+        per_repo = _indexes.setdefault(repo, {})
+        index = per_repo.get(model)
+        if index is None or index.state != state:
+            store = _memmap_store(repo, model)
+            if store is not None:
+                store.retain(repo.get_unit_embedding_ids(model))
+                index = StoreIndex(store)
+            else:
+                index = VectorIndex.load(repo, model)
+            index.state = state
+            per_repo[model] = index
+    return index
+
+def compact_vector_store(repo, embedder=None) -> dict:
+    """Drop tombstoned rows from the memmap store of an embedder; {"before", "after"} row counts."""
+    model = make_embedder(embedder).name
+    store = _memmap_store(repo, model)
+    if store is None: return {"before": 0, "after": 0}
+    store.retain(repo.get_unit_embedding_ids(model))
+    with _index_lock:
+        _indexes.get(repo, {}).pop(model, None)
+    return store.compact()
+
+def vector_search(query: str, repo, k: int = 100, embedder=None, exact: bool = False, nprobe: int = 8) -> list:
+    """Nearest search units to the query text.
+
+    Returns list of dicts like fts_search: {unit_id, paper_id, content, section_path, unit_type,
+    source_type, source_id, score} with score = cosine similarity (higher = better).
+    """
+    embedder = make_embedder(embedder)
+    index = vector_index(repo, embedder.name)
+    if not query.strip() or not index.size: return []
+    options = {"exact": exact} if isinstance(index, StoreIndex) else {"exact": exact, "nprobe": nprobe}
+    hits = index.search(np.asarray(embedder([query]), dtype=np.float32)[0], k, **options)
+    units = {row["unit_id"]: row for row in repo.get_search_units_by_ids([uid for uid, _ in hits])}
+    return [{**units[uid], "score": score} for uid, score in hits if uid in units]
@@ -4,8 +4,19 @@ Summary structure: Essence, Key equations, Methods, Relevance.
 Summaries are versioned — keep history. Deactivate old, don't delete.
 The summary is embedded in the paper's .md file (in the "Generated scientific summary"
 section, clearly separated from source text).
+
+Papers longer than the model's character budget are summarized map-reduce:
+the source text is cut at the section boundaries of _split_markdown_to_units,
+each chunk is condensed into notes concurrently (bounded thread pool), and the
+versioned summary prompt runs once over the notes. Chunk notes are cached on
+disk by sha256(model, chunk prompt, chunk text), so changing SUMMARY_PROMPTS
+or regenerating re-runs only the reduce query.
 """
 
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional
 
 SUMMARY_PROMPT_V1 = """You are an expert computational scientist. Generate a structured scientific summary of the following paper.
@@ -38,8 +49,92 @@ Rules:
 
 SUMMARY_PROMPTS = {"v1": SUMMARY_PROMPT_V1}
 
+# Map step: part of a paper -> notes. Changing this text changes the cache key of every chunk.
+CHUNK_PROMPT = """You are reading one consecutive part of a longer scientific paper. Write dense notes on this part only, for a later step that will summarize the whole paper from the notes of all parts.
+
+Keep:
+- claims and results, with the numbers that support them
+- important equations in LaTeX, with the meaning of their symbols
+- algorithms, numerical techniques, data structures and implementation details
+- names of methods, software, datasets and systems studied
+
+Rules:
+- Do not invent information not present in the text.
+- Do not add an introduction or a conclusion; no more than about 300 words.
+
+Sections: {sections}
+
+{text}"""
+
+REDUCE_PREFIX = "Summarize this paper. It was too long to read at once, so here are notes on its consecutive parts, in order:"
+
+def _char_budget(agent) -> int:
+    return max(12000, agent.max_context_length * 3 - 16000) if agent.max_context_length else 12000
+
+def split_markdown_chunks(markdown: str, chunk_chars: int) -> list:
+    """Cut source markdown into [(section_paths, text)] chunks of at most ~chunk_chars.
+
+    Boundaries are the section/equation units of _split_markdown_to_units, packed
+    greedily in document order; a single section longer than chunk_chars is split
+    at blank lines (hard cut as a last resort).
+    """
+    from paperdb.search.fts import _split_markdown_to_units
+
+    pieces = []
+    for unit in _split_markdown_to_units(0, source_markdown(markdown), None, paragraphs=False):
+        paths = [unit.section_path] if unit.section_path else []
+        block = f"## {unit.section_path}\n\n{unit.content}" if unit.unit_type != "equation" and unit.section_path else unit.content
+        while len(block) > chunk_chars:
+            cut = block.rfind("\n\n", 0, chunk_chars)
+            if cut <= 0: cut = chunk_chars
+            pieces.append((paths, block[:cut]))
+            block = block[cut:].lstrip("\n")
+        if block: pieces.append((paths, block))
+    return _pack(pieces, chunk_chars)
+
+def _pack(pieces, chunk_chars: int) -> list:
+    """Greedily join consecutive [(section_paths, text)] pieces into chunks of <= chunk_chars."""
+    chunks, paths, texts, size = [], [], [], 0
+    for piece_paths, block in pieces:
+        if texts and size + len(block) + 2 > chunk_chars:
+            chunks.append((paths, "\n\n".join(texts)))
+            paths, texts, size = [], [], 0
+        paths += [p for p in piece_paths if p not in paths]
+        texts.append(block)
+        size += len(block) + 2
+    if texts: chunks.append((paths, "\n\n".join(texts)))
+    return chunks
+
+def _chunk_key(model_name: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{prompt}".encode("utf-8")).hexdigest()
+
+def _summarize_chunks(agent, chunks, cache_dir: Optional[Path], max_workers: int) -> list:
+    """Map step: [(section_paths, "### Part i (...)" + notes)] for every chunk, from the cache or concurrent queries."""
+    from paperdb.config import response_text
+
+    model_name = getattr(agent, "model_name", "unknown")
+
+    def notes(item):
+        index, (paths, text) = item
+        prompt = CHUNK_PROMPT.format(sections="; ".join(paths) or "untitled", text=text)
+        path = cache_dir / f"{_chunk_key(model_name, prompt)}.md" if cache_dir else None
+        if path and path.exists(): return path.read_text(encoding="utf-8")
+        result = response_text(agent, agent.query(prompt))
+        if path and result.strip():
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{index}.tmp")
+            tmp.write_text(result, encoding="utf-8")
+            os.replace(tmp, path)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+        results = list(pool.map(notes, enumerate(chunks)))
+    return [(paths, f"### Part {i + 1} ({'; '.join(paths) or 'untitled'})\n\n{text}")
+            for i, ((paths, _), text) in enumerate(zip(chunks, results))]
+
 def generate_summary(markdown: str, paper_id: int, run_id: int, repo,
-                     llm_config=None, prompt_version="v1") -> str:
+                     llm_config=None, prompt_version="v1", mode="auto",
+                     chunk_chars: Optional[int] = None, max_workers: int = 4,
+                     cache_dir=None) -> str:
     """Generate a scientific summary from paper markdown using LLM.
 
     Args:
@@ -49,6 +144,12 @@ def generate_summary(markdown: str, paper_id: int, run_id: int, repo,
         repo: Repository with add_summary, deactivate_summaries methods.
         llm_config: LLM template key or None for default.
         prompt_version: Version of the prompt template to use.
+        mode: "single" (one query over the text, truncated to the budget), "map_reduce",
+            or "auto" (map_reduce only when the text exceeds the model's budget).
+        chunk_chars: Map-step chunk size; defaults to the budget, at most 16000 chars.
+        max_workers: Concurrent chunk queries.
+        cache_dir: Chunk-notes cache directory; None = <data_dir>/cache/chunk_summaries,
+            False disables caching.
 
     Returns:
         Summary markdown text.
@@ -58,14 +159,31 @@ def generate_summary(markdown: str, paper_id: int, run_id: int, repo,
     prompt_template = SUMMARY_PROMPTS.get(prompt_version)
     if prompt_template is None:
         raise ValueError(f"Unknown prompt_version '{prompt_version}'. Available: {list(SUMMARY_PROMPTS.keys())}")
+    if mode not in ("auto", "single", "map_reduce"):
+        raise ValueError(f"Unknown summary mode '{mode}'. Available: auto, single, map_reduce")
 
     agent = make_agent(llm_config)
     agent.set_system_prompt(prompt_template)
 
-    max_chars = max(12000, agent.max_context_length * 3 - 16000) if agent.max_context_length else 12000
-    md_truncated = markdown[:max_chars]
-
-    response = agent.query(f"Summarize this paper:\n\n{md_truncated}")
+    max_chars = _char_budget(agent)
+    if mode == "single" or (mode == "auto" and len(markdown) <= max_chars):
+        response = agent.query(f"Summarize this paper:\n\n{markdown[:max_chars]}")
+    else:
+        if cache_dir is None:
+            from paperdb.paths import get_cache_dir
+            cache_dir = get_cache_dir() / "chunk_summaries"
+        if cache_dir:
+            cache_dir = Path(cache_dir)
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        chunk_chars = chunk_chars or min(max_chars, 16000)
+        chunks = split_markdown_chunks(markdown, chunk_chars)
+        parts = _summarize_chunks(agent, chunks, cache_dir, max_workers)
+        # notes of very long documents may still exceed the budget: condense them again (also cached)
+        while sum(len(text) + 2 for _, text in parts) > max_chars:
+            chunks = _pack(parts, chunk_chars)
+            if len(chunks) >= len(parts): break
+            parts = _summarize_chunks(agent, chunks, cache_dir, max_workers)
+        response = agent.query(f"{REDUCE_PREFIX}\n\n" + "\n\n".join(text for _, text in parts)[:max_chars])
     summary_text = response_text(agent, response)
 
     model_name = getattr(agent, 'model_name', 'unknown')
@@ -7,14 +7,28 @@ The UNIQUE(tag_id, normalized_alias) constraint allows this.
 Functions:
 - normalize_alias: lowercase, strip whitespace and punctuation
 - resolve_to_canonical: resolve alias to canonical tag(s) — returns list due to ambiguity
+- alias_index: shared in-memory AliasMap per repository (used by extraction, ranking, rules)
 - add_alias: add a tag alias (normalizes before storing)
 - merge_tags: merge one tag into another, preserving raw_name in paper_tags
 - apply_clean_tags_rules: apply consolidation rules from clean_tags.py
 - analyze_tag_distribution: analyze tag frequency, category coverage, orphans
+
+Non-obvious things:
+- The alias index is keyed by (repo.tags_generation, PRAGMA data_version).
+  Repository bumps tags_generation on every tag/alias insert or delete
+  (so add_alias, merge_tags, delete_tag invalidate it); data_version changes
+  when another connection (CLI next to the MCP server) commits, which costs
+  one PRAGMA per lookup instead of reloading tags for every name.
+- A map loaded while `repo.conn.in_transaction` is returned but not cached:
+  it may hold tags/aliases that are later rolled back, and a rollback does
+  not change the key. The cache only ever holds committed state; a
+  rolled-back write leaves the counter bumped, which costs one reload.
 """
 
 import re
 import json
+import threading
+import weakref
 from typing import Optional
 from pathlib import Path
 
@@ -37,33 +51,107 @@ def resolve_to_canonical(alias: str, repo, category=None) -> list:
 
     Args:
         alias: Raw tag text to resolve.
-        repo: Repository with get_tag_aliases_by_normalized method.
+        repo: Repository (resolved through its shared alias_index()).
         category: Optional category filter to disambiguate.
 
     Returns:
         List of tag dicts: [{'id': ..., 'canonical_name': ..., 'category': ...}]
     """
-    normalized = normalize_alias(alias)
-    if not normalized:
-        return []
-
-    # First try the canonical name, then every alias match. Repository errors
-    # are contract failures and must not be converted into "no match".
-    tag = repo.get_tag_by_name(normalized, category) if category else repo.get_tag_by_name_any_category(normalized)
-    if tag:
-        return [tag if isinstance(tag, dict) else {'id': tag.id, 'canonical_name': tag.canonical_name, 'category': tag.category}]
-    results = []
-    for alias_row in repo.get_tag_aliases_by_normalized(normalized):
-        if isinstance(alias_row, dict):
-            value = {'id': alias_row.get('tag_id', alias_row.get('id')), 'canonical_name': alias_row.get('canonical_name'), 'category': alias_row.get('category')}
-        else:
-            value = {'id': getattr(alias_row, 'tag_id', getattr(alias_row, 'id', None)), 'canonical_name': getattr(alias_row, 'canonical_name', None), 'category': getattr(alias_row, 'category', None)}
-        if category and value.get('category') != category: continue
-        if value.get('canonical_name') is None:
-            full = repo.get_tag_by_id(value['id'])
-            if full: value = full if isinstance(full, dict) else {'id': full.id, 'canonical_name': full.canonical_name, 'category': full.category}
-        results.append(value)
-    return results
+    return alias_index(repo).resolve(alias, category)
+
+class AliasMap:
+    """In-memory tags + tag_aliases: resolve raw names without a query per name.
+
+    Canonical-name matches win over alias matches (as in the SQL-era
+    resolve_to_canonical); an alias may map to several tags. Tags and aliases
+    created while a private copy is in use are registered with `add_tag()` /
+    `add_alias()` to keep that copy in sync.
+    """
+
+    def __init__(self):
+        self.by_name = {}    # canonical_name -> [tag dict] (ascending id)
+        self.by_lower = {}   # lower(canonical_name) -> [tag dict], for query-side tag references
+        self.by_alias = {}   # normalized_alias -> [tag dict] (insertion order)
+        self.by_id = {}
+        self.generation = None
+
+    def add_tag(self, tag_id: int, canonical_name: str, category: str) -> dict:
+        tag = self.by_id.get(tag_id)
+        if tag is None:
+            tag = self.by_id[tag_id] = {'id': tag_id, 'canonical_name': canonical_name, 'category': category}
+            self.by_name.setdefault(canonical_name, []).append(tag)
+            self.by_lower.setdefault(canonical_name.lower(), []).append(tag)
+        return tag
+
+    def add_alias(self, tag_id: int, normalized_alias: str):
+        tags = self.by_alias.setdefault(normalized_alias, [])
+        if tag_id in self.by_id and all(t['id'] != tag_id for t in tags): tags.append(self.by_id[tag_id])
+
+    def copy(self) -> "AliasMap":
+        """Independent copy to extend with add_tag()/add_alias() without touching the shared index."""
+        amap = AliasMap()
+        for tag in self.by_id.values(): amap.add_tag(tag['id'], tag['canonical_name'], tag['category'])
+        for normalized, tags in self.by_alias.items():
+            for tag in tags: amap.add_alias(tag['id'], normalized)
+        return amap
+
+    def find_tag(self, canonical_name: str, category: str):
+        return next((t for t in self.by_name.get(canonical_name, []) if t['category'] == category), None)
+
+    def resolve(self, alias: str, category=None) -> list:
+        """Tag dicts for a raw name: exact canonical name first, else every alias hit (category-filtered)."""
+        normalized = normalize_alias(alias)
+        if not normalized: return []
+        named = self.by_name.get(normalized, [])
+        if category: named = [t for t in named if t['category'] == category]
+        if named: return [dict(named[0])]
+        return [dict(t) for t in self.by_alias.get(normalized, []) if not category or t['category'] == category]
+
+    def tag_ids(self, name: str, category=None) -> list:
+        """Ids of tags whose lowercased canonical name or normalized alias equals name.lower() (ascending)."""
+        key = name.lower()
+        hits = {t['id']: t for t in [*self.by_lower.get(key, []), *self.by_alias.get(key, [])]}
+        if category: hits = {i: t for i, t in hits.items() if t['category'].lower() == category.lower()}
+        return sorted(hits)
+
+def load_alias_map(repo) -> AliasMap:
+    """Read all tags and aliases (two queries) into a new AliasMap."""
+    amap = AliasMap()
+    for tag in sorted(repo.get_all_tags(), key=lambda t: t['id'] if isinstance(t, dict) else t.id):
+        data = tag if isinstance(tag, dict) else tag.model_dump()
+        amap.add_tag(data['id'], data['canonical_name'], data['category'])
+    for row in repo.list_tag_aliases():
+        data = row if isinstance(row, dict) else row.model_dump()
+        amap.add_alias(data['tag_id'], data['normalized_alias'])
+    return amap
+
+_indexes = weakref.WeakKeyDictionary()   # repo -> AliasMap
+_index_lock = threading.Lock()
+
+def _tags_generation(repo):
+    """(in-process tag write counter, SQLite data_version), or None when the repo keeps no counter."""
+    generation = getattr(repo, 'tags_generation', None)
+    if generation is None: return None
+    return generation, repo.conn.execute("PRAGMA data_version").fetchone()[0]
+
+def alias_index(repo) -> AliasMap:
+    """The shared AliasMap of `repo`, loaded on first use and reloaded after tag/alias writes.
+
+    Treat it as read-only; use `.copy()` to extend it. Repositories without a
+    `tags_generation` counter get a fresh map on every call, and so does a
+    caller inside an open transaction whose writes changed the key (the map is
+    not cached, see module notes).
+    """
+    generation = _tags_generation(repo)
+    if generation is None: return load_alias_map(repo)
+    with _index_lock:
+        amap = _indexes.get(repo)
+        if amap is None or amap.generation != generation:
+            amap = load_alias_map(repo)
+            amap.generation = generation
+            if repo.conn.in_transaction: return amap
+            _indexes[repo] = amap
+    return amap
 
 def add_alias(tag_id: int, alias: str, repo):
     """Add a tag alias. Normalizes before storing.
@@ -113,13 +201,8 @@ def apply_clean_tags_rules(rules_path: str, repo):
         print("[aliases] No CONSOLIDATION_RULES found in rules file")
         return
 
-    # Get all existing tags
-    all_tags = repo.get_all_tags()
-
-    tag_list = []
-    for t in all_tags:
-        t = t if isinstance(t, dict) else {'id': t.id, 'canonical_name': t.canonical_name, 'category': t.category}
-        tag_list.append(t)
+    # All existing tags (copied: merges below invalidate the shared index)
+    tag_list = [dict(t) for t in alias_index(repo).by_id.values()]
 
     changes = 0
     for canonical_name, patterns in rules.items():
@@ -9,8 +9,15 @@ Extended categories per §18 D6:
 Key principles:
 - Provisional tags first — don't try to get it perfect.
 - Preserve raw tag text in paper_tags.raw_name.
-- Canonicalize via aliases.resolve_to_canonical().
+- Canonicalize via the shared alias index (aliases.alias_index), the same
+  resolution as aliases.resolve_to_canonical().
 - Empty categories are harmless; noisy invented tags are not.
+
+Batch mode (extract_tags_batch): several papers' summaries go into one JSON
+request keyed "P1", "P2", ...; raw names are resolved against an AliasMap
+copied once from the shared alias index, and all paper_tags / tag_assertions rows are written in one
+transaction. Summaries, not full Markdown: they are what fits several
+papers into one context window, and the tags are read off the same content.
 """
 
 import json
@@ -57,6 +64,11 @@ Rules:
 - 1-5 tags per category maximum. Quality over quantity.
 - Return valid JSON only."""
 
+BATCH_PROMPT = """Extract structured tags for each of the papers below (each is given by its summary).
+Return one JSON object keyed by the paper label ({labels}); the value for each paper is an object with these keys: {categories}.
+
+{papers}"""
+
 def _parse_llm_json(text: str) -> dict:
     """Parse JSON from LLM response, handling code fences and extra text."""
     # Strip code fences if present
@@ -84,7 +96,6 @@ def extract_tags(markdown: str, paper_id: int, run_id: int, repo, llm_config=Non
         List of (tag_id, category, canonical_name, raw_name, confidence) tuples for stored tags.
     """
     from paperdb.config import make_agent, response_text
-    from paperdb.taxonomy.aliases import resolve_to_canonical, normalize_alias
 
     agent = make_agent(llm_config)
     agent.set_system_prompt(SYSTEM_PROMPT)
@@ -103,6 +114,67 @@ def extract_tags(markdown: str, paper_id: int, run_id: int, repo, llm_config=Non
     except json.JSONDecodeError as e:
         raise ValueError(f"LLM returned invalid JSON for tag extraction: {e}\nRaw: {raw_text[:500]}")
 
+    from paperdb.taxonomy.aliases import alias_index
+    return _store_tags(tags_dict, paper_id, run_id, repo, alias_index(repo), shared=True)
+
+def extract_tags_batch(papers: list, repo, llm_config=None, batch_size: int = 8, max_chars: int = 6000) -> tuple:
+    """Tag several papers per LLM call.
+
+    Args:
+        papers: List of (paper_id, run_id, summary_text).
+        repo: Repository object (also needs list_tag_aliases and conn).
+        llm_config: LLM template key (str) or config dict. If None, uses default from config.
+        batch_size: Papers per LLM request.
+        max_chars: Per-paper cap on summary characters (further reduced to fit the context window).
+
+    Returns:
+        (results, errors): {paper_id: [(tag_id, category, canonical_name, raw_name, confidence), ...]}
+        for the papers tagged, and {paper_id: message} for papers whose batch failed or that are
+        missing from the response. Nothing is written for a failed paper.
+    """
+    from paperdb.config import make_agent, response_text
+    from paperdb.db.connection import db_transaction
+    from paperdb.taxonomy.aliases import alias_index
+
+    agent = make_agent(llm_config)
+    agent.set_system_prompt(SYSTEM_PROMPT)
+    budget = max(12000, agent.max_context_length * 3 - 16000) if agent.max_context_length else 12000
+
+    parsed, errors = [], {}
+    for i0 in range(0, len(papers), max(1, batch_size)):
+        batch = papers[i0:i0 + max(1, batch_size)]
+        per_paper = min(max_chars, budget // len(batch))
+        labels = [f"P{k+1}" for k in range(len(batch))]
+        body = "\n\n".join(f"## {label}\n{(text or '')[:per_paper]}" for label, (_, _, text) in zip(labels, batch))
+        prompt = BATCH_PROMPT.format(labels=", ".join(labels), categories=", ".join(TAG_CATEGORIES), papers=body)
+        try:
+            raw_text = response_text(agent, agent.query(prompt, response_format={"type": "json_object"}))
+            by_label = _parse_llm_json(raw_text)
+        except Exception as e:
+            for paper_id, _, _ in batch: errors[paper_id] = f"batch tag extraction failed: {e}"
+            continue
+        for label, (paper_id, run_id, _) in zip(labels, batch):
+            tags_dict = by_label.get(label) if isinstance(by_label, dict) else None
+            if isinstance(tags_dict, dict): parsed.append((paper_id, run_id, tags_dict))
+            else: errors[paper_id] = f"paper {label} missing from batch tag response"
+
+    results = {}
+    if parsed:
+        amap = alias_index(repo).copy()
+        with db_transaction(repo.conn):
+            for paper_id, run_id, tags_dict in parsed:
+                results[paper_id] = _store_tags(tags_dict, paper_id, run_id, repo, amap)
+    return results, errors
+
+def _store_tags(tags_dict: dict, paper_id: int, run_id: int, repo, amap, shared: bool = False) -> list:
+    """Resolve every raw name of one paper's {category: [raw, ...]} against `amap` and store the assertions.
+
+    Tags and aliases created here are added to `amap`. With shared=True `amap` is the shared
+    alias_index(), which is only read: it is copied the first time a new tag has to be registered
+    (most papers resolve every name to an existing tag and never pay for the copy).
+    """
+    from paperdb.taxonomy.aliases import normalize_alias
+
     results = []
     for category in TAG_CATEGORIES:
         raw_tags = tags_dict.get(category, [])
@@ -117,7 +189,7 @@ def extract_tags(markdown: str, paper_id: int, run_id: int, repo, llm_config=Non
                 continue
 
             # Try to resolve to canonical tag(s) via aliases
-            canonical_tags = resolve_to_canonical(raw_name, repo, category=category)
+            canonical_tags = amap.resolve(raw_name, category)
             if canonical_tags:
                 # Use first match (or let ambiguity be — store all)
                 for tag in canonical_tags:
@@ -126,22 +198,20 @@ def extract_tags(markdown: str, paper_id: int, run_id: int, repo, llm_config=Non
             else:
                 # No existing canonical tag — create new one
                 canonical_name = raw_name.lower().strip()
-                tag_id = _get_or_create_tag(repo, canonical_name, category)
+                known = amap.find_tag(canonical_name, category)
+                tag_id = known['id'] if known else repo.add_tag(canonical_name=canonical_name, category=category)
                 if tag_id is not None:
                     _store_paper_tag(repo, paper_id, tag_id, run_id, raw_name, source='llm', confidence=0.7)
                     # Also add as alias
                     normalized = normalize_alias(raw_name)
                     repo.add_tag_alias(tag_id=tag_id, alias=raw_name, normalized_alias=normalized)
+                    if shared:
+                        amap, shared = amap.copy(), False
+                    amap.add_tag(tag_id, canonical_name, category)
+                    amap.add_alias(tag_id, normalized)
                     results.append((tag_id, category, canonical_name, raw_name, 0.7))
-
     return results
 
-def _get_or_create_tag(repo, canonical_name: str, category: str) -> Optional[int]:
-    """Get existing tag or create new one. Returns tag_id."""
-    existing = repo.get_tag_by_name(canonical_name, category)
-    if existing: return existing['id'] if isinstance(existing, dict) else existing.id
-    return repo.add_tag(canonical_name=canonical_name, category=category)
-
 def _store_paper_tag(repo, paper_id: int, tag_id: int, run_id: int, raw_name: str, source: str, confidence: float):
     """Store a paper_tags assertion, preserving raw_name."""
     repo.add_paper_tag(paper_id=paper_id, tag_id=tag_id, source=source, run_id=run_id, confidence=confidence, raw_name=raw_name)
@@ -7,7 +7,9 @@ Each provider subclasses Agent and translates to its native SDK.
 
 Non-obvious things:
 - Model profiles (name, base_url, api_key env var, context length) are loaded
-  from config/LLMs.toml by template name, not hardcoded.
+  from config/LLMs.toml by template name, not hardcoded. The file is parsed
+  once per process and SDK clients are pooled per (provider, base_url, key)
+  in `llm_templates`, so constructing an Agent is cheap.
 - Tool calling is provider-agnostic: `try_tool()` dispatches to registered
   Python callbacks; each subclass only needs to implement `extract_tool_call()`.
 - `bHistory` controls whether the conversation accumulates in `self.history`
@@ -18,11 +20,11 @@ Non-obvious things:
 import os
 from abc import ABC, abstractmethod
 from typing import Tuple, List, Dict, Any, Optional, Generator, Callable, Optional
-import toml
 import json
 #import yaml
 
 from .ToolScheme import schema
+from . import llm_templates
 
 
 class Agent(ABC):
@@ -68,33 +70,15 @@ class Agent(ABC):
         config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
         #keys_path = os.path.join(config_dir, 'providers.key')
         keys_path = 'providers.key'
-        with open(keys_path, 'r') as file:
-            self.keys = toml.load(file)['api_keys']
+        self.keys = llm_templates.load_toml(keys_path)['api_keys']
 
     def load_template(self):
         """
-        Load the LLM template configuration from a YAML or TOML file. It also checks for
-        the API key in environment variables first, falling back to the TOML file if not found.
+        Look up the LLM template in config/LLMs.toml (parsed once per process, see
+        llm_templates) and resolve the API key from the environment or providers.key.
         """
-        config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
-
-        config_path = os.path.join(config_dir, 'LLMs.toml')
-        print(f"Loading TOML from: {config_path}")
-        try:
-            with open(config_path, 'r') as file:    
-                content = file.read()
-                print("#=============== File content:")
-                print(content)
-                print("#===============")
-                templates = toml.loads(content)  # Use loads instead of load
-                print("#=============== Templates loaded successfully!")
-                print("Available templates:", list(templates.keys()))
-        except Exception as e:
-            print(f"Error loading TOML: {str(e)}")
-            raise
-
-        #for t in templates: print(t)
-        self.template  = templates.get(self.template_name)
+        templates = llm_templates.get_templates()
+        self.template  = dict(templates[self.template_name]) if self.template_name in templates else None
         if not self.template : 
             print( f"ERROR in Agent::load_template() not such template ({self.template_name}) ")
             print( "available templates are: " )
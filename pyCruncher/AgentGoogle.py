@@ -19,6 +19,7 @@ from typing import Tuple, List, Dict, Any, Optional, Generator, Callable
 import google.generativeai as genai
 from google.generativeai.types import FunctionDeclaration #, FunctionParam
 from .Agent import Agent
+from . import llm_templates
 from .ToolScheme import schema
 
 class AgentGoogle(Agent):
@@ -50,8 +51,10 @@ class AgentGoogle(Agent):
 
     def setup_client(self):
         """Configure the Google Generative AI client with the API key."""
-        genai.configure(api_key=self.api_key)
-        self.client = genai.GenerativeModel( self.model_name  )
+        def make():
+            genai.configure(api_key=self.api_key)
+            return genai.GenerativeModel( self.model_name  )
+        self.client = llm_templates.get_client(("google", self.model_name, self.api_key), make)
 
     def get_response_text(self, message):
         #return response.choices[0].message.content
@@ -22,14 +22,15 @@ import requests
 import json
 from typing import Tuple, List, Dict, Any, Optional, Generator, Callable, Optional
 from .Agent import Agent
+from . import llm_templates
     
 class AgentOpenAI(Agent):
     def __init__(self, template_name: str, base_url=None):
         super().__init__(template_name, base_url=base_url )
-        self.session = requests.Session()
+        self.session = llm_templates.get_client(("requests", self.base_url), requests.Session)
 
     def setup_client(self):
-        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+        self.client = llm_templates.get_client(("openai", self.base_url, self.api_key), lambda: OpenAI(api_key=self.api_key, base_url=self.base_url))
 
     # def get_api_key(self):
     #     # --- get API key
@@ -7,13 +7,20 @@ asks for a Doxygen comment block. The challenge is giving the LLM enough
 context without exceeding the token limit.
 
 Non-obvious things:
-- `find_function_end()` uses brace matching to locate function bodies —
-  this is a heuristic and can fail on macros or template-heavy code.
+- `find_function_end()` uses brace matching to locate function bodies
+  (`scoped_cpp.BraceMap`, which ignores braces in comments and literals) —
+  this is a heuristic and can fail on macros that open or close braces.
 - `get_function_context()` vs `get_function_context_wholefile()` vs
   `get_function_context_body()` — three strategies for how much context to
   send: just the declaration, the whole file, or just the body. The choice
   depends on the function's complexity and the model's context window.
 - Uses `AgentDeepSeek` by default but can be swapped for other agents.
+- `process_project(..., pipelined=True)` first collects every function that
+  has no doc comment above it, then queries the LLM from `llm_jobs` threads
+  (the calls are network-bound). Each file gets all its docs inserted in one
+  pass, bottom-up, so earlier insertions do not shift later line numbers.
+  Every generated doc is appended to a JSONL journal keyed by file, content
+  hash, line and name, so an interrupted run resumes without re-querying.
 """
 
 #import os
@@ -21,20 +28,45 @@ Non-obvious things:
 
 import os
 import json
+import hashlib
+from difflib import unified_diff
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .AgentDeepSeek import AgentDeepSeek
 from . import ctags
-
-def find_function_end(lines, start_line):
-    """Find end of function by matching braces"""
-    brace_count = 0
-    found_opening = False
-    for i in range(start_line, len(lines)):
-        line = lines[i]
-        brace_count += line.count('{') - line.count('}')
-        if '{' in line: found_opening = True
-        if found_opening and brace_count == 0:
-            return i + 1
-    return -1  # Function end not found
+from .scoped_cpp import BraceMap
+
+def find_function_end(lines, start_line, braces=None):
+    """Find end of function by matching braces; braces: BraceMap of `lines`, reused across functions"""
+    if braces is None: braces = BraceMap(lines)
+    end = braces.scope_end(start_line)
+    return -1 if end is None else end + 1  # -1: function end not found
+
+def has_doc_comment(lines, line_number):
+    """True if the nearest non-blank line above `line_number` (1-based) is a ///, //! or /** ... */ comment"""
+    i = line_number - 2
+    while i >= 0 and not lines[i].strip(): i -= 1
+    if i < 0: return False
+    s = lines[i].strip()
+    return s.startswith('///') or s.startswith('//!') or s.endswith('*/')
+
+def insert_docs(lines, docs):
+    """Copy of `lines` (with line ends) with each (line_number, doc_string) inserted above its line, bottom-up"""
+    new_lines = list(lines)
+    for line_num, doc_string in sorted(docs, reverse=True):
+        target_line = lines[line_num - 1]
+        indent = ' ' * (len(target_line) - len(target_line.lstrip()))
+        new_lines[line_num - 1:line_num - 1] = [f"{indent}{line}\n" for line in doc_string.split('\n')]
+    return new_lines
+
+def write_diff(full_path, orig_lines, new_lines):
+    """Write `<full_path>.diff`, a unified diff of the documented file; returns its path"""
+    diff_file = f"{full_path}.diff"
+    with open(diff_file, 'w') as f:
+        f.write(f"--- {full_path}\n")
+        f.write(f"+++ {full_path}\n")
+        diff = unified_diff(orig_lines, new_lines, fromfile=full_path, tofile=full_path, lineterm='')
+        f.writelines('\n'.join(diff))
+    return diff_file
 
 class CodeDocumenter:
     def __init__(self, context_strategy="whole_file", max_context_size=100000 ):
@@ -161,7 +193,6 @@ class CodeDocumenter:
         # Read original file
         with open(full_path, 'r') as f:
             orig_lines = f.readlines()
-        new_lines = orig_lines.copy()
         
         docs = []   # Generate all docstrings first
         processed_methods = set()  # Keep track of processed methods by line number
@@ -190,35 +221,108 @@ class CodeDocumenter:
                 docs.append((line_num, doc_string))
                 processed_methods.add(line_num)
         
-        docs.sort(reverse=True)        # Sort by line number in reverse order to insert from bottom up
-        
-        # Insert all docstrings
-        for line_num, doc_string in docs:
-            # Get proper indentation
-            target_line = orig_lines[line_num - 1]
-            indent = ' ' * (len(target_line) - len(target_line.lstrip()))
-            doc_lines = [f"{indent}{line}\n" for line in doc_string.split('\n')]
-            new_lines[line_num - 1:line_num - 1] = doc_lines
-        
-        diff_file = f"{full_path}.diff"      # Generate diff file name
-        
-        # Create unified diff
-        with open(diff_file, 'w') as f:
-            f.write(f"--- {full_path}\n")
-            f.write(f"+++ {full_path}\n")
-            
-            # Generate unified diff format
-            from difflib import unified_diff
-            diff = unified_diff(orig_lines, new_lines, 
-                            fromfile=full_path, 
-                            tofile=full_path,
-                            lineterm='')
-            
-            f.writelines('\n'.join(diff))
-        
+        new_lines = insert_docs(orig_lines, docs)   # inserted bottom-up, so line numbers stay valid
+        diff_file = write_diff(full_path, orig_lines, new_lines)
         print(f"Diff file generated: {diff_file}")
         return diff_file
 
+    def collect_undocumented(self, selected_files):
+        """{file_path: [(line, name, function_info)]} of functions without a doc comment, one per line; also {file_path: sha1}"""
+        jobs, hashes = {}, {}
+        for file_path in selected_files:
+            if file_path not in self.files_dict:
+                print(f"No information found for file: {file_path}")
+                continue
+            content = self.read_file_content(file_path)
+            lines = content.split('\n')
+            file_info = self.files_dict[file_path]
+            todo, seen = [], set()
+            for name, info in list(file_info['free_functions'].items()) + list(file_info['methods'].items()):
+                line = info['line']
+                if line in seen or has_doc_comment(lines, line): continue
+                seen.add(line)
+                todo.append((line, name, info))
+            if todo:
+                jobs[file_path] = sorted(todo, key=lambda t: t[0])
+                hashes[file_path] = hashlib.sha1(content.encode()).hexdigest()
+        return jobs, hashes
+
+    @staticmethod
+    def load_journal(journal_path):
+        """{key: doc_string} of the docs generated by earlier runs (JSONL; a torn last line is ignored)"""
+        journal = {}
+        if journal_path and os.path.exists(journal_path):
+            with open(journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    journal[entry['key']] = entry['doc']
+        return journal
+
+    def apply_docs(self, file_path, docs, in_place=False):
+        """Insert {line: doc_string} into one file in a single pass (or write a .diff); returns the written path"""
+        full_path = self.project_path + file_path
+        with open(full_path, 'r') as f:
+            orig_lines = f.readlines()
+        new_lines = insert_docs(orig_lines, docs.items())
+        if not in_place:
+            return write_diff(full_path, orig_lines, new_lines)
+        with open(f"{full_path}.bak", 'w') as f:   # backup of the undocumented file
+            f.writelines(orig_lines)
+        with open(full_path, 'w') as f:
+            f.writelines(new_lines)
+        # keep the loaded tags valid for the edited file: shift each function by the doc lines inserted above it
+        added = sorted((line, doc.count('\n') + 1) for line, doc in docs.items())
+        file_info = self.files_dict.get(file_path, {})
+        infos = {id(info): info for table in ('free_functions', 'methods') for info in file_info.get(table, {}).values()}
+        for info in infos.values():
+            info['line'] += sum(n for line, n in added if line <= info['line'])
+        return full_path
+
+    def document_files_pipelined(self, selected_files, llm_jobs=4, journal_path="doc_journal.jsonl", in_place=False):
+        """Document all undocumented functions of `selected_files` with `llm_jobs` concurrent LLM requests.
+
+        A file is written (or diffed) as soon as its last function is done; docs found in the journal are
+        reused. Failed requests are reported and left out, so the next run retries them.
+        """
+        jobs, hashes = self.collect_undocumented(selected_files)
+        journal = self.load_journal(journal_path)
+        done = {file_path: {} for file_path in jobs}
+        pending = []
+        for file_path, todo in jobs.items():
+            for line, name, info in todo:
+                key = f"{file_path}:{hashes[file_path]}:{line}:{name}"
+                if key in journal: done[file_path][line] = journal[key]
+                else: pending.append((file_path, line, name, info, key))
+        remaining = {file_path: len(todo) - len(done[file_path]) for file_path, todo in jobs.items()}
+        n_total = sum(len(todo) for todo in jobs.values())
+        print(f"{n_total} undocumented functions in {len(jobs)} files; {n_total - len(pending)} from journal, {len(pending)} to generate")
+        written = []
+        for file_path, n in remaining.items():
+            if n == 0: written.append(self.apply_docs(file_path, done[file_path], in_place))
+        if not pending:
+            return written
+        with open(journal_path, 'a') as jf, ThreadPoolExecutor(max_workers=llm_jobs) as pool:
+            futures = {pool.submit(self.generate_function_doc, info, file_path): (file_path, line, name, key)
+                       for file_path, line, name, info, key in pending}
+            for i, future in enumerate(as_completed(futures), 1):
+                file_path, line, name, key = futures[future]
+                try:
+                    doc_string = future.result()
+                except Exception as e:
+                    print(f"[{i}/{len(pending)}] FAILED {file_path}:{line} {name}: {e}")
+                else:
+                    jf.write(json.dumps({"key": key, "file": file_path, "line": line, "name": name, "doc": doc_string}) + "\n")
+                    jf.flush()
+                    done[file_path][line] = doc_string
+                    print(f"[{i}/{len(pending)}] {file_path}:{line} {name}")
+                remaining[file_path] -= 1
+                if remaining[file_path] == 0 and done[file_path]:
+                    written.append(self.apply_docs(file_path, done[file_path], in_place))
+        return written
+
     def log_prompt(self, prefix, suffix, file_path, func_name, scope=""):
         """Write the complete prompt to a debug file for inspection"""
         full_name = f"{scope}::{func_name}" if scope else func_name
@@ -327,7 +431,9 @@ Focus on the role (purpose) of the function, what it does, and document the para
         with open(full_path, 'w') as f:
             f.writelines(lines)
 
-    def process_project(self, project_path, selected_files, tags_file="tags_all.json" , agent_type="deepseek"):
+    def process_project(self, project_path, selected_files, tags_file="tags_all.json" , agent_type="deepseek",
+                        pipelined=False, llm_jobs=4, journal_path="doc_journal.jsonl", in_place=False):
+        """Document `selected_files`: one .diff per file, or with pipelined=True see document_files_pipelined()"""
         # 2. Check and prepare database
         if os.path.exists(tags_file):
             print(f"Using existing tags from {tags_file}")
@@ -346,6 +452,8 @@ Focus on the role (purpose) of the function, what it does, and document the para
             return False
         
         # 5. Process selected files
+        if pipelined:
+            return self.document_files_pipelined(selected_files, llm_jobs=llm_jobs, journal_path=journal_path, in_place=in_place)
         for file_path in selected_files:
             print(f"\nProcessing file: {file_path}")
             #self.document_file(file_path)
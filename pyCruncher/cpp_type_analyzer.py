@@ -15,6 +15,10 @@ Non-obvious things:
 - C++ is hard to parse: templates, operator overloading, and macros mean
   the analyzer is inherently incomplete. It's a best-effort first pass,
   complemented by ctags.
+- With a `parse_cache.FragmentCache`, `process_file()` collects each file
+  into its own fragment (FileInfo, types, classes) that is pickled by content
+  hash and merged into the registry; an unchanged file is neither re-read by
+  the parser nor re-merged, and an edited one is re-parsed with `tree.edit`.
 """
 
 import os
@@ -23,6 +27,9 @@ from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Dict, List, Optional, Set, Tuple
 from tree_sitter import Parser, Node
+from .parse_cache import FragmentMerger, IncrementalTrees, content_key, grammar_version
+
+FRAGMENT_VERSION = 1    # bump when the extraction below changes, to invalidate cached fragments
 
 # Debug logging setup
 DEBUG_LEVEL = 2  # 0=INFO, 1=DEBUG, 2=TRACE
@@ -336,10 +343,15 @@ class TypeRegistry:
 
 class TypeCollector:
     """Collect type information from source files"""
-    def __init__(self, parser: Parser, verbosity: int = 0):
+    def __init__(self, parser: Parser, verbosity: int = 0, cache=None, max_trees: int = IncrementalTrees.MAX_FILES):
         self.registry = TypeRegistry()
         self._classes: List[ClassInfo] = []
         self.parser = parser
+        self.cache = cache                   # parse_cache.FragmentCache or None
+        self.trees = IncrementalTrees(max_trees)    # max_trees=0: no edits expected, keep no trees
+        self._file_classes: Dict[str, List[ClassInfo]] = {}
+        self.fragments = FragmentMerger({'types': self.registry.types, 'files': self.registry.files})
+        self.version = f"cpp_types:{FRAGMENT_VERSION}:{grammar_version(parser)}"
         global DEBUG_LEVEL
         DEBUG_LEVEL = verbosity
         setup_logging(DEBUG_LEVEL)
@@ -356,28 +368,61 @@ class TypeCollector:
         tree = self.parser.parse(bytes(code, "utf8"))
         self.process_node(tree.root_node, code, "<string>")
 
-    def process_file(self, file_path: str):
-        """Process a C++ source file"""
+    def process_file(self, file_path: str, edits=None):
+        """Process a C++ source file
+
+        edits: [(start_byte, old_end_byte, new_end_byte)] since the previous call for this file, if known.
+        """
         debug(f"Processing file: {file_path}", 1)
         
         # Read the file content
         with open(file_path, 'r') as f:
             content = f.read()
         debug("File content read", 2)
-
-        # Initialize file tracking
-        file_info = self.registry.add_file(file_path)
-        file_scope = Scope(type=ScopeType.GLOBAL, name=os.path.basename(file_path))
-        file_info.scope = file_scope
-        
-        # Set up initial scope
+        data = bytes(content, "utf8")
+        key = content_key(data, self.version)
+        if self.fragments.keys.get(file_path) == key:
+            debug("File unchanged since last merge", 2)
+            return
+        fragment = self.cache.get('cpp_types', file_path, key) if self.cache else None
+        if fragment is None:
+            fragment = self._collect_fragment(file_path, content, data, edits)
+            if self.cache: self.cache.put('cpp_types', file_path, key, fragment)
+        self._merge_fragment(file_path, fragment, key)
+
+    def _collect_fragment(self, file_path: str, content: str, data: bytes, edits=None) -> dict:
+        """Process one file into an empty registry; returns its entries {table: [(key, value)]} and classes."""
+        registry, classes = self.registry, self._classes
+        self.registry, self._classes = TypeRegistry(), []
+        try:
+            # Initialize file tracking
+            file_info = self.registry.add_file(file_path)
+            file_scope = Scope(type=ScopeType.GLOBAL, name=os.path.basename(file_path))
+            file_info.scope = file_scope
+            
+            # Set up initial scope
+            self.registry.scope_stack = [file_scope]
+            self.registry.current_scope = file_scope
+            
+            # Parse and process the file
+            tree = self.trees.parse(self.parser, file_path, data, edits)
+            debug("File parsed", 2)
+            self.process_node(tree.root_node, content, file_path)
+            return {'tables': {'types': list(self.registry.types.items()), 'files': [(file_path, file_info)]},
+                    'classes': self._classes}
+        finally:
+            self.registry, self._classes = registry, classes
+
+    def _merge_fragment(self, file_path: str, fragment: dict, key: str):
+        """Replace what file_path contributed to the registry and the class list with `fragment`."""
+        self.fragments.merge(file_path, fragment['tables'], key)
+        old = {id(c) for c in self._file_classes.get(file_path, ())}
+        if old: self._classes[:] = [c for c in self._classes if id(c) not in old]
+        self._classes.extend(fragment['classes'])
+        self._file_classes[file_path] = fragment['classes']
+        file_scope = self.registry.files[file_path].scope
         self.registry.scope_stack = [file_scope]
         self.registry.current_scope = file_scope
-        
-        # Parse and process the file
-        tree = self.parser.parse(bytes(content, "utf8"))
-        debug("File parsed", 2)
-        self.process_node(tree.root_node, content, file_path)
 
     def process_node(self, node: Node, content: str, file_path: str):
         """Process a node in the AST"""
@@ -12,11 +12,17 @@ Non-obvious things:
   human inspection during debugging.
 - `process_ctags_json_claude()` reformats the output specifically for
   feeding to an LLM (compact, deduplicated, with signatures).
+- The JSON output is consumed one line at a time by `iter_ctags_tags()`, which
+  the `process_ctags_json*` readers use, so the tags file is never loaded
+  whole. `stream_ctags()` runs ctags with `-o -` and yields tags straight
+  from its stdout pipe as they are written, so no file or global timeout
+  is needed.
 """
 
 import re
 from collections import defaultdict
 import subprocess
+import tempfile
 import json
 import time
 #import networkx as nx
@@ -65,6 +71,66 @@ def run_ctags(output_file, path, kinds=None, exclude=None ):
     except subprocess.CalledProcessError as e:
         print(f"Error running ctags: {e}")
 
+def print_ctags_progress(n_tags, elapsed):
+    print(f"[ctags] {n_tags} tags in {elapsed:.1f}s ({n_tags / max(elapsed, 1e-9):.0f} tags/s)")
+
+def iter_ctags_tags(source, progress=None, every=100_000):
+    """
+    Yield the decoded tag entries of ctags JSON output one by one.
+    :param source: path of a JSON tags file, or an iterable of its lines (open file, process stdout).
+    :param progress: optional callback(n_tags, elapsed_seconds), called every `every` tags and at the end.
+    Pseudo-tags ("_type": "ptag") and undecodable lines (e.g. a truncated last line) are skipped.
+    """
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+        with open(source, 'r', encoding='utf-8', errors='replace') as f:
+            yield from iter_ctags_tags(f, progress, every)
+        return
+    t0 = time.perf_counter()
+    n = 0
+    for line in source:
+        if not line.startswith('{"_type": "tag"'):
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        n += 1
+        if progress and n % every == 0:
+            progress(n, time.perf_counter() - t0)
+        yield entry
+    if progress:
+        progress(n, time.perf_counter() - t0)
+
+def _tee(lines, out):
+    for line in lines:
+        out.write(line)
+        yield line
+
+def stream_ctags(cmd, tee=None, progress=None, every=100_000):
+    """
+    Run a ctags JSON command that writes to stdout (`-o -`) and yield its tags as they arrive.
+    :param tee: optional path; the raw JSON lines are also written there (for tools that read the tags file).
+    There is no timeout: ctags runs as long as it produces output. Closing the generator early kills it;
+    a non-zero exit status raises RuntimeError with the end of ctags' stderr.
+    """
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err, text=True, encoding='utf-8',
+                                errors='replace', bufsize=1 << 16)
+        out = open(tee, 'w', encoding='utf-8') if tee else None
+        lines = proc.stdout if out is None else _tee(proc.stdout, out)
+        finished = False
+        try:
+            yield from iter_ctags_tags(lines, progress, every)
+            finished = True
+        finally:
+            if not finished: proc.kill()
+            proc.stdout.close()
+            returncode = proc.wait()
+            if out: out.close()
+        if returncode != 0:
+            err.seek(0)
+            raise RuntimeError(f"ctags exited with {returncode}: {err.read()[-2000:].decode(errors='replace')}")
+
 # Parse a single line from a ctags file
 def parse_ctags_line(line):
     parts = line.split('\t')
@@ -261,21 +327,18 @@ def process_ctags_json(json_file, base_path ):
     function_lines = []
     member_lines   = [] 
     name_spaces    = {}
-    with open(json_file, 'r') as f:
-        for i,line in enumerate(f):
-            if line.startswith('{"_type": "tag"'):
-                entry = json.loads(line)
-                name = entry.get('name')
-                if "__anon" in name: continue
-                kind = entry.get('kind')
-                if kind=='function':
-                    function_lines.append(entry)
-                elif kind=='member':
-                    member_lines.append(entry)
-                elif (kind=='class') or (kind=='struct'):
-                    class_lines.append(entry)
-                elif kind=='namespace':
-                    name_spaces[name] = entry
+    for entry in iter_ctags_tags(json_file):
+        name = entry.get('name')
+        if "__anon" in name: continue
+        kind = entry.get('kind')
+        if kind=='function':
+            function_lines.append(entry)
+        elif kind=='member':
+            member_lines.append(entry)
+        elif (kind=='class') or (kind=='struct'):
+            class_lines.append(entry)
+        elif kind=='namespace':
+            name_spaces[name] = entry
 
     for k,v in name_spaces.items(): print( "name_space ", k ) 
 
@@ -299,73 +362,70 @@ def process_ctags_json_by_files_2(json_file, base_path):
   name_spaces = {} # Keep track of namespaces
   
   # First pass: collect all entries
-  with open(json_file, 'r') as f:
-      for line in f:
-          if line.startswith('{"_type": "tag"'):
-              entry = json.loads(line)
-              name = entry.get('name')
-              if "__anon" in name: 
-                  continue
-                  
-              kind = entry.get('kind')
-              path = entry.get('path')
-              rel_path = path[len(base_path):]  # relative path
-              
-              # Initialize file entry if not exists
-              if rel_path not in files_dict:
-                  files_dict[rel_path] = {
-                      'classes': {},      # classes defined in this file
-                      'methods': {},      # methods defined in this file
-                      'free_functions': {},  # free functions defined in this file
-                      'members': {},         # class members defined in this file
-                  }
-              
-              # Process based on kind
-              if kind == 'namespace':
-                  name_spaces[name] = entry
-                  
-              elif kind in ['class', 'struct']:
-                  # Process class directly here instead of using process_classes
-                  class_info = {
-                      'line': entry.get('line'),
-                      'kind': kind,
-                      'scope': entry.get('scope'),
-                      'scopeKind': entry.get('scopeKind'),
-                      'inherits': entry.get('inherits'),
-                      'properties': {},
-                      'methods': {}
-                  }
-                  # Use the full name (including namespace) as the key
-                  files_dict[rel_path]['classes'][name] = class_info
-                  
-              elif kind == 'function':
-                  scope = entry.get('scope')
-                  scopeK = entry.get('scopeKind')
-                  
-                  # Process function info
-                  func_info = {
-                      'line': entry.get('line'),
-                      'signature': process_signature(entry.get('signature', '')),
-                      'return_type': entry.get('typeref', '').split(":")[-1] if entry.get('typeref') else None,
-                      'name': name
-                  }
-                  
-                  if scope and (scopeK == 'class' or scopeK == 'struct'):
-                      # This is a class method
-                      files_dict[rel_path]['methods'][f"{scope}::{name}"] = func_info
-                  else:
-                      # This is a free function
-                      files_dict[rel_path]['free_functions'][name] = func_info
-                      
-              elif kind == 'member':
-                  scope = entry.get('scope')
-                  if scope:  # If member has a scope (belongs to a class)
-                      member_info = {
-                          'line': entry.get('line'),
-                          'type': entry.get('typeref', '').split(":")[-1] if entry.get('typeref') else None
-                      }
-                      # Store with full scoped name
-                      files_dict[rel_path]['members'][f"{scope}::{name}"] = member_info
+  for entry in iter_ctags_tags(json_file):
+      name = entry.get('name')
+      if "__anon" in name: 
+          continue
+
+      kind = entry.get('kind')
+      path = entry.get('path')
+      rel_path = path[len(base_path):]  # relative path
+
+      # Initialize file entry if not exists
+      if rel_path not in files_dict:
+          files_dict[rel_path] = {
+              'classes': {},      # classes defined in this file
+              'methods': {},      # methods defined in this file
+              'free_functions': {},  # free functions defined in this file
+              'members': {},         # class members defined in this file
+          }
+
+      # Process based on kind
+      if kind == 'namespace':
+          name_spaces[name] = entry
+
+      elif kind in ['class', 'struct']:
+          # Process class directly here instead of using process_classes
+          class_info = {
+              'line': entry.get('line'),
+              'kind': kind,
+              'scope': entry.get('scope'),
+              'scopeKind': entry.get('scopeKind'),
+              'inherits': entry.get('inherits'),
+              'properties': {},
+              'methods': {}
+          }
+          # Use the full name (including namespace) as the key
+          files_dict[rel_path]['classes'][name] = class_info
+
+      elif kind == 'function':
+          scope = entry.get('scope')
+          scopeK = entry.get('scopeKind')
+
+          # Process function info
+          func_info = {
+              'line': entry.get('line'),
+              'signature': process_signature(entry.get('signature', '')),
+              'return_type': entry.get('typeref', '').split(":")[-1] if entry.get('typeref') else None,
+              'name': name
+          }
+
+          if scope and (scopeK == 'class' or scopeK == 'struct'):
+              # This is a class method
+              files_dict[rel_path]['methods'][f"{scope}::{name}"] = func_info
+          else:
+              # This is a free function
+              files_dict[rel_path]['free_functions'][name] = func_info
+
+      elif kind == 'member':
+          scope = entry.get('scope')
+          if scope:  # If member has a scope (belongs to a class)
+              member_info = {
+                  'line': entry.get('line'),
+                  'type': entry.get('typeref', '').split(":")[-1] if entry.get('typeref') else None
+              }
+              # Store with full scoped name
+              files_dict[rel_path]['members'][f"{scope}::{name}"] = member_info
   
   return files_dict
 
@@ -376,61 +436,58 @@ def process_ctags_json_by_files(json_file, base_path):
   name_spaces = {} # Keep track of namespaces
   
   # First pass: collect all entries
-  with open(json_file, 'r') as f:
-      for line in f:
-          if line.startswith('{"_type": "tag"'):
-              entry = json.loads(line)
-              name = entry.get('name')
-              if "__anon" in name: 
-                  continue
-                  
-              kind = entry.get('kind')
-              path = entry.get('path')
-              rel_path = path[len(base_path):]  # relative path
-              
-              # Initialize file entry if not exists
-              if rel_path not in files_dict:
-                  files_dict[rel_path] = {
-                      'classes': {},      # classes defined in this file
-                      'methods': {},      # methods defined in this file
-                      'free_functions': {},  # free functions defined in this file
-                      'members': {},         # class members defined in this file
-                  }
-              
-              # Process based on kind
-              if kind == 'namespace':
-                  name_spaces[name] = entry
-                  
-              elif kind in ['class', 'struct']:
-                  class_lines = []
-                  class_lines.append(entry)
-                  cls = process_classes(class_lines, base_path, classes)
-                  files_dict[rel_path]['classes'][name] = cls[name]
-                  
-              elif kind == 'function':
-                  scope = entry.get('scope')
-                  scopeK = entry.get('scopeKind')
-                  
-                  # Process function info
-                  func_info = {
-                      'line': entry.get('line'),
-                      'signature': process_signature(entry.get('signature', '')),
-                      'return_type': entry.get('typeref', '').split(":")[-1] if entry.get('typeref') else None,
-                      'name': name
-                  }
-                  
-                  if scope and (scopeK == 'class' or scopeK == 'struct'):
-                      # This is a class method
-                      files_dict[rel_path]['methods'][f"{scope}::{name}"] = func_info
-                  else:
-                      # This is a free function
-                      files_dict[rel_path]['free_functions'][name] = func_info
-                      
-              elif kind == 'member':
-                  files_dict[rel_path]['members'][name] = {
-                      'line': entry.get('line'),
-                      'type': entry.get('typeref', '').split(":")[-1] if entry.get('typeref') else None
-                  }
+  for entry in iter_ctags_tags(json_file):
+      name = entry.get('name')
+      if "__anon" in name: 
+          continue
+
+      kind = entry.get('kind')
+      path = entry.get('path')
+      rel_path = path[len(base_path):]  # relative path
+
+      # Initialize file entry if not exists
+      if rel_path not in files_dict:
+          files_dict[rel_path] = {
+              'classes': {},      # classes defined in this file
+              'methods': {},      # methods defined in this file
+              'free_functions': {},  # free functions defined in this file
+              'members': {},         # class members defined in this file
+          }
+
+      # Process based on kind
+      if kind == 'namespace':
+          name_spaces[name] = entry
+
+      elif kind in ['class', 'struct']:
+          class_lines = []
+          class_lines.append(entry)
+          cls = process_classes(class_lines, base_path, classes)
+          files_dict[rel_path]['classes'][name] = cls[name]
+
+      elif kind == 'function':
+          scope = entry.get('scope')
+          scopeK = entry.get('scopeKind')
+
+          # Process function info
+          func_info = {
+              'line': entry.get('line'),
+              'signature': process_signature(entry.get('signature', '')),
+              'return_type': entry.get('typeref', '').split(":")[-1] if entry.get('typeref') else None,
+              'name': name
+          }
+
+          if scope and (scopeK == 'class' or scopeK == 'struct'):
+              # This is a class method
+              files_dict[rel_path]['methods'][f"{scope}::{name}"] = func_info
+          else:
+              # This is a free function
+              files_dict[rel_path]['free_functions'][name] = func_info
+
+      elif kind == 'member':
+          files_dict[rel_path]['members'][name] = {
+              'line': entry.get('line'),
+              'type': entry.get('typeref', '').split(":")[-1] if entry.get('typeref') else None
+          }
   
   return files_dict
 
@@ -452,51 +509,48 @@ def process_ctags_json_claude(json_file, base_path):
     member_lines = []
 
     # First pass: collect all entries
-    with open(json_file, 'r') as f:
-        for line in f:
-            if line.startswith('{"_type": "tag"'):
-                entry = json.loads(line)
-                name = entry.get('name')
-                if "__anon" in name:
-                    continue
-                
-                kind = entry.get('kind')
-                path = entry.get('path')
-                rel_path = path[len(base_path):]  # relative path
-                
-                # Initialize file entry if not exists
-                if rel_path not in files_dict:
-                    files_dict[rel_path] = {
-                        'classes': set(),      # class names defined in this file
-                        'methods': {},         # methods defined in this file
-                        'free_functions': {},  # free functions defined in this file
-                        'members': {},         # class members defined in this file
-                    }
-
-                # Collect entries by kind
-                if kind == 'function':
-                    function_lines.append(entry)
-                    # Add to files_dict if it's a free function
-                    if not entry.get('scope') or entry.get('scopeKind') not in ['class', 'struct']:
-                        files_dict[rel_path]['free_functions'][name] = {
-                            'line': entry.get('line'),
-                            'signature': process_signature(entry.get('signature', '')),
-                            'return_type': entry.get('typeref', '').split(":")[-1] if entry.get('typeref') else None
-                        }
-
-                elif kind == 'member':
-                    member_lines.append(entry)
-                    files_dict[rel_path]['members'][name] = {
-                        'line': entry.get('line'),
-                        'type': entry.get('typeref', '').split(":")[-1] if entry.get('typeref') else None
-                    }
-
-                elif kind in ['class', 'struct']:
-                    class_lines.append(entry)
-                    files_dict[rel_path]['classes'].add(name)
-
-                elif kind == 'namespace':
-                    name_spaces[name] = entry
+    for entry in iter_ctags_tags(json_file):
+        name = entry.get('name')
+        if "__anon" in name:
+            continue
+
+        kind = entry.get('kind')
+        path = entry.get('path')
+        rel_path = path[len(base_path):]  # relative path
+
+        # Initialize file entry if not exists
+        if rel_path not in files_dict:
+            files_dict[rel_path] = {
+                'classes': set(),      # class names defined in this file
+                'methods': {},         # methods defined in this file
+                'free_functions': {},  # free functions defined in this file
+                'members': {},         # class members defined in this file
+            }
+
+        # Collect entries by kind
+        if kind == 'function':
+            function_lines.append(entry)
+            # Add to files_dict if it's a free function
+            if not entry.get('scope') or entry.get('scopeKind') not in ['class', 'struct']:
+                files_dict[rel_path]['free_functions'][name] = {
+                    'line': entry.get('line'),
+                    'signature': process_signature(entry.get('signature', '')),
+                    'return_type': entry.get('typeref', '').split(":")[-1] if entry.get('typeref') else None
+                }
+
+        elif kind == 'member':
+            member_lines.append(entry)
+            files_dict[rel_path]['members'][name] = {
+                'line': entry.get('line'),
+                'type': entry.get('typeref', '').split(":")[-1] if entry.get('typeref') else None
+            }
+
+        elif kind in ['class', 'struct']:
+            class_lines.append(entry)
+            files_dict[rel_path]['classes'].add(name)
+
+        elif kind == 'namespace':
+            name_spaces[name] = entry
 
     # Process classes and their members
     classes = process_classes(class_lines, base_path)
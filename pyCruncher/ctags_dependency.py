@@ -9,11 +9,19 @@ Non-obvious things:
 - `DependencyProcessor` reads the ctags JSON, then for each function it
   scans the source lines for identifiers that match known function names.
   This is a textual scan, not a real AST — fast but may produce false
-  positives (e.g. comments, string literals).
+  positives (e.g. identifiers in comments or string literals).
 - `FunctionInfo` records carry `qualified_name` (e.g. `MyClass::myMethod`)
   to distinguish methods from free functions with the same name.
 - The dependency tree can be serialized for visualization or for feeding
   to an LLM as context.
+- Function bodies end at the brace matching the first `{` at or after the
+  ctags line, found with `scoped_cpp.BraceMap` (one scan per file that skips
+  comments, string/char literals and raw strings).
+- Identifiers are resolved through `CallResolver`, built once per
+  `analyze_dependencies()` call: unqualified method names map to their
+  `Class::name` candidates (in class order), so one identifier costs a few
+  dict probes instead of a loop over every class. Bodies are resolved in a
+  process pool when there are many of them (`jobs`).
 """
 
 import re
@@ -24,6 +32,9 @@ import time
 #import networkx as nx
 import traceback
 import os
+from concurrent.futures import ProcessPoolExecutor
+from .scoped_cpp import BraceMap
+from .ctags import iter_ctags_tags
 
 class_file           = 'tags_classes.log'
 method_file          = 'tags_methods.log'
@@ -556,6 +567,60 @@ def print_files_structure(files_dict):
         for member_name, member_info in content['members'].items():
             print(f"    - {member_name} (line {member_info['line']})")
 
+class CallResolver:
+    """Lookup tables that map an identifier found in a function body to the functions it may call.
+
+    methods_any[name] -> [Class::name or Class.name] and methods_cpp[name] -> [Class::name],
+    both in the order of `classes`; the namespace/class prefix probes are single set lookups.
+    """
+
+    def __init__(self, functions, classes):
+        self.functions = set(functions)
+        rank = {c: i for i, c in enumerate(classes)}
+        cpp, py = defaultdict(dict), defaultdict(dict)
+        for q in self.functions:
+            if '::' in q:
+                cls, name = q.rsplit('::', 1)
+                if '.' not in name and cls in rank: cpp[name][cls] = q
+            if '.' in q:
+                cls, name = q.rsplit('.', 1)
+                if '::' not in name and cls in rank: py[name][cls] = q
+        self.methods_cpp = {name: [c[cls] for cls in sorted(c, key=rank.get)] for name, c in cpp.items()}
+        self.methods_any = {}
+        for name in set(cpp) | set(py):
+            c, p = cpp.get(name, {}), py.get(name, {})
+            self.methods_any[name] = [c.get(cls) or p[cls] for cls in sorted(set(c) | set(p), key=rank.get)]
+
+    def resolve(self, identifier, namespace=None, class_name=None):
+        """Qualified names `identifier` may refer to, from inside a function of namespace/class_name."""
+        cpp_style = identifier.replace('.', '::')
+        if cpp_style in self.functions: return [cpp_style]
+        py_style = identifier.replace('::', '.')
+        if py_style in self.functions: return [py_style]
+        if namespace and f"{namespace}::{cpp_style}" in self.functions: return [f"{namespace}::{cpp_style}"]
+        if class_name and f"{class_name}::{cpp_style}" in self.functions: return [f"{class_name}::{cpp_style}"]
+        if '::' not in cpp_style:                        # unqualified: a method of any class
+            return self.methods_any.get(cpp_style, [])
+        return self.methods_cpp.get(cpp_style.rsplit('::', 1)[1], [])   # obj.method / obj::method
+
+_resolver = None
+
+def _init_resolver(resolver):
+    global _resolver
+    _resolver = resolver
+
+def _resolve_calls_job(item):
+    """(qualified_name, calls or None, error or None) of one function body; runs in pool workers too."""
+    qname, body, namespace, class_name, check_call_syntax = item
+    try:
+        identifiers = DependencyProcessor.extract_identifiers(body, check_call_syntax)
+        calls = []
+        for identifier in sorted(identifiers):
+            calls.extend(_resolver.resolve(identifier, namespace, class_name))
+        return qname, calls, None
+    except Exception as e:
+        return qname, None, str(e)
+
 class DependencyProcessor:
     def __init__(self):
         self.functions = {}       # Dict of qualified_name -> FunctionInfo
@@ -567,15 +632,8 @@ class DependencyProcessor:
         """
         Enhanced version of process_ctags_json that includes function dependencies
         """
-        with open(json_file, 'r') as f:
-            lines = f.readlines()
-
-        # First pass: collect all classes and function definitions
-        for line in lines:
-            entry = json.loads(line)
-            if entry.get('_type') != 'tag':
-                continue
-                
+        # First pass: collect all classes and function definitions (tags are streamed, not read at once)
+        for entry in iter_ctags_tags(json_file):
             kind = entry.get('kind')
             name = entry.get('name')
             path = entry.get('path')
@@ -636,7 +694,8 @@ class DependencyProcessor:
 
         return self.functions, self.classes, self.files
 
-    def extract_identifiers(self, code, check_call_syntax=False):
+    @staticmethod
+    def extract_identifiers(code, check_call_syntax=False):
         """
         Extract all identifiers from a piece of code, optionally checking for function call syntax
         """
@@ -665,112 +724,45 @@ class DependencyProcessor:
                 identifiers.update(re.findall(pattern, code))
             return identifiers
 
-    def analyze_dependencies(self, check_call_syntax=False):
+    def analyze_dependencies(self, check_call_syntax=False, jobs=None, min_parallel=64):
         """
-        Analyze function bodies to find potential function calls based on identifiers
+        Analyze function bodies to find potential function calls based on identifiers.
+        `jobs` worker processes resolve the bodies when there are at least `min_parallel` of them.
         """
-        for func_name, func_info in self.functions.items():
-            if not func_info.body:
-                continue
-                
-            try:
-                # Get all identifiers in function body
-                identifiers = self.extract_identifiers(func_info.body, check_call_syntax)
-                func_info.calls = []  # Reset calls to avoid duplicates
-                
-                # Look for direct function calls
-                for identifier in identifiers:
-                    # Try both separator styles
-                    cpp_style = identifier.replace('.', '::')
-                    py_style = identifier.replace('::', '.')
-                    
-                    # Try direct matches
-                    if cpp_style in self.functions:
-                        func_info.calls.append(cpp_style)
-                        continue
-                    if py_style in self.functions:
-                        func_info.calls.append(py_style)
-                        continue
-                    
-                    # Try with current namespace prefix
-                    if func_info.namespace:
-                        ns_qualified = f"{func_info.namespace}::{cpp_style}"
-                        if ns_qualified in self.functions:
-                            func_info.calls.append(ns_qualified)
-                            continue
-                            
-                    # Try with class prefix if this is a method
-                    if func_info.class_name:
-                        class_qualified = f"{func_info.class_name}::{cpp_style}"
-                        if class_qualified in self.functions:
-                            func_info.calls.append(class_qualified)
-                            continue
-                    
-                    # Try all classes for method calls
-                    for class_name in self.classes:
-                        # For unqualified method names
-                        if '::' not in cpp_style and '.' not in cpp_style:
-                            class_cpp = f"{class_name}::{cpp_style}"
-                            class_py = f"{class_name}.{cpp_style}"
-                            if class_cpp in self.functions:
-                                func_info.calls.append(class_cpp)
-                                continue
-                            if class_py in self.functions:
-                                func_info.calls.append(class_py)
-                                continue
-                        # For qualified method names (obj.method or obj::method)
-                        else:
-                            parts = cpp_style.split('::')
-                            class_qualified = f"{class_name}::{parts[-1]}"
-                            if class_qualified in self.functions:
-                                func_info.calls.append(class_qualified)
-                                continue
-                
-                # Handle nested namespace calls
-                parts = cpp_style.split('::')
-                if len(parts) > 1:
-                    # Try all possible namespace combinations
-                    for i in range(len(parts)):
-                        ns = '::'.join(parts[:i])
-                        name = '::'.join(parts[i:])
-                        if ns and name:
-                            full_name = f"{ns}::{name}"
-                            if full_name in self.functions:
-                                func_info.calls.append(full_name)
-                                break
-                    
-            except Exception as e:
-                print(f"Error analyzing function {func_name}: {str(e)}")
-
-    def find_scope_end(self, lines, start_idx):
+        global _resolver
+        items = [(name, f.body, f.namespace, f.class_name, check_call_syntax)
+                 for name, f in self.functions.items() if f.body]
+        resolver = CallResolver(self.functions, self.classes)
+        jobs = jobs or os.cpu_count() or 1
+        if jobs <= 1 or len(items) < min_parallel:
+            _resolver = resolver
+            results = [_resolve_calls_job(item) for item in items]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_resolver, initargs=(resolver,)) as pool:
+                results = list(pool.map(_resolve_calls_job, items, chunksize=max(1, len(items) // (jobs * 8))))
+        for func_name, calls, err in results:
+            if err is None:
+                self.functions[func_name].calls = calls
+            else:
+                print(f"Error analyzing function {func_name}: {err}")
+
+    def find_scope_end(self, lines, start_idx, braces=None):
         """
         Find the end of a scope (function/method body) by matching brackets
         Returns the line number of the closing bracket
+        braces: BraceMap of `lines`, to resolve many functions of one file with a single scan
         """
-        brace_count = 0
-        in_scope = False
-        
-        for i, line in enumerate(lines[start_idx:], start=start_idx):
-            # Skip string literals and comments
-            if '/*' in line or '//' in line or '"' in line or "'" in line:
-                continue
-                
-            for char in line:
-                if char == '{':
-                    brace_count += 1
-                    in_scope = True
-                elif char == '}':
-                    brace_count -= 1
-                    
-                if in_scope and brace_count == 0:
-                    return i
-                    
-        return len(lines) - 1  # If not found, return last line
+        if braces is None: braces = BraceMap(lines)
+        end = braces.scope_end(start_idx)
+        return len(lines) - 1 if end is None else end  # If not found, return last line
 
     def load_file_contents(self, base_path):
         """
         Load contents of all tracked files and determine function end lines using bracket matching
         """
+        funcs_by_file = defaultdict(list)
+        for func_info in self.functions.values():
+            funcs_by_file[func_info.file_path].append(func_info)
         for file_path in self.files:
             full_path = os.path.join(base_path, file_path.lstrip('/'))
             try:
@@ -779,12 +771,12 @@ class DependencyProcessor:
                     self.files[file_path]['content'] = content
                     
                     lines = content.split('\n')
-                    for func_name, func_info in self.functions.items():
-                        if func_info.file_path == file_path:
-                            start_idx = func_info.start_line - 1
-                            end_idx = self.find_scope_end(lines, start_idx)
-                            func_info.end_line = end_idx + 1
-                            func_info.body = '\n'.join(lines[start_idx:end_idx+1])
+                    braces = BraceMap(content)
+                    for func_info in funcs_by_file.get(file_path, ()):
+                        start_idx = func_info.start_line - 1
+                        end_idx = self.find_scope_end(lines, start_idx, braces)
+                        func_info.end_line = end_idx + 1
+                        func_info.body = '\n'.join(lines[start_idx:end_idx+1])
                             
             except Exception as e:
                 print(f"Error loading file {file_path}: {str(e)}")
@@ -819,14 +811,7 @@ class DependencyProcessor:
             print_deps(func_name)
 
 def process_ctags_with_deps(self, json_file, base_path):
-    with open(json_file, 'r') as f:
-        lines = f.readlines()
-
-    for line in lines:
-        entry = json.loads(line)
-        if entry.get('_type') != 'tag':
-            continue
-            
+    for entry in iter_ctags_tags(json_file):
         kind = entry.get('kind')
         name = entry.get('name')
         path = entry.get('path')
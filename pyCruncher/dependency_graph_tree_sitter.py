@@ -10,13 +10,29 @@ Non-obvious things:
   called within the body. This is extracted from the AST, not from text
   scanning, so it's more accurate than ctags_dependency.
 - `FileInfo` aggregates all functions and classes in a single file.
-- `parse_directory()` walks a folder and returns a dict of file→FileInfo.
+- `parse_directory()` walks a folder (sorted, so the result order does not
+  depend on the filesystem) and returns a dict of file→FileInfo. With `jobs`
+  worker processes, each worker builds its own parser once and sends back the
+  same picklable per-file fragment the cache stores; the parent merges them in
+  path order, so the registry is identical to a serial run.
+- `analyze_dependencies(jobs=...)` parses function bodies in workers too; they
+  return the raw callee names and the parent resolves them into `calls`, with
+  a suffix index instead of scanning all functions per unresolved name.
+- With a `parse_cache.FragmentCache`, each file's functions, classes and
+  FileInfo are pickled by content hash; an unchanged file is merged from the
+  cache without parsing, and `parse_file()` then returns None instead of a tree.
 """
 
 import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from typing import List, Dict, Set
-from .tree_sitter_utils import get_parser, get_node_text, get_qualified_name, visit_tree
+from .tree_sitter_utils import get_parser, get_node_text, get_qualified_name, visit_tree, BUILD_PATH
+from .parse_cache import FragmentCache, FragmentMerger, IncrementalTrees, content_key, grammar_version
+
+FRAGMENT_VERSION = 1    # bump when the extraction below changes, to invalidate cached fragments
 
 @dataclass
 class FunctionInfo:
@@ -55,12 +71,15 @@ class FileInfo:
     content: bytes = None
 
 class DependencyGraphTreeSitter:
-    def __init__(self):
+    def __init__(self, cache=None, max_trees=IncrementalTrees.MAX_FILES):
         self.functions: Dict[str, FunctionInfo] = {}
         self.classes: Dict[str, ClassInfo] = {}
         self.files: Dict[str, FileInfo] = {}
         self.cpp_parser = None
         self.python_parser = None
+        self.cache = cache                   # parse_cache.FragmentCache or None
+        self.trees = IncrementalTrees(max_trees)    # max_trees=0: no edits expected, keep no trees
+        self.fragments = FragmentMerger({'functions': self.functions, 'classes': self.classes, 'files': self.files})
         
     def initialize_parser(self, language):
         """Initialize parser for the specified language"""
@@ -75,44 +94,95 @@ class DependencyGraphTreeSitter:
         else:
             raise ValueError(f"Unsupported language: {language}")
 
-    def parse_file(self, file_path: str):
-        """Parse a single source file"""
+    def parse_file(self, file_path: str, edits=None):
+        """Parse a single source file
+
+        edits: [(start_byte, old_end_byte, new_end_byte)] since the previous parse of this file, if known.
+        Returns the syntax tree, or None when the file was unchanged or taken from the cache.
+        """
+        key, fragment, tree = self._fragment(file_path, edits, self.fragments.keys.get(file_path))
+        if fragment is not None:
+            self.fragments.merge(file_path, fragment, key)
+        return tree
+
+    def _fragment(self, file_path: str, edits=None, known_key=None):
+        """(key, fragment, tree) of one file; fragment is None when the key equals known_key,
+        tree is None unless the file was actually parsed."""
         # Determine language from file extension
         ext = os.path.splitext(file_path)[1].lower()
         if ext in ['.cpp', '.hpp', '.h', '.cc']:
-            parser = self.initialize_parser("cpp")
+            language = "cpp"
         elif ext in ['.py']:
-            parser = self.initialize_parser("python")
+            language = "python"
         else:
             raise ValueError(f"Unsupported file extension: {ext}")
 
         # Read file content
         with open(file_path, 'rb') as f:
             content = f.read()
-        
-        # Parse the file
-        tree = parser.parse(content)
-        
-        # Create file info
-        file_info = FileInfo(path=file_path, content=content)
-        self.files[file_path] = file_info
-        
-        # Process the syntax tree
-        self._process_tree(tree.root_node, content, file_path)
-        
-        return tree
+        key = content_key(content, f"ts_deps:{FRAGMENT_VERSION}:{grammar_version(lib_path=BUILD_PATH)}")
+        if known_key == key:
+            return key, None, None
+        fragment = self.cache.get('ts_deps', file_path, key) if self.cache else None
+        tree = None
+        if fragment is None:
+            parser = self.initialize_parser(language)
+            tree = self.trees.parse(parser, file_path, content, edits)
+            fragment = self._collect_fragment(tree, content, file_path)
+            if self.cache: self.cache.put('ts_deps', file_path, key, fragment)
+        return key, fragment, tree
+
+    def _collect_fragment(self, tree, content: bytes, file_path: str) -> dict:
+        """Process one syntax tree into empty tables; returns {table: [(key, value)]}."""
+        tables = self.functions, self.classes, self.files
+        self.functions, self.classes, self.files = {}, {}, {}
+        try:
+            # Create file info
+            self.files[file_path] = FileInfo(path=file_path, content=content)
+            
+            # Process the syntax tree
+            self._process_tree(tree.root_node, content, file_path)
+            return {'functions': list(self.functions.items()), 'classes': list(self.classes.items()),
+                    'files': list(self.files.items())}
+        finally:
+            self.functions, self.classes, self.files = tables
 
-    def parse_directory(self, dir_path: str, file_pattern: str = None):
-        """Parse all matching files in a directory"""
-        for root, _, files in os.walk(dir_path):
-            for file in files:
+    @staticmethod
+    def list_files(dir_path: str, file_pattern: str = None) -> List[str]:
+        """Matching files under dir_path, in sorted walk order"""
+        paths = []
+        for root, dirs, files in os.walk(dir_path):
+            dirs.sort()
+            for file in sorted(files):
                 if file_pattern and not file.endswith(file_pattern):
                     continue
-                file_path = os.path.join(root, file)
+                paths.append(os.path.join(root, file))
+        return paths
+
+    def parse_directory(self, dir_path: str, file_pattern: str = None, jobs: int = 1, min_parallel: int = 16) -> Dict[str, FileInfo]:
+        """Parse all matching files in a directory
+
+        jobs: worker processes (None = os.cpu_count()); used when there are at least `min_parallel` files.
+        Fragments are merged in list_files() order whatever `jobs` is. Returns self.files.
+        """
+        paths = self.list_files(dir_path, file_pattern)
+        jobs = jobs or os.cpu_count() or 1
+        if jobs <= 1 or len(paths) < min_parallel:
+            for file_path in paths:
                 try:
                     self.parse_file(file_path)
                 except Exception as e:
                     print(f"Error parsing {file_path}: {str(e)}")
+            return self.files
+        items = [(file_path, self.fragments.keys.get(file_path)) for file_path in paths]
+        cache_dir = str(self.cache.cache_dir) if self.cache else None
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(cache_dir,)) as pool:
+            for file_path, key, fragment, err in pool.map(_parse_job, items, chunksize=max(1, len(items) // (jobs * 8))):
+                if err is not None:
+                    print(f"Error parsing {file_path}: {err}")
+                elif fragment is not None:
+                    self.fragments.merge(file_path, fragment, key)
+        return self.files
 
     def _process_tree(self, node, content: bytes, file_path: str):
         """Process the syntax tree to extract functions, classes, and dependencies"""
@@ -249,8 +319,10 @@ class DependencyGraphTreeSitter:
             self.classes[qualified_name] = class_info
             self.files[file_path].classes.append(qualified_name)
 
-    def _process_function_calls(self, node, content: bytes, current_function: FunctionInfo):
-        """Process function calls within a function body"""
+    @staticmethod
+    def _call_names(node, content: bytes) -> List[str]:
+        """Names of the functions called within a syntax (sub)tree, as written"""
+        names = []
         def process_node(node):
             # Check for function calls
             if node.type == 'call_expression':
@@ -275,45 +347,64 @@ class DependencyGraphTreeSitter:
                         function_name = get_node_text(func_node, content)
                     
                     if function_name:
-                        # Try to find the fully qualified name
-                        qualified_name = None
-                        
-                        # Check if it's a class method
-                        if current_function.class_name:
-                            # First check in the same class
-                            class_qualified = f"{current_function.class_name}::{function_name}"
-                            if class_qualified in self.functions:
-                                qualified_name = class_qualified
-                        
-                        # Check in the same namespace
-                        if not qualified_name and current_function.namespace:
-                            ns_qualified = f"{current_function.namespace}::{function_name}"
-                            if ns_qualified in self.functions:
-                                qualified_name = ns_qualified
-                        
-                        # Use global scope if not found
-                        if not qualified_name:
-                            # Look for exact match in functions
-                            for func_qualified_name in self.functions:
-                                if func_qualified_name.endswith(f"::{function_name}"):
-                                    qualified_name = func_qualified_name
-                                    break
-                            
-                            # If still not found, store the unqualified name
-                            if not qualified_name:
-                                qualified_name = function_name
-                        
-                        current_function.calls.add(qualified_name)
+                        names.append(function_name)
         
         visit_tree(node, process_node)
+        return names
 
-    def analyze_dependencies(self):
-        """Analyze function bodies to find dependencies"""
-        for func_name, func_info in self.functions.items():
-            if func_info.body:
-                # Parse the function body
-                tree = self.cpp_parser.parse(func_info.body.encode())
-                self._process_function_calls(tree.root_node, func_info.body.encode(), func_info)
+    def suffix_index(self) -> Dict[str, str]:
+        """Name suffix (e.g. B::f) -> first function, in registry order, whose qualified name ends with ::B::f"""
+        index = {}
+        for func_qualified_name in self.functions:
+            i = func_qualified_name.find('::')
+            while i >= 0:
+                index.setdefault(func_qualified_name[i + 2:], func_qualified_name)
+                i = func_qualified_name.find('::', i + 1)
+        return index
+
+    def _resolve_call(self, function_name: str, current_function: FunctionInfo, suffixes: Dict[str, str]) -> str:
+        """Qualified name of a called function: same class, then same namespace, then any scope"""
+        # Check if it's a class method
+        if current_function.class_name:
+            # First check in the same class
+            class_qualified = f"{current_function.class_name}::{function_name}"
+            if class_qualified in self.functions:
+                return class_qualified
+        
+        # Check in the same namespace
+        if current_function.namespace:
+            ns_qualified = f"{current_function.namespace}::{function_name}"
+            if ns_qualified in self.functions:
+                return ns_qualified
+        
+        # Use global scope if not found, else store the unqualified name
+        return suffixes.get(function_name, function_name)
+
+    def _process_function_calls(self, node, content: bytes, current_function: FunctionInfo, suffixes=None):
+        """Process function calls within a function body"""
+        if suffixes is None: suffixes = self.suffix_index()
+        for function_name in self._call_names(node, content):
+            current_function.calls.add(self._resolve_call(function_name, current_function, suffixes))
+
+    def analyze_dependencies(self, jobs: int = 1, min_parallel: int = 64):
+        """Analyze function bodies to find dependencies
+
+        jobs: worker processes parsing the bodies (None = os.cpu_count()), used for at least `min_parallel` bodies;
+        workers return raw callee names and the calls are resolved and merged here.
+        """
+        suffixes = self.suffix_index()
+        items = [(func_name, func_info.body) for func_name, func_info in self.functions.items() if func_info.body]
+        jobs = jobs or os.cpu_count() or 1
+        if jobs <= 1 or len(items) < min_parallel:
+            parser = self.initialize_parser("cpp")
+            results = [(func_name, self._call_names(parser.parse(body.encode()).root_node, body.encode()))
+                       for func_name, body in items]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(None,)) as pool:
+                results = list(pool.map(_calls_job, items, chunksize=max(1, len(items) // (jobs * 8))))
+        for func_name, names in results:
+            func_info = self.functions[func_name]
+            func_info.calls.update(self._resolve_call(name, func_info, suffixes) for name in names)
 
     def find_include_file(self, include_path: str, source_file: str, project_root: str) -> str:
         """Find the full path of an included file"""
@@ -385,3 +476,45 @@ class DependencyGraphTreeSitter:
         # Then parse each file
         for dep_file in all_files:
             self.parse_file(dep_file)
+
+# ========== Pool workers (one DependencyGraphTreeSitter, hence one parser per language, per process)
+
+_worker = None
+
+def _init_worker(cache_dir):
+    global _worker
+    _worker = DependencyGraphTreeSitter(cache=FragmentCache(cache_dir) if cache_dir else None, max_trees=0)
+
+def _parse_job(item):
+    """(file_path, key, fragment or None, error or None) of one file"""
+    file_path, known_key = item
+    try:
+        key, fragment, _ = _worker._fragment(file_path, known_key=known_key)   # max_trees=0: trees are not sent back, none kept
+        return file_path, key, fragment, None
+    except Exception as e:
+        return file_path, None, None, str(e)
+
+def _calls_job(item):
+    """(qualified_name, raw callee names) of one function body"""
+    func_name, body = item
+    content = body.encode()
+    return func_name, _worker._call_names(_worker.initialize_parser("cpp").parse(content).root_node, content)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tree-sitter call graph of a source tree")
+    parser.add_argument("root", help="directory to parse")
+    parser.add_argument("--pattern", default=None, help="file suffix filter, e.g. .cpp")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: all cores, 1 = serial)")
+    parser.add_argument("--cache", default=None, help="fragment cache directory")
+    parser.add_argument("--calls", action="store_true", help="also resolve function calls")
+    args = parser.parse_args()
+
+    graph = DependencyGraphTreeSitter(cache=FragmentCache(args.cache) if args.cache else None)
+    t0 = time.perf_counter()
+    graph.parse_directory(args.root, args.pattern, jobs=args.jobs)
+    t1 = time.perf_counter()
+    print(f"{len(graph.files)} files, {len(graph.functions)} functions, {len(graph.classes)} classes in {t1 - t0:.2f}s")
+    if args.calls:
+        graph.analyze_dependencies(jobs=args.jobs)
+        n_calls = sum(len(f.calls) for f in graph.functions.values())
+        print(f"{n_calls} calls in {time.perf_counter() - t1:.2f}s")
@@ -0,0 +1,82 @@
+"""
+Process-wide cache of parsed LLM templates (config/LLMs.toml) and provider clients.
+
+`Agent.load_template()` and `paperdb.config` both resolve template names
+against config/LLMs.toml; before this module every call re-read and
+re-parsed the file, and every Agent built a fresh SDK client. Here the
+file is parsed once and kept until it changes on disk, and clients are
+shared between agents that talk to the same endpoint with the same key.
+
+    tpl    = get_template("gemini-flash")
+    client = get_client(("openai", base_url, api_key), lambda: OpenAI(api_key=api_key, base_url=base_url))
+
+Non-obvious things:
+- Invalidation compares (st_mtime_ns, st_size) of the file on every lookup;
+  one stat() is far cheaper than a TOML parse and picks up edits without a
+  restart. Set `force=True` to re-read regardless (e.g. same-second edits
+  on filesystems with coarse mtime).
+- `get_template()` returns a shallow copy, so callers may modify the dict
+  without changing what the next caller sees; `load_toml()` returns the
+  shared parsed object and must be treated as read-only.
+- The client pool key is whatever tuple the caller passes (provider,
+  base_url, api_key, ...); SDK clients (openai, anthropic) are thread-safe
+  and hold a connection pool, so sharing them is the point. Per-agent
+  state (history, tools) lives on the Agent, never on the client.
+- Only `os`, `threading` and `toml` are imported, so paperdb can use this
+  without pulling in any provider SDK.
+"""
+
+import os
+import threading
+import toml
+
+LLMS_TOML = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'LLMs.toml')
+
+_lock    = threading.Lock()
+_parsed  = {}   # abspath -> ((st_mtime_ns, st_size), data)
+_clients = {}   # key tuple -> client
+stats    = {'parses': 0, 'clients_created': 0}
+
+def load_toml(path=LLMS_TOML, force=False):
+    """Parsed content of a TOML file, re-read only when its mtime or size changed."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _lock:
+        hit = _parsed.get(path)
+        if hit is not None and hit[0] == stamp and not force:
+            return hit[1]
+    with open(path, 'r') as f:
+        data = toml.load(f)
+    with _lock:
+        _parsed[path] = (stamp, data)
+        stats['parses'] += 1
+    return data
+
+def get_templates(path=LLMS_TOML):
+    """All templates {name: settings}; read-only (see module notes)."""
+    return load_toml(path)
+
+def get_template(name, path=LLMS_TOML):
+    """Settings dict of one template (a copy); raises ValueError listing the available names."""
+    templates = load_toml(path)
+    if name not in templates:
+        raise ValueError(f"Unknown LLM template '{name}'. Available: {', '.join(templates.keys())}")
+    return dict(templates[name])
+
+def get_client(key, factory):
+    """Client for `key` from the pool, created by `factory()` on first use."""
+    with _lock:
+        client = _clients.get(key)
+    if client is not None: return client
+    new = factory()
+    with _lock:
+        client = _clients.setdefault(key, new)   # another thread may have won the race; keep one
+        if client is new: stats['clients_created'] += 1
+    return client
+
+def clear(clients=True):
+    """Forget parsed files (and pooled clients); mostly for tests."""
+    with _lock:
+        _parsed.clear()
+        if clients: _clients.clear()
@@ -0,0 +1,196 @@
+"""
+Per-file parse cache for the tree-sitter analyzers — re-parse only what changed.
+
+`cpp_type_analyzer.TypeCollector`, `python_type_analyzer.TypeCollector` and
+`dependency_graph_tree_sitter.DependencyGraphTreeSitter` each process a file
+into a *fragment*: the registry entries that one file contributes (types,
+classes, functions, scopes, calls, includes/imports), extracted as if the
+registry were empty. Fragments are pickled under a cache directory and merged
+into the global registry, so a repeated analysis re-parses only edited files.
+
+    cache = FragmentCache(".shadow/cache/tree_sitter")
+    collector = TypeCollector(parser, cache=cache)
+    collector.process_file(path)                  # unchanged file: pickle load + merge, no parse
+    collector.process_file(path, edits=[(start, old_end, new_end)])   # edited in place: incremental tree.edit
+
+Non-obvious things:
+- The cache key is SHA-256 of the file bytes plus a version string of the
+  analyzer (`FRAGMENT_VERSION` of each module) and of the grammar
+  (`grammar_version()`), so a rebuilt language library invalidates entries.
+- `FragmentMerger` keeps, per registry key, the files that define it in merge
+  order. The last merged file wins (what sequential processing did), and
+  replacing or dropping a file restores the definition of the file before it,
+  so only the changed fragment is re-merged.
+- `IncrementalTrees` keeps the last tree of the `max_files` most recently
+  parsed files in memory (trees are not picklable; an LRU bounds the bytes
+  and trees held on a large repo, `max_files=0` keeps none for one-shot
+  batch runs). With known edit ranges, or a prefix/suffix diff of the old
+  and new bytes when none are given, the old tree is `edit()`ed and handed to
+  `parser.parse(new_bytes, old_tree)`, which reuses the unchanged subtrees.
+"""
+
+import os
+import hashlib
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+
+def content_key(data: bytes, version: str) -> str:
+    """Cache key of file bytes analyzed by a given analyzer/grammar version."""
+    h = hashlib.sha256(data)
+    h.update(b'\0' + version.encode())
+    return h.hexdigest()
+
+def grammar_version(parser=None, lib_path=None) -> str:
+    """Best-effort identity of a tree-sitter grammar: language ABI version and the built library's size/mtime."""
+    language = getattr(parser, 'language', None)
+    parts = [str(getattr(language, 'version', '') or getattr(language, 'name', '') or '')]
+    if lib_path and os.path.exists(lib_path):
+        st = os.stat(lib_path)
+        parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+    return '|'.join(parts)
+
+class FragmentCache:
+    """Pickled per-file fragments: <cache_dir>/<analyzer>/<sha1 of path>.pkl holding (key, fragment)."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, analyzer, file_path):
+        name = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()
+        return self.cache_dir / analyzer / f"{name}.pkl"
+
+    def get(self, analyzer, file_path, key):
+        """The fragment stored for file_path under `key`, or None."""
+        try:
+            with open(self._path(analyzer, file_path), 'rb') as f:
+                stored_key, fragment = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+            stored_key = None
+        if stored_key != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return fragment
+
+    def put(self, analyzer, file_path, key, fragment):
+        path = self._path(analyzer, file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump((key, fragment), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+class FragmentMerger:
+    """Merge per-file fragments {table: [(key, value)]} into a registry's dicts.
+
+    targets: table -> dict to write into. Tables in `nested` take (outer, inner) keys and write
+    target[outer][inner]; tables in `first_wins` keep the first file's value instead of the last.
+    """
+
+    def __init__(self, targets, nested=(), first_wins=()):
+        self.targets = targets
+        self.nested = set(nested)
+        self.first_wins = set(first_wins)
+        self.fragments = {}     # file -> {table: {key: value}}
+        self.keys = {}          # file -> content key of the merged fragment
+        self.owners = {}        # (table, key) -> [files defining it, in merge order]
+
+    def _set(self, table, key, value):
+        if table in self.nested:
+            self.targets[table].setdefault(key[0], {})[key[1]] = value
+        else:
+            self.targets[table][key] = value
+
+    def _del(self, table, key):
+        target = self.targets[table]
+        if table in self.nested:
+            inner = target.get(key[0], {})
+            inner.pop(key[1], None)
+            if not inner: target.pop(key[0], None)
+        else:
+            target.pop(key, None)
+
+    def drop(self, file_path):
+        """Remove the contribution of file_path; keys it shadowed get their previous definition back."""
+        fragment = self.fragments.pop(file_path, None)
+        self.keys.pop(file_path, None)
+        if fragment is None: return
+        for table, entries in fragment.items():
+            for key in entries:
+                owners = self.owners[(table, key)]
+                winner = owners[0] if table in self.first_wins else owners[-1]
+                owners.remove(file_path)
+                if not owners:
+                    del self.owners[(table, key)]
+                    self._del(table, key)
+                elif winner == file_path:
+                    new = owners[0] if table in self.first_wins else owners[-1]
+                    self._set(table, key, self.fragments[new][table][key])
+
+    def merge(self, file_path, fragment, key=None):
+        """Replace the contribution of file_path with `fragment` ({table: [(key, value)]})."""
+        self.drop(file_path)
+        tables = {table: dict(entries) for table, entries in fragment.items()}
+        self.fragments[file_path] = tables
+        self.keys[file_path] = key
+        for table, entries in tables.items():
+            for k, value in entries.items():
+                owners = self.owners.setdefault((table, k), [])
+                owners.append(file_path)
+                if table not in self.first_wins or len(owners) == 1:
+                    self._set(table, k, value)
+
+def _point(data: bytes, offset: int):
+    """(row, byte column) of a byte offset, as tree-sitter counts them."""
+    row = data.count(b'\n', 0, offset)
+    return row, offset - (data.rfind(b'\n', 0, offset) + 1)
+
+def _longest(same, hi):
+    """Largest n <= hi with same(n) true (same is monotone), by bisection over memcmp-backed slices."""
+    lo = 0
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if same(mid): lo = mid
+        else: hi = mid - 1
+    return lo
+
+def diff_edit(old: bytes, new: bytes):
+    """The single (start, old_end, new_end) byte range that turns `old` into `new` (common prefix/suffix)."""
+    a, b = memoryview(old), memoryview(new)
+    start = _longest(lambda n: a[:n] == b[:n], min(len(a), len(b)))
+    tail = _longest(lambda n: a[len(a) - n:] == b[len(b) - n:], min(len(a), len(b)) - start)
+    return start, len(old) - tail, len(new) - tail
+
+class IncrementalTrees:
+    """Last syntax tree of the `max_files` most recently parsed files; re-parses an edited file incrementally from it."""
+
+    MAX_FILES = 64
+
+    def __init__(self, max_files=MAX_FILES):
+        self.max_files = max_files
+        self.trees = OrderedDict()      # file -> (bytes, tree), least recently parsed first
+
+    def parse(self, parser, file_path, data: bytes, edits=None):
+        """Tree of `data`. edits: [(start_byte, old_end_byte, new_end_byte)] since the last parse, if known;
+        several edits are folded into the one range that covers them."""
+        old = self.trees.pop(file_path, None)
+        if old is None:
+            tree = parser.parse(data)
+        else:
+            old_data, tree = old
+            if old_data == data:
+                self.trees[file_path] = old
+                return tree
+            start, old_end, new_end = edits[0] if edits and len(edits) == 1 else diff_edit(old_data, data)
+            tree.edit(start_byte=start, old_end_byte=old_end, new_end_byte=new_end,
+                      start_point=_point(data, start), old_end_point=_point(old_data, old_end),
+                      new_end_point=_point(data, new_end))
+            tree = parser.parse(data, tree)
+        if self.max_files > 0:
+            self.trees[file_path] = (data, tree)
+            while len(self.trees) > self.max_files:
+                self.trees.popitem(last=False)
+        return tree
@@ -11,6 +11,10 @@ Non-obvious things:
   `FunctionInfo`, `MethodInfo`, and `ClassInfo` records.
 - The registry can be queried to build dependency graphs or to provide
   context to LLM-based code documenters.
+- With a `parse_cache.FragmentCache`, `process_file()` collects each file
+  into its own fragment (imports, classes, functions) that is pickled by
+  content hash and merged into the registry; functions of the shared global
+  scope keep first-file-wins, as when files are processed in sequence.
 """
 
 import os
@@ -20,6 +24,9 @@ from enum import Enum, auto
 from typing import Dict, List, Optional, Set, Tuple, Union
 from tree_sitter import Parser, Node, Language
 from pathlib import Path
+from .parse_cache import FragmentMerger, IncrementalTrees, content_key, grammar_version
+
+FRAGMENT_VERSION = 1    # bump when the extraction below changes, to invalidate cached fragments
 
 # Debug logging setup
 DEBUG_LEVEL = 2  # 0=INFO, 1=DEBUG, 2=TRACE
@@ -257,10 +264,13 @@ class TypeRegistry:
 
 class TypeCollector:
     """Collect type information from Python source files"""
-    def __init__(self, parser: Parser, language: Language):
+    def __init__(self, parser: Parser, language: Language, cache=None, max_trees: int = IncrementalTrees.MAX_FILES):
         self.parser = parser
         self.language = language
         self.registry = TypeRegistry()
+        self.cache = cache                   # parse_cache.FragmentCache or None
+        self.trees = IncrementalTrees(max_trees)    # max_trees=0: no edits expected, keep no trees
+        self.version = f"python_types:{FRAGMENT_VERSION}:{grammar_version(parser)}"
         global DEBUG_LEVEL
         DEBUG_LEVEL = 0
         setup_logging(DEBUG_LEVEL)
@@ -268,6 +278,10 @@ class TypeCollector:
         # Initialize global scope
         global_scope = Scope(type=ScopeType.GLOBAL, name="")
         self.registry.add_scope(global_scope.name, global_scope)
+        self.fragments = FragmentMerger(
+            {'imports': self.registry.imports, 'classes': self.registry.classes, 'functions': self.registry.functions,
+             'module_functions': self.registry.module_functions, 'global_functions': global_scope.functions},
+            nested=('imports', 'module_functions'), first_wins=('global_functions',))
 
     def process_code(self, code: str, file_path: str = "<string>"):
         """Process Python code directly"""
@@ -299,39 +313,62 @@ class TypeCollector:
 
         debug(f"Finished processing code from {file_path}", 1)
 
-    def process_file(self, file_path: str):
-        """Process a Python source file"""
+    def process_file(self, file_path: str, edits=None):
+        """Process a Python source file
+
+        edits: [(start_byte, old_end_byte, new_end_byte)] since the previous call for this file, if known.
+        """
         debug(f"Processing file: {file_path}", 1)
         with open(file_path, 'r') as f:
             code = f.read()
+        data = bytes(code, "utf8")
+        key = content_key(data, self.version)
+        if self.fragments.keys.get(file_path) == key:
+            debug(f"File unchanged since last merge: {file_path}", 1)
+            return
+        fragment = self.cache.get('python_types', file_path, key) if self.cache else None
+        if fragment is None:
+            fragment = self._collect_fragment(file_path, code, data, edits)
+            if self.cache: self.cache.put('python_types', file_path, key, fragment)
+        self.fragments.merge(file_path, fragment, key)
+        debug(f"Finished processing file: {file_path}", 1)
+
+    def _collect_fragment(self, file_path: str, code: str, data: bytes, edits=None) -> dict:
+        """Process one file into an empty registry; returns its entries {table: [(key, value)]}."""
+        registry = self.registry
+        self.registry = TypeRegistry()
+        try:
+            tree = self.trees.parse(self.parser, file_path, data, edits)
             
-        tree = self.parser.parse(bytes(code, "utf8"))
-        
-        # Get just the filename for registry
-        filename = Path(file_path).name
-        debug(f"Using filename: {filename} for registry", 1)
+            # Get just the filename for registry
+            filename = Path(file_path).name
+            debug(f"Using filename: {filename} for registry", 1)
 
-        # Get or create global scope for this file
-        global_scope = self.registry.get_scope("")
-        if not global_scope:
             global_scope = Scope(type=ScopeType.GLOBAL, name="")
             self.registry.add_scope("", global_scope)
 
-        # First pass: process imports
-        for child in tree.root_node.children:
-            if child.type == "import_statement":
-                self._process_import(child, code, file_path)
-            elif child.type == "import_from_statement":
-                self._process_from_import(child, code, file_path)
-
-        # Second pass: process functions and classes
-        for child in tree.root_node.children:
-            if child.type == "function_definition":
-                self._process_function(child, code, file_path)
-            elif child.type == "class_definition":
-                self._process_class(child, code, file_path)
+            # First pass: process imports
+            for child in tree.root_node.children:
+                if child.type == "import_statement":
+                    self._process_import(child, code, file_path)
+                elif child.type == "import_from_statement":
+                    self._process_from_import(child, code, file_path)
 
-        debug(f"Finished processing file: {file_path}", 1)
+            # Second pass: process functions and classes
+            for child in tree.root_node.children:
+                if child.type == "function_definition":
+                    self._process_function(child, code, file_path)
+                elif child.type == "class_definition":
+                    self._process_class(child, code, file_path)
+
+            r = self.registry
+            return {'imports': [((f, local), v) for f, names in r.imports.items() for local, v in names.items()],
+                    'classes': list(r.classes.items()),
+                    'functions': list(r.functions.items()),
+                    'module_functions': [((m, name), info) for m, funcs in r.module_functions.items() for name, info in funcs.items()],
+                    'global_functions': list(global_scope.functions.items())}
+        finally:
+            self.registry = registry
 
     def _process_node(self, node: Node, content: str, file_path: str):
         """Process a node in the AST"""
@@ -18,6 +18,25 @@ Non-obvious things:
   skeletons are always generated from static analysis alone.
 - The tech matrix is a CSV with folders as rows and languages as columns,
   showing file counts — useful for spotting language sprawl.
+- Static analysis (FileAnalysis + SymbolInfo + skeleton) is cached per file in
+  `.shadow/cache/analysis.json`, keyed by SHA-256 of the content (mtime+size
+  only decide whether to re-hash). A run analyzes just the new/changed files —
+  Python in a process pool, C/C++ with one ctags call on that file list — and
+  rewrites only their skeletons; without an explicit shadow_dir the outputs go
+  to the stable `.shadow/latest/`, so unchanged skeletons are not rewritten.
+  LLM summaries are not part of the cache.
+- ctags writes its JSON to a pipe (`stream_ctags_json`); tags become
+  SymbolInfo as they arrive, with progress every 100k tags and no fixed
+  timeout. `ctags_output.json` is still written alongside, as a copy.
+- Git metadata comes from one streamed `git log --name-only` pass over the
+  history (not three git processes per file), stored with its HEAD in
+  `.shadow/cache/git_history.json` and extended with just the new commits
+  on the next run.
+- Symbols are also written to `graphs/symbols.db`, a SQLite table indexed by
+  name, file and scope (paths interned in a `files` table). `SymbolStore`
+  answers "methods of class X" or "where is Y defined" with an index lookup
+  instead of loading `symbols.json`, which big repos can skip with
+  `symbols_json=False`. `SymbolInfo`/`FileAnalysis` use `__slots__`.
 """
 
 import os
@@ -26,18 +45,24 @@ import ast
 import json
 import time
 import glob
+import hashlib
+import sqlite3
+import tempfile
 import subprocess
 import fnmatch
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass, field, asdict
 from typing import List, Dict, Optional, Any, Set
 
+from .ctags import iter_ctags_tags, stream_ctags, print_ctags_progress
+
 # ---------------------------------------------------------------------------
 # Data classes
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class SymbolInfo:
     name: str
     kind: str              # "class", "function", "method", "member", "module"
@@ -48,7 +73,7 @@ class SymbolInfo:
     signature: str = ""
     language: str = ""     # "python", "cpp", "h", etc.
 
-@dataclass
+@dataclass(slots=True)
 class FileAnalysis:
     rel_path: str
     language: str = ""
@@ -77,6 +102,7 @@ class RepoAnalysis:
     call_edges: List[tuple] = field(default_factory=list)     # (caller, callee)
     folder_stats: Dict[str, dict] = field(default_factory=dict)
     errors: List[str] = field(default_factory=list)
+    cache_stats: Dict[str, int] = field(default_factory=dict)  # reused / analyzed / removed files
 
 # ---------------------------------------------------------------------------
 # File discovery
@@ -189,10 +215,10 @@ def _py_func_sig(node):
 # C/C++ analysis via ctags (subprocess)
 # ---------------------------------------------------------------------------
 
-def run_ctags_json(repo_root, output_file, languages='C++,C', exclude=None):
-    """Run universal-ctags and produce JSON output. Returns True on success."""
+def _ctags_json_cmd(repo_root, output_file, languages='C++,C', exclude=None, files=None, list_file=None):
+    """universal-ctags JSON command line; output_file '-' writes to stdout. With `files`, they are listed in list_file (-L)."""
     cmd = [
-        'ctags', '-R',
+        'ctags', *([] if files is not None else ['-R']),
         f'--languages={languages}',
         '--output-format=json',
         '--fields=+cniKSE',
@@ -202,80 +228,137 @@ def run_ctags_json(repo_root, output_file, languages='C++,C', exclude=None):
     if exclude:
         for ex in exclude:
             cmd.append(f'--exclude={ex}')
-    cmd += ['-o', output_file, repo_root]
+    if files is not None:
+        Path(list_file).write_text(''.join(f + '\n' for f in files))
+        cmd += ['-L', list_file, '-o', output_file]
+    else:
+        cmd += ['-o', output_file, repo_root]
+    return cmd
+
+def run_ctags_json(repo_root, output_file, languages='C++,C', exclude=None, files=None):
+    """Run universal-ctags and produce JSON output. Returns True on success.
+
+    With `files` (absolute paths), only those files are tagged (passed via -L), not the whole tree.
+    """
+    cmd = _ctags_json_cmd(repo_root, output_file, languages, exclude, files, output_file + '.files')
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
         return result.returncode == 0
     except Exception as e:
         print(f"[ctags] Error: {e}")
         return False
 
+def stream_ctags_json(repo_root, languages='C++,C', exclude=None, files=None, output_file=None, verbose=False):
+    """Run universal-ctags into a pipe and build {rel_path: FileAnalysis}, [SymbolInfo] while it runs.
+
+    output_file: optional copy of the raw JSON; the -L list of `files` goes to output_file + '.files' (else a temp file).
+    Raises OSError when ctags is missing and RuntimeError when it fails.
+    """
+    list_file = output_file + '.files' if output_file else None
+    if files is not None and list_file is None:
+        fd, list_file = tempfile.mkstemp(suffix='.files')
+        os.close(fd)
+    try:
+        cmd = _ctags_json_cmd(repo_root, '-', languages, exclude, files, list_file)
+        return parse_ctags_json(stream_ctags(cmd, tee=output_file, progress=print_ctags_progress if verbose else None), repo_root)
+    finally:
+        if list_file and not output_file: os.remove(list_file)
+
 def parse_ctags_json(json_file, repo_root):
-    """Parse ctags JSON and return dict of {rel_path: FileAnalysis} and list of SymbolInfo."""
+    """Parse ctags JSON and return dict of {rel_path: FileAnalysis} and list of SymbolInfo.
+
+    json_file: path of a ctags JSON file, or an iterable of decoded tags (e.g. ctags.stream_ctags()).
+    """
     files = {}
     symbols = []
-    if not os.path.exists(json_file):
-        return files, symbols
-    with open(json_file, 'r') as f:
-        for line in f:
-            if not line.startswith('{"_type": "tag"'):
-                continue
+    if isinstance(json_file, str):
+        if not os.path.exists(json_file):
+            return files, symbols
+        json_file = iter_ctags_tags(json_file)
+    for entry in json_file:
+        name = entry.get('name', '')
+        if '__anon' in name:
+            continue
+        kind = entry.get('kind', '')
+        path = entry.get('path', '')
+        rel = os.path.relpath(path, repo_root) if os.path.isabs(path) else path
+        il = entry.get('line', 0)
+        scope = entry.get('scope', '')
+        sig = entry.get('signature', '')
+        ext = os.path.splitext(rel)[1].lower()
+        lang = LANG_MAP.get(ext, 'cpp')
+
+        if rel not in files:
+            fa = FileAnalysis(rel_path=rel, language=lang)
             try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            name = entry.get('name', '')
-            if '__anon' in name:
-                continue
-            kind = entry.get('kind', '')
-            path = entry.get('path', '')
-            rel = os.path.relpath(path, repo_root) if os.path.isabs(path) else path
-            il = entry.get('line', 0)
-            scope = entry.get('scope', '')
-            sig = entry.get('signature', '')
-            ext = os.path.splitext(rel)[1].lower()
-            lang = LANG_MAP.get(ext, 'cpp')
-
-            if rel not in files:
-                fa = FileAnalysis(rel_path=rel, language=lang)
-                try:
-                    fa.size_bytes = os.path.getsize(path)
-                    fa.line_count = sum(1 for _ in open(path, errors='replace'))
-                except:
-                    pass
-                files[rel] = fa
-
-            si = SymbolInfo(name=name, kind=kind, file_path=rel, line=il, scope=scope, signature=sig, language=lang)
-            symbols.append(si)
-
-            if kind in ('class', 'struct'):
-                files[rel].classes.append(name)
-            elif kind == 'function':
-                qname = f"{scope}::{name}" if scope else name
-                files[rel].functions.append(qname)
+                fa.size_bytes = os.path.getsize(path)
+                fa.line_count = sum(1 for _ in open(path, errors='replace'))
+            except:
+                pass
+            files[rel] = fa
 
+        si = SymbolInfo(name=name, kind=kind, file_path=rel, line=il, scope=scope, signature=sig, language=lang)
+        symbols.append(si)
+
+        if kind in ('class', 'struct'):
+            files[rel].classes.append(name)
+        elif kind == 'function':
+            qname = f"{scope}::{name}" if scope else name
+            files[rel].functions.append(qname)
+
+    counts = {}
+    for s in symbols:
+        counts[s.file_path] = counts.get(s.file_path, 0) + 1
     for rel, fa in files.items():
-        fa.symbols_count = sum(1 for s in symbols if s.file_path == rel)
+        fa.symbols_count = counts.get(rel, 0)
     return files, symbols
 
 # ---------------------------------------------------------------------------
 # Skeleton generation (pure text, no LLM)
 # ---------------------------------------------------------------------------
 
+class SymbolIndex:
+    """Symbols grouped once by file, then by kind and (for methods/members) by scope.
+
+    Built in one pass over the symbol list, so emitting all skeletons is linear in the
+    number of symbols instead of files x symbols. Order within each group is the order
+    of the input list.
+    """
+
+    def __init__(self, symbols):
+        self.by_file = {}
+        for s in symbols:
+            entry = self.by_file.get(s.file_path)
+            if entry is None:
+                entry = self.by_file[s.file_path] = {'classes': [], 'functions': [], 'methods': {}, 'members': {}}
+            if s.kind in ('class', 'struct'):
+                entry['classes'].append(s)
+            elif s.kind == 'function':
+                entry['functions'].append(s)
+            elif s.kind in ('method', 'member'):
+                entry[s.kind + 's'].setdefault(s.scope, []).append(s)
+
+    _EMPTY = {'classes': [], 'functions': [], 'methods': {}, 'members': {}}
+
+    def file(self, rel_path):
+        """{'classes', 'functions': [SymbolInfo], 'methods', 'members': {scope: [SymbolInfo]}} of one file."""
+        return self.by_file.get(rel_path, self._EMPTY)
+
 def generate_skeleton(fa, symbols_list):
-    """Generate a concise text skeleton for a file."""
+    """Generate a concise text skeleton for a file.
+
+    symbols_list: a SymbolIndex (build it once for many files) or a plain list of SymbolInfo.
+    """
     lines = [f"# {fa.rel_path}", f"Language: {fa.language} | Lines: {fa.line_count} | Symbols: {fa.symbols_count}", ""]
-    file_syms = [s for s in symbols_list if s.file_path == fa.rel_path]
-    classes = [s for s in file_syms if s.kind in ('class', 'struct')]
-    funcs = [s for s in file_syms if s.kind == 'function']
-    methods = [s for s in file_syms if s.kind == 'method']
-    members = [s for s in file_syms if s.kind == 'member']
+    index = symbols_list if isinstance(symbols_list, SymbolIndex) else SymbolIndex(s for s in symbols_list if s.file_path == fa.rel_path)
+    file_syms = index.file(fa.rel_path)
+    classes, funcs = file_syms['classes'], file_syms['functions']
     if classes:
         lines.append("## Classes")
         for c in classes:
             lines.append(f"- **{c.name}** (line {c.line})")
-            cls_methods = [m for m in methods if m.scope == c.name]
-            cls_members = [m for m in members if m.scope == c.name]
+            cls_methods = file_syms['methods'].get(c.name, ())
+            cls_members = file_syms['members'].get(c.name, ())
             for m in cls_members:
                 lines.append(f"  - `{m.name}` (member, line {m.line})")
             for m in cls_methods:
@@ -312,6 +395,79 @@ def git_file_stats(repo_root, rel_path):
         pass
     return stats
 
+GIT_HISTORY_VERSION = 1
+
+def _git(repo_root, *args):
+    r = subprocess.run(['git', *args], capture_output=True, text=True, cwd=repo_root, timeout=30)
+    return r.stdout.strip() if r.returncode == 0 else ""
+
+def _iter_git_log(repo_root, rev_range):
+    """Stream `git log --name-only` of rev_range, newest first: yields (date, [rel paths]) per commit.
+
+    Paths are relative to repo_root (which may be a subdirectory of the work tree); -z keeps
+    names with spaces or non-ASCII characters unquoted.
+    """
+    proc = subprocess.Popen(['git', '-c', 'core.quotePath=false', 'log', '-z', '--no-merges', '--name-only', '--relative',
+                             '--format=%x01%cd', '--date=short', rev_range, '--', '.'],
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, cwd=repo_root)
+    date, paths, tail = None, [], b''
+    for chunk in iter(lambda: proc.stdout.read(1 << 20), b''):
+        tokens = (tail + chunk).split(b'\0')
+        tail = tokens.pop()
+        for tok in tokens:
+            if tok.startswith(b'\x01'):
+                if date is not None: yield date, paths
+                date, paths = tok[1:].decode(), []
+            elif tok.strip(b'\n'):
+                paths.append(tok.lstrip(b'\n').decode('utf-8', errors='replace'))
+    if date is not None: yield date, paths
+    proc.wait()
+
+def git_history_stats(repo_root, cache_path=None, verbose=False):
+    """{rel_path: {"last", "first", "count"}} of every file in the history, from one `git log` pass.
+
+    With cache_path the maps are stored with the HEAD they describe; a later call only reads the
+    commits since that HEAD (a full pass if it is no longer an ancestor, e.g. after a rebase).
+    Unlike git_file_stats, merge commits are not counted and "first" is the oldest commit
+    touching the path rather than its latest addition.
+    """
+    head = _git(repo_root, 'rev-parse', 'HEAD')
+    if not head: return {}
+    cached = {}
+    if cache_path and os.path.exists(cache_path):
+        try:
+            cached = json.loads(Path(cache_path).read_text())
+        except (OSError, ValueError):
+            cached = {}
+    old_head = cached.get('head') if cached.get('version') == GIT_HISTORY_VERSION else None
+    if old_head == head: return cached['files']
+    if old_head and subprocess.run(['git', 'merge-base', '--is-ancestor', old_head, head],
+                                   capture_output=True, cwd=repo_root).returncode == 0:
+        stats, rev_range = cached['files'], f"{old_head}..{head}"
+    else:
+        stats, rev_range = {}, head
+    n_commits = 0
+    touched, created = set(), set()            # commits arrive newest first
+    for date, paths in _iter_git_log(repo_root, rev_range):
+        n_commits += 1
+        for rel in paths:
+            st = stats.get(rel)
+            if st is None:
+                stats[rel] = {"last": date, "first": date, "count": 1}
+                created.add(rel)
+            else:
+                if rel not in touched: st["last"] = date
+                if rel in created: st["first"] = date
+                st["count"] += 1
+            touched.add(rel)
+    if verbose: print(f"  git log: {n_commits} commits ({'incremental' if rev_range != head else 'full'})")
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = cache_path + '.tmp'
+        Path(tmp).write_text(json.dumps({'version': GIT_HISTORY_VERSION, 'head': head, 'files': stats}, separators=(',', ':')))
+        os.replace(tmp, cache_path)
+    return stats
+
 # ---------------------------------------------------------------------------
 # LLM summarization (OpenAI-compatible API)
 # ---------------------------------------------------------------------------
@@ -498,6 +654,197 @@ def generate_report(analysis):
 
     return "\n".join(lines)
 
+# ---------------------------------------------------------------------------
+# Symbol store (SQLite, indexed lookups without loading every symbol)
+# ---------------------------------------------------------------------------
+
+SYMBOL_STORE_SCHEMA = """
+CREATE TABLE files   (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE);
+CREATE TABLE symbols (key TEXT NOT NULL, name TEXT NOT NULL, kind TEXT NOT NULL, file_id INTEGER NOT NULL,
+                      line INTEGER, end_line INTEGER, scope TEXT, signature TEXT, language TEXT);
+"""
+SYMBOL_STORE_INDEXES = """
+CREATE INDEX symbols_name  ON symbols(name, kind);
+CREATE INDEX symbols_file  ON symbols(file_id);
+CREATE INDEX symbols_scope ON symbols(scope, kind);
+"""
+_SYMBOL_COLUMNS = "s.name, s.kind, f.path, s.line, s.end_line, s.scope, s.signature, s.language"
+
+class SymbolStore:
+    """Read-only view of a symbols.db written by SymbolStore.write(); lookups return SymbolInfo in write order."""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(f"file:{Path(path).resolve()}?mode=ro", uri=True)
+
+    @staticmethod
+    def write(path, symbols):
+        """Replace the store at `path` with {key: SymbolInfo} (built in a temp file, swapped in with os.replace)."""
+        tmp = f"{path}.tmp"
+        if os.path.exists(tmp): os.remove(tmp)
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.executescript(SYMBOL_STORE_SCHEMA)
+            file_ids = {}
+            def rows():
+                for key, s in symbols.items():
+                    fid = file_ids.get(s.file_path)
+                    if fid is None:
+                        fid = file_ids[s.file_path] = len(file_ids) + 1
+                    yield key, s.name, s.kind, fid, s.line, s.end_line, s.scope, s.signature, s.language
+            with conn:
+                conn.executemany("INSERT INTO symbols VALUES (?,?,?,?,?,?,?,?,?)", rows())
+                conn.executemany("INSERT INTO files VALUES (?,?)", ((fid, p) for p, fid in file_ids.items()))
+                conn.executescript(SYMBOL_STORE_INDEXES)
+        finally:
+            conn.close()
+        os.replace(tmp, path)
+        return len(symbols)
+
+    def _query(self, where="", params=()):
+        sql = f"SELECT {_SYMBOL_COLUMNS} FROM symbols s JOIN files f ON f.id = s.file_id {where} ORDER BY s.rowid"
+        return [SymbolInfo(*row) for row in self.conn.execute(sql, params)]
+
+    def find(self, name, kind=None):
+        """Definitions of a symbol name (optionally of one kind)."""
+        if kind: return self._query("WHERE s.name = ? AND s.kind = ?", (name, kind))
+        return self._query("WHERE s.name = ?", (name,))
+
+    def members(self, scope, kind=None):
+        """Symbols whose scope is `scope`, e.g. members("Foo", "method") -> the methods of class Foo."""
+        if kind: return self._query("WHERE s.scope = ? AND s.kind = ?", (scope, kind))
+        return self._query("WHERE s.scope = ?", (scope,))
+
+    def in_file(self, rel_path):
+        """All symbols of one file."""
+        return self._query("WHERE f.path = ?", (rel_path,))
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM symbols").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ---------------------------------------------------------------------------
+# Incremental analysis cache
+# ---------------------------------------------------------------------------
+
+CACHE_VERSION = 1
+CTAGS_LANGS = {'cpp', 'cpp_header', 'c'}
+_UNCACHED_FIELDS = ('summary', 'summary_ok', 'git_last_touched', 'git_commits', 'git_first_date')
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+class AnalysisCache:
+    """Per-file FileAnalysis + SymbolInfo, keyed by content hash, persisted as one JSON file.
+
+    Entries: rel_path -> {sha256, mtime_ns, size, analyzer, fa, symbols}. `analyzer` is how the
+    file was analyzed ("python", "ctags", "plain"); an entry made by another analyzer is a miss.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._pending = {}     # rel -> (sha256, mtime_ns, size) hashed during lookup()
+        if path and os.path.exists(path):
+            try:
+                data = json.loads(Path(path).read_text())
+                if data.get('version') == CACHE_VERSION:
+                    self.entries = data.get('files', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def lookup(self, rel, abs_path, analyzer):
+        """(FileAnalysis, [SymbolInfo]) if the cached analysis is still valid for the file, else None."""
+        if not self.path: return None
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            return None
+        entry = self.entries.get(rel)
+        if entry and entry['analyzer'] == analyzer and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            return self._load(entry)
+        sha = _sha256_file(abs_path)
+        self._pending[rel] = (sha, st.st_mtime_ns, st.st_size)
+        if entry and entry['analyzer'] == analyzer and entry['sha256'] == sha:     # touched, not changed
+            entry['mtime_ns'], entry['size'] = st.st_mtime_ns, st.st_size
+            return self._load(entry)
+        return None
+
+    @staticmethod
+    def _load(entry):
+        return FileAnalysis(**entry['fa']), [SymbolInfo(**s) for s in entry['symbols']]
+
+    def put(self, rel, abs_path, analyzer, fa, symbols):
+        if not self.path: return
+        sha, mtime_ns, size = self._pending.pop(rel, None) or (None, None, None)
+        if sha is None:
+            st = os.stat(abs_path)
+            sha, mtime_ns, size = _sha256_file(abs_path), st.st_mtime_ns, st.st_size
+        fa_dict = asdict(fa)
+        for name in _UNCACHED_FIELDS: fa_dict.pop(name, None)
+        self.entries[rel] = {'sha256': sha, 'mtime_ns': mtime_ns, 'size': size, 'analyzer': analyzer,
+                             'fa': fa_dict, 'symbols': [asdict(s) for s in symbols]}
+
+    def set_skeleton(self, rel, skeleton):
+        if rel in self.entries: self.entries[rel]['fa']['skeleton'] = skeleton
+
+    def prune(self, keep):
+        """Drop entries of files no longer discovered; returns their rel paths."""
+        gone = [rel for rel in self.entries if rel not in keep]
+        for rel in gone: del self.entries[rel]
+        return gone
+
+    def save(self):
+        if not self.path: return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + '.tmp'
+        Path(tmp).write_text(json.dumps({'version': CACHE_VERSION, 'files': self.entries}, separators=(',', ':')))
+        os.replace(tmp, self.path)
+
+def _plain_file_analysis(abs_path, rel, lang):
+    """FileAnalysis with size and line count only (languages without a structural analyzer)."""
+    fa = FileAnalysis(rel_path=rel, language=lang)
+    try:
+        fa.size_bytes = os.path.getsize(abs_path)
+        with open(abs_path, errors='replace') as f:
+            fa.line_count = sum(1 for _ in f)
+    except OSError:
+        pass
+    return fa
+
+def _analyze_python_job(args):
+    return analyze_python_file(*args)
+
+def analyze_python_files(items, jobs=None, min_parallel=32):
+    """analyze_python_file over [(abs_path, rel_path)]; a process pool when there are enough files."""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(items) < min_parallel:
+        return [analyze_python_file(a, r) for a, r in items]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_analyze_python_job, items, chunksize=max(1, len(items) // (jobs * 8))))
+
+def _write_if_changed(path, text):
+    """Write text unless the file already holds exactly it; returns True when written."""
+    try:
+        if Path(path).read_text() == text: return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    Path(path).write_text(text)
+    return True
+
 # ---------------------------------------------------------------------------
 # Main orchestrator
 # ---------------------------------------------------------------------------
@@ -517,14 +864,24 @@ def run_repo_mapper(
     deepseek_key="",
     max_llm_files=10,
     verbose=True,
+    use_cache=True,
+    cache_path=None,
+    jobs=None,
+    symbols_json=True,
 ):
-    """Run the full repo mapping pipeline. Returns RepoAnalysis."""
+    """Run the full repo mapping pipeline. Returns RepoAnalysis.
+
+    use_cache: reuse the static analysis of unchanged files from `cache_path`
+    (default <repo>/.shadow/cache/analysis.json); `jobs` worker processes parse changed Python files.
+    symbols_json: also write graphs/symbols.json next to the graphs/symbols.db SymbolStore.
+    """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     if shadow_dir is None:
-        shadow_dir = os.path.join(repo_root, ".shadow", timestamp)
+        shadow_dir = os.path.join(repo_root, ".shadow", "latest" if use_cache else timestamp)
     os.makedirs(shadow_dir, exist_ok=True)
 
     analysis = RepoAnalysis(repo_root=repo_root, shadow_dir=shadow_dir, timestamp=timestamp)
+    cache = AnalysisCache((cache_path or os.path.join(repo_root, ".shadow", "cache", "analysis.json")) if use_cache else None)
 
     if verbose: print(f"\n{'='*70}\n[RepoMapper] repo={repo_root} shadow={shadow_dir}\n{'='*70}")
 
@@ -533,74 +890,101 @@ def run_repo_mapper(
     file_list = discover_files(repo_root, extensions=extensions, ignores=ignores, max_files=max_files)
     if verbose: print(f"  Found {len(file_list)} files")
 
+    # Cached analyses of unchanged files; the rest is grouped by analyzer
+    def analyzer_of(lang):
+        if lang == 'python': return 'python'
+        return 'ctags' if use_ctags and lang in CTAGS_LANGS else 'plain'
+    abs_of = {rel: absp for rel, absp, _ in file_list}
+    fresh = set()                          # rel paths analyzed in this run
+    todo = {'python': [], 'ctags': [], 'plain': []}
+    def add_result(rel, fa, syms, analyzer, cached=False, store=True):
+        analysis.files[rel] = fa
+        for s in syms:
+            key = f"{rel}::{s.name}" if analyzer == 'python' else f"{s.file_path}::{s.scope}::{s.name}"
+            analysis.symbols[key] = s
+        if not cached:
+            fresh.add(rel)
+            if store: cache.put(rel, abs_of[rel], analyzer, fa, syms)
+    for rel, absp, lang in file_list:
+        hit = cache.lookup(rel, absp, analyzer_of(lang))
+        if hit is None:
+            todo[analyzer_of(lang)].append((rel, absp, lang))
+        else:
+            add_result(rel, *hit, analyzer_of(lang), cached=True)
+    n_reused = len(analysis.files)
+
     # --- Stage 2: Python AST analysis ---
     if verbose: print("\n[Stage 2] Python AST analysis...")
-    py_count = 0
-    for rel, absp, lang in file_list:
-        if lang == 'python':
-            fa, syms = analyze_python_file(absp, rel)
-            analysis.files[rel] = fa
-            for s in syms:
-                analysis.symbols[f"{rel}::{s.name}"] = s
-            py_count += 1
-    if verbose: print(f"  Analyzed {py_count} Python files")
+    py_items = todo['python']
+    for (rel, _, _), (fa, syms) in zip(py_items, analyze_python_files([(absp, rel) for rel, absp, _ in py_items], jobs=jobs)):
+        add_result(rel, fa, syms, 'python')
+    if verbose: print(f"  Analyzed {len(py_items)} Python files")
 
     # --- Stage 3: Ctags for C/C++ ---
-    ctags_ok = False
     if use_ctags:
         if verbose: print("\n[Stage 3] Running ctags...")
-        ctags_file = os.path.join(shadow_dir, "ctags_output.json")
-        ctags_ok = run_ctags_json(repo_root, ctags_file, languages='C++,C', exclude=['Build-*', 'build', '__pycache__', '.git'])
-        if ctags_ok:
-            cpp_files, cpp_syms = parse_ctags_json(ctags_file, repo_root)
-            for rel, fa in cpp_files.items():
-                if rel not in analysis.files:
-                    analysis.files[rel] = fa
-                else:
-                    # merge ctags data into existing
-                    existing = analysis.files[rel]
-                    existing.classes.extend(fa.classes)
-                    existing.functions.extend(fa.functions)
-                    existing.symbols_count += fa.symbols_count
+        c_items = todo['ctags']
+        if c_items:
+            ctags_file = os.path.join(shadow_dir, "ctags_output.json")
+            try:
+                cpp_files, cpp_syms = stream_ctags_json(repo_root, languages='C++,C', exclude=['Build-*', 'build', '__pycache__', '.git'],
+                                                        files=[absp for _, absp, _ in c_items], output_file=ctags_file, verbose=verbose)
+                ctags_ok = True
+            except (OSError, RuntimeError) as e:
+                if verbose: print(f"  [ctags] {e}")
+                cpp_files, cpp_syms, ctags_ok = {}, [], False
+            syms_by_file = {}
             for s in cpp_syms:
-                analysis.symbols[f"{s.file_path}::{s.scope}::{s.name}"] = s
-            if verbose: print(f"  ctags found {len(cpp_files)} C/C++ files, {len(cpp_syms)} symbols")
-        else:
-            analysis.errors.append("ctags failed or not installed")
-            if verbose: print("  [WARN] ctags failed")
+                syms_by_file.setdefault(s.file_path, []).append(s)
+            for rel, absp, lang in c_items:
+                fa = cpp_files.get(rel) or _plain_file_analysis(absp, rel, lang)
+                add_result(rel, fa, syms_by_file.get(rel, []), 'ctags', store=ctags_ok)
+            if ctags_ok:
+                if verbose: print(f"  ctags found {len(cpp_files)} C/C++ files, {len(cpp_syms)} symbols")
+            else:
+                analysis.errors.append("ctags failed or not installed")
+                if verbose: print("  [WARN] ctags failed")
+        elif verbose: print("  no changed C/C++ files")
     else:
         if verbose: print("\n[Stage 3] ctags SKIPPED")
 
     # Also add non-python, non-ctags files to analysis (e.g. .js, .jl, .md)
-    for rel, absp, lang in file_list:
-        if rel not in analysis.files:
-            fa = FileAnalysis(rel_path=rel, language=lang)
-            try:
-                fa.size_bytes = os.path.getsize(absp)
-                fa.line_count = sum(1 for _ in open(absp, errors='replace'))
-            except:
-                pass
-            analysis.files[rel] = fa
+    for rel, absp, lang in todo['plain']:
+        add_result(rel, _plain_file_analysis(absp, rel, lang), [], 'plain')
+    analysis.files = {rel: analysis.files[rel] for rel, _, _ in file_list}    # discovery order
 
     # --- Stage 4: Skeletons ---
     if verbose: print("\n[Stage 4] Generating skeletons...")
     skel_dir = os.path.join(shadow_dir, "skeletons")
     os.makedirs(skel_dir, exist_ok=True)
-    all_syms = list(analysis.symbols.values())
+    removed = cache.prune(set(abs_of)) if use_cache else []
+    for rel in removed:
+        try: os.remove(os.path.join(skel_dir, rel + ".skeleton.md"))
+        except OSError: pass
+    sym_index = SymbolIndex(analysis.symbols.values())
+    written = 0
     for rel, fa in analysis.files.items():
-        skeleton = generate_skeleton(fa, all_syms)
-        fa.skeleton = skeleton
         skel_path = os.path.join(skel_dir, rel + ".skeleton.md")
-        os.makedirs(os.path.dirname(skel_path), exist_ok=True)
-        Path(skel_path).write_text(skeleton)
-    if verbose: print(f"  Generated {len(analysis.files)} skeletons")
+        if rel not in fresh and fa.skeleton and os.path.exists(skel_path):
+            continue
+        skeleton = generate_skeleton(fa, sym_index)
+        fa.skeleton = skeleton
+        if use_cache: cache.set_skeleton(rel, skeleton)
+        _write_if_changed(skel_path, skeleton)
+        written += 1
+    if use_cache: cache.save()
+    analysis.cache_stats = {"reused": n_reused, "analyzed": len(fresh), "removed": len(removed), "skeletons_written": written}
+    if verbose: print(f"  Generated {written} skeletons ({len(analysis.files) - written} unchanged)")
 
     # --- Stage 5: Git metadata ---
     if use_git:
         if verbose: print("\n[Stage 5] Extracting git metadata...")
+        history = git_history_stats(repo_root, os.path.join(os.path.dirname(cache.path), "git_history.json") if use_cache else None,
+                                    verbose=verbose)
         git_count = 0
         for rel, fa in analysis.files.items():
-            stats = git_file_stats(repo_root, rel)
+            stats = history.get(rel)
+            if stats is None: continue
             fa.git_last_touched = stats["last"]
             fa.git_first_date = stats["first"]
             fa.git_commits = stats["count"]
@@ -674,23 +1058,23 @@ def run_repo_mapper(
     csv_text = tech_matrix_to_csv(matrix)
     rollup_dir = os.path.join(shadow_dir, "rollups")
     os.makedirs(rollup_dir, exist_ok=True)
-    Path(os.path.join(rollup_dir, "tech_matrix.csv")).write_text(csv_text)
+    _write_if_changed(os.path.join(rollup_dir, "tech_matrix.csv"), csv_text)
 
     # Concept map
     cmap = generate_concept_map(analysis)
-    Path(os.path.join(rollup_dir, "concept_map.md")).write_text(cmap)
+    _write_if_changed(os.path.join(rollup_dir, "concept_map.md"), cmap)
 
     # Import edges TSV
     graph_dir = os.path.join(shadow_dir, "graphs")
     os.makedirs(graph_dir, exist_ok=True)
-    with open(os.path.join(graph_dir, "import_edges.tsv"), 'w') as f:
-        f.write("from_file\tto_module\n")
-        for src, dst in analysis.import_edges:
-            f.write(f"{src}\t{dst}\n")
+    _write_if_changed(os.path.join(graph_dir, "import_edges.tsv"),
+                      "from_file\tto_module\n" + "".join(f"{src}\t{dst}\n" for src, dst in analysis.import_edges))
 
-    # Symbols JSON
-    syms_json = {k: asdict(v) for k, v in analysis.symbols.items()}
-    Path(os.path.join(graph_dir, "symbols.json")).write_text(json.dumps(syms_json, indent=1, default=str))
+    # Symbols: indexed SQLite store, plus the JSON dump
+    SymbolStore.write(os.path.join(graph_dir, "symbols.db"), analysis.symbols)
+    if symbols_json:
+        syms_json = {k: asdict(v) for k, v in analysis.symbols.items()}
+        _write_if_changed(os.path.join(graph_dir, "symbols.json"), json.dumps(syms_json, indent=1, default=str))
 
     if verbose: print(f"  Folders: {len(analysis.folder_stats)}, Import edges: {len(analysis.import_edges)}")
 
@@ -707,6 +1091,7 @@ def run_repo_mapper(
         "file_count": len(analysis.files),
         "symbol_count": len(analysis.symbols),
         "import_edge_count": len(analysis.import_edges),
+        "cache_stats": analysis.cache_stats,
         "folder_stats": analysis.folder_stats,
         "errors": analysis.errors,
         "files": {rel: {"language": fa.language, "lines": fa.line_count, "symbols": fa.symbols_count,
@@ -13,10 +13,15 @@ Non-obvious things:
 - This is a best-effort parser — it will miss template specializations,
   operator overloads, and macro-generated functions. Use tree-sitter for
   accuracy, use this for speed.
+- `BraceMap` finds function-body ranges: one regex pass over the file that
+  skips `//` and `/* */` comments, string and char literals and raw strings
+  (`R"delim(...)delim"`), then matches the remaining braces with a stack.
+  A `'` after a digit or letter is a digit separator (`1'000`), not a char literal.
 """
 
 import re
 import sys
+from bisect import bisect_left
 
 # Pre-compile patterns as before
 COMMENT_PATTERN     = re.compile(r'//.*?$|/\*.*?\*/', re.MULTILINE | re.DOTALL)
@@ -45,6 +50,47 @@ CPP_KEYWORDS = {
     'break', 'continue', 'do', 'sizeof', 'typedef'
 }
 
+# One token per match: comments and literals are consumed whole so braces inside them are never seen
+CODE_TOKEN_PATTERN = re.compile(r'''
+      (?<![\w])(?:u8|[uUL])?R"(?P<delim>[^()\\\s"]{0,16})\(.*?\)(?P=delim)"   # raw string
+    | //[^\n]*                                              # line comment
+    | /\*.*?(?:\*/|\Z)                                      # block comment (may be unterminated)
+    | "(?:\\.|[^"\\\n])*"?                                   # string literal, ends at the line end if unterminated
+    | (?<![\w'])(?:u8|[uUL])?'(?:\\.|[^'\\\n])*'?          # char literal, not a digit separator
+    | [{}]
+''', re.VERBOSE | re.DOTALL)
+
+class BraceMap:
+    """Matched code braces of a C/C++ source, found in one linear scan.
+
+    open_lines[i] is the 0-based line of the i-th opening brace (ascending) and close_lines[i]
+    the line of its matching closing brace (None if unmatched), so the body that starts at or
+    after any line is found by bisection.
+    """
+
+    def __init__(self, text):
+        if isinstance(text, (list, tuple)): text = '\n'.join(text)
+        line_starts = [0] + [m.end() for m in re.finditer('\n', text)]
+        self.n_lines = len(line_starts)
+        self.open_lines, self.close_lines, stack = [], [], []
+        for m in CODE_TOKEN_PATTERN.finditer(text):
+            c = m.group()
+            if c == '{':
+                stack.append(len(self.open_lines))
+                self.open_lines.append(bisect_left(line_starts, m.start() + 1) - 1)
+                self.close_lines.append(None)
+            elif c == '}' and stack:
+                self.close_lines[stack.pop()] = bisect_left(line_starts, m.start() + 1) - 1
+
+    def scope_end(self, start_line):
+        """0-based line of the brace closing the first scope opened at or after start_line, or None."""
+        i = bisect_left(self.open_lines, start_line)
+        return self.close_lines[i] if i < len(self.open_lines) else None
+
+    def scope_ends(self, start_lines):
+        """scope_end() of many start lines."""
+        return [self.scope_end(s) for s in start_lines]
+
 def is_not_function(return_type, name):
     return (  return_type.strip() in CPP_KEYWORDS 
            or name       .strip() in CPP_KEYWORDS)
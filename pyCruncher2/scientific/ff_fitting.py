@@ -0,0 +1,187 @@
+"""
+Batched force-field parameter fitting on top of getVarDerivsLJQ / getVarDerivsMorseQ.
+
+A training set is a list of geometries (fragment 1 + fragment 2 + reference
+interaction energy). `FittingSet` packs all of them into contiguous arrays
+once, so one call evaluates model energies and the full Jacobian
+dE/dparam for the whole dataset — either compiled (`cpp/ForceFields_lib.cpp`,
+OpenMP over systems) or vectorized NumPy (`forcefields.py`). `fit()` drives
+a least-squares optimizer with those calls, so a fit costs arithmetic, not
+Python loops over geometries.
+
+Non-obvious things:
+- Parameters live in a per-type table `tpars[ntype,npar]` in the C++ packed
+  order (LJQ: R0,E0,qq; MorseQ: R0,E0,qq,k); atomic parameters are mixed
+  per pair by `mix_LJQ()` / `mix_varMorseQ()`.
+- `sys[nsys,4] = (i0_frag1, na1, i0_frag2, na2)` indexes the shared `apos`
+  and `atypes` arrays, i.e. a CSR-like layout without per-system objects.
+- With `bBoth=False` only fragment-1 atoms are differentiated (fragment 2
+  is a fixed environment, as in the original `getVarDerivs()`); a type that
+  appears only in fragment 2 then has zero gradient.
+- `mask[ntype,npar]` selects free parameters; the rest stay at `tpars0`.
+"""
+
+import time
+import numpy as np
+
+from . import forcefields as ff
+
+MIXING = {
+    'LJQ':    (ff.mix_LJQ,       ff.dmix_LJQ,       ff._varLJQ   ),
+    'MorseQ': (ff.mix_varMorseQ, ff.dmix_varMorseQ, ff._varMorseQ),
+}
+
+class FittingSet:
+    """
+    Training geometries packed into contiguous arrays.
+
+    Attributes:
+        sys     (int32[nsys,4]):  first atom and atom count of fragment 1 and fragment 2
+        apos    (float64[na,3]):  all atom positions
+        atypes  (int32[na]):      atom type index into the parameter table
+        Eref    (float64[nsys]):  reference interaction energies
+        weights (float64[nsys]):  residual weights
+    """
+
+    def __init__(self, sys, apos, atypes, Eref, weights=None, type_names=None):
+        self.sys     = np.ascontiguousarray(sys,    dtype=np.int32).reshape(-1, 4)
+        self.apos    = np.ascontiguousarray(apos,   dtype=np.float64).reshape(-1, 3)
+        self.atypes  = np.ascontiguousarray(atypes, dtype=np.int32)
+        self.Eref    = np.ascontiguousarray(Eref,   dtype=np.float64)
+        self.weights = np.ones(len(self.sys)) if weights is None else np.ascontiguousarray(weights, dtype=np.float64)
+        self.type_names = type_names
+        self.ntype   = int(self.atypes.max()) + 1 if len(self.atypes) else 0
+        self._pairs  = None
+
+    @classmethod
+    def from_systems(cls, systems, weights=None, type_names=None):
+        """Pack an iterable of (apos1[na1,3], types1[na1], apos2[na2,3], types2[na2], Eref)."""
+        sys = []; apos = []; atypes = []; Eref = []
+        na = 0
+        for apos1, types1, apos2, types2, E in systems:
+            n1 = len(apos1); n2 = len(apos2)
+            sys.append((na, n1, na + n1, n2))
+            apos  .append(np.asarray(apos1, dtype=np.float64).reshape(n1, 3)); apos  .append(np.asarray(apos2, dtype=np.float64).reshape(n2, 3))
+            atypes.append(np.asarray(types1, dtype=np.int32));                 atypes.append(np.asarray(types2, dtype=np.int32))
+            Eref.append(E)
+            na += n1 + n2
+        return cls(np.array(sys, dtype=np.int32), np.concatenate(apos), np.concatenate(atypes), np.array(Eref), weights=weights, type_names=type_names)
+
+    def __len__(self):
+        return len(self.sys)
+
+    def pairs(self):
+        """Flat (ia, ja, isys) index arrays of all fragment1 x fragment2 atom pairs (built once, cached)."""
+        if self._pairs is None:
+            i0, n1, j0, n2 = self.sys.T.astype(np.int64)
+            npair = n1 * n2
+            isys  = np.repeat(np.arange(len(self.sys)), npair)
+            k     = np.arange(npair.sum()) - np.repeat(np.cumsum(npair) - npair, npair)   # pair index within system
+            n2s   = n2[isys]
+            ia    = i0[isys] + k // n2s
+            ja    = j0[isys] + k %  n2s
+            self._pairs = (ia, ja, isys)
+        return self._pairs
+
+def eval_numpy(fs, name, tpars, bBoth=True, nchunk=1 << 20):
+    """Energies Es[nsys] and Jacobian J[nsys,ntype*npar] by vectorized NumPy, in chunks of `nchunk` pairs."""
+    mix, dmix, var = MIXING[name]
+    tpars = np.asarray(tpars, dtype=np.float64)
+    ntype, npar = tpars.shape
+    nsys = len(fs)
+    ia, ja, isys = fs.pairs()
+    Es = np.zeros(nsys)
+    J  = np.zeros(nsys * ntype * npar)
+    ks = np.arange(npar)
+    for i in range(0, len(ia), nchunk):
+        a = ia[i:i + nchunk]; b = ja[i:i + nchunk]; s = isys[i:i + nchunk]
+        ti = fs.atypes[a]; tj = fs.atypes[b]
+        d  = fs.apos[a] - fs.apos[b]
+        r  = np.sqrt(np.einsum('ij,ij->i', d, d))
+        pi = tpars[ti]; pj = tpars[tj]
+        E, dpij = var(r, mix(pi, pj))
+        Es += np.bincount(s, E, minlength=nsys)
+        idx = ((s * ntype + ti) * npar)[:, None] + ks
+        J  += np.bincount(idx.ravel(), dmix(pi, pj, dpij).ravel(), minlength=J.size)
+        if bBoth:
+            idx = ((s * ntype + tj) * npar)[:, None] + ks
+            J  += np.bincount(idx.ravel(), dmix(pj, pi, dpij).ravel(), minlength=J.size)
+    return Es, J.reshape(nsys, ntype * npar)
+
+def eval_cpp(fs, name, tpars, bBoth=True):
+    """Energies Es[nsys] and Jacobian J[nsys,ntype*npar] in one compiled call (OpenMP over systems)."""
+    from . import forcefields_lib as ffl
+    return ffl.getVarDerivsSystems(name, fs.sys, fs.apos, fs.atypes, tpars, bBoth=bBoth)
+
+EVALUATORS = {
+    'numpy': eval_numpy,
+    'cpp':   eval_cpp,
+}
+
+def fit(fs, name, tpars0, mask=None, backend='cpp', method='lm', bBoth=True, niter=100, tol=1e-10, lam0=1e-3, bPrint=False):
+    """
+    Least-squares fit of the type parameter table to the reference energies of `fs`.
+
+    Minimizes 0.5*sum( w*(E_model - Eref) )^2 over the parameters selected by `mask`.
+    `method='lm'` is a built-in Levenberg-Marquardt on the analytic Jacobian;
+    `method='scipy'` hands the same residual/Jacobian to scipy.optimize.least_squares.
+
+    Returns:
+        tpars (ndarray[ntype,npar]): fitted parameter table
+        info  (dict): cost, rmse, niter, nevals, time
+    """
+    evaluate = EVALUATORS[backend]
+    tpars0 = np.array(tpars0, dtype=np.float64)
+    if mask is None: mask = np.ones(tpars0.shape, dtype=bool)
+    mask  = np.asarray(mask, dtype=bool)
+    free  = np.flatnonzero(mask.ravel())
+    w     = fs.weights
+    cache = {}
+
+    def residuals_jacobian(x):
+        key = x.tobytes()
+        if key not in cache:
+            cache.clear()
+            tpars = tpars0.copy(); tpars.ravel()[free] = x
+            Es, J = evaluate(fs, name, tpars, bBoth=bBoth)
+            cache[key] = (w * (Es - fs.Eref), J[:, free] * w[:, None])
+            nevals[0] += 1
+        return cache[key]
+
+    nevals = [0]
+    x  = tpars0.ravel()[free].copy()
+    T0 = time.perf_counter()
+    if method == 'scipy':
+        from scipy.optimize import least_squares
+        res = least_squares(lambda x: residuals_jacobian(x)[0], x, jac=lambda x: residuals_jacobian(x)[1], method='lm', xtol=tol, ftol=tol, max_nfev=niter)
+        x = res.x; it = res.nfev
+    else:
+        x, it = _levenberg_marquardt(residuals_jacobian, x, niter=niter, tol=tol, lam=lam0, bPrint=bPrint)
+    r, _  = residuals_jacobian(x)
+    tpars = tpars0.copy(); tpars.ravel()[free] = x
+    info  = {'cost': 0.5 * float(r @ r), 'rmse': float(np.sqrt(np.mean(r * r))), 'niter': it, 'nevals': nevals[0], 'time': time.perf_counter() - T0}
+    if bPrint: print(f"ff_fitting.fit() {name} backend={backend} method={method} | cost {info['cost']:.6e} rmse {info['rmse']:.6e} niter {it} nevals {nevals[0]} time {info['time']:.3f} [s]")
+    return tpars, info
+
+def _levenberg_marquardt(residuals_jacobian, x, niter=100, tol=1e-10, lam=1e-3, bPrint=False):
+    r, J = residuals_jacobian(x)
+    cost = 0.5 * (r @ r)
+    it = 0
+    for it in range(1, niter + 1):
+        A = J.T @ J
+        g = J.T @ r
+        D = np.diag(A).copy(); D[D == 0] = 1.0
+        while True:
+            dx = np.linalg.solve(A + lam * np.diag(D), -g)
+            x_new = x + dx
+            r_new, J_new = residuals_jacobian(x_new)
+            cost_new = 0.5 * (r_new @ r_new)
+            if cost_new <= cost or lam > 1e16: break
+            lam *= 10.0
+        if bPrint: print(f"  LM iter {it:4d} cost {cost_new:.6e} lam {lam:.2e} |dx| {np.linalg.norm(dx):.3e}")
+        if cost_new > cost: break                                   # could not decrease the cost any more
+        converged = (cost - cost_new) <= tol * max(cost, 1e-300) or np.linalg.norm(dx) <= tol * (np.linalg.norm(x) + tol)
+        x, r, J, cost = x_new, r_new, J_new, cost_new
+        lam = max(lam * 0.3, 1e-12)
+        if converged: break
+    return x, it
@@ -0,0 +1,239 @@
+"""
+Vectorized NumPy reference implementations of the potentials in cpp/ForceFields.cpp.
+
+Every scalar C++ function has an array-at-a-time counterpart with the same
+name, so fitting and validation scripts can evaluate millions of distances
+without compiling anything. Positions are arrays of shape (...,3), distances
+and parameters broadcast against each other.
+
+Non-obvious things:
+- Formulas are transcribed from `ForceFields.cpp`, including its
+  conventions: `dE_r` is the true radial derivative dE/dr for every term, so
+  the `fpos` returned by `get*()` is `-dE_r/r * dpos = -grad E`, and the
+  `_var*()` output columns follow the C++ `dpar[]` slots (e.g. `_varLJ`
+  stores `[dE_E0, dE_R0]`). Change both sides together, the agreement test
+  `tests/test_forcefields_numpy.py` compares them directly and checks the
+  force against a finite-difference gradient of the energy.
+- `get*()`/`var*()` take unpacked parameters like the C++ inline functions;
+  `_get*()`/`_var*()`/`evaluate*()` take a packed `par[...,npar]` array.
+- `mix_*()`/`dmix_*()` return new arrays instead of writing into `pij`/`dpi`.
+"""
+
+import numpy as np
+
+COULOMB_CONST = 14.3996448915  # [eV A]
+
+# number of packed parameters per potential (the `npar` of the C++ drivers)
+NPAR = {
+    'Coulomb': 1,
+    'LJ':      2,
+    'LJQ':     3,
+    'Morse':   3,
+    'MorseQ':  4,
+}
+
+def _norm(dpos):
+    dpos = np.asarray(dpos, dtype=np.float64)
+    return dpos, np.sqrt(np.einsum('...i,...i->...', dpos, dpos))
+
+def _force(dpos, dE_r, inv_r):
+    return dpos * (-dE_r * inv_r)[..., None]
+
+def _unpack(par, npar):
+    par = np.asarray(par, dtype=np.float64)
+    if par.shape[-1] != npar:
+        raise ValueError(f"expected par[...,{npar}], got shape {par.shape}")
+    return [par[..., i] for i in range(npar)]
+
+# -------- Coulomb potential
+
+def getCoulomb(dpos, qq):
+    """Coulomb energy and force. Returns (E[...], fpos[...,3])."""
+    dpos, r = _norm(dpos)
+    inv_r = 1.0 / r
+    E     = COULOMB_CONST * qq * inv_r
+    dE_r  = -E * inv_r
+    return E, _force(dpos, dE_r, inv_r)
+
+def _getCoulomb(dpos, par):
+    return getCoulomb(dpos, *_unpack(par, 1))
+
+def varCoulomb(r, qq):
+    """Coulomb energy and derivative according to charge product. Returns (E, dE_qq)."""
+    inv_r = 1.0 / np.asarray(r, dtype=np.float64)
+    dE_qq = COULOMB_CONST * inv_r
+    return dE_qq * qq, dE_qq
+
+def _varCoulomb(r, par):
+    E, dE_qq = varCoulomb(r, *_unpack(par, 1))
+    return E, np.stack([dE_qq], axis=-1)
+
+# -------- Lennard-Jones potential
+
+def getLJ(dpos, E0, R0):
+    """Lennard-Jones energy and force. Returns (E[...], fpos[...,3])."""
+    dpos, r = _norm(dpos)
+    inv_r = 1.0 / r
+    u     = R0 * inv_r
+    u2    = u * u
+    u6    = u2 * u2 * u2
+    u12   = u6 * u6
+    E     = E0 *        (u12 - 2 * u6)
+    dE_r  = -E0 * 12.0 * (u12 -    u6) * inv_r
+    return E, _force(dpos, dE_r, inv_r)
+
+def _getLJ(dpos, par):
+    return getLJ(dpos, *_unpack(par, 2))
+
+def varLJ(r, R0, E0):
+    """Lennard-Jones energy and derivatives according to parameters. Returns (E, dE_E0, dE_R0)."""
+    inv_r = 1.0 / np.asarray(r, dtype=np.float64)
+    u     = R0 * inv_r
+    u2    = u * u
+    u6    = u2 * u2 * u2
+    u12   = u6 * u6
+    dE_E0 = (u12 - 2 * u6)
+    dE_R0 = 12.0 * E0 * (u12 - u6) / R0
+    return E0 * dE_E0, dE_E0, dE_R0
+
+def _varLJ(r, par):
+    E, dE_E0, dE_R0 = varLJ(r, *_unpack(par, 2))
+    return E, np.stack([dE_E0, dE_R0], axis=-1)
+
+# -------- LennardJones+Coulomb potential
+
+def getLJQ(dpos, R0, E0, qq):
+    """Lennard-Jones + Coulomb energy and force. Returns (E[...], fpos[...,3])."""
+    dpos, r = _norm(dpos)
+    inv_r     = 1.0 / r
+    u         = R0 * inv_r
+    u2        = u * u
+    u6        = u2 * u2 * u2
+    u12       = u6 * u6
+    E_lj      = E0 * (u12 - 2 * u6)
+    dE_r_lj   = -E0 * 12.0 * (u12 - u6) * inv_r
+    E_coul    = COULOMB_CONST * qq * inv_r
+    dE_r_coul = -E_coul * inv_r
+    return E_lj + E_coul, _force(dpos, dE_r_lj + dE_r_coul, inv_r)
+
+def _getLJQ(dpos, par):
+    return getLJQ(dpos, *_unpack(par, 3))
+
+def varLJQ(r, R0, E0, qq):
+    """Lennard-Jones + Coulomb energy and derivatives. Returns (E, dE_R0, dE_E0, dE_qq)."""
+    inv_r = 1.0 / np.asarray(r, dtype=np.float64)
+    u     = R0 * inv_r
+    u2    = u * u
+    u6    = u2 * u2 * u2
+    u12   = u6 * u6
+    dE_E0 = (u12 - 2 * u6)
+    dE_R0 = 12.0 * E0 * (u12 - u6) / R0
+    dE_qq = COULOMB_CONST * inv_r
+    return E0 * dE_E0 + qq * dE_qq, dE_R0, dE_E0, dE_qq
+
+def _varLJQ(r, par):
+    E, dE_R0, dE_E0, dE_qq = varLJQ(r, *_unpack(par, 3))
+    return E, np.stack([dE_R0, dE_E0, dE_qq], axis=-1)
+
+def mix_LJQ(pi, pj):
+    """Pair parameters from atomic ones: R0 additive, E0 and qq multiplicative."""
+    pi = np.asarray(pi, dtype=np.float64); pj = np.asarray(pj, dtype=np.float64)
+    return np.stack([pi[..., 0] + pj[..., 0], pi[..., 1] * pj[..., 1], pi[..., 2] * pj[..., 2]], axis=-1)
+
+def dmix_LJQ(pi, pj, dpij):
+    """Chain rule of `mix_LJQ`: derivatives according to pair parameters -> according to pi."""
+    pj = np.asarray(pj, dtype=np.float64); dpij = np.asarray(dpij, dtype=np.float64)
+    return np.stack([dpij[..., 0], dpij[..., 1] * pj[..., 1], dpij[..., 2] * pj[..., 2]], axis=-1)
+
+# -------- Morse potential
+
+def getMorse(dpos, R0, E0, k):
+    """Morse energy and force. Returns (E[...], fpos[...,3])."""
+    dpos, r = _norm(dpos)
+    inv_r = 1.0 / r
+    e     = np.exp(-k * (r - R0))
+    E     = E0 * (e * e - 2 * e)
+    dE_r  = -2 * E0 * k * (e * e - e)
+    return E, _force(dpos, dE_r, inv_r)
+
+def _getMorse(dpos, par):
+    return getMorse(dpos, *_unpack(par, 3))
+
+def varMorse(r, R0, E0, k):
+    """Morse energy and derivatives according to parameters. Returns (E, dE_R0, dE_E0, dE_k)."""
+    r     = np.asarray(r, dtype=np.float64)
+    e     = np.exp(-k * (r - R0))
+    dE_E0 = (e * e - 2 * e)
+    dE_R0 =  2 * E0 * k * (e * e - e)
+    dE_k  = -2 * E0 *     (e * e - e) * (r - R0)
+    return E0 * dE_E0, dE_R0, dE_E0, dE_k
+
+def _varMorse(r, par):
+    E, dE_R0, dE_E0, dE_k = varMorse(r, *_unpack(par, 3))
+    return E, np.stack([dE_R0, dE_E0, dE_k], axis=-1)
+
+# -------- Morse+Coulomb potential
+
+def getMorseQ(dpos, R0, E0, qq, k):
+    """Morse + Coulomb energy and force. Returns (E[...], fpos[...,3])."""
+    dpos, r = _norm(dpos)
+    e          = np.exp(-k * (r - R0))
+    e2         = e * e
+    E_morse    =     E0 *     (e2 - 2 * e)
+    dE_r_morse = -2 * E0 * k * (e2 -    e)
+    inv_r      = 1.0 / r
+    E_coul     = COULOMB_CONST * qq * inv_r
+    dE_r_coul  = -E_coul * inv_r
+    return E_morse + E_coul, _force(dpos, dE_r_morse + dE_r_coul, inv_r)
+
+def _getMorseQ(dpos, par):
+    return getMorseQ(dpos, *_unpack(par, 4))
+
+def varMorseQ(r, R0, E0, qq, k):
+    """Morse + Coulomb energy and derivatives. Returns (E, dE_R0, dE_E0, dE_qq, dE_k)."""
+    r     = np.asarray(r, dtype=np.float64)
+    e     = np.exp(-k * (r - R0))
+    e2    = e * e
+    dE_E0 = (e2 - 2 * e)
+    dE_R0 =  2 * E0 * k * (e2 - e)
+    dE_k  = -2 * E0 *     (e2 - e) * (r - R0)
+    dE_qq = COULOMB_CONST / r
+    return E0 * dE_E0 + qq * dE_qq, dE_R0, dE_E0, dE_qq, dE_k
+
+def _varMorseQ(r, par):
+    E, dE_R0, dE_E0, dE_qq, dE_k = varMorseQ(r, *_unpack(par, 4))
+    return E, np.stack([dE_R0, dE_E0, dE_qq, dE_k], axis=-1)
+
+def mix_varMorseQ(pi, pj):
+    """Pair parameters: R0 additive, E0 and qq multiplicative, k arithmetic mean."""
+    pi = np.asarray(pi, dtype=np.float64); pj = np.asarray(pj, dtype=np.float64)
+    return np.stack([pi[..., 0] + pj[..., 0], pi[..., 1] * pj[..., 1], pi[..., 2] * pj[..., 2], (pi[..., 3] + pj[..., 3]) * 0.5], axis=-1)
+
+def dmix_varMorseQ(pi, pj, dpij):
+    """Chain rule of `mix_varMorseQ`: derivatives according to pair parameters -> according to pi."""
+    pj = np.asarray(pj, dtype=np.float64); dpij = np.asarray(dpij, dtype=np.float64)
+    return np.stack([dpij[..., 0], dpij[..., 1] * pj[..., 1], dpij[..., 2] * pj[..., 2], dpij[..., 3] * 0.5], axis=-1)
+
+# ========== Evaluation of potentials at points (mirrors evaluate*() in ForceFields.cpp)
+
+def evaluateCoulomb(ps, params): return _getCoulomb(ps, params)
+def evaluateLJ     (ps, params): return _getLJ     (ps, params)
+def evaluateLJQ    (ps, params): return _getLJQ    (ps, params)
+def evaluateMorse  (ps, params): return _getMorse  (ps, params)
+def evaluateMorseQ (ps, params): return _getMorseQ (ps, params)
+
+evaluators = {
+    'Coulomb': evaluateCoulomb,
+    'LJ':      evaluateLJ,
+    'LJQ':     evaluateLJQ,
+    'Morse':   evaluateMorse,
+    'MorseQ':  evaluateMorseQ,
+}
+
+var_evaluators = {
+    'Coulomb': _varCoulomb,
+    'LJ':      _varLJ,
+    'LJQ':     _varLJQ,
+    'Morse':   _varMorse,
+    'MorseQ':  _varMorseQ,
+}
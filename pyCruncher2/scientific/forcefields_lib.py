@@ -0,0 +1,115 @@
+"""
+ctypes binding of cpp/ForceFields.cpp — the compiled counterpart of forcefields.py.
+
+Compiles `cpp/ForceFields_lib.cpp` (a thin `extern "C"` layer over the inline
+C++ potentials) with g++ into a shared library next to the source, loads it
+with ctypes and exposes the same `evaluate*()` / `_var*()` calls as the NumPy
+module, so both paths can be compared one-to-one.
+
+Non-obvious things:
+- The library is rebuilt only when the `.so` is missing or older than any of
+  the `.cpp/.h` sources in `cpp/` (or when `bRecompile=True`).
+- `Vec3d` is a plain union of 3 doubles, so `(n,3)` C-contiguous float64
+  arrays are passed directly as `Vec3d*`.
+- Built with `-fopenmp`: `getVarDerivsSystems()` runs over training systems
+  in parallel (thread count from `OMP_NUM_THREADS`).
+"""
+
+import os
+import glob
+import ctypes
+import subprocess
+from ctypes import c_int, c_double
+import numpy as np
+
+array1d = np.ctypeslib.ndpointer(dtype=np.double, ndim=1, flags='CONTIGUOUS')
+array2d = np.ctypeslib.ndpointer(dtype=np.double, ndim=2, flags='CONTIGUOUS')
+array1i = np.ctypeslib.ndpointer(dtype=np.int32,  ndim=1, flags='CONTIGUOUS')
+array2i = np.ctypeslib.ndpointer(dtype=np.int32,  ndim=2, flags='CONTIGUOUS')
+
+CPP_DIR  = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'cpp'))
+LIB_SRC  = os.path.join(CPP_DIR, 'ForceFields_lib.cpp')
+LIB_PATH = os.path.join(CPP_DIR, 'ForceFields_lib.so')
+
+NPAR = {'Coulomb': 1, 'LJ': 2, 'LJQ': 3, 'Morse': 3, 'MorseQ': 4}
+
+# potentials supported by getVarDerivs*() -> `kind` argument of the C interface
+VAR_KINDS = {'LJQ': 0, 'MorseQ': 1}
+
+FFLAGS = "-O3 -march=native -fopenmp -fPIC -shared"
+
+lib = None
+
+def _needs_rebuild(src=LIB_SRC, so=LIB_PATH):
+    if not os.path.exists(so): return True
+    t_so = os.path.getmtime(so)
+    deps = glob.glob(os.path.join(os.path.dirname(src), '*.cpp')) + glob.glob(os.path.join(os.path.dirname(src), '*.h'))
+    return any(os.path.getmtime(f) > t_so for f in deps)
+
+def compile_lib(src=LIB_SRC, so=LIB_PATH, flags=FFLAGS, bPrint=False):
+    cmd = f"g++ {flags} {src} -o {so}"
+    if bPrint: print("forcefields_lib.compile_lib()", cmd)
+    subprocess.run(cmd, shell=True, check=True)
+    return so
+
+def load_lib(bRecompile=False, bPrint=False):
+    global lib
+    if lib is not None and not bRecompile: return lib
+    if bRecompile or _needs_rebuild():
+        compile_lib(bPrint=bPrint)
+    lib = ctypes.CDLL(LIB_PATH)
+    for name in NPAR:
+        f = getattr(lib, f"evaluate{name}_c")
+        f.argtypes = [c_int, array2d, array1d, array2d, array2d]
+        f.restype  = None
+        f = getattr(lib, f"var{name}_c")
+        f.argtypes = [c_int, array1d, array2d, array1d, array2d]
+        f.restype  = None
+    lib.getVarDerivs_c.argtypes        = [c_int, c_int, array2d, array2d, c_int, array2d, array2d, array2d]
+    lib.getVarDerivs_c.restype         = c_double
+    lib.getVarDerivsSystems_c.argtypes = [c_int, c_int, array2i, array2d, array1i, c_int, array2d, array1d, array2d, c_int]
+    lib.getVarDerivsSystems_c.restype  = c_int
+    return lib
+
+def evaluate(name, ps, params):
+    """Energy and force of potential `name` at points ps[n,3]. Returns (Es[n], fs[n,3])."""
+    load_lib()
+    ps     = np.ascontiguousarray(ps,     dtype=np.double)
+    params = np.ascontiguousarray(params, dtype=np.double).reshape(len(ps), NPAR[name])
+    n  = len(ps)
+    Es = np.zeros(n)
+    fs = np.zeros((n, 3))
+    getattr(lib, f"evaluate{name}_c")(n, ps, Es, fs, params)
+    return Es, fs
+
+def var(name, rs, params):
+    """Energy and derivatives according to parameters at distances rs[n]. Returns (Es[n], dpars[n,npar])."""
+    load_lib()
+    rs     = np.ascontiguousarray(rs,     dtype=np.double)
+    params = np.ascontiguousarray(params, dtype=np.double).reshape(len(rs), NPAR[name])
+    n     = len(rs)
+    Es    = np.zeros(n)
+    dpars = np.zeros((n, NPAR[name]))
+    getattr(lib, f"var{name}_c")(n, rs, params, Es, dpars)
+    return Es, dpars
+
+def getVarDerivs(name, apos1, pars1, apos2, pars2):
+    """Interaction energy of two fragments and dE/dpars1[na1,npar] (mirrors getVarDerivsLJQ/MorseQ)."""
+    load_lib()
+    npar  = NPAR[name]
+    apos1 = np.ascontiguousarray(apos1, dtype=np.double); pars1 = np.ascontiguousarray(pars1, dtype=np.double).reshape(-1, npar)
+    apos2 = np.ascontiguousarray(apos2, dtype=np.double); pars2 = np.ascontiguousarray(pars2, dtype=np.double).reshape(-1, npar)
+    dE_par1 = np.zeros((len(apos1), npar))
+    E = lib.getVarDerivs_c(VAR_KINDS[name], len(apos1), apos1, pars1, len(apos2), apos2, pars2, dE_par1)
+    return E, dE_par1
+
+def getVarDerivsSystems(name, sys, apos, atypes, tpars, bBoth=True, Es=None, J=None):
+    """Energies Es[nsys] and Jacobian J[nsys,ntype*npar] of a packed training set (see ff_fitting.FittingSet)."""
+    load_lib()
+    tpars = np.ascontiguousarray(tpars, dtype=np.double)
+    ntype, npar = tpars.shape
+    nsys = len(sys)
+    if Es is None: Es = np.zeros(nsys)
+    if J  is None: J  = np.zeros((nsys, ntype * npar))
+    lib.getVarDerivsSystems_c(VAR_KINDS[name], nsys, sys, apos, atypes, ntype, tpars, Es, J, int(bBoth))
+    return Es, J
@@ -0,0 +1,211 @@
+"""
+Multi-device work splitting for OpenCLBase-derived simulations.
+
+`select_device()` gives an `OpenCLBase` exactly one device. A `DeviceGroup`
+instead creates one worker (e.g. a `NumIntegralSim`, `BiotSavartSim` or
+`MolecularDynamics`) per device, each with its own context, queue, buffers
+and program, then cuts the sample range into contiguous partitions sized by
+the measured throughput of each device, runs them concurrently from a
+thread pool and concatenates the results in the original order.
+
+    with DeviceGroup.from_cpu_subdevices(lambda ctx: NumIntegralSim(ctx=ctx), cu_per_sub=4) as group:
+        B = group.run_split('run_biot_savart', split={'samples': samples}, r_mid=r_mid, dl=dl, Iarr=Iarr)
+
+Non-obvious things:
+- Workers are independent `OpenCLBase` objects, so the simulation classes
+  need no changes beyond accepting `ctx=`; devices from different platforms
+  (NVIDIA GPU + pocl CPU) can be mixed in one group.
+- Throughput starts from `max_compute_units * max_clock_frequency` and is
+  replaced by the measured items/second after every `map()` (exponential
+  moving average with `smoothing`); `calibrate()` just runs once to get
+  there. The measured time includes uploads and any program build done
+  inside the worker call (NumIntegralSim rebuilds on every run), so
+  calibrate with the call you will actually repeat.
+- A device whose partition was empty has no measurement and keeps its
+  previous share, and no weight drops below `min_share` of the total, so a
+  device that was slow once is still offered work later.
+- Partition boundaries are multiples of `align` (use the worker's `nloc`)
+  so no device gets a ragged work-group in the middle of the range; empty
+  partitions are skipped, not launched.
+- The group owns the thread pool that drives the devices; `close()` (or
+  leaving a `with` block) shuts it down. A closed group cannot run again.
+- pyopencl releases the GIL in blocking enqueue/finish calls, which is what
+  lets plain Python threads drive the devices concurrently.
+- A CPU device is split with `create_sub_devices(EQUALLY)`; when it has
+  fewer compute units than requested sub-devices (e.g. a 1-core container)
+  `from_cpu_subdevices()` falls back to repeating the whole device, which
+  still exercises the split/gather path.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pyopencl as cl
+
+
+def list_devices(device_type=None):
+    """All devices of all platforms, optionally filtered by cl.device_type (e.g. cl.device_type.CPU)."""
+    devices = []
+    for platform in cl.get_platforms():
+        for device in platform.get_devices():
+            if device_type is None or (device.type & device_type):
+                devices.append(device)
+    return devices
+
+def split_sub_devices(device, cu_per_sub=1):
+    """Partition `device` into sub-devices of `cu_per_sub` compute units each."""
+    return device.create_sub_devices([cl.device_partition_property.EQUALLY, int(cu_per_sub)])
+
+def throughput_guess(device):
+    return float(device.max_compute_units * max(device.max_clock_frequency, 1))
+
+def partition_range(n, weights, align=1):
+    """
+    Split range(n) into len(weights) contiguous (i0,i1) pieces proportional to `weights`.
+
+    Boundaries are rounded to multiples of `align` (the last piece ends at n);
+    pieces of zero-weight entries are empty.
+    """
+    w = np.maximum(np.asarray(weights, dtype=np.float64), 0.0)
+    if w.sum() <= 0: w = np.ones_like(w)
+    cuts = np.round(np.cumsum(w) / w.sum() * n / align).astype(np.int64) * align
+    cuts = np.minimum(cuts, n); cuts[-1] = n
+    starts = np.concatenate([[0], cuts[:-1]])
+    return [(int(i0), int(max(i0, i1))) for i0, i1 in zip(starts, cuts)]
+
+class DeviceGroup:
+    """
+    One worker per OpenCL device plus a throughput-weighted range partitioner.
+
+    Attributes:
+        devices (list[cl.Device]):    devices in partition order
+        workers (list):               `make_worker(ctx)` result per device
+        weights (ndarray):            current throughput estimate [items/s] (relative)
+        last    (list[dict]):         per-device i0, i1, time of the last map()
+    """
+
+    def __init__(self, devices, make_worker, weights=None, align=1, smoothing=0.5, min_share=0.01, bPrint=False):
+        if len(devices) == 0: raise ValueError("DeviceGroup() needs at least one device")
+        self.devices   = list(devices)
+        self.ctxs      = [cl.Context([d]) for d in self.devices]
+        self.workers   = [make_worker(ctx) for ctx in self.ctxs]
+        self.weights   = np.array(weights if weights is not None else [throughput_guess(d) for d in self.devices], dtype=np.float64)
+        self.align     = align
+        self.smoothing = smoothing
+        self.min_share = min_share
+        self.bPrint    = bPrint
+        self.last      = []
+        self.pool      = ThreadPoolExecutor(max_workers=len(self.devices))
+        if bPrint: self.print_devices()
+
+    @classmethod
+    def from_devices(cls, make_worker, device_type=None, **kwargs):
+        """All devices (optionally of one cl.device_type) of all platforms."""
+        return cls(list_devices(device_type), make_worker, **kwargs)
+
+    @classmethod
+    def from_cpu_subdevices(cls, make_worker, cu_per_sub=1, nsub=None, **kwargs):
+        """
+        The first CPU device split into sub-devices of `cu_per_sub` compute units.
+
+        If `nsub` is given and the device cannot provide that many sub-devices,
+        the whole device is repeated `nsub` times instead (see module notes).
+        """
+        cpus = list_devices(cl.device_type.CPU)
+        if not cpus: raise RuntimeError("DeviceGroup.from_cpu_subdevices(): no OpenCL CPU device found")
+        cpu = cpus[0]
+        subs = []
+        if cpu.max_compute_units >= 2 * cu_per_sub:
+            try:
+                subs = split_sub_devices(cpu, cu_per_sub)
+            except cl.Error as e:
+                print(f"DeviceGroup.from_cpu_subdevices() create_sub_devices failed: {e}")
+        if nsub is not None:
+            subs = subs[:nsub] if len(subs) >= nsub else [cpu] * nsub
+        elif not subs:
+            subs = [cpu]
+        return cls(subs, make_worker, **kwargs)
+
+    def __len__(self):
+        return len(self.devices)
+
+    def close(self):
+        """Shut down the thread pool (waits for running partitions)."""
+        self.pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def print_devices(self):
+        for i, (d, w) in enumerate(zip(self.devices, self.weights)):
+            print(f"DeviceGroup[{i}] {d.name:<40} CUs {d.max_compute_units:>4}  weight {w / self.weights.sum():.3f}")
+
+    def partition(self, n):
+        return partition_range(n, self.weights, align=self.align)
+
+    def map(self, func, n, bUpdate=True):
+        """
+        Run `func(worker, i0, i1)` for every non-empty partition of range(n) concurrently.
+
+        Returns the list of results in partition order (None for empty ones) and,
+        with bUpdate, folds the measured items/second into `weights`.
+        """
+        parts = self.partition(n)
+        def run(i):
+            i0, i1 = parts[i]
+            if i1 <= i0: return None, 0.0
+            T0 = time.perf_counter()
+            res = func(self.workers[i], i0, i1)
+            return res, time.perf_counter() - T0
+        outs = list(self.pool.map(run, range(len(self))))
+        self.last = [{'i0': i0, 'i1': i1, 'time': t} for (i0, i1), (_, t) in zip(parts, outs)]
+        if bUpdate: self._update_weights()
+        if self.bPrint:
+            for i, p in enumerate(self.last):
+                print(f"DeviceGroup.map() [{i}] items {p['i1'] - p['i0']:>10} time {p['time']:.6f} [s]")
+        return [r for r, _ in outs]
+
+    def _update_weights(self):
+        measured = np.zeros(len(self), dtype=bool)
+        rates = np.zeros(len(self))
+        for i, p in enumerate(self.last):
+            n = p['i1'] - p['i0']
+            if n > 0 and p['time'] > 0: rates[i] = n / p['time']; measured[i] = True
+        if not measured.any(): return
+        # previous estimates on the scale of the measured rates; devices without a measurement
+        # (empty partition) carry their previous weight forward instead of decaying
+        scale = rates[measured].sum() / self.weights[measured].sum()
+        rates[~measured] = self.weights[~measured] * scale
+        weights = self.smoothing * self.weights * scale + (1.0 - self.smoothing) * rates
+        self.weights = np.maximum(weights, self.min_share * weights.sum())
+
+    def run_split(self, method, split, axis=0, bUpdate=True, **kwargs):
+        """
+        Call `worker.<method>(**kwargs, **split_parts)` on every device and concatenate the results.
+
+        `split` maps keyword names to arrays that are cut along `axis` (all the same length,
+        e.g. {'samples': samples} or {'pos': pos, 'force': force}); other kwargs go to
+        every worker unchanged.
+        """
+        n = None
+        for k, a in split.items():
+            if n is None: n = a.shape[axis]
+            elif a.shape[axis] != n: raise ValueError(f"DeviceGroup.run_split(): '{k}' has {a.shape[axis]} items along axis {axis}, expected {n}")
+        def func(worker, i0, i1):
+            parts = {k: np.ascontiguousarray(np.take(a, np.arange(i0, i1), axis=axis)) for k, a in split.items()}
+            return getattr(worker, method)(**kwargs, **parts)
+        res = [r for r in self.map(func, n, bUpdate=bUpdate) if r is not None]
+        return np.concatenate(res, axis=axis)
+
+    def calibrate(self, method, split, nrep=1, **kwargs):
+        """Run `run_split()` `nrep` times to replace the initial guess by measured throughput; returns the weights."""
+        for _ in range(nrep):
+            self.run_split(method, split, **kwargs)
+        return self.weights / self.weights.sum()
+
+    def call_all(self, method, *args, **kwargs):
+        """Same call on every worker (e.g. load_program / build_program); results in device order."""
+        return list(self.pool.map(lambda w: getattr(w, method)(*args, **kwargs), self.workers))
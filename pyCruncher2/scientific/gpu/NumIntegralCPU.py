@@ -0,0 +1,173 @@
+"""
+CPU counterpart of NumIntegralSim — same source x sample accumulation without OpenCL.
+
+`NumIntegralCPU.run_biot_savart()` and `run_morse_ring()` take exactly the
+inputs of the OpenCL `NumIntegralSim` methods in `test_num_integral_cl.py`
+and return the same arrays, so results can be produced and cross-checked
+on machines without an OpenCL device. The pair functions are NumPy
+transcriptions of the `Forces.cl` ones selected by the `GET_PAIR_EXPR`
+macro (`getBiotSavart_dB`, `getMorse`, `getMorse_lin5/9/17`), written per
+tile instead of per pair.
+
+Non-obvious things:
+- The (N samples x M sources) double loop is cut into tiles of
+  `nblock_sample x nblock_source`, so each vectorized step touches a few
+  hundred KB of temporaries that stay in cache; sample blocks are handed to
+  a thread pool (NumPy releases the GIL inside ufuncs) and written into
+  disjoint rows of the output, so no locking is needed. The pool lives for
+  one `accumulate()` call, so an evaluator holds no threads between runs.
+- Tiles are structure-of-arrays (dx,dy,dz [bs,bm]) and the sum over
+  sources is folded into the tile function: einsum for Morse, and for
+  Biot–Savart the cross product with per-source dl becomes three mat-vec
+  products, which is ~8x faster than building [bs,bm,4] and summing.
+- Arithmetic is float32 like the kernels (`dtype=np.float64` for a
+  reference); agreement with OpenCL is to float32 rounding, not bitwise,
+  because the summation order over sources differs.
+- Conventions follow `NumIntegral.cl`: dp = source - sample, the Morse pair
+  parameters are REQH = par with REQH.x += REQH0.x and REQH.yzw *= REQH0.yzw,
+  output is (xyz vector, w scalar) per sample.
+- Does not import pyopencl.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# ========== Tile functions (mirror Forces.cl)
+# dx,dy,dz[bs,bm] = source - sample for one tile, per-source arrays are [bm];
+# each returns the tile sum over sources as [bs,4] = (xyz vector, w scalar)
+
+def _sum_vec(g, dx, dy, dz, E=None):
+    out = np.empty((len(g), 4), dtype=g.dtype)
+    out[:, 0] = np.einsum('ij,ij->i', g, dx)
+    out[:, 1] = np.einsum('ij,ij->i', g, dy)
+    out[:, 2] = np.einsum('ij,ij->i', g, dz)
+    out[:, 3] = 0 if E is None else E.sum(axis=1)
+    return out
+
+def getBiotSavart_dB(dx, dy, dz, lx, ly, lz, I, K):
+    """NumIntegral.cl `getBiotSavart_dB(-dp, dl, I, K)`: K*I*(dl x r)/|r|^3 with r = sample - source."""
+    r2 = dx * dx + dy * dy + dz * dz
+    r2 += r2.dtype.type(1e-20)
+    w  = 1 / (r2 * np.sqrt(r2))
+    w *= K * I
+    wx = w * dx; wy = w * dy; wz = w * dz
+    # cross(dl, -dp) summed over sources -> per-source dl components become mat-vec products
+    out = np.empty((len(w), 4), dtype=w.dtype)
+    out[:, 0] = wy @ lz - wz @ ly
+    out[:, 1] = wz @ lx - wx @ lz
+    out[:, 2] = wx @ ly - wy @ lx
+    out[:, 3] = 0
+    return out
+
+def getMorse(dx, dy, dz, R0, E0, b):
+    r = np.sqrt(dx * dx + dy * dy + dz * dz)
+    e = np.exp(-b * (r - R0))
+    E = E0 *         e * (e - 2)
+    F = E0 * 2 * b * e * (e - 1)
+    return _sum_vec(F / r, dx, dy, dz, E)
+
+def _getMorse_lin(dx, dy, dz, R0, E0, b, n):
+    r2    = dx * dx + dy * dy + dz * dz
+    Rc    = R0 + n / b
+    r_inv = 1 / np.sqrt(r2)
+    r     = r2 * r_inv
+    y     = 1 - (b / n) * (r - R0)
+    yn1   = y**(n - 1)
+    p     = yn1 * y
+    E     = E0 * p * (p - 2)
+    g     = -2 * E0 * (p - 1) * (-b * yn1) * r_inv
+    cut   = r2 > Rc * Rc
+    E[cut] = 0; g[cut] = 0
+    return _sum_vec(g, dx, dy, dz, E)
+
+def getMorse_lin5 (dx, dy, dz, R0, E0, b): return _getMorse_lin(dx, dy, dz, R0, E0, b, 5)
+def getMorse_lin9 (dx, dy, dz, R0, E0, b): return _getMorse_lin(dx, dy, dz, R0, E0, b, 9)
+def getMorse_lin17(dx, dy, dz, R0, E0, b): return _getMorse_lin(dx, dy, dz, R0, E0, b, 17)
+
+MORSE_VARIANTS = {
+    'Morse':       getMorse,
+    'Morse_lin5':  getMorse_lin5,
+    'Morse_lin9':  getMorse_lin9,
+    'Morse_lin17': getMorse_lin17,
+}
+
+# ========== Blocked, threaded accumulation
+
+class NumIntegralCPU:
+    """
+    Blocked source x sample accumulator with the NumIntegralSim interface.
+
+    Args:
+        nblock_sample (int): samples per tile (and per thread task)
+        nblock_source (int): sources per tile
+        nthreads      (int): thread pool size (default: os.cpu_count())
+        dtype:               np.float32 (like OpenCL) or np.float64
+    """
+
+    def __init__(self, nblock_sample=64, nblock_source=1024, nthreads=None, dtype=np.float32):
+        self.nblock_sample = nblock_sample
+        self.nblock_source = nblock_source
+        self.nthreads      = nthreads or os.cpu_count() or 1
+        self.dtype         = dtype
+
+    def accumulate(self, samples, src_pos, tile_func, src_args=()):
+        """
+        out[j] = sum_i pair(src_pos[i] - samples[j], args[i]) for all samples j.
+
+        `tile_func(dx, dy, dz, *args)` gets one tile (dx,dy,dz [bs,bm], per-source args [bm])
+        and returns its sum over sources [bs,4]; see getBiotSavart_dB() / getMorse().
+        """
+        dt      = self.dtype
+        samples = np.asarray(samples, dtype=dt)
+        src_pos = np.asarray(src_pos, dtype=dt)
+        sx, sy, sz = (np.ascontiguousarray(samples[:, k]) for k in range(3))
+        px, py, pz = (np.ascontiguousarray(src_pos[:, k]) for k in range(3))
+        src_args = [np.ascontiguousarray(a, dtype=dt) for a in src_args]
+        N = len(samples); M = len(src_pos)
+        out = np.zeros((N, 4), dtype=dt)
+        bs = self.nblock_sample; bm = self.nblock_source
+
+        def block(j0):
+            j1  = min(j0 + bs, N)
+            acc = np.zeros((j1 - j0, 4), dtype=dt)
+            for i0 in range(0, M, bm):
+                i1 = min(i0 + bm, M)
+                dx = px[None, i0:i1] - sx[j0:j1, None]
+                dy = py[None, i0:i1] - sy[j0:j1, None]
+                dz = pz[None, i0:i1] - sz[j0:j1, None]
+                acc += tile_func(dx, dy, dz, *[a[i0:i1] for a in src_args])
+            out[j0:j1] = acc
+
+        starts = range(0, N, bs)
+        if self.nthreads == 1 or len(starts) == 1:
+            for j0 in starts: block(j0)
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.nthreads, len(starts))) as pool:
+                list(pool.map(block, starts))
+        return out
+
+    # Example A: Biot–Savart (same inputs/outputs as NumIntegralSim.run_biot_savart)
+    def run_biot_savart(self, r_mid, dl, Iarr, samples, K=1.0e-7, bPrint=False):
+        dt = self.dtype
+        K  = dt(K)
+        dl = np.asarray(dl, dtype=dt)
+        out = self.accumulate(samples, r_mid, lambda dx, dy, dz, lx, ly, lz, I: getBiotSavart_dB(dx, dy, dz, lx, ly, lz, I, K),
+                              src_args=(dl[:, 0], dl[:, 1], dl[:, 2], Iarr))
+        if bPrint: print(f"NumIntegralCPU.run_biot_savart() N={len(samples)} M={len(r_mid)} nthreads={self.nthreads}")
+        return out[:, :3]
+
+    # Example B: Non-bonded Morse (same inputs/outputs as NumIntegralSim.run_morse_ring)
+    def run_morse_ring(self, apos, aREQs, samples, REQH0=(3.0, 1.0, 0.0, 0.0), bMorse=1.6, variant='Morse', bPrint=False):
+        if variant not in MORSE_VARIANTS:
+            raise ValueError(f"NumIntegralCPU.run_morse_ring(): unknown variant '{variant}', expected one of {list(MORSE_VARIANTS)}")
+        func  = MORSE_VARIANTS[variant]
+        dt    = self.dtype
+        REQH0 = np.asarray(REQH0, dtype=dt)
+        aREQs = np.asarray(aREQs, dtype=dt)
+        R0    = aREQs[:, 0] + REQH0[0]
+        E0    = aREQs[:, 1] * REQH0[1]
+        b     = dt(bMorse)
+        out = self.accumulate(samples, apos, lambda dx, dy, dz, R0_, E0_: func(dx, dy, dz, R0_, E0_, b), src_args=(R0, E0))
+        if bPrint: print(f"NumIntegralCPU.run_morse_ring({variant}) N={len(samples)} M={len(apos)} nthreads={self.nthreads}")
+        return out
@@ -67,17 +67,21 @@ class OpenCLBase:
     - Common utility functions for OpenCL operations
     """
     
-    def __init__(self, nloc=32, device_index=0):
+    def __init__(self, nloc=32, device_index=0, ctx=None):
         """
         Initialize the OpenCL environment.
         
         Args:
             nloc (int): Local work group size
             device_index (int): Index of the device to use (default: 0)
+            ctx (cl.Context): Use this context instead of select_device() (e.g. one device of a DeviceGroup)
         """
         self.nloc = nloc
-        self.ctx = select_device(preferred_vendor='nvidia', bPrint=True)
-        clu.get_cl_info(self.ctx.devices[0])
+        if ctx is None:
+            self.ctx = select_device(preferred_vendor='nvidia', bPrint=True)
+            clu.get_cl_info(self.ctx.devices[0])
+        else:
+            self.ctx = ctx
         self.queue = cl.CommandQueue(self.ctx)
             
         self.buffer_dict = {}
@@ -101,6 +101,8 @@ def get_cl_info( device ):
         print(f"Usable Local Memory Size: {usable_local_mem} bytes")
     except AttributeError as e:
         print(f"Note: PyOpenCL characterize module not available. Some device info will not be displayed.")
+    except RuntimeError as e:   # e.g. CPU devices (pocl): "bank count is meaningless for cache-based lmem"
+        print(f"Note: {e}")
 
     # Retrieve various characteristics
     try:
@@ -339,6 +339,44 @@ inline float4 getMorse_cub17( float3 dp, float R0, float E0, float4 cpoly, float
     return (float4)(dp * f_over_r, E);
 }
 
+// ---------------- Tabulated cubic-Hermite potentials (tables built by pyCruncher2/scientific/spline_tables.py)
+// tab[i]  = (c0,c1,c2,c3) Horner coefficients of interval i in u=(x-x_i)/dx
+// tabpar  = (x0, 1/dx, n, x1);  x<x0 is clamped to the first knot, x>x1 returns 0 (cutoff)
+// Returns (y, dy/dx)
+inline float2 hermite_tab( float x, __constant float4* tab, float4 tabpar ){
+    if( x > tabpar.w ){ return (float2)(0.f); }
+    const float t  = fmax( (x - tabpar.x)*tabpar.y, 0.f );
+    const int   i  = min( (int)t, (int)tabpar.z - 1 );
+    const float u  = t - (float)i;
+    const float4 c = tab[i];
+    const float y  =   c.x + u*(     c.y + u*(     c.z + u*c.w ));
+    const float dy = ( c.y + u*( 2.f*c.z + u*3.f*c.w ) )*tabpar.y;
+    return (float2)(y, dy);
+}
+
+/**
+ * @brief Any radial potential E(r) tabulated on r in [x0,x1].
+ * @return float4   Force vector in xyz, Energy in w.
+ */
+inline float4 getRadialTab( float3 dp, __constant float4* tab, float4 tabpar ){
+    const float r  = length( dp );
+    const float2 e = hermite_tab( r, tab, tabpar );
+    return (float4)( dp*(-e.y/r), e.x );
+}
+
+/**
+ * @brief Morse potential with exp(-b*(r-R0)) taken from a table of p(x)=exp(-b*x), x=r-R0.
+ * @param tab    __constant float4* table of p(x) (spline_tables.morse_exp_table), x1 = Rc-R0min acts as cutoff
+ * @return float4   Force vector in xyz, Energy in w.
+ */
+inline float4 getMorse_tab( float3 dp, float R0, float E0, __constant float4* tab, float4 tabpar ){
+    const float r  = length( dp );
+    const float2 p = hermite_tab( r - R0, tab, tabpar );
+    const float E  =      E0*p.x*(p.x - 2.f);
+    const float F  = -2.f*E0*    (p.x - 1.f)*p.y;   // F = -dE/dr
+    return (float4)( dp*(F/r), E );
+}
+
 
 
 
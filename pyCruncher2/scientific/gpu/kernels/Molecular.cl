@@ -415,6 +415,44 @@ inline float4 getMorse_cub17( float3 dp, float R0, float E0, float4 cpoly, float
     return (float4)(dp * f_over_r, E);
 }
 
+// ---------------- Tabulated cubic-Hermite potentials (tables built by pyCruncher2/scientific/spline_tables.py)
+// tab[i]  = (c0,c1,c2,c3) Horner coefficients of interval i in u=(x-x_i)/dx
+// tabpar  = (x0, 1/dx, n, x1);  x<x0 is clamped to the first knot, x>x1 returns 0 (cutoff)
+// Returns (y, dy/dx)
+inline float2 hermite_tab( float x, __constant float4* tab, float4 tabpar ){
+    if( x > tabpar.w ){ return (float2)(0.f); }
+    const float t  = fmax( (x - tabpar.x)*tabpar.y, 0.f );
+    const int   i  = min( (int)t, (int)tabpar.z - 1 );
+    const float u  = t - (float)i;
+    const float4 c = tab[i];
+    const float y  =   c.x + u*(     c.y + u*(     c.z + u*c.w ));
+    const float dy = ( c.y + u*( 2.f*c.z + u*3.f*c.w ) )*tabpar.y;
+    return (float2)(y, dy);
+}
+
+/**
+ * @brief Any radial potential E(r) tabulated on r in [x0,x1].
+ * @return float4   Force vector in xyz, Energy in w.
+ */
+inline float4 getRadialTab( float3 dp, __constant float4* tab, float4 tabpar ){
+    const float r  = length( dp );
+    const float2 e = hermite_tab( r, tab, tabpar );
+    return (float4)( dp*(-e.y/r), e.x );
+}
+
+/**
+ * @brief Morse potential with exp(-b*(r-R0)) taken from a table of p(x)=exp(-b*x), x=r-R0.
+ * @param tab    __constant float4* table of p(x) (spline_tables.morse_exp_table), x1 = Rc-R0min acts as cutoff
+ * @return float4   Force vector in xyz, Energy in w.
+ */
+inline float4 getMorse_tab( float3 dp, float R0, float E0, __constant float4* tab, float4 tabpar ){
+    const float r  = length( dp );
+    const float2 p = hermite_tab( r - R0, tab, tabpar );
+    const float E  =      E0*p.x*(p.x - 2.f);
+    const float F  = -2.f*E0*    (p.x - 1.f)*p.y;   // F = -dE/dr
+    return (float4)( dp*(F/r), E );
+}
+
 
 
 
@@ -527,6 +565,26 @@ __kernel void scanNonBond(
     }
 }
 
+// same as scanNonBond but with a tabulated potential (spline_tables.RadialTable) in constant memory
+// it has its own marker TAB_FORCE_NONBOND (not GET_FORCE_NONBOND) since `tab` does not exist in the other kernels, e.g.
+//   fij = getMorse_tab( dp, REQH.x, REQH.y, tab, tabpar );
+__kernel void scanNonBondTab(
+    const    int      n,      // 1  number of points
+    const    float4   REQH,   // 2  non-bonded parameters (RvdW,EvdW,QvdW,Hbond)
+    __global float4*  pos,    // 3  [n]positions of points
+    __global float4*  force,  // 4  [n]forces on points
+    const    float8   ffpar,  // 5  parameters specific to the potential function used
+    __constant float4* tab,   // 6  [ntab] cubic-Hermite coefficients
+    const    float4   tabpar  // 7  (x0, 1/dx, ntab, x1)
+){
+    const int i = get_global_id(0);
+    if(i>=n) return;
+    float4 fij;
+    const float3 dp = pos[i].xyz;
+    //<<<TAB_FORCE_NONBOND   // this line will be replaced python pre-processor
+    force[i] = fij;
+}
+
 #define WG_scanNonBond2 32
 __kernel void scanNonBond2(
     const int         n,     // 1  number of points
@@ -542,7 +600,7 @@ __kernel void scanNonBond2(
     __local float4 lPar[WG_scanNonBond2];          // cached atom parameters
     const int    lid = get_local_id(0);  // 0 … WG-1
     const int    gid = get_global_id(0); // 0 … n-1
-    const float3 p   = pos[gid].xyz;     // position of the test point
+    const float3 p   = pos[min(gid,n-1)].xyz; // position of the test point (clamped: threads gid>=n only pad the work-group)
     float4       f   = (float4)(0.0f);
     // tile atoms through shared memory
     for(int il0=0; il0<na; il0+=WG_scanNonBond2){
@@ -556,7 +614,7 @@ __kernel void scanNonBond2(
         #pragma unroll           // optional
         for (int j=0; j<WG_scanNonBond2; ++j) {
             int ja=il0+j;
-            if(ia<na){
+            if(ja<na){
                 const float3 dp  = lPos[j].xyz-p;
                 float4 REQH      = lPar[j];
                 REQH.x  +=REQH0.x;
@@ -574,6 +632,53 @@ __kernel void scanNonBond2(
     }
 }
 
+__kernel void scanNonBond2Tab(
+    const int         n,     // 1  number of points
+    const float4      REQH0, // 2  non-bonded parameters of test atom (RvdW,EvdW,QvdW,Hbond)
+    __global float4*  pos,   // 3  [n] positions of points
+    __global float4*  force, // 4  [n] forces on points
+    const int         na,    // 5  number of atoms
+    __global float4*  apos,  // 6  [na] postions of atoms
+    __global float4*  REQs,  // 7  [na] non-bonded parameters of atoms (RvdW,EvdW,QvdW,Hbond)
+    const float8      ffpar, // 8  parameters specific to the potential function used
+    __constant float4* tab,  // 9  [ntab] cubic-Hermite coefficients (spline_tables.RadialTable)
+    const float4      tabpar // 10 (x0, 1/dx, ntab, x1)
+){
+    __local float4 lPos[WG_scanNonBond2];          // cached atom positions
+    __local float4 lPar[WG_scanNonBond2];          // cached atom parameters
+    const int    lid = get_local_id(0);  // 0 … WG-1
+    const int    gid = get_global_id(0); // 0 … n-1
+    const float3 p   = pos[min(gid,n-1)].xyz; // position of the test point (clamped: threads gid>=n only pad the work-group)
+    float4       f   = (float4)(0.0f);
+    // tile atoms through shared memory
+    for(int il0=0; il0<na; il0+=WG_scanNonBond2){
+        int ia=il0+lid;      // global atom index
+        if(ia<na){
+            lPos[lid]=apos[ia];
+            lPar[lid]=REQs[ia];
+        }
+        barrier(CLK_LOCAL_MEM_FENCE);
+        // loop over the current tile
+        #pragma unroll           // optional
+        for (int j=0; j<WG_scanNonBond2; ++j) {
+            int ja=il0+j;
+            if(ja<na){
+                const float3 dp  = lPos[j].xyz-p;
+                float4 REQH      = lPar[j];
+                REQH.x  +=REQH0.x;
+                REQH.yzw*=REQH0.yzw;
+                float4 fij;
+                //<<<TAB_FORCE_NONBOND   // this line will be replaced python pre-processor
+                f+=fij;
+            }
+        }
+        barrier(CLK_LOCAL_MEM_FENCE);
+    }
+    if(gid<n){
+        force[gid]=f;
+    }
+}
+
 __kernel void scanNonBond2PBC( 
     const int         n,      // 1  number of points
     const float4      REQH0,  // 2  non-bonded parameters of test atom (RvdW,EvdW,QvdW,Hbond)
@@ -590,7 +695,7 @@ __kernel void scanNonBond2PBC(
     __local float4 lPar[WG_scanNonBond2];          // cached atom parameters
     const int    lid = get_local_id(0);  // 0 … WG-1
     const int    gid = get_global_id(0); // 0 … n-1
-    const float3 p   = pos[gid].xyz;     // position of the test point
+    const float3 p   = pos[min(gid,n-1)].xyz; // position of the test point (clamped: threads gid>=n only pad the work-group)
     float4       f   = (float4)(0.0f);
     // tile atoms through shared memory
     for(int il0=0; il0<na; il0+=WG_scanNonBond2){
@@ -604,7 +709,7 @@ __kernel void scanNonBond2PBC(
         #pragma unroll           // optional
         for (int j=0; j<WG_scanNonBond2; ++j) {
             int ja=il0+j;
-            if(ia<na){
+            if(ja<na){
                 const float3 dp0  = lPos[j].xyz-p;
                 float4 REQH      = lPar[j];
                 REQH.x  +=REQH0.x;
@@ -647,7 +752,7 @@ __kernel void scanNonBond2PBC_2(
     __local float4 lPar[WG_scanNonBond2];          // cached atom parameters
     const int    lid = get_local_id(0);  // 0 … WG-1
     const int    gid = get_global_id(0); // 0 … n-1
-    const float3 p   = pos[gid].xyz;     // position of the test point
+    const float3 p   = pos[min(gid,n-1)].xyz; // position of the test point (clamped: threads gid>=n only pad the work-group)
     float4       f   = (float4)(0.0f);
     // tile atoms through shared memory
     for(int il0=0; il0<na; il0+=WG_scanNonBond2){
@@ -667,7 +772,7 @@ __kernel void scanNonBond2PBC_2(
                     #pragma unroll           // optional
                     for (int j=0; j<WG_scanNonBond2; ++j) {
                         int ja=il0+j;
-                        if(ia<na){
+                        if(ja<na){
                             const float3 dp  = lPos[j].xyz-p0;
                             float4 REQH      = lPar[j];
                             REQH.x  +=REQH0.x;
@@ -34,8 +34,8 @@ def line_samples(N=200, p0=(-2.0, 0.0, 0.5), p1=(2.0, 0.0, 0.5)):
 
 
 class BiotSavartSim(OpenCLBase):
-    def __init__(self, nloc=64, device_index=0):
-        super().__init__(nloc=nloc, device_index=device_index)
+    def __init__(self, nloc=64, device_index=0, ctx=None):
+        super().__init__(nloc=nloc, device_index=device_index, ctx=ctx)
         # Paths
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.kernels_dir = os.path.join(self.base_dir, 'kernels')
@@ -31,6 +31,7 @@ import time
 from . import clUtils as clu
 #from .MMFF import MMFF
 from .OpenCLBase import OpenCLBase
+from .. import spline_tables as st
 
 REQ_DEFAULT = np.array([1.7, 0.1, 0.0, 0.0], dtype=np.float32)  # R, E, Q, padding
 
@@ -60,9 +61,9 @@ class MolecularDynamics(OpenCLBase):
     for molecular dynamics simulations using the relax_multi_mini.cl kernel.
     """
     
-    def __init__(self, nloc=32, perBatch=10):
+    def __init__(self, nloc=32, perBatch=10, ctx=None):
         # Initialize the base class
-        super().__init__(nloc=nloc, device_index=0)
+        super().__init__(nloc=nloc, device_index=0, ctx=ctx)
         
         # Load the OpenCL program
         base_path = os.path.dirname(os.path.abspath(__file__))
@@ -91,14 +92,22 @@ class MolecularDynamics(OpenCLBase):
             })
         self.try_make_buffers(buffs)
 
-    def scanNonBond(self, pos, force, REQH, ffpar, bRealloc=True ):
+    def upload_table(self, table):
+        """Upload a spline_tables.RadialTable into the read-only `tab_buff` (re-uploads only when the table changes)."""
+        if getattr(self, "_table", None) is table: return
+        if table.n > st.NMAX_CONSTANT: print(f"WARNING upload_table() {table.nbytes} bytes may exceed __constant memory")
+        self.tab_buff = cl.Buffer(self.ctx, cl.mem_flags.READ_ONLY | cl.mem_flags.COPY_HOST_PTR, hostbuf=table.cl_buffer())
+        self.buffer_dict["tab_buff"] = self.tab_buff
+        self._table = table
+
+    def scanNonBond(self, pos, force, REQH, ffpar, bRealloc=True, table=None ):
         n = len(pos)
         if bRealloc:  self.realloc_scan(n)
         # Upload data to GPU
         self.toGPU_( self.poss_buff,   pos)
         self.toGPU_( self.forces_buff, force)
         # Get kernel
-        kernel = self.prg.scanNonBond
+        kernel = self.prg.scanNonBond if table is None else self.prg.scanNonBondTab
         # Set arguments
         # Ensure ffpar is length-8 for float8 (pad with zeros if needed)
         ffpar_arr = np.asarray(ffpar, dtype=np.float32).ravel()
@@ -106,13 +115,17 @@ class MolecularDynamics(OpenCLBase):
             ffpar_arr = ffpar_arr[:8]
         ffpar8 = np.zeros(8, dtype=np.float32)
         ffpar8[:ffpar_arr.size] = ffpar_arr
-        kernel.set_args(
+        args = [
             np.int32(n),
             cl_array.vec.make_float4(*REQH),
             self.poss_buff,
             self.forces_buff,
             cl_array.vec.make_float8(*ffpar8)
-        )
+        ]
+        if table is not None:
+            self.upload_table(table)
+            args += [ self.tab_buff, cl_array.vec.make_float4(*table.tabpar) ]
+        kernel.set_args(*args)
         # Run kernel
         global_size = (n,)
         local_size = None
@@ -121,9 +134,10 @@ class MolecularDynamics(OpenCLBase):
         self.queue.finish()
         return result
 
-    def scanNonBond2(self, pos, force, apos, aREQs, REQH0, ffpar, bRealloc=True, nPBC=None, lvec=None, name=""):
+    def scanNonBond2(self, pos, force, apos, aREQs, REQH0, ffpar, bRealloc=True, nPBC=None, lvec=None, name="", table=None):
         n  = len(pos)
         na = len(apos)
+        if (table is not None) and (nPBC is not None): raise ValueError("scanNonBond2(): tabulated potentials are implemented only in the non-PBC kernel scanNonBond2Tab")
         if bRealloc:  self.realloc_scan(n, na=na)
         # Upload data to GPU
         self.toGPU_( self.poss_buff,   pos)
@@ -158,6 +172,21 @@ class MolecularDynamics(OpenCLBase):
                 lvec_cl,
                 npbc_cl,
             )
+        elif table is not None:
+            self.upload_table(table)
+            kernel = self.prg.scanNonBond2Tab
+            kernel.set_args(
+                np.int32(n),
+                cl_array.vec.make_float4(*REQH0),
+                self.poss_buff,
+                self.forces_buff,
+                np.int32(na),
+                self.apos_buff,
+                self.aREQs_buff,
+                cl_array.vec.make_float8(*ffpar8),
+                self.tab_buff,
+                cl_array.vec.make_float4(*table.tabpar),
+            )
         else:
             kernel = self.prg.scanNonBond2        
             kernel.set_args(
@@ -263,6 +292,10 @@ def eval_Morse_exact(rs, R0, E0, b):
     F =  2 * b *  E0*p*(p - 1.0)
     return E, F
 
+def eval_Morse_tab(rs, R0, E0, table):
+    # same result as eval_Morse_exact, with exp(-b*x) interpolated from st.morse_exp_table(b, Rc)
+    return st.eval_Morse_tab(rs, R0, E0, table)
+
 def test_potential_scans( n=100, xmin=0.0, xmax=10.0, R0=3.0, E0=1.0, bMorse=1.6):
     md = MolecularDynamics(nloc=32)
     
@@ -370,6 +403,35 @@ def test_potential_scans( n=100, xmin=0.0, xmax=10.0, R0=3.0, E0=1.0, bMorse=1.6
     plt.show()
 
 
+def test_tabulated_scan( n=1000, xmin=0.5, xmax=10.0, R0=3.0, E0=1.0, bMorse=1.6, Rc=9.0, tol=1e-5 ):
+    """Morse from a constant-memory table (scanNonBondTab) vs the exact exp() kernel and vs eval_Morse_exact()."""
+    md = MolecularDynamics(nloc=32)
+    base_path   = os.path.dirname(os.path.abspath(__file__))
+    kernel_path = os.path.join(base_path, 'kernels/Molecular.cl')
+    table = st.morse_exp_table(bMorse, Rc, tol=tol)
+    print(f"test_tabulated_scan() {table}  err_f32={table.err_f32}")
+    rs  = np.linspace(xmin, xmax, n)
+    pos = np.zeros((n, 4), dtype=np.float32)
+    pos[:, 0] = rs
+    REQH  = np.array([R0, E0, 0.0, 0.0], dtype=np.float32)
+    force = np.zeros((n, 4), dtype=np.float32)
+    output_path   = os.path.join(base_path, "tests/tmp/cl/tmp_Morse_tab.cl")
+    substitutions = { "macros": {
+        "GET_FORCE_NONBOND": "fij = getMorse    ( dp, REQH.x, REQH.y, ffpar.x );",
+        "TAB_FORCE_NONBOND": "fij = getMorse_tab( dp, REQH.x, REQH.y, tab, tabpar );",
+    } }
+    md.preprocess_opencl_source(kernel_path, substitutions, output_path)
+    md.load_program(kernel_path=output_path)
+    ffpar   = np.array([bMorse], dtype=np.float32)
+    fes_tab = md.scanNonBond( pos=pos, force=force, REQH=REQH, ffpar=ffpar, table=table )
+    E_ref, F_ref = eval_Morse_exact(rs, R0, E0, bMorse)
+    E_np,  F_np  = eval_Morse_tab  (rs, R0, E0, table)
+    mask = rs < Rc
+    def err(a, b): return np.max( np.abs(a[mask] - b[mask]) / np.maximum(1.0, np.abs(b[mask])) )   # same error measure as spline_tables
+    print(f"  err(E_cl, E_exact) {err(fes_tab[:,3], E_ref):.3e}   err(F_cl, F_exact) {err(fes_tab[:,0], F_ref):.3e}")
+    print(f"  err(E_cl, E_np   ) {err(fes_tab[:,3], E_np ):.3e}   err(F_cl, F_np   ) {err(fes_tab[:,0], F_np ):.3e}")
+    return fes_tab
+
 def test_speed( n=1000, na=1000, bMorse=1.6, Rc=5.0, nPBC=None, lvec=[[1.0,0.0,0.0],[0.0,1.0,0.0],[0.0,0.0,1.0]] ):
 
     # Initialize MolecularDynamics
@@ -447,6 +509,18 @@ def test_speed( n=1000, na=1000, bMorse=1.6, Rc=5.0, nPBC=None, lvec=[[1.0,0.0,0
         #print(f"   Result forces: \n", forces)
         #print(f"   result forces.shape {fes.shape} range: [{fes.min():.3f}, {fes.max():.3f}]")
 
+    if nPBC is None:
+        # exp(-b*(r-R0)) from a __constant table; R0 = REQH.x + aREQs.x reaches ~5.0
+        table = st.morse_exp_table(bMorse, Rc=10.0, R0max=6.0, tol=1e-5)
+        output_path   = os.path.join(base_path, "tests/tmp/cl/tmp_Morse_tab.cl")
+        substitutions = { "macros": { "TAB_FORCE_NONBOND": "fij = getMorse_tab( dp, REQH.x, REQH.y, tab, tabpar );" } }
+        md.preprocess_opencl_source(kernel_path, substitutions, output_path)
+        md.load_program(kernel_path=output_path)
+        fes = md.scanNonBond2( pos=pos, force=force, apos=apos, aREQs=aREQs, REQH0=REQH, ffpar=[bMorse], name=f"Morse_tab({table.n})", table=table )
+        names    .append("Morse_tab")
+        energies .append(fes[:,3])
+        forces   .append(fes[:,0])
+
     # fig, (ax1, ax2) = plot1d( rs, energies, forces, labels=names, colors=['k', 'b','c','g',   'r'], figsize=(10,15) )
     # ax1.set_ylim(-1,1)
     # ax2.set_ylim(-1,1)
@@ -460,6 +534,7 @@ if __name__ == "__main__":
     #   python -u -m pyCruncher2.scientific.gpu.run_scanNonBond | tee OUT-scanNonBond
 
     test_potential_scans()
+    #test_tabulated_scan()
 
     
     #test_speed( n=10000, na=1000000 )
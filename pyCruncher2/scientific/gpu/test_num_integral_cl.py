@@ -3,7 +3,8 @@
 Generic GPU Numerical Integral Testing Framework using OpenCL macro specialization.
 
 This script demonstrates a single generic kernel template `NumIntegral.cl` specialized
-at build-time via macro injection to run two examples:
+at build-time via macro injection to run two examples (or the same on CPU with
+`--backend cpu`, see NumIntegralCPU.py):
 
 1) Biot–Savart magnetic field accumulation from current elements to sample points.
 2) Molecular non-bonded Morse potential accumulation from atoms to probe points.
@@ -12,15 +13,22 @@ It does NOT modify any existing example scripts. It uses utilities from OpenCLBa
 
 Run:
   python -u -m pyCruncher2.scientific.gpu.test_num_integral_cl | tee OUT-generic-integral
+  python -u -m pyCruncher2.scientific.gpu.test_num_integral_cl --backend cpu
 """
 
 import os
+import argparse
 import numpy as np
-import pyopencl as cl
-import pyopencl.array as cl_array
 import matplotlib.pyplot as plt
 
-from .OpenCLBase import OpenCLBase
+try:
+    import pyopencl as cl
+    import pyopencl.array as cl_array
+    from .OpenCLBase import OpenCLBase
+except ImportError:     # CPU-only machine: `--backend cpu` (NumIntegralCPU) still works
+    cl = None
+    OpenCLBase = object
+from .NumIntegralCPU import NumIntegralCPU
 
 MU0_4PI = np.float32(1.0e-7)  # SI
 
@@ -60,8 +68,8 @@ def ring_atoms(M=64, R=2.0, center=(0.0,0.0,0.0), REQ=(1.7, 0.1, 0.0, 0.0)):
 
 
 class NumIntegralSim(OpenCLBase):
-    def __init__(self, nloc=128, device_index=0):
-        super().__init__(nloc=nloc, device_index=device_index)
+    def __init__(self, nloc=128, device_index=0, ctx=None):
+        super().__init__(nloc=nloc, device_index=device_index, ctx=ctx)
         self.base_dir    = os.path.dirname(os.path.abspath(__file__))
         self.kernels_dir = os.path.join(self.base_dir, 'kernels')
         self.path_kernel = os.path.join(self.kernels_dir, 'NumIntegral.cl')
@@ -182,8 +190,8 @@ class NumIntegralSim(OpenCLBase):
 # Demo
 # ----------------------
 
-def main():
-    sim = NumIntegralSim(nloc=128)
+def main(backend='cl'):
+    sim = NumIntegralSim(nloc=128) if backend == 'cl' else NumIntegralCPU()
 
     # A) Biot–Savart demo
     print("\n=== Biot–Savart (generic kernel) ===")
@@ -228,4 +236,7 @@ def main():
 if __name__ == '__main__':
     # How to run:
     #   python -u -m pyCruncher2.scientific.gpu.test_num_integral_cl | tee OUT-generic-integral
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backend', choices=['cl', 'cpu'], default='cl', help="OpenCL (NumIntegralSim) or blocked NumPy (NumIntegralCPU)")
+    args = parser.parse_args()
+    main(backend=args.backend)
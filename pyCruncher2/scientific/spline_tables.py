@@ -0,0 +1,197 @@
+"""
+Uniform cubic-Hermite tables of radial functions, shared by NumPy and OpenCL.
+
+A `RadialTable` samples y(x) and dy/dx at n+1 equidistant knots on [x0,x1]
+and stores one float4 of Horner coefficients per interval. The same
+coefficient array is evaluated by `RadialTable.eval()` in NumPy and uploaded
+as a `__constant float4*` buffer for `hermite_tab()` / `getRadialTab()` /
+`getMorse_tab()` in `gpu/kernels/Forces.cl`, so both sides interpolate the
+identical piecewise polynomial instead of calling `exp()` per pair.
+`build_table()` picks the resolution from a requested error bound and checks
+it against the exact function; `get_table()` caches built tables by key.
+
+Non-obvious things:
+- Coefficients are in the interval-local variable u=(x-x_i)/dx:
+  y = c0 + u*(c1 + u*(c2 + u*c3)), dy/dx = (c1 + u*(2c2 + 3u*c3))/dx,
+  so the kernel needs one multiply-add chain and no division.
+- `tabpar = (x0, 1/dx, n, x1)` is passed by value next to the buffer.
+  Below x0 the table is clamped to the first knot, beyond x1 it returns
+  (0,0): x1 acts as the cutoff and the caller is responsible for choosing a
+  function that is negligible there.
+- Errors are |approx-exact|/max(1,|exact|): absolute where the function is
+  O(1) or smaller, relative where it is large (e.g. exp(-b*x) at x<0).
+- Hermite error scales as dx^4 for y but dx^3 for dy/dx, so the force
+  tolerance usually decides the resolution.
+- OpenCL `__constant` memory is typically 64 KB, i.e. at most 4096 float4
+  intervals (`NMAX_CONSTANT`); `build_table()` refuses to go beyond `nmax`.
+- The measured error is for the float64 coefficients; the float32 upload
+  adds ~1e-7 relative rounding on top (`err_f32` reports it).
+- Morse tables tabulate only p(x)=exp(-b*x), x=r-R0, so one table serves
+  all pair parameters R0,E0 of a given b (mixed per pair in the kernel).
+"""
+
+import numpy as np
+
+NMAX_CONSTANT = 4096   # 64 KB of __constant memory / sizeof(float4)
+
+class RadialTable:
+    """
+    Piecewise cubic-Hermite interpolant on a uniform grid.
+
+    Attributes:
+        coefs  (float64[n,4]): Horner coefficients (c0,c1,c2,c3) per interval
+        x0, x1 (float):        tabulated range, x1 is the cutoff
+        n      (int):          number of intervals
+        err    (tuple):        measured (error of y, error of dy/dx) vs the exact function, or None
+    """
+
+    def __init__(self, coefs, x0, x1, err=None, err_f32=None):
+        self.coefs   = np.ascontiguousarray(coefs, dtype=np.float64).reshape(-1, 4)
+        self.n       = len(self.coefs)
+        self.x0      = float(x0)
+        self.x1      = float(x1)
+        self.dx      = (self.x1 - self.x0) / self.n
+        self.inv_dx  = 1.0 / self.dx
+        self.err     = err
+        self.err_f32 = err_f32
+        self._coefs32 = None
+        self._cols    = np.ascontiguousarray(self.coefs.T)
+        self._cols32  = None
+
+    @classmethod
+    def from_samples(cls, x0, x1, ys, dys):
+        """Build from function values ys[n+1] and derivatives dys[n+1] at the knots."""
+        ys = np.asarray(ys, dtype=np.float64); dys = np.asarray(dys, dtype=np.float64)
+        dx = (x1 - x0) / (len(ys) - 1)
+        y0, y1 = ys[:-1], ys[1:]
+        d0, d1 = dys[:-1] * dx, dys[1:] * dx
+        coefs = np.stack([y0, d0, 3 * (y1 - y0) - 2 * d0 - d1, 2 * (y0 - y1) + d0 + d1], axis=-1)
+        return cls(coefs, x0, x1)
+
+    @classmethod
+    def from_func(cls, func, x0, x1, n, h=None):
+        """Tabulate func(x) -> (y, dy/dx); if func returns only y, dy/dx is taken by central differences with step h."""
+        xs = np.linspace(x0, x1, n + 1)
+        ys, dys = _eval_func(func, xs, h)
+        return cls.from_samples(x0, x1, ys, dys)
+
+    @property
+    def tabpar(self):
+        """float4 (x0, 1/dx, n, x1) passed to the kernel next to the coefficient buffer."""
+        return np.array([self.x0, self.inv_dx, self.n, self.x1], dtype=np.float32)
+
+    def cl_buffer(self):
+        """Coefficients as contiguous float32[n,4], ready for a __constant float4* buffer."""
+        if self._coefs32 is None:
+            self._coefs32 = np.ascontiguousarray(self.coefs, dtype=np.float32)
+        return self._coefs32
+
+    @property
+    def nbytes(self):
+        return self.n * 16
+
+    def eval(self, x, bFloat32=False):
+        """Interpolated (y, dy/dx) at x; bFloat32 evaluates the uploaded float32 coefficients."""
+        x = np.asarray(x, dtype=np.float64)
+        if bFloat32:
+            if self._cols32 is None: self._cols32 = np.ascontiguousarray(self.cl_buffer().T)
+            cols = self._cols32
+        else:
+            cols = self._cols
+        t = (x - self.x0) * self.inv_dx
+        t = np.maximum(t, 0.0)
+        i = np.minimum(t.astype(np.intp), self.n - 1)
+        u = t - i
+        c0, c1, c2, c3 = (np.take(c, i) for c in cols)   # column gathers are ~2x faster than coefs[i]
+        y  = c0 + u * (c1 + u * (c2 + u * c3))
+        dy = (c1 + u * (2 * c2 + 3 * u * c3)) * self.inv_dx
+        out = x > self.x1
+        if np.any(out):
+            y = np.where(out, 0.0, y); dy = np.where(out, 0.0, dy)
+        return y, dy
+
+    def measure_error(self, func, nsub=16, h=None):
+        """Max error of y and dy/dx on `nsub` points per interval (knots excluded). Stores and returns it."""
+        u  = (np.arange(nsub) + 0.5) / nsub
+        xs = (self.x0 + (np.arange(self.n)[:, None] + u[None, :]) * self.dx).ravel()
+        y_ref, dy_ref = _eval_func(func, xs, h)
+        wy = 1.0 / np.maximum(1.0, np.abs(y_ref)); wdy = 1.0 / np.maximum(1.0, np.abs(dy_ref))
+        y,  dy  = self.eval(xs)
+        self.err = (float(np.max(np.abs(y - y_ref) * wy)), float(np.max(np.abs(dy - dy_ref) * wdy)))
+        y,  dy  = self.eval(xs, bFloat32=True)
+        self.err_f32 = (float(np.max(np.abs(y - y_ref) * wy)), float(np.max(np.abs(dy - dy_ref) * wdy)))
+        return self.err
+
+    def __repr__(self):
+        return f"RadialTable(n={self.n}, x=[{self.x0},{self.x1}], dx={self.dx:.3e}, err={self.err}, {self.nbytes} bytes)"
+
+def _eval_func(func, xs, h=None):
+    res = func(xs)
+    if isinstance(res, tuple):
+        return np.asarray(res[0], dtype=np.float64), np.asarray(res[1], dtype=np.float64)
+    if h is None: h = 1e-5 * max(1.0, float(np.max(np.abs(xs))))
+    dys = (np.asarray(func(xs + h)) - np.asarray(func(xs - h))) / (2 * h)
+    return np.asarray(res, dtype=np.float64), dys
+
+def build_table(func, x0, x1, n=None, tol=1e-6, dtol=None, n0=64, nmax=NMAX_CONSTANT, h=None, bPrint=False):
+    """
+    Tabulate func on [x0,x1] with a fixed `n`, or refine until the measured error
+    meets `tol` for y and `dtol` (default: tol) for dy/dx.
+
+    Raises ValueError if the bound is not reached within `nmax` intervals.
+    """
+    if n is not None:
+        table = RadialTable.from_func(func, x0, x1, n, h=h)
+        table.measure_error(func, h=h)
+        return table
+    if dtol is None: dtol = tol
+    n = n0
+    while True:
+        table = RadialTable.from_func(func, x0, x1, n, h=h)
+        ey, edy = table.measure_error(func, h=h)
+        if bPrint: print(f"build_table() n={n:6d} err_y={ey:.3e} err_dy={edy:.3e} (tol {tol:.1e}, dtol {dtol:.1e})")
+        if ey <= tol and edy <= dtol: return table
+        if n >= nmax:
+            raise ValueError(f"build_table(): error ({ey:.3e},{edy:.3e}) > ({tol:.1e},{dtol:.1e}) with n={n} = nmax intervals on [{x0},{x1}]")
+        scale = max((ey / tol) ** 0.25, (edy / dtol) ** (1.0 / 3.0))   # Hermite: y ~ dx^4, dy ~ dx^3
+        n = min(nmax, max(n + 1, int(np.ceil(n * scale * 1.1))))
+
+# ========== Table cache
+
+_cache = {}
+
+def get_table(key, func, x0, x1, n=None, tol=1e-6, dtol=None, **kwargs):
+    """Build a table once per (key, range, resolution/tolerance) and return the cached instance afterwards."""
+    ckey = (key, float(x0), float(x1), n, tol, dtol)
+    table = _cache.get(ckey)
+    if table is None:
+        table = build_table(func, x0, x1, n=n, tol=tol, dtol=dtol, **kwargs)
+        _cache[ckey] = table
+    return table
+
+def clear_cache():
+    _cache.clear()
+
+# ========== Morse potential through a tabulated exp(-b*x)
+
+def morse_exp_func(b):
+    """p(x)=exp(-b*x) and dp/dx, the only transcendental part of the Morse potential."""
+    def func(x):
+        p = np.exp(-b * x)
+        return p, -b * p
+    return func
+
+def morse_exp_table(b, Rc, R0min=0.0, R0max=4.0, n=None, tol=1e-6, dtol=None, **kwargs):
+    """
+    Cached table of exp(-b*x) covering x = r - R0 for r in [0,Rc] and R0 in [R0min,R0max].
+
+    The x range is [-R0max, Rc-R0min]; E0 and R0 are applied per pair by eval_Morse_tab()/getMorse_tab().
+    """
+    return get_table(("Morse_exp", float(b)), morse_exp_func(b), -R0max, Rc - R0min, n=n, tol=tol, dtol=dtol, **kwargs)
+
+def eval_Morse_tab(rs, R0, E0, table):
+    """Morse energy and radial force F=-dE/dr from a morse_exp_table() (same convention as eval_Morse_exact)."""
+    p, dp = table.eval(np.asarray(rs) - R0)
+    E =        E0 * p * (p - 2.0)
+    F = -2.0 * E0 *     (p - 1.0) * dp
+    return E, F
@@ -78,7 +78,7 @@ class MockPaperDB:
     def ingest_all(self, llm_config=None):
         return {"ingested": 42}
 
-    def search(self, query, required_tags=None, preferred_tags=None, excluded_tags=None, year_range=None, limit=20, explain=False):
+    def search(self, query, required_tags=None, preferred_tags=None, excluded_tags=None, year_range=None, limit=20, explain=False, mode="lexical", embedder=None):
         import copy
         results = copy.deepcopy(MOCK_PAPERS[:limit])
         if not explain:
@@ -86,11 +86,18 @@ class MockPaperDB:
                 r.pop("match_reason", None)
         return results
 
-    def retrieve_context(self, query, token_budget=24000, include=None, filters=None, save=False):
+    def retrieve_context(self, query, token_budget=24000, include=None, filters=None, save=False, tokenizer=None):
         result = dict(MOCK_CONTEXT)
         if save: result["id"] = 1
         return result
 
+    def retrieve_context_stream(self, query, token_budget=24000, include=None, filters=None, save=False, tokenizer=None, pack=None):
+        content = MOCK_CONTEXT["content"]
+        for i0 in range(0, len(content), 40):
+            yield content[i0:i0 + 40]
+        if pack is not None:
+            pack.query, pack.paper_count, pack.token_estimate, pack.selected_units_json = query, 1, len(content) // 4, "[7]"
+
     def get_paper(self, id_or_key_or_doi):
         if id_or_key_or_doi in self._papers: return dict(self._papers[id_or_key_or_doi])
         try: return dict(self._papers_by_id[int(id_or_key_or_doi)])
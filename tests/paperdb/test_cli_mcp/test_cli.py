@@ -122,6 +122,11 @@ def test_context_out(tmp_path):
     content = out_file.read_text()
     assert "Context Pack" in content
 
+def test_context_streams_to_stdout():
+    result = runner.invoke(app, ["context", "XPBD constraint solving"])
+    assert result.exit_code == 0
+    assert "## Paper 1: Macklin_2016_XPBD" in result.output and "## Bibliography" in result.output
+
 # ── Error handling ────────────────────────────────────────────────────────────
 def test_ingest_no_args():
     result = runner.invoke(app, ["ingest"])
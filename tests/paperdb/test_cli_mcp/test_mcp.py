@@ -11,7 +11,7 @@ from paperdb import mcp as mcp_module
 # ── Tool existence ────────────────────────────────────────────────────────────
 DISCOVERY_TOOLS = ["search_papers", "find_methods", "find_equations", "compare_methods", "build_topic_review"]
 INSPECTION_TOOLS = ["get_paper", "get_paper_markdown", "get_paper_methods", "get_paper_equations", "get_related_papers", "explain_paper_match"]
-CONTEXT_TOOLS = ["retrieve_context"]
+CONTEXT_TOOLS = ["retrieve_context", "stream_context"]
 TAXONOMY_TOOLS = ["list_tags", "list_tag_aliases"]
 MUTATING_TOOLS = ["ingest_pdf", "reprocess_document", "merge_tags"]
 
@@ -1,5 +1,6 @@
 """Test MCP retrieve_context tool — the central output for LLM agents."""
 import sys
+import inspect
 import json
 import pytest
 
@@ -56,6 +57,22 @@ def test_retrieve_context_content_has_bibliography():
     result = json.loads(mcp_module.retrieve_context("XPBD"))
     assert "Bibliography" in result["content"] or "bibliography" in result["content"].lower()
 
+def test_stream_context_sends_pieces():
+    """stream_context logs every piece as it is produced and returns only the metadata; it writes no files."""
+    import asyncio
+    class Ctx:
+        def __init__(self): self.logs, self.progress = [], []
+        async def log(self, message, level=None, logger_name=None, extra=None): self.logs.append((logger_name, message))
+        async def report_progress(self, progress, total=None, message=None): self.progress.append(progress)
+    mcp_module._db = MockPaperDB()
+    ctx = Ctx()
+    result = json.loads(asyncio.run(mcp_module.stream_context("XPBD", ctx)))
+    streamed = "".join(message for _, message in ctx.logs)
+    assert "Context Pack" in streamed and "content" not in result and "out_path" not in result
+    assert "out_path" not in inspect.signature(mcp_module.stream_context).parameters
+    assert len(ctx.logs) > 1 and ctx.progress == list(range(1, len(ctx.logs) + 1))
+    assert result["paper_count"] == 1 and result["selected_units"] == [7] and result["chars"] == len(streamed)
+
 def test_context_resource():
     """The paperdb://context/{id} resource should return a saved context pack."""
     mcp_module._db = MockPaperDB()
@@ -231,6 +231,79 @@ def test_markdown_reprocessing_does_not_require_original_pdf(tmp_path):
     conn.close()
 
 
+SECTIONED_MD = """# Paper
+
+## Model
+
+The energy is
+
+$$E = k x^2 (1)$$
+
+where k is the stiffness.
+
+## Algorithm 1: Relax
+
+1. Initialize x
+2. Update x
+
+## Results
+
+Convergence in 10 steps.
+
+$$r = b - A x (2)$$
+"""
+
+
+def test_incremental_section_reingest(tmp_path):
+    from paperdb.db.connection import get_connection, init_schema
+    from paperdb.db.repository import Repository
+    from paperdb.ingest.pipeline import ingest_paper
+    conn = get_connection(tmp_path / "sections.db")
+    init_schema(conn)
+    repo = Repository(conn)
+    markdown_path = tmp_path / "sections.md"
+    markdown_path.write_text(SECTIONED_MD)
+    pid = repo.upsert_paper(Paper(paper_key="Sections_2026_Incremental", title="Sections", markdown_path=str(markdown_path)))
+    ops = ["equations", "methods", "search_units"]
+    first = ingest_paper(pid, repo, operations=ops, llm_config=False, data_dir=str(tmp_path / "papers"))
+    assert first["errors"] == [] and {"equations", "methods", "search_units"}.issubset(first["operations_run"])
+    su_run1 = repo.get_current_run(pid, "search_units")
+    units1 = {u.id: u for u in repo.get_search_units_for_paper(pid)}
+    model_eq1 = next(e for e in repo.get_equations_for_paper(pid) if "k x^2" in e.latex_raw)
+
+    # reflowing whitespace changes the file bytes but no section hash: LLM/method inputs stay equivalent
+    markdown_path.write_text(SECTIONED_MD.replace("Convergence in 10 steps.", "Convergence  in 10\nsteps."))
+    reflow = ingest_paper(pid, repo, operations=["methods"], llm_config=False, data_dir=str(tmp_path / "papers"))
+    assert reflow["operations_skipped"] == ["methods"]
+
+    markdown_path.write_text(SECTIONED_MD.replace("$$r = b - A x (2)$$", "$$r = b - A x - c (2)$$"))
+    second = ingest_paper(pid, repo, operations=ops, llm_config=False, data_dir=str(tmp_path / "papers"))
+    assert second["errors"] == [] and {"equations", "methods", "search_units"}.issubset(second["operations_run"])
+
+    eq_run2 = repo.get_current_run(pid, "equations")
+    su_run2 = repo.get_current_run(pid, "search_units")
+    # only search-unit re-indexing skips unchanged sections; whole-text operations record hashes without reuse
+    reused = {s.section_key: s.reused_from_run_id for s in repo.get_run_sections(su_run2.id)}
+    assert reused["source:Paper > Model"] == su_run1.id and reused["source:Results"] is None
+    for operation in ("equations", "methods"):
+        rows = repo.get_run_sections(repo.get_current_run(pid, operation).id)
+        assert rows and all(s.reused_from_run_id is None for s in rows)
+    equations = repo.get_equations_for_paper(pid)
+    assert sorted(e.equation_number for e in equations) == ["1", "2"] and all(e.run_id == eq_run2.id for e in equations)
+    model_eq2 = next(e for e in equations if "k x^2" in e.latex_raw)
+    assert model_eq2.id != model_eq1.id
+    assert [v.symbol for v in repo.get_variables_for_equation(model_eq2.id)] == [v.symbol for v in repo.get_variables_for_equation(model_eq1.id)]
+    assert any("c" in e.latex_normalized for e in equations if e.equation_number == "2")
+
+    units2 = {u.id: u for u in repo.get_search_units_for_paper(pid)}
+    kept = [u for uid, u in units2.items() if uid in units1 and u.source_type == "section"]
+    assert kept and all(u.section_key != "source:Results" for u in kept)
+    assert any(u.section_key == "source:Results" and uid not in units1 for uid, u in units2.items())
+    assert sum("b - A x - c" in (u.content or "") for u in units2.values()) >= 1
+    assert not any("b - A x (2)" in (u.content or "") for u in units2.values())
+    conn.close()
+
+
 if __name__ == "__main__":
     test_atomic_write()
     test_atomic_write_json()
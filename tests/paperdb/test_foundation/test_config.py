@@ -0,0 +1,78 @@
+"""Test LLM template resolution: parse-once cache, mtime invalidation, client pooling."""
+import os
+
+import pytest
+
+import paperdb.config as config
+from paperdb.ingest.jobs import _model_name
+
+TOML_V1 = """
+[alpha]
+model_name  = "alpha-model"
+api_key_var = "any"
+provider    = "openai"
+
+[beta]
+model_name  = "beta-model"
+api_key_var = "any"
+"""
+
+
+@pytest.fixture
+def llms_toml(tmp_path, monkeypatch):
+    path = tmp_path / "LLMs.toml"
+    path.write_text(TOML_V1)
+    monkeypatch.setattr(config, "_get_llms_toml_path", lambda: path)
+    monkeypatch.delenv("PAPERDB_LLM", raising=False)
+    config.llm_templates.clear()
+    yield path
+    config.llm_templates.clear()
+
+
+def test_parsed_once_across_lookups(llms_toml):
+    parses = config.llm_templates.stats["parses"]
+    for _ in range(1000):
+        assert config.get_llm_config("beta")["model_name"] == "beta-model"
+        assert _model_name({"template_name": "alpha"}) == "alpha-model"
+    assert config.get_llm_config()["model_name"] == "alpha-model"      # default = first template
+    assert config.llm_templates.stats["parses"] == parses + 1
+
+
+def test_reparsed_when_file_changes(llms_toml):
+    assert _model_name("alpha") == "alpha-model"
+    llms_toml.write_text(TOML_V1.replace("alpha-model", "alpha-model-v2"))
+    st = os.stat(llms_toml)
+    os.utime(llms_toml, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))   # coarse-mtime filesystems
+    assert _model_name("alpha") == "alpha-model-v2"
+
+
+def test_unknown_key_and_copies(llms_toml):
+    with pytest.raises(ValueError, match="Available: alpha, beta"):
+        config.get_llm_config("gamma")
+    cfg = config.get_llm_config("alpha")
+    cfg["model_name"] = "mutated"
+    assert config.get_llm_config("alpha")["model_name"] == "alpha-model"
+
+
+def test_client_pool(llms_toml):
+    made = []
+    def factory():
+        made.append(object())
+        return made[-1]
+    c1 = config.llm_templates.get_client(("openai", "http://x/v1", "k"), factory)
+    c2 = config.llm_templates.get_client(("openai", "http://x/v1", "k"), factory)
+    c3 = config.llm_templates.get_client(("openai", "http://y/v1", "k"), factory)
+    assert c1 is c2 and c1 is not c3 and len(made) == 2
+
+
+def test_agents_share_template_and_client():
+    pytest.importorskip("openai")
+    from pyCruncher import llm_templates
+    from pyCruncher.AgentOpenAI import AgentOpenAI
+    a1 = AgentOpenAI("fzu-llama-8b")
+    parses = llm_templates.stats["parses"]
+    a2 = AgentOpenAI("fzu-llama-8b")
+    assert llm_templates.stats["parses"] == parses
+    assert a1.client is a2.client and a1.session is a2.session
+    a2.history.append({"role": "user", "content": "hi"})
+    assert a1.history == []
@@ -280,6 +280,12 @@ class MockRepository:
         rows = self.conn.execute("SELECT id FROM papers ORDER BY id LIMIT ? OFFSET ?", (limit, offset)).fetchall()
         return [self.get_paper(row[0]) for row in rows]
 
+    def get_all_tags(self):
+        return [dict(row) for row in self.conn.execute("SELECT * FROM tags ORDER BY id").fetchall()]
+
+    def list_tag_aliases(self):
+        return [dict(row) for row in self.conn.execute("SELECT * FROM tag_aliases ORDER BY rowid").fetchall()]
+
     def get_active_summary(self, paper_id):
         from types import SimpleNamespace
         row = self.conn.execute("SELECT * FROM summaries WHERE paper_id=? AND is_active=1 ORDER BY id DESC LIMIT 1", (paper_id,)).fetchone()
@@ -294,6 +300,26 @@ class MockRepository:
     def get_methods_for_paper(self, paper_id):
         return [dict(row) for row in self.conn.execute("SELECT * FROM methods WHERE paper_id=? ORDER BY id", (paper_id,)).fetchall()]
 
+    def _by_paper(self, table, paper_ids):
+        out = {}
+        for row in self.conn.execute(f"SELECT * FROM {table} WHERE paper_id IN ({','.join('?' * len(paper_ids))}) ORDER BY id", list(paper_ids)).fetchall():
+            out.setdefault(row['paper_id'], []).append(dict(row))
+        return out
+
+    def get_active_summaries(self, paper_ids):
+        from types import SimpleNamespace
+        return {pid: SimpleNamespace(**[s for s in rows if s['is_active']][-1])
+                for pid, rows in self._by_paper("summaries", paper_ids).items() if any(s['is_active'] for s in rows)}
+
+    def get_equations_for_papers(self, paper_ids):
+        return self._by_paper("equations", paper_ids)
+
+    def get_variables_for_equations(self, equation_ids):
+        return {}
+
+    def get_methods_for_papers(self, paper_ids):
+        return self._by_paper("methods", paper_ids)
+
     def replace_search_units(self, paper_id, units):
         """Transactional delete+insert of search units for a paper."""
         self.conn.execute("BEGIN")
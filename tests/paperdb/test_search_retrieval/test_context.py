@@ -128,6 +128,112 @@ def test_context_pack_score_in_output():
     print("✓ test_context_pack_score_in_output passed")
 
 
+
+def test_context_pack_knapsack_prefers_dense_blocks():
+    """A huge top-ranked summary does not crowd out the evidence of the other papers."""
+    conn, repo = create_test_db()
+    big = insert_test_paper(repo, "Big_2020", title="Ewald summation", year=2020)
+    insert_test_summary(repo, big, "Ewald " * 2000)
+    for i in range(4):
+        pid = insert_test_paper(repo, f"Small_{i}_2020", title="Ewald summation", year=2020)
+        insert_test_summary(repo, pid, f"Short summary {i} of the Ewald method.")
+    pack = assemble_context_pack("Ewald", repo, token_budget=1500, include=["summary"])
+    assert pack.paper_count == 4 and "Big_2020" not in pack.content
+    assert all(f"Short summary {i}" in pack.content for i in range(4))
+    assert pack.token_estimate <= 1500 and len(pack.content) <= 1500 * 4
+
+
+def test_context_pack_pluggable_tokenizer():
+    """Budget is measured with the given tokenizer; unknown specs fail loudly."""
+    from paperdb.search.packing import count_tokens, make_tokenizer
+    conn, repo = create_test_db()
+    for i in range(6):
+        pid = insert_test_paper(repo, f"Paper_{i}_2020", title="Ewald summation", year=2020)
+        insert_test_summary(repo, pid, "word " * 60)
+    words = lambda text: len(text.split())
+    pack = assemble_context_pack("Ewald", repo, token_budget=250, include=["summary"], tokenizer=words)
+    assert 0 < pack.paper_count < 6 and words(pack.content) <= 250
+    assert make_tokenizer("chars:2")("abcde") == 3 and count_tokens("abcde", make_tokenizer()) == 2
+    try:
+        make_tokenizer("bpe")
+        assert False, "expected ValueError"
+    except ValueError as exc:
+        assert "Unknown tokenizer" in str(exc)
+
+
+def test_context_pack_prefetches_evidence(tmp_path):
+    """Evidence for all candidate papers comes from a constant number of bulk queries."""
+    from paperdb.db.connection import get_connection, init_schema
+    from paperdb.db.models import Paper
+    from paperdb.db.repository import Repository
+    conn = get_connection(tmp_path / "context.db")
+    init_schema(conn)
+    repo = Repository(conn)
+    for i in range(30):
+        bib = tmp_path / f"P{i}.bib"
+        bib.write_text(f"@article{{P{i}_2020, title={{Ewald {i}}}}}")
+        pid = repo.upsert_paper(Paper(paper_key=f"P{i}_2020", title=f"Ewald summation {i}", year=2020, bibtex_path=str(bib)))
+        repo.add_summary(paper_id=pid, content=f"Summary {i} of Ewald.")
+        eq = repo.upsert_equation(paper_id=pid, latex_raw=f"E_{i} = q^2/r")
+        repo.add_variable(equation_id=eq, symbol="q", meaning=f"charge {i}")
+        repo.upsert_method(paper_id=pid, name=f"Method {i}", complexity="O(n log n)")
+    statements = []
+    conn.set_trace_callback(statements.append)
+    pack = assemble_context_pack("Ewald", repo, token_budget=24000)
+    conn.set_trace_callback(None)
+    evidence = [s for s in statements if any(t in s for t in ("FROM summaries", "FROM equations", "FROM equation_variables", "FROM methods"))]
+    assert pack.paper_count == 30 and len(evidence) == 4
+    assert "charge 7" in pack.content and "@article{P7_2020" in pack.content and "| Method 7 |" in pack.content
+    conn.close()
+
+
+def test_read_bibtex_cached_until_changed(tmp_path):
+    import os
+    from paperdb.search.context import read_bibtex
+    bib = tmp_path / "a.bib"
+    bib.write_text("@article{a, title={One}}\n")
+    assert read_bibtex(bib) == "@article{a, title={One}}" and read_bibtex(tmp_path / "missing.bib") is None
+    bib.write_text("@article{a, title={Two!}}\n")
+    st = os.stat(bib)
+    os.utime(bib, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert read_bibtex(bib) == "@article{a, title={Two!}}"
+
+
+def test_context_pack_stream(tmp_path):
+    """The stream starts with the header, reads Markdown in chunks and joins to the non-streamed pack."""
+    from paperdb.search.context import ContextPack, _FileText, assemble_context_pack_stream
+    conn, repo = create_test_db()
+    md = tmp_path / "paper.md"
+    md.write_text("Ewald summation derivation.\n" * 5000)
+    for i in range(3):
+        pid = insert_test_paper(repo, f"Paper_{i}_2020", title="Ewald summation", year=2020)
+        insert_test_summary(repo, pid, f"Summary {i}")
+    repo.conn.execute("UPDATE papers SET markdown_path=? WHERE paper_key='Paper_0_2020'", (str(md),))
+    include = ["summary", "markdown"]
+    stream = assemble_context_pack_stream("Ewald", repo, token_budget=40000, include=include, pack=(meta := ContextPack()))
+    assert next(stream) == "# Context pack: Ewald\n\n"
+    pieces = ["# Context pack: Ewald\n\n", *stream]
+    pack = assemble_context_pack("Ewald", repo, token_budget=40000, include=include)
+    assert "".join(pieces) == pack.content and meta.paper_count == pack.paper_count == 3
+    assert max(len(p) for p in pieces) <= _FileText.CHUNK_CHARS < md.stat().st_size
+    assert pack.token_estimate <= meta.token_estimate <= 40000
+
+
+def test_file_tokens_streamed(tmp_path):
+    """File token counts are taken chunk by chunk and match counting the whole text."""
+    from paperdb.search.context import _FileText, _file_tokens
+    from paperdb.search.packing import CharTokenizer
+    md = tmp_path / "paper.md"
+    text = "Ewald summation dérivation of the lattice sum.\n" * 5000
+    md.write_text(text, encoding="utf-8")
+    assert len(text) > 2 * _FileText.CHUNK_CHARS
+    st = os.stat(md)
+    chars = CharTokenizer(3.5)
+    assert _file_tokens(str(md), st.st_mtime_ns, st.st_size, chars) == chars(text)
+    words = lambda t: len(t.split())                          # no name: not cached, cut at line ends
+    assert _file_tokens(str(md), st.st_mtime_ns, st.st_size, words) == words(text)
+
+
 if __name__ == "__main__":
     test_context_pack_basic()
     test_context_pack_multiple_papers()
@@ -137,4 +243,6 @@ if __name__ == "__main__":
     test_context_pack_include_filter()
     test_context_pack_filters()
     test_context_pack_score_in_output()
+    test_context_pack_knapsack_prefers_dense_blocks()
+    test_context_pack_pluggable_tokenizer()
     print("\n✅ All context pack tests passed!")
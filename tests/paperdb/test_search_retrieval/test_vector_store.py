@@ -0,0 +1,131 @@
+"""Tests for the memory-mapped int8 vector store and its use by vector_search."""
+
+import numpy as np
+import pytest
+
+from paperdb.db.connection import get_connection, init_schema
+from paperdb.db.models import Paper
+from paperdb.db.repository import Repository
+from paperdb.search.fts import SearchUnit
+from paperdb.search.vector_store import VectorStore, quantize, store_dir
+from paperdb.search.vectors import (HashingEmbedder, compact_vector_store, embed_search_units, exact_search,
+                                    vector_search)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    conn = get_connection(tmp_path / "vectors.db")
+    init_schema(conn)
+    yield Repository(conn)
+    conn.close()
+
+
+def _unit_vectors(n=2000, dim=48, seed=3):
+    m = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+
+def test_quantize_is_close():
+    m = _unit_vectors()
+    q, scale = quantize(m)
+    assert q.dtype == np.int8 and scale.shape == (len(m),)
+    assert np.abs(q * scale[:, None] - m).max() <= scale.max() / 2 + 1e-7
+    q0, s0 = quantize(np.zeros((1, 4)))
+    assert not q0.any() and s0[0] == 1.0
+
+
+def test_append_tombstone_compact(tmp_path):
+    m = _unit_vectors(n=100)
+    store = VectorStore(tmp_path / "s", dim=m.shape[1])
+    store.append(np.arange(100), m)
+    store.append([5, 6], m[[50, 51]])                       # re-embedding supersedes the old rows
+    assert store.count == 102 and store.live_count() == 100
+    assert store.tombstone([7]) == 1 and store.retain(np.arange(90)) == 10
+    assert VectorStore(tmp_path / "s").live_count() == 89  # state survives reopening
+
+    hits = store.search(m[50], k=2)
+    assert {uid for uid, _ in hits} == {5, 50}
+    assert store.compact() == {"before": 102, "after": 89}
+    assert store.count == 89 and store.live_count() == 89
+    assert {uid for uid, _ in store.search(m[50], k=2)} == {5, 50}
+    assert all(uid != 7 for uid, _ in store.search(m[7], k=89))
+    with pytest.raises(ValueError, match="expected vectors of shape"):
+        store.append([1], m[:2])
+
+
+def test_interrupted_append_is_ignored(tmp_path):
+    m = _unit_vectors(n=10)
+    store = VectorStore(tmp_path / "s", dim=m.shape[1])
+    store.append(np.arange(5), m[:5])
+    with open(tmp_path / "s" / "q.i8", "ab") as f:          # data written, meta.json never updated
+        f.write(b"\x01" * 3 * m.shape[1])
+    store = VectorStore(tmp_path / "s")
+    assert store.count == 5
+    store.append(np.arange(5, 10), m[5:])
+    assert [uid for uid, _ in store.search(m[8], k=1)] == [8]
+    assert (tmp_path / "s" / "q.i8").stat().st_size == 10 * m.shape[1]
+
+
+def test_search_matches_exact(tmp_path):
+    m = _unit_vectors()
+    store = VectorStore(tmp_path / "s", dim=m.shape[1], keep_float=True)
+    store.append(np.arange(len(m)) + 1000, m)
+    q = m[17] + 0.3 * m[99]
+    ref_rows, ref_scores = exact_search(m, q, k=10)
+    hits = store.search(q, k=10, block=256)                  # re-ranked with the float copy: exact
+    assert [uid - 1000 for uid, _ in hits] == list(ref_rows)
+    assert np.allclose([s for _, s in hits], ref_scores, atol=1e-5)
+    approx = store.search(q, k=10, rerank=False, block=256)
+    assert approx[0][0] == hits[0][0] and abs(approx[0][1] - hits[0][1]) < 2e-2
+
+
+def test_memmap_backed_vector_search(repo):
+    pid = repo.upsert_paper(Paper(paper_key="A_2020", title="Untitled"))
+    units = [("Intro", "molecular dynamics of water"), ("Method", "verlet integration of the equations of motion")]
+    repo.replace_search_units(pid, [SearchUnit(unit_type="section", source_type="section", section_path=p,
+                                               section_key=f"source:{p}", content=t) for p, t in units])
+    emb = HashingEmbedder(64)
+    embed_search_units(repo, emb)                            # SQLite blobs first ...
+    assert embed_search_units(repo, emb, store="memmap")["embedded"] == 0
+    store = VectorStore(store_dir(repo, emb.name))           # ... migrated into the store on first use
+    assert store.live_count() == 2 and repo.get_unit_embeddings(emb.name) == []
+    assert vector_search("verlet integration", repo, k=1, embedder=emb)[0]["section_path"] == "Method"
+
+    # rebuilding a section deletes its unit; the store tombstones it on the next search
+    repo.replace_search_units(pid, [SearchUnit(unit_type="section", source_type="section", section_path="Method",
+                                               section_key="source:Method", content="leapfrog scheme")],
+                              keep_sections=["source:Intro"])
+    assert embed_search_units(repo, emb)["embedded"] == 1    # an existing store stays the default
+    hits = vector_search("leapfrog scheme", repo, k=5, embedder=emb)
+    assert hits[0]["content"] == "leapfrog scheme" and len(hits) == 2
+    assert compact_vector_store(repo, emb) == {"before": 3, "after": 2}
+    assert vector_search("leapfrog scheme", repo, k=1, embedder=emb)[0]["content"] == "leapfrog scheme"
+
+
+def test_forced_reembed_refreshes_cached_index(repo):
+    """force=True replaces the store rows of the same unit ids; the cached index must see the new rows."""
+    pid = repo.upsert_paper(Paper(paper_key="B_2021", title="Untitled"))
+    units = [("Intro", "molecular dynamics of water"), ("Method", "verlet integration"), ("Results", "diffusion coefficient")]
+    repo.replace_search_units(pid, [SearchUnit(unit_type="section", source_type="section", section_path=p,
+                                               section_key=f"source:{p}", content=t) for p, t in units])
+    emb = HashingEmbedder(64)
+    embed_search_units(repo, emb, store="memmap")
+    before = vector_search("verlet integration", repo, k=3, embedder=emb)
+    assert len(before) == 3 and before[0]["section_path"] == "Method"
+    assert embed_search_units(repo, emb, store="memmap", force=True)["embedded"] == 3
+    after = vector_search("verlet integration", repo, k=3, embedder=emb)
+    assert [(h["unit_id"], round(h["score"], 4)) for h in after] == [(h["unit_id"], round(h["score"], 4)) for h in before]
+    assert VectorStore(store_dir(repo, emb.name)).count == 6
+
+
+def test_store_exact_search(tmp_path):
+    m = _unit_vectors(n=500)
+    store = VectorStore(tmp_path / "s", dim=m.shape[1], keep_float=True)
+    store.append(np.arange(len(m)), m)
+    ref_rows, ref_scores = exact_search(m, m[3], k=5)
+    hits = store.search(m[3], k=5, exact=True, block=64)
+    assert [uid for uid, _ in hits] == list(ref_rows) and np.allclose([s for _, s in hits], ref_scores, atol=1e-6)
+    int8_only = VectorStore(tmp_path / "q", dim=m.shape[1])
+    int8_only.append(np.arange(len(m)), m)
+    with pytest.raises(ValueError, match="keep_float"):
+        int8_only.search(m[3], k=5, exact=True)
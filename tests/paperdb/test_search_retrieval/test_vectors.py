@@ -0,0 +1,103 @@
+"""Tests for embedding retrieval: search kernels, incremental embedding, hybrid ranking."""
+
+import numpy as np
+import pytest
+
+from paperdb.db.connection import get_connection, init_schema
+from paperdb.db.models import Paper
+from paperdb.db.repository import Repository
+from paperdb.search.fts import SearchUnit
+from paperdb.search.ranking import search
+from paperdb.search.vectors import (HashingEmbedder, IVFIndex, embed_search_units, exact_search,
+                                    make_embedder, vector_search)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    conn = get_connection(tmp_path / "vectors.db")
+    init_schema(conn)
+    yield Repository(conn)
+    conn.close()
+
+
+def _paper(repo, key, units):
+    pid = repo.upsert_paper(Paper(paper_key=key, title="Untitled"))
+    repo.replace_search_units(pid, [SearchUnit(unit_type="section", source_type="section", section_path=path,
+                                               section_key=f"source:{path}", content=text) for path, text in units])
+    return pid
+
+
+def _unit_vectors(n=3000, dim=32, seed=1):
+    m = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+
+def test_exact_search_blocked_matches_full_sort():
+    m = _unit_vectors()
+    q = m[17] + 0.1 * m[99]
+    rows, scores = exact_search(m, q, k=25, block=128)
+    ref = np.argsort(-(m @ q))[:25]
+    assert list(rows) == list(ref) and np.allclose(scores, (m @ q)[ref])
+
+
+def test_ivf_all_lists_equals_exact():
+    m = _unit_vectors()
+    ivf = IVFIndex(m, nlist=16, niter=5)
+    assert ivf.offsets[-1] == len(m)
+    q = m[5]
+    rows, _ = ivf.search(m, q, k=10, nprobe=16)
+    assert list(rows) == list(exact_search(m, q, k=10)[0])
+    assert ivf.search(m, q, k=1, nprobe=2)[0][0] == 5          # a stored vector finds itself in its own list
+
+
+def test_hashing_embedder():
+    emb = make_embedder("hash:64")
+    v = emb(["Gauss-Seidel iteration on the GPU", "gauss-seidel iteration on the gpu", ""])
+    assert v.shape == (3, 64) and v.dtype == np.float32
+    assert np.allclose(v[0], v[1]) and np.isclose(np.linalg.norm(v[0]), 1) and not v[2].any()
+    with pytest.raises(ValueError, match="Unknown embedder"):
+        make_embedder("word2vec")
+
+
+def test_embedding_is_incremental(repo):
+    pid = _paper(repo, "A_2020", [("Intro", "molecular dynamics of water"), ("Method", "verlet integration")])
+    emb = HashingEmbedder(64)
+    assert embed_search_units(repo, emb)["embedded"] == 2
+    assert embed_search_units(repo, emb)["embedded"] == 0
+    runs = [r for r in repo.get_runs_for_paper(pid) if r.operation == "embed"]
+    assert len(runs) == 1 and runs[0].status == "ok"
+
+    # rebuild one section: the kept unit keeps its vector, only the new unit is embedded
+    kept = [u for u in repo.get_search_units_for_paper(pid) if u.section_key == "source:Intro"]
+    repo.replace_search_units(pid, [SearchUnit(unit_type="section", source_type="section", section_path="Method",
+                                               section_key="source:Method", content="leapfrog integration")],
+                              keep_sections=["source:Intro"])
+    assert embed_search_units(repo, emb)["embedded"] == 1
+    assert repo.get_unit_embedding_state(emb.name)[0] == 2 and kept[0].id in {u for u, _ in repo.get_unit_embeddings(emb.name)}
+    assert embed_search_units(repo, HashingEmbedder(32))["embedded"] == 2     # another embedder re-embeds everything
+
+
+def test_vector_search_and_hybrid_ranking(repo):
+    a = _paper(repo, "Solver_2021", [("Method", "a gauss seidel sweep over all constraints")])
+    b = _paper(repo, "Other_2019", [("Method", "fourier transform of the charge density")])
+    embed_search_units(repo, HashingEmbedder(256))
+    hits = vector_search("gauss seidel solver", repo, k=2, embedder="hash:256")
+    assert [h["paper_id"] for h in hits][0] == a and hits[0]["score"] > hits[1]["score"]
+
+    # FTS ANDs all terms, so "solver" misses the unit; hybrid mode finds it through the vector
+    assert search("gauss seidel solver", repo) == []
+    results = search("gauss seidel solver", repo, mode="hybrid", embedder="hash:256", explain=True)
+    assert results[0].paper.id == a and results[0].breakdown["vector"] == 1
+    assert "fused" in results[0].matching_units[0]
+    assert all("vector" not in r.breakdown for r in results[1:])     # Other_2019 shares no words: below the floor
+    with pytest.raises(ValueError):
+        search("x", repo, mode="semantic")
+
+
+def test_hybrid_nonsense_query_has_no_vector_results(repo):
+    _paper(repo, "Solver_2021", [("Method", "a gauss seidel sweep over all constraints")])
+    _paper(repo, "Other_2019", [("Method", "fourier transform of the charge density")])
+    embed_search_units(repo, HashingEmbedder(256))
+    assert len(vector_search("xyzzy plugh frobnicate", repo, k=2, embedder="hash:256")) == 2   # top-k always answers
+    assert search("xyzzy plugh frobnicate", repo, mode="hybrid", embedder="hash:256") == []
+    assert search("xyzzy plugh frobnicate", repo, mode="hybrid", embedder="hash:256", min_similarity=-1.0) != []
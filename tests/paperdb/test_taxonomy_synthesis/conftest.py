@@ -217,6 +217,9 @@ class MockRepo:
         rows = self.conn.execute("SELECT ta.*, t.canonical_name, t.category FROM tag_aliases ta JOIN tags t ON ta.tag_id=t.id WHERE ta.normalized_alias=?", (normalized_alias,)).fetchall()
         return self._dicts(rows)
 
+    def list_tag_aliases(self):
+        return self._dicts(self.conn.execute("SELECT * FROM tag_aliases ORDER BY rowid").fetchall())
+
     def get_tag_aliases_by_tag(self, tag_id):
         return self._dicts(self.conn.execute("SELECT * FROM tag_aliases WHERE tag_id=?", (tag_id,)).fetchall())
 
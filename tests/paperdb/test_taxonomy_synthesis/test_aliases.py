@@ -192,3 +192,37 @@ CONSOLIDATION_RULES = {
         assert "density functional theory (dft)" in canonical_names
     finally:
         os.unlink(rules_path)
+
+def test_alias_index_shared_and_invalidated(tmp_path):
+    """The index is loaded once per repository and reloaded after add_alias / merge_tags / other connections' writes."""
+    from paperdb.db.connection import get_connection, init_schema
+    from paperdb.db.repository import Repository
+    from paperdb.taxonomy.aliases import alias_index, resolve_to_canonical, add_alias, merge_tags
+
+    conn = get_connection(tmp_path / "aliases.db")
+    init_schema(conn)
+    repo = Repository(conn)
+    md = repo.add_tag("molecular dynamics", "method")
+    index = alias_index(repo)
+    assert resolve_to_canonical("molecular dynamics", repo)[0]['id'] == md
+    assert alias_index(repo) is index                      # no writes -> same object
+
+    add_alias(md, "MD", repo)
+    assert alias_index(repo) is not index
+    assert [t['id'] for t in resolve_to_canonical("md", repo, category="method")] == [md]
+
+    dyn = repo.add_tag("md simulations", "method")
+    merge_tags(md, dyn, repo)
+    assert resolve_to_canonical("md simulations", repo) == [] and alias_index(repo).tag_ids("MD") == [md]
+
+    other = get_connection(tmp_path / "aliases.db")       # e.g. the CLI writing next to a running MCP server
+    Repository(other).add_tag("markdown", "software")
+    other.close()
+    assert resolve_to_canonical("markdown", repo)[0]['category'] == "software"
+
+    conn.execute("BEGIN")                                  # a map loaded inside a transaction is not cached
+    repo.add_tag("lattice boltzmann", "method")
+    assert resolve_to_canonical("lattice boltzmann", repo) != []
+    conn.execute("ROLLBACK")
+    assert resolve_to_canonical("lattice boltzmann", repo) == []
+    conn.close()
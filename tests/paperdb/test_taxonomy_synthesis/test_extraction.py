@@ -110,6 +110,96 @@ def test_extract_tags_stores_source_and_run_id():
         assert pt['source'] == 'llm'
         assert pt['run_id'] == run_id
 
+TAG_CATS = list(json.loads(MOCK_TAG_RESPONSE))
+
+def test_extract_tags_copies_alias_index_only_for_new_tags():
+    """Names that all resolve read the shared alias index; the first new tag copies it, repeats reuse that tag."""
+    from paperdb.taxonomy import extraction
+    from paperdb.taxonomy.aliases import AliasMap
+
+    repo = make_mock_repo()
+    gs = repo.add_tag("gauss-seidel", "solver")
+    paper_id = repo.add_paper("Copy_2024")
+    run_id = repo.create_processing_run(paper_id, operation='tag')
+    known = json.dumps({**{cat: [] for cat in TAG_CATS}, "solver": ["Gauss-Seidel"]})
+    new = json.dumps({**{cat: [] for cat in TAG_CATS}, "implementation": ["GPU", "gpu"], "solver": ["gauss-seidel"]})
+    copy = AliasMap.copy
+    with patch('paperdb.config.make_agent', return_value=MockAgent(responses=[known, new])), \
+         patch.object(AliasMap, 'copy', autospec=True, side_effect=copy) as spy:
+        first = extraction.extract_tags(SAMPLE_MD, paper_id, run_id, repo)
+        assert spy.call_count == 0 and first == [(gs, "solver", "gauss-seidel", "Gauss-Seidel", 0.8)]
+        second = extraction.extract_tags(SAMPLE_MD, paper_id, run_id, repo)
+        assert spy.call_count == 1
+    gpu = [t['id'] for t in repo.get_all_tags() if t['canonical_name'] == 'gpu']
+    assert len(gpu) == 1
+    assert [(tag_id, raw) for tag_id, category, _, raw, _ in second if category == "implementation"] == [(gpu[0], "GPU"), (gpu[0], "gpu")]
+
+def _batch_response(**papers):
+    return json.dumps({label: {**{cat: [] for cat in TAG_CATS}, **tags} for label, tags in papers.items()})
+
+def test_extract_tags_batch_one_call_shared_aliases():
+    """Several papers per request; names resolve through existing aliases and tags created in the same batch."""
+    from paperdb.taxonomy import extraction
+
+    repo = make_mock_repo()
+    gs = repo.add_tag("gauss-seidel iteration", "solver")
+    repo.add_tag_alias(gs, "Gauss-Seidel", "gauss-seidel")
+    pids = [repo.add_paper(f"Batch_2024_{i}") for i in range(3)]
+    runs = [repo.create_processing_run(pid, operation='tag') for pid in pids]
+    papers = [(pid, run, f"Summary of paper {i}") for i, (pid, run) in enumerate(zip(pids, runs))]
+
+    response = _batch_response(P1={"solver": ["Gauss-Seidel"], "implementation": ["GPU"]},
+                               P2={"implementation": ["gpu"], "method": ["XPBD"]})     # P3 missing
+    mock_agent = MockAgent(responses=[response])
+    with patch('paperdb.config.make_agent', return_value=mock_agent):
+        results, errors = extraction.extract_tags_batch(papers, repo, batch_size=3)
+
+    assert mock_agent.response_idx == 1
+    assert set(results) == {pids[0], pids[1]} and set(errors) == {pids[2]}
+    assert (gs, "solver", "gauss-seidel iteration", "Gauss-Seidel", 0.8) in results[pids[0]]
+    gpu = [t for t in repo.get_all_tags() if t['canonical_name'] == 'gpu']
+    assert len(gpu) == 1
+    assert (gpu[0]['id'], "implementation", "gpu", "gpu", 0.8) in results[pids[1]]
+    rows = repo.conn.execute("SELECT paper_id, raw_name, run_id FROM tag_assertions ORDER BY id").fetchall()
+    assert [tuple(r) for r in rows] == [(pids[0], "Gauss-Seidel", runs[0]), (pids[0], "GPU", runs[0]),
+                                        (pids[1], "XPBD", runs[1]), (pids[1], "gpu", runs[1])]
+
+def test_extract_tags_batch_splits_and_isolates_failures():
+    """batch_size splits the requests; an unparsable response fails only its own papers."""
+    from paperdb.taxonomy import extraction
+
+    repo = make_mock_repo()
+    pids = [repo.add_paper(f"Split_2024_{i}") for i in range(3)]
+    papers = [(pid, None, "summary") for pid in pids]
+    mock_agent = MockAgent(responses=[_batch_response(P1={"domain": ["optics"]}, P2={"domain": ["Optics"]}), "not json"])
+    with patch('paperdb.config.make_agent', return_value=mock_agent):
+        results, errors = extraction.extract_tags_batch(papers, repo, batch_size=2)
+    assert mock_agent.response_idx == 2
+    assert set(results) == set(pids[:2]) and list(errors) == [pids[2]]
+    assert len(repo.get_all_tags()) == 1
+
+def test_tag_batch_runs_and_skips(tmp_path):
+    """jobs.tag_batch: one tag run per paper from its summary; unchanged summaries are skipped."""
+    from paperdb.db.connection import get_connection, init_schema
+    from paperdb.db.repository import Repository
+    from paperdb.db.models import Paper
+    from paperdb.ingest.jobs import tag_batch
+
+    conn = get_connection(tmp_path / "batch.db")
+    init_schema(conn)
+    repo = Repository(conn)
+    pids = [repo.upsert_paper(Paper(paper_key=f"Batch_2024_{i}", title=f"B{i}")) for i in range(2)]
+    for pid in pids: repo.add_summary(paper_id=pid, content=f"Summary {pid} about molecular dynamics.")
+    response = _batch_response(P1={"method": ["molecular dynamics"]}, P2={"method": ["Molecular Dynamics"]})
+    with patch('paperdb.config.make_agent', return_value=MockAgent(responses=[response])):
+        first = tag_batch(pids, repo)
+        second = tag_batch(pids, repo)
+    assert (first["processed"], first["failed"]) == (2, 0) and second["skipped"] == 2
+    for pid in pids:
+        assert [t.canonical_name for t in repo.get_tags_for_paper(pid)] == ["molecular dynamics"]
+        assert repo.get_current_run(pid, "tag") is not None
+    conn.close()
+
 def test_tag_categories_list():
     """Test that TAG_CATEGORIES contains all 13 extended categories."""
     from paperdb.taxonomy import extraction
@@ -128,3 +128,92 @@ def test_get_summary_history_empty():
     paper_id = repo.add_paper("Test_2020_Empty")
     history = summaries.get_summary_history(paper_id, repo)
     assert len(history) == 0
+
+LONG_MD = "# A Long Thesis\n\n" + "\n\n".join(
+    f"## Chapter {i}\n\n" + "\n\n".join(f"Paragraph {j} of chapter {i} about relaxation solvers. " * 8 for j in range(12))
+    for i in range(10))
+
+class RecordingAgent(MockAgent):
+    """Answers chunk prompts with the chapters they saw, the reduce prompt with MOCK_SUMMARY."""
+
+    def __init__(self):
+        super().__init__()
+        import threading
+        self.lock = threading.Lock()
+        self.prompts = []
+        self.active = self.max_active = 0
+
+    def query(self, prompt=None, messages=None, bTools=True, **kwargs):
+        import re, time
+        with self.lock:
+            self.prompts.append(prompt)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self.lock: self.active -= 1
+        if prompt.startswith(summaries_module().REDUCE_PREFIX): content = MOCK_SUMMARY
+        else: content = "notes: " + ", ".join(sorted(set(re.findall(r"## (Chapter \d+)", prompt))))
+        return type("MockResponse", (), {"content": content})()
+
+def summaries_module():
+    from paperdb.synthesis import summaries
+    return summaries
+
+def test_split_markdown_chunks_covers_all_sections():
+    summaries = summaries_module()
+    chunks = summaries.split_markdown_chunks(LONG_MD, 3000)
+    assert len(chunks) > 3 and all(len(text) <= 3000 for _, text in chunks)
+    joined = "\n\n".join(text for _, text in chunks)
+    for i in range(10):
+        assert f"## Chapter {i}" in joined or f"A Long Thesis > Chapter {i}" in joined
+        assert f"Paragraph 11 of chapter {i}" in joined
+
+def test_map_reduce_summary_covers_whole_document(tmp_path):
+    summaries = summaries_module()
+    repo = make_mock_repo()
+    paper_id = repo.add_paper("Test_2020_Long")
+    run_id = repo.create_processing_run(paper_id, operation='summarize')
+    agent = RecordingAgent()
+
+    with patch('paperdb.config.make_agent', return_value=agent):
+        result = summaries.generate_summary(LONG_MD, paper_id, run_id, repo, mode="map_reduce",
+                                            chunk_chars=3000, max_workers=3, cache_dir=tmp_path)
+
+    assert result == MOCK_SUMMARY
+    reduce_prompt = agent.prompts[-1]
+    assert reduce_prompt.startswith(summaries.REDUCE_PREFIX)
+    for i in range(10): assert f"Chapter {i}" in reduce_prompt     # every chapter reached the reduce step
+    assert 1 < agent.max_active <= 3
+    assert repo.get_active_summary(paper_id)['content'] == MOCK_SUMMARY
+
+def test_map_reduce_cache_reruns_only_reduce(tmp_path, monkeypatch):
+    summaries = summaries_module()
+    repo = make_mock_repo()
+    paper_id = repo.add_paper("Test_2020_Cache")
+    run_id = repo.create_processing_run(paper_id, operation='summarize')
+    agent = RecordingAgent()
+    kwargs = dict(mode="map_reduce", chunk_chars=3000, cache_dir=tmp_path)
+
+    with patch('paperdb.config.make_agent', return_value=agent):
+        summaries.generate_summary(LONG_MD, paper_id, run_id, repo, **kwargs)
+        n_first = len(agent.prompts)
+        monkeypatch.setitem(summaries.SUMMARY_PROMPTS, "v1", summaries.SUMMARY_PROMPT_V1 + "\n- Changed rule.")
+        summaries.generate_summary(LONG_MD, paper_id, run_id, repo, **kwargs)
+
+    assert n_first > 2
+    assert len(agent.prompts) == n_first + 1
+    assert agent.prompts[-1] == agent.prompts[n_first - 1]
+
+def test_auto_mode_keeps_single_query_for_short_papers(tmp_path):
+    summaries = summaries_module()
+    repo = make_mock_repo()
+    paper_id = repo.add_paper("Test_2020_Short")
+    run_id = repo.create_processing_run(paper_id, operation='summarize')
+    agent = RecordingAgent()
+
+    with patch('paperdb.config.make_agent', return_value=agent):
+        summaries.generate_summary(SAMPLE_MD, paper_id, run_id, repo, cache_dir=tmp_path)
+        with pytest.raises(ValueError, match="Unknown summary mode"):
+            summaries.generate_summary(SAMPLE_MD, paper_id, run_id, repo, mode="tree")
+
+    assert len(agent.prompts) == 1 and agent.prompts[0].startswith("Summarize this paper:")
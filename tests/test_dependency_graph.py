@@ -3,7 +3,7 @@ import sys
 import unittest
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from pyCruncher.ctags_dependency import DependencyProcessor
+from pyCruncher.ctags_dependency import DependencyProcessor, FunctionInfo
 
 class TestDependencyGraph(unittest.TestCase):
     def setUp(self):
@@ -301,5 +301,52 @@ int main() {
         # shutil.rmtree(self.test_dir)
         pass
 
+class TestCallResolution(unittest.TestCase):
+    """Call resolution on a hand-built processor (no ctags needed)."""
+
+    def make_processor(self):
+        processor = DependencyProcessor()
+        for cls in ['Shape', 'geo::Circle', 'Py']:
+            processor.classes[cls] = {}
+        for qname, cls, ns, body in [
+            ('Shape::area',       'Shape',       None,  'return w * h;'),
+            ('geo::Circle::area', 'geo::Circle', None,  'return pi() * r * r;'),
+            ('Py.area',           'Py',          None,  'return 0'),
+            ('geo::pi',           None,          'geo', 'return 3.14;'),
+            ('report',            None,          None,  's.area(); geo::pi(); area(); missing();'),
+        ]:
+            f = FunctionInfo()
+            f.name, f.class_name, f.namespace, f.file_path, f.body = qname.split(':')[-1], cls, ns, 'a.cpp', body
+            processor.functions[qname] = f
+        return processor
+
+    def test_resolution(self):
+        processor = self.make_processor()
+        processor.analyze_dependencies(check_call_syntax=True, jobs=1)
+        self.assertEqual(processor.functions['report'].calls,
+                         ['Shape::area', 'geo::Circle::area', 'Py.area', 'geo::pi', 'Shape::area', 'geo::Circle::area'])
+        self.assertEqual(processor.functions['geo::Circle::area'].calls, [])     # pi() is not geo::Circle::pi
+
+    def test_pool_matches_serial(self):
+        serial, pooled = self.make_processor(), self.make_processor()
+        serial.analyze_dependencies(jobs=1)
+        pooled.analyze_dependencies(jobs=2, min_parallel=1)
+        for name in serial.functions:
+            self.assertEqual(serial.functions[name].calls, pooled.functions[name].calls)
+
+    def test_scope_end_ignores_comments_and_literals(self):
+        lines = [
+            'int f() {  // } in a comment',
+            '    const char* s = "}{\\"}";',
+            "    char c = '}'; int n = 1'000;",
+            '    /* } */ auto r = R"x(})x";',
+            '    return 0;',
+            '}',
+            'void g() { if (x) { y(); } }',
+        ]
+        processor = DependencyProcessor()
+        self.assertEqual(processor.find_scope_end(lines, 0), 5)
+        self.assertEqual(processor.find_scope_end(lines, 6), 6)
+
 if __name__ == '__main__':
     unittest.main()
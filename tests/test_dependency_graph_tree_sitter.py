@@ -1,6 +1,10 @@
 import unittest
 import os
+import sys
+import time
 import shutil
+import argparse
+import tempfile
 
 import sys
 sys.path.append("../")
@@ -160,10 +164,77 @@ class TestDependencyGraphTreeSitter(unittest.TestCase):
         multiply_func = processor.functions['math::advanced::multiply']
         self.assertEqual(multiply_func.namespace, 'math::advanced', "Wrong namespace for math::advanced::multiply")
 
+    def test_parallel_matches_serial(self):
+        """parse_directory/analyze_dependencies with worker processes give the serial registry, in the same order"""
+        write_cpp_tree(os.path.join(self.test_dir, 'tree'), n_files=24)
+        results = []
+        for jobs in (1, 2):
+            processor = DependencyGraphTreeSitter()
+            files = processor.parse_directory(os.path.join(self.test_dir, 'tree'), '.cpp', jobs=jobs, min_parallel=1)
+            processor.analyze_dependencies(jobs=jobs, min_parallel=1)
+            results.append((list(files), list(processor.functions), list(processor.classes),
+                            {name: sorted(f.calls) for name, f in processor.functions.items()}))
+        self.assertEqual(len(results[0][0]), 24)
+        self.assertEqual(results[0], results[1])
+        self.assertIn('m3::add', results[0][3]['m3::advanced::multiply'])
+
     def tearDown(self):
         """Clean up test files"""
         if os.path.exists(self.test_dir):
             shutil.rmtree(self.test_dir)
 
+def write_cpp_tree(root, n_files=2000, n_dirs=40):
+    """Synthetic C++ tree: n_files sources spread over n_dirs directories, each with its own namespace m<i>"""
+    template = """
+    namespace m{i} {{
+        int add(int a, int b) {{ return a + b; }}
+        namespace advanced {{
+            int multiply(int a, int b) {{ return a * m{i}::add(a, b); }}
+            class Calculator{i} {{
+            public:
+                static int compute(int x, int y) {{ return add(x, advanced::multiply(x, y)); }}
+                int apply(int x, int y) {{ return compute(x, y) + m{j}::add(x, y); }}
+            }};
+        }}
+    }}
+    int main{i}() {{ m{i}::advanced::Calculator{i} calc; return calc.apply(1, 2) + m{i}::add(3, 4); }}
+    """
+    for i in range(n_files):
+        d = os.path.join(root, f"dir{i % n_dirs:03d}")
+        os.makedirs(d, exist_ok=True)
+        with open(os.path.join(d, f"src{i:05d}.cpp"), 'w') as f:
+            f.write(template.format(i=i, j=(i * 7) % n_files) * 4)
+
+def benchmark(root=None, n_files=2000, jobs=None, pattern='.cpp'):
+    """Wall time of parse_directory + analyze_dependencies, serial vs `jobs` workers, on `root` or a synthetic tree"""
+    tmp = None
+    if root is None:
+        tmp = tempfile.mkdtemp(prefix='ts_bench_')
+        root = tmp
+        write_cpp_tree(root, n_files)
+    try:
+        results = {}
+        for n in (1, jobs or os.cpu_count() or 1):
+            processor = DependencyGraphTreeSitter()
+            t0 = time.perf_counter()
+            processor.parse_directory(root, pattern, jobs=n)
+            t1 = time.perf_counter()
+            processor.analyze_dependencies(jobs=n)
+            t2 = time.perf_counter()
+            results[n] = (list(processor.functions), {k: f.calls for k, f in processor.functions.items()})
+            print(f"jobs={n:3d}  files {len(processor.files):6d}  functions {len(processor.functions):7d}  "
+                  f"parse {t1 - t0:7.2f}s  calls {t2 - t1:7.2f}s")
+        print("identical results:", all(r == results[1] for r in results.values()))
+    finally:
+        if tmp: shutil.rmtree(tmp)
+
 if __name__ == '__main__':
-    unittest.main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bench', nargs='?', const='', default=None, help="benchmark on a C++ tree (default: synthetic)")
+    parser.add_argument('--bench-files', type=int, default=2000)
+    parser.add_argument('--jobs', type=int, default=None)
+    args, rest = parser.parse_known_args()
+    if args.bench is not None:
+        benchmark(args.bench or None, args.bench_files, args.jobs)
+    else:
+        unittest.main(argv=[sys.argv[0]] + rest)
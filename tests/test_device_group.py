@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+test_device_group.py — multi-device work splitting (pyCruncher2/scientific/gpu/DeviceGroup.py).
+
+Checks the throughput-weighted range partition, that a DeviceGroup of CPU
+sub-devices (pocl; the whole CPU repeated if it has too few compute units)
+returns exactly the single-device results of NumIntegralSim and
+BiotSavartSim in the original order, and that measured timings move the
+partition towards the faster worker. As a script it also times the
+Biot–Savart run on 1 device vs the group.
+
+Usage:
+  python tests/test_device_group.py
+  python tests/test_device_group.py --nsub 4 --N 200000
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+cl = pytest.importorskip("pyopencl")
+
+from pyCruncher2.scientific.gpu import DeviceGroup as dg
+
+def _has_cpu_device():
+    try:
+        return len(dg.list_devices(cl.device_type.CPU)) > 0
+    except cl.Error:
+        return False
+
+needs_cpu = pytest.mark.skipif(not _has_cpu_device(), reason="no OpenCL CPU device (pocl)")
+
+def test_partition_range():
+    parts = dg.partition_range(1000, [1, 1, 2], align=32)
+    assert parts[0][0] == 0 and parts[-1][1] == 1000
+    assert all(a[1] == b[0] for a, b in zip(parts, parts[1:]))
+    assert all(i0 % 32 == 0 for i0, _ in parts)
+    sizes = [i1 - i0 for i0, i1 in parts]
+    assert abs(sizes[2] - 500) <= 32 and abs(sizes[0] - 250) <= 32
+    assert dg.partition_range(10, [1, 0, 1])[1] == (5, 5)
+    assert dg.partition_range(0, [1, 1]) == [(0, 0), (0, 0)]
+    assert dg.partition_range(7, [0, 0]) == [(0, 4), (4, 7)]
+
+def make_group(make_worker, nsub=3, **kwargs):
+    return dg.DeviceGroup.from_cpu_subdevices(make_worker, nsub=nsub, **kwargs)
+
+@needs_cpu
+def test_num_integral_split_matches_single():
+    from pyCruncher2.scientific.gpu.test_num_integral_cl import NumIntegralSim, circle_loop, line_samples, ring_atoms, MU0_4PI
+    with make_group(lambda ctx: NumIntegralSim(nloc=32, ctx=ctx), align=32) as group:
+        r_mid, dl, Iarr = circle_loop(M=64, R=1.0)
+        samples = line_samples(N=1001)
+        B_ref = group.workers[0].run_biot_savart(r_mid, dl, Iarr, samples, K=MU0_4PI)
+        B     = group.run_split('run_biot_savart', split={'samples': samples}, r_mid=r_mid, dl=dl, Iarr=Iarr, K=MU0_4PI)
+        assert B.shape == B_ref.shape and np.array_equal(B, B_ref)
+        apos, aREQs = ring_atoms(M=50, R=2.0)
+        probes = line_samples(N=333, p0=(-4.0, 0.0, 0.5), p1=(4.0, 0.0, 0.5))     # off the ring plane: no probe on an atom
+        F_ref = group.workers[0].run_morse_ring(apos, aREQs, probes)
+        F     = group.run_split('run_morse_ring', split={'samples': probes}, apos=apos, aREQs=aREQs)
+        assert np.array_equal(F, F_ref)
+
+@needs_cpu
+def test_biot_savart_sim_split_matches_single():
+    from pyCruncher2.scientific.gpu.run_biot_savart import BiotSavartSim, circle_loop, line_samples
+    with make_group(lambda ctx: BiotSavartSim(nloc=32, ctx=ctx), align=32) as group:
+        r_mid, dl, Iarr = circle_loop(M=64)
+        samples = line_samples(N=777)
+        B_ref = group.workers[0].run(r_mid, dl, Iarr, samples)
+        B     = group.run_split('run', split={'samples': samples}, r_mid=r_mid, dl=dl, Iarr=Iarr)
+        assert np.array_equal(B, B_ref)
+
+@needs_cpu
+def test_weights_follow_measured_throughput():
+    with make_group(lambda ctx: None, nsub=2, weights=[1.0, 1.0], smoothing=0.0) as group:
+        slow = {0: 2e-5, 1: 1e-5}                              # seconds per item: device 1 twice as fast
+        def func(worker, i0, i1):
+            idev = [p for p in range(len(group)) if group.partition(1000)[p] == (i0, i1)]
+            time.sleep((i1 - i0) * slow[idev[0]])
+            return np.arange(i0, i1)
+        for _ in range(3):
+            out = group.map(func, 1000)
+        assert np.array_equal(np.concatenate(out), np.arange(1000))
+        sizes = [p['i1'] - p['i0'] for p in group.last]
+        assert sizes[1] > 1.5 * sizes[0]
+    with pytest.raises(RuntimeError):                          # pool shut down on leaving the with block
+        group.map(func, 1000)
+
+def test_empty_partition_keeps_its_share():
+    group = dg.DeviceGroup.__new__(dg.DeviceGroup)                 # weights only, no OpenCL
+    group.devices, group.smoothing, group.min_share = [None] * 3, 0.0, 0.01
+    group.weights = np.array([1.0, 1.0, 1e-6])
+    for _ in range(5):
+        group.last = [{'i0': 0, 'i1': 500, 'time': 1e-3}, {'i0': 500, 'i1': 1000, 'time': 1e-3}, {'i0': 1000, 'i1': 1000, 'time': 0.0}]
+        group._update_weights()
+    share = group.weights / group.weights.sum()
+    assert np.isclose(share[0], share[1]) and share[2] >= 0.01 - 1e-12
+    group.weights = np.array([1.0, 1.0, 0.5])
+    group._update_weights()
+    assert np.allclose(group.weights / group.weights.sum(), [0.4, 0.4, 0.2])     # unmeasured: previous share carried forward
+
+def benchmark(nsub=4, N=100000, M=512, nrep=3):
+    from pyCruncher2.scientific.gpu.run_biot_savart import BiotSavartSim, circle_loop, line_samples
+    with make_group(lambda ctx: BiotSavartSim(nloc=32, ctx=ctx), nsub=nsub, align=32, bPrint=True) as group:
+        r_mid, dl, Iarr = circle_loop(M=M)
+        samples = line_samples(N=N)
+        group.workers[0].run(r_mid, dl, Iarr, samples)            # build + warm-up
+        T1 = min(_timeit(lambda: group.workers[0].run(r_mid, dl, Iarr, samples)) for _ in range(nrep))
+        print("calibrated weights:", group.calibrate('run', {'samples': samples}, nrep=2, r_mid=r_mid, dl=dl, Iarr=Iarr))
+        Tg = min(_timeit(lambda: group.run_split('run', {'samples': samples}, r_mid=r_mid, dl=dl, Iarr=Iarr)) for _ in range(nrep))
+        print(f"BiotSavart N={N} M={M}: 1 device {T1*1e3:.2f} [ms]  group of {len(group)} {Tg*1e3:.2f} [ms]  speedup {T1/Tg:.2f}x")
+
+def _timeit(f):
+    T0 = time.perf_counter(); f(); return time.perf_counter() - T0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nsub", type=int, default=4,      help="number of CPU sub-devices")
+    parser.add_argument("--N",    type=int, default=100000, help="number of samples in the benchmark")
+    args = parser.parse_args()
+    test_partition_range()
+    test_num_integral_split_matches_single()
+    test_biot_savart_sim_split_matches_single()
+    test_weights_follow_measured_throughput()
+    print("[OK] split results == single-device results")
+    benchmark(nsub=args.nsub, N=args.N)
@@ -28,4 +28,6 @@ if __name__ == "__main__":
     project_path = os.path.expanduser("~/git/FireCore/cpp")
     selected_files = ["/common/molecular/MolWorld_sp3_simple.h"]
     get_backups( selected_files, project_path )
-    documenter.process_project(project_path, selected_files )
\ No newline at end of file
+    # --pipelined: concurrent LLM requests, docs written into the files, resumable via doc_journal.jsonl
+    pipelined = "--pipelined" in sys.argv
+    documenter.process_project(project_path, selected_files, pipelined=pipelined, llm_jobs=4, in_place=pipelined )
\ No newline at end of file
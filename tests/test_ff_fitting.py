@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+test_ff_fitting.py — batched parameter-gradient fitting (pyCruncher2/scientific/ff_fitting.py).
+
+Builds a synthetic training set (random fragment pairs, reference energies
+from known parameters), checks that the compiled (OpenMP) and NumPy Jacobians
+agree with each other and with finite differences, that the single-pair
+getVarDerivs*() matches, and that fit() recovers perturbed parameters.
+As a script it also benchmarks one full-dataset evaluation against the
+per-geometry Python loop over getVarDerivs*() it replaces.
+
+Usage:
+  python tests/test_ff_fitting.py
+  python tests/test_ff_fitting.py --nsys 20000
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pyCruncher2.scientific import ff_fitting as fit
+
+requires_cpp = pytest.mark.skipif(shutil.which("g++") is None, reason="g++ not available")
+BACKENDS = [pytest.param("cpp", marks=requires_cpp), "numpy"]
+EVAL = {'cpp': fit.eval_cpp, 'numpy': fit.eval_numpy}
+
+TPARS = {   # per-type R0(half), E0(sqrt), q, k  (H, C, N, O)
+    'LJQ':    np.array([[1.2, 0.12, 0.2], [1.9, 0.10, -0.1], [1.8, 0.13, -0.3], [1.7, 0.15, -0.4]]),
+    'MorseQ': np.array([[1.2, 0.12, 0.2, 1.6], [1.9, 0.10, -0.1, 1.7], [1.8, 0.13, -0.3, 1.5], [1.7, 0.15, -0.4, 1.8]]),
+}
+
+def make_set(name, nsys=200, na1=(3, 8), na2=(3, 8), rmin=3.0, seed=0):
+    rng  = np.random.default_rng(seed)
+    ntyp = len(TPARS[name])
+    systems = []
+    while len(systems) < nsys:
+        n1 = rng.integers(*na1); n2 = rng.integers(*na2)
+        a1 = rng.normal(scale=1.0, size=(n1, 3))
+        a2 = rng.normal(scale=1.0, size=(n2, 3)) + np.array([rng.uniform(4.5, 7.0), 0, 0])
+        if np.linalg.norm(a1[:, None] - a2[None, :], axis=2).min() < rmin: continue   # no close contacts, like real training sets
+        systems.append((a1, rng.integers(0, ntyp, n1), a2, rng.integers(0, ntyp, n2), 0.0))
+    fs = fit.FittingSet.from_systems(systems)
+    fs.Eref[:], _ = fit.eval_numpy(fs, name, TPARS[name])
+    return fs
+
+@requires_cpp
+@pytest.mark.parametrize("name", ["LJQ", "MorseQ"])
+@pytest.mark.parametrize("bBoth", [True, False])
+def test_cpp_matches_numpy(name, bBoth):
+    fs = make_set(name, nsys=300)
+    E_np, J_np = fit.eval_numpy(fs, name, TPARS[name], bBoth=bBoth)
+    E_c,  J_c  = fit.eval_cpp  (fs, name, TPARS[name], bBoth=bBoth)
+    assert np.allclose(E_np, E_c, rtol=1e-10, atol=1e-12)
+    assert np.allclose(J_np, J_c, rtol=1e-10, atol=1e-12)
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", ["LJQ", "MorseQ"])
+def test_jacobian_finite_difference(name, backend, h=1e-6):
+    fs = make_set(name, nsys=20)
+    tpars = TPARS[name]
+    evaluate = EVAL[backend]
+    _, J = evaluate(fs, name, tpars)
+    for k in range(tpars.size):
+        tp = tpars.copy(); tp.ravel()[k] += h; Ep, _ = evaluate(fs, name, tp)
+        tm = tpars.copy(); tm.ravel()[k] -= h; Em, _ = evaluate(fs, name, tm)
+        assert np.allclose((Ep - Em) / (2 * h), J[:, k], rtol=1e-5, atol=1e-7), f"{name} {backend} parameter {k}"
+
+@requires_cpp
+@pytest.mark.parametrize("name", ["LJQ", "MorseQ"])
+def test_single_pair_getVarDerivs(name):
+    from pyCruncher2.scientific import forcefields_lib as ffl
+    fs = make_set(name, nsys=1)
+    i0, n1, j0, n2 = fs.sys[0]
+    t1 = fs.atypes[i0:i0 + n1]; t2 = fs.atypes[j0:j0 + n2]
+    E, dE_par1 = ffl.getVarDerivs(name, fs.apos[i0:i0 + n1], TPARS[name][t1], fs.apos[j0:j0 + n2], TPARS[name][t2])
+    Es, J = fit.eval_numpy(fs, name, TPARS[name], bBoth=False)
+    assert np.isclose(E, Es[0])
+    dE_type = np.zeros_like(TPARS[name]); np.add.at(dE_type, t1, dE_par1)
+    assert np.allclose(dE_type.ravel(), J[0])
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", ["LJQ", "MorseQ"])
+def test_fit_recovers_parameters(name, backend):
+    fs = make_set(name, nsys=400)
+    rng = np.random.default_rng(3)
+    mask = np.ones_like(TPARS[name], dtype=bool); mask[:, 2] = False       # charges fixed
+    tpars0 = TPARS[name] * np.where(mask, 1.0 + rng.uniform(-0.05, 0.05, TPARS[name].shape), 1.0)
+    tpars, info = fit.fit(fs, name, tpars0, mask=mask, backend=backend, niter=200)
+    assert info['rmse'] < 1e-8
+    assert np.allclose(tpars, TPARS[name], rtol=1e-5)
+
+def benchmark(nsys=5000, nrep=3):
+    from pyCruncher2.scientific import forcefields_lib as ffl
+    for name in ["LJQ", "MorseQ"]:
+        fs = make_set(name, nsys=nsys)
+        tpars = TPARS[name]
+        def python_loop():
+            for i0, n1, j0, n2 in fs.sys:
+                t1 = fs.atypes[i0:i0 + n1]; t2 = fs.atypes[j0:j0 + n2]
+                ffl.getVarDerivs(name, fs.apos[i0:i0 + n1], tpars[t1], fs.apos[j0:j0 + n2], tpars[t2])
+        fs.pairs()
+        npair = int((fs.sys[:, 1] * fs.sys[:, 3]).sum())
+        print(f"\n{name}: nsys={nsys} npairs={npair}")
+        for label, f in [("python loop over getVarDerivs", python_loop),
+                         ("eval_numpy (vectorized)",      lambda: fit.eval_numpy(fs, name, tpars)),
+                         ("eval_cpp (OpenMP)",            lambda: fit.eval_cpp  (fs, name, tpars))]:
+            T = min(_timeit(f) for _ in range(nrep))
+            print(f"  {label:<32} {T*1e3:>10.3f} [ms] {T*1e9/npair:>10.3f} [ns/pair]")
+        tpars0 = tpars * (1.0 + np.random.default_rng(1).uniform(-0.05, 0.05, tpars.shape))
+        fit.fit(fs, name, tpars0, backend='cpp', bPrint=True)
+
+def _timeit(f):
+    T0 = time.perf_counter(); f(); return time.perf_counter() - T0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nsys", type=int, default=5000, help="number of training geometries in the benchmark")
+    args = parser.parse_args()
+    for name in ["LJQ", "MorseQ"]:
+        for bBoth in [True, False]: test_cpp_matches_numpy(name, bBoth)
+        for backend in ["cpp", "numpy"]: test_jacobian_finite_difference(name, backend)
+        test_single_pair_getVarDerivs(name)
+        for backend in ["cpp", "numpy"]: test_fit_recovers_parameters(name, backend)
+        print(f"[OK] {name}: cpp == numpy == finite differences, fit recovers parameters")
+    benchmark(nsys=args.nsys)
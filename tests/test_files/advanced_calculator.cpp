@@ -0,0 +1,75 @@
+
+namespace math {
+    double add(double x, double y) {
+        return x + y;
+    }
+    
+    namespace advanced {
+        double multiply(double x, double y) {
+            return x * y;
+        }
+        
+        class Calculator {
+        public:
+            Calculator() : value(0) {}
+            
+            double compute(double x, double y) {
+                // Test calling function from parent namespace
+                value = math::add(x, y);
+                // Test calling function from same namespace
+                value = multiply(value, 2.0);
+                return value;
+            }
+            
+            // Test function pointer and complex expressions
+            double apply(double (*func)(double, double), double x, double y) {
+                value = func(x, y);
+                return value;
+            }
+            
+        private:
+            double value;
+        };
+    }
+}
+
+namespace utils {
+    class Helper {
+    public:
+        static double process(double x, double y) {
+            math::advanced::Calculator calc;
+            // Test nested namespace function call
+            double result = math::advanced::multiply(x, y);
+            // Test method call on object
+            result = calc.compute(result, 2.0);
+            return result;
+        }
+    };
+}
+
+// Test global namespace function
+double calculate(double x, double y) {
+    utils::Helper helper;
+    // Test static method call
+    return utils::Helper::process(x, y);
+}
+
+int main() {
+    math::advanced::Calculator calc;
+    double result = 0.0;
+    
+    // Test direct function calls
+    result = math::add(1.0, 2.0);
+    result = math::advanced::multiply(result, 3.0);
+    
+    // Test method calls
+    result = calc.compute(result, 4.0);
+    
+    // Test function pointer
+    result = calc.apply(math::add, result, 5.0);
+    
+    // Test through helper
+    result = calculate(result, 6.0);
+    
+    return 0;
+}
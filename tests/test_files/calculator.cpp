@@ -0,0 +1,41 @@
+
+class MathUtils {
+public:
+    MathUtils() : value(0) {}
+    
+    double add(double x) {
+        value += x;
+        return value;
+    }
+    
+    double multiply(double x) {
+        value = add(0);  // Reset value
+        for(int i = 0; i < x; i++) {
+            add(value);
+        }
+        return value;
+    }
+    
+private:
+    double value;
+};
+
+double processNumbers(const std::vector<double>& numbers) {
+    MathUtils calc;
+    double result = 0;
+    for(const auto& num : numbers) {
+        if(static_cast<int>(num) % 2 == 0) {
+            result = calc.multiply(num);
+        } else {
+            result = calc.add(num);
+        }
+    }
+    return result;
+}
+
+int main() {
+    std::vector<double> numbers = {1.0, 2.0, 3.0, 4.0};
+    double result = processNumbers(numbers);
+    std::cout << "Result: " << result << std::endl;
+    return 0;
+}
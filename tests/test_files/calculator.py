@@ -0,0 +1,32 @@
+
+class Calculator:
+    def __init__(self):
+        self.value = 0
+        
+    def add(self, x):
+        self.value += x
+        return self.value
+        
+    def multiply(self, x):
+        self.value = self.add(0)  # Reset value
+        for _ in range(x):
+            self.add(self.value)
+        return self.value
+
+def process_numbers(numbers):
+    calc = Calculator()
+    result = 0
+    for num in numbers:
+        if num % 2 == 0:
+            result = calc.multiply(num)
+        else:
+            result = calc.add(num)
+    return result
+
+def main():
+    numbers = [1, 2, 3, 4]
+    result = process_numbers(numbers)
+    print(f"Result: {result}")
+
+if __name__ == '__main__':
+    main()
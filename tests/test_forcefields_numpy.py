@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+test_forcefields_numpy.py — NumPy reference potentials vs compiled cpp/ForceFields.cpp.
+
+Checks that every `evaluate*()` (energy + force) and `_var*()` (parameter
+derivatives) in pyCruncher2/scientific/forcefields.py agrees with the C++
+implementation compiled through forcefields_lib, that the returned force is
+minus the finite-difference gradient of the energy, then benchmarks both paths.
+Runs under pytest (agreement only) or as a script (agreement + benchmark).
+
+Usage:
+  python tests/test_forcefields_numpy.py
+  python tests/test_forcefields_numpy.py --n 1000000
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pyCruncher2.scientific import forcefields as ff
+
+requires_cpp = pytest.mark.skipif(shutil.which("g++") is None, reason="g++ not available")
+
+# parameter ranges per potential, in the C++ packed order
+PAR_RANGES = {
+    'Coulomb': [(-1.0, 1.0)],
+    'LJ':      [(0.001, 0.02), (3.0, 4.0)],
+    'LJQ':     [(3.0, 4.0), (0.001, 0.02), (-1.0, 1.0)],
+    'Morse':   [(3.0, 4.0), (0.001, 0.02), (1.5, 1.8)],
+    'MorseQ':  [(3.0, 4.0), (0.001, 0.02), (-1.0, 1.0), (1.5, 1.8)],
+}
+
+def make_inputs(name, n, seed=0):
+    rng = np.random.default_rng(seed)
+    ps  = rng.normal(size=(n, 3))
+    ps *= (rng.uniform(1.5, 8.0, n) / np.linalg.norm(ps, axis=1))[:, None]
+    params = np.stack([rng.uniform(a, b, n) for a, b in PAR_RANGES[name]], axis=1)
+    return ps, params
+
+@requires_cpp
+@pytest.mark.parametrize("name", list(ff.NPAR))
+def test_evaluate_agrees_with_cpp(name, n=10000):
+    from pyCruncher2.scientific import forcefields_lib as ffl
+    ps, params = make_inputs(name, n)
+    E_np, f_np = ff.evaluators[name](ps, params)
+    E_c,  f_c  = ffl.evaluate(name, ps, params)
+    assert np.allclose(E_np, E_c, rtol=1e-12, atol=1e-14)
+    assert np.allclose(f_np, f_c, rtol=1e-12, atol=1e-14)
+
+@requires_cpp
+@pytest.mark.parametrize("name", list(ff.NPAR))
+def test_var_agrees_with_cpp(name, n=10000):
+    from pyCruncher2.scientific import forcefields_lib as ffl
+    ps, params = make_inputs(name, n)
+    rs = np.linalg.norm(ps, axis=1)
+    E_np, d_np = ff.var_evaluators[name](rs, params)
+    E_c,  d_c  = ffl.var(name, rs, params)
+    assert np.allclose(E_np, E_c, rtol=1e-12, atol=1e-14)
+    assert np.allclose(d_np, d_c, rtol=1e-12, atol=1e-14)
+
+@pytest.mark.parametrize("name", list(ff.NPAR))
+def test_force_is_minus_energy_gradient(name, n=1000, h=1e-5):
+    ps, params = make_inputs(name, n)
+    _, f = ff.evaluators[name](ps, params)
+    grad = np.zeros_like(ps)
+    for i in range(3):
+        dp = np.zeros(3); dp[i] = h
+        grad[:, i] = (ff.evaluators[name](ps + dp, params)[0] - ff.evaluators[name](ps - dp, params)[0]) / (2 * h)
+    assert np.allclose(f, -grad, rtol=1e-6, atol=1e-9)
+
+def test_mixing_rules():
+    rng = np.random.default_rng(1)
+    pi = rng.uniform(0.5, 2.0, (100, 4)); pj = rng.uniform(0.5, 2.0, (100, 4)); dpij = rng.normal(size=(100, 4))
+    pij = ff.mix_varMorseQ(pi, pj)
+    assert np.allclose(pij[:, 0], pi[:, 0] + pj[:, 0]) and np.allclose(pij[:, 3], 0.5 * (pi[:, 3] + pj[:, 3]))
+    assert np.allclose(ff.mix_LJQ(pi[:, :3], pj[:, :3]), pij[:, :3])
+    dpi = ff.dmix_varMorseQ(pi, pj, dpij)
+    assert np.allclose(dpi[:, :3], ff.dmix_LJQ(pi[:, :3], pj[:, :3], dpij[:, :3]))
+    assert np.allclose(dpi[:, 3], 0.5 * dpij[:, 3])
+
+def benchmark(n=1000000, nrep=3):
+    from pyCruncher2.scientific import forcefields_lib as ffl
+    ffl.load_lib(bPrint=True)
+    print(f"\n{'potential':<10} {'kind':<9} {'numpy [ns/pair]':>16} {'C++ [ns/pair]':>14} {'numpy/C++':>10}   n={n}")
+    for name in ff.NPAR:
+        ps, params = make_inputs(name, n)
+        rs = np.linalg.norm(ps, axis=1)
+        T_np = min(_timeit(lambda: ff.evaluators[name](ps, params)) for _ in range(nrep))
+        T_c  = min(_timeit(lambda: ffl.evaluate(name, ps, params))  for _ in range(nrep))
+        print(f"{name:<10} {'evaluate':<9} {T_np*1e9/n:>16.3f} {T_c*1e9/n:>14.3f} {T_np/T_c:>10.2f}")
+        T_np = min(_timeit(lambda: ff.var_evaluators[name](rs, params)) for _ in range(nrep))
+        T_c  = min(_timeit(lambda: ffl.var(name, rs, params))           for _ in range(nrep))
+        print(f"{name:<10} {'var':<9} {T_np*1e9/n:>16.3f} {T_c*1e9/n:>14.3f} {T_np/T_c:>10.2f}")
+
+def _timeit(f):
+    T0 = time.perf_counter(); f(); return time.perf_counter() - T0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=1000000, help="number of distances in the benchmark")
+    args = parser.parse_args()
+    for name in ff.NPAR:
+        test_evaluate_agrees_with_cpp(name)
+        test_var_agrees_with_cpp(name)
+        test_force_is_minus_energy_gradient(name)
+        print(f"[OK] {name:<8} NumPy == C++ (energy, force, parameter derivatives), force == -grad E")
+    test_mixing_rules()
+    print("[OK] mix_LJQ / mix_varMorseQ")
+    benchmark(n=args.n)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+test_num_integral_cpu.py — blocked CPU evaluator (pyCruncher2/scientific/gpu/NumIntegralCPU.py).
+
+Checks that NumIntegralCPU agrees with a plain float64 NumPy evaluation
+of the same sums (Biot–Savart and every Morse `variant`), that tiling and
+thread count do not change the result, and — when an OpenCL device
+(e.g. pocl) is available — that it matches NumIntegralSim within float32
+tolerance. As a script it times the CPU engine (1 thread / all threads)
+against the OpenCL path.
+
+Usage:
+  python tests/test_num_integral_cpu.py
+  python tests/test_num_integral_cpu.py --N 20000 --M 2000
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pyCruncher2.scientific.gpu.NumIntegralCPU import NumIntegralCPU, MORSE_VARIANTS
+from pyCruncher2.scientific.gpu.test_num_integral_cl import circle_loop, line_samples, ring_atoms, MU0_4PI
+
+VARIANTS = list(MORSE_VARIANTS)
+REQH0    = (3.0, 1.0, 1.0, 1.0)
+
+def _has_opencl():
+    try:
+        import pyopencl as cl
+        return len(cl.get_platforms()) > 0
+    except Exception:
+        return False
+
+needs_opencl = pytest.mark.skipif(not _has_opencl(), reason="no OpenCL platform")
+
+def make_inputs(N=301, M=180):
+    r_mid, dl, Iarr = circle_loop(M=M, R=1.0)
+    samples = line_samples(N=N, p0=(-2.0, 0.1, 0.5), p1=(2.0, 0.1, 0.5))
+    apos, aREQs = ring_atoms(M=M, R=2.0, REQ=(1.4, 0.1, 0.0, 0.0))
+    aREQs[:, 0] += np.linspace(0.0, 0.3, M, dtype=np.float32)       # not all atoms equal
+    probes = line_samples(N=N, p0=(-4.0, 0.0, 0.3), p1=(4.0, 0.0, 0.3))
+    return r_mid, dl, Iarr, samples, apos, aREQs, probes
+
+def assert_close32(a, ref, rtol=1e-4):
+    """Tolerance relative to the magnitude of the whole field (sums of terms of both signs cancel)."""
+    scale = np.abs(ref).max(axis=0, keepdims=True) + 1e-30
+    assert np.all(np.abs(a - ref) <= rtol * scale), np.abs((a - ref) / scale).max()
+
+def test_blocking_and_threads_do_not_matter():
+    r_mid, dl, Iarr, samples, apos, aREQs, probes = make_inputs()
+    ref = NumIntegralCPU(dtype=np.float64, nblock_sample=1000, nblock_source=1000, nthreads=1)
+    B_ref = ref.run_biot_savart(r_mid, dl, Iarr, samples, K=MU0_4PI)
+    for bs, bm, nt in [(7, 13, 1), (64, 32, 4), (300, 1000, 2)]:
+        cpu = NumIntegralCPU(dtype=np.float64, nblock_sample=bs, nblock_source=bm, nthreads=nt)
+        assert_close32(cpu.run_biot_savart(r_mid, dl, Iarr, samples, K=MU0_4PI), B_ref, rtol=1e-12)    # only the summation order differs
+        assert_close32(cpu.run_morse_ring(apos, aREQs, probes, REQH0=REQH0), ref.run_morse_ring(apos, aREQs, probes, REQH0=REQH0), rtol=1e-12)
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_float32_vs_float64(variant):
+    r_mid, dl, Iarr, samples, apos, aREQs, probes = make_inputs()
+    F32 = NumIntegralCPU().run_morse_ring(apos, aREQs, probes, REQH0=REQH0, variant=variant)
+    F64 = NumIntegralCPU(dtype=np.float64).run_morse_ring(apos, aREQs, probes, REQH0=REQH0, variant=variant)
+    assert F32.dtype == np.float32
+    assert_close32(F32, F64)
+
+def test_biot_savart_loop_field():
+    # on the axis of a circular loop Bz = mu0/4pi * 2*pi*I*R^2 / (R^2+z^2)^1.5
+    r_mid, dl, Iarr = circle_loop(M=2000, R=1.0)
+    z = np.linspace(-2, 2, 41)
+    samples = np.stack([0 * z, 0 * z, z], axis=1).astype(np.float32)
+    B = NumIntegralCPU(dtype=np.float64).run_biot_savart(r_mid, dl, Iarr, samples, K=1.0)
+    assert np.allclose(B[:, 2], 2 * np.pi / (1 + z**2)**1.5, rtol=1e-4)
+
+@needs_opencl
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_matches_opencl(variant):
+    from pyCruncher2.scientific.gpu.test_num_integral_cl import NumIntegralSim
+    r_mid, dl, Iarr, samples, apos, aREQs, probes = make_inputs()
+    sim = _opencl_sim()
+    cpu = NumIntegralCPU()
+    assert_close32(cpu.run_biot_savart(r_mid, dl, Iarr, samples, K=MU0_4PI), sim.run_biot_savart(r_mid, dl, Iarr, samples, K=MU0_4PI))
+    assert_close32(cpu.run_morse_ring(apos, aREQs, probes, REQH0=REQH0, variant=variant),
+                   sim.run_morse_ring(apos, aREQs, probes, REQH0=REQH0, variant=variant))
+
+_sim = None
+def _opencl_sim():
+    global _sim
+    if _sim is None:
+        import pyopencl as cl
+        from pyCruncher2.scientific.gpu.test_num_integral_cl import NumIntegralSim
+        _sim = NumIntegralSim(nloc=32, ctx=cl.create_some_context(interactive=False))
+    return _sim
+
+def benchmark(N=10000, M=1000, nrep=3):
+    r_mid, dl, Iarr, samples, apos, aREQs, probes = make_inputs(N=N, M=M)
+    npair = N * M
+    runs = [("cpu 1 thread",   NumIntegralCPU(nthreads=1)),
+            ("cpu all threads", NumIntegralCPU())]
+    if _has_opencl(): runs.append(("opencl", _opencl_sim()))
+    for label, eng in runs:
+        eng.run_biot_savart(r_mid, dl, Iarr, samples)        # warm-up (OpenCL builds the program inside)
+        T = min(_timeit(lambda: eng.run_biot_savart(r_mid, dl, Iarr, samples)) for _ in range(nrep))
+        Tm = min(_timeit(lambda: eng.run_morse_ring(apos, aREQs, probes, REQH0=REQH0)) for _ in range(nrep))
+        print(f"  {label:<16} BiotSavart {T*1e9/npair:8.3f} [ns/pair]   Morse {Tm*1e9/npair:8.3f} [ns/pair]   (N={N} M={M}, OpenCL time includes program build)")
+
+def _timeit(f):
+    T0 = time.perf_counter(); f(); return time.perf_counter() - T0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--N", type=int, default=10000, help="number of samples in the benchmark")
+    parser.add_argument("--M", type=int, default=1000,  help="number of sources in the benchmark")
+    args = parser.parse_args()
+    test_blocking_and_threads_do_not_matter()
+    test_biot_savart_loop_field()
+    for v in VARIANTS:
+        test_float32_vs_float64(v)
+        if _has_opencl(): test_matches_opencl(v)
+    print("[OK] CPU engine matches float64 reference" + (" and OpenCL" if _has_opencl() else ""))
+    benchmark(N=args.N, M=args.M)
@@ -0,0 +1,75 @@
+"""Tests for the per-file fragment cache used by the tree-sitter analyzers (no tree-sitter needed)."""
+
+import os
+import sys
+import unittest
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyCruncher.parse_cache import FragmentCache, FragmentMerger, IncrementalTrees, content_key, diff_edit
+
+class TestFragmentMerger(unittest.TestCase):
+    def make(self):
+        self.types, self.imports, self.first = {}, {}, {}
+        return FragmentMerger({'types': self.types, 'imports': self.imports, 'first': self.first},
+                              nested=('imports',), first_wins=('first',))
+
+    def test_last_file_wins_and_drop_restores(self):
+        m = self.make()
+        m.merge('a.h', {'types': [('A', 'a1'), ('X', 'xa')], 'imports': [(('a.h', 'os'), None)], 'first': [('f', 'fa')]})
+        m.merge('b.h', {'types': [('B', 'b1'), ('X', 'xb')], 'first': [('f', 'fb')]})
+        self.assertEqual(self.types, {'A': 'a1', 'X': 'xb', 'B': 'b1'})
+        self.assertEqual(self.first, {'f': 'fa'})
+        m.merge('b.h', {'types': [('B', 'b2')]})                 # edited: X falls back to a.h
+        self.assertEqual(self.types, {'A': 'a1', 'X': 'xa', 'B': 'b2'})
+        m.drop('a.h')
+        self.assertEqual(self.types, {'B': 'b2'})
+        self.assertEqual(self.imports, {})
+        self.assertEqual(self.first, {})
+
+class TestFragmentCache(unittest.TestCase):
+    def test_roundtrip_and_invalidation(self):
+        with tempfile.TemporaryDirectory() as d:
+            cache = FragmentCache(d)
+            key = content_key(b'int x;', 'cpp:1')
+            self.assertIsNone(cache.get('cpp', 'x.h', key))
+            cache.put('cpp', 'x.h', key, {'types': [('x', 1)]})
+            self.assertEqual(FragmentCache(d).get('cpp', 'x.h', key), {'types': [('x', 1)]})
+            self.assertIsNone(cache.get('cpp', 'x.h', content_key(b'int x;', 'cpp:2')))   # new grammar/analyzer version
+
+class FakeTree:
+    def __init__(self): self.edits = []
+    def edit(self, **kw): self.edits.append(kw)
+
+class FakeParser:
+    def parse(self, data, old_tree=None):
+        self.old_tree = old_tree
+        return FakeTree()
+
+class TestIncrementalTrees(unittest.TestCase):
+    def test_edit_ranges(self):
+        self.assertEqual(diff_edit(b'int a;\nint b;\n', b'int a;\nlong bb;\n'), (7, 11, 13))
+        trees, parser = IncrementalTrees(), FakeParser()
+        first = trees.parse(parser, 'f.cpp', b'int a;\nint b;\n')
+        self.assertIs(trees.parse(parser, 'f.cpp', b'int a;\nint b;\n'), first)
+        trees.parse(parser, 'f.cpp', b'int a;\nlong bb;\n')
+        self.assertIs(parser.old_tree, first)
+        self.assertEqual(first.edits, [dict(start_byte=7, old_end_byte=11, new_end_byte=13, start_point=(1, 0),
+                                             old_end_point=(1, 4), new_end_point=(1, 6))])
+
+    def test_lru_bound(self):
+        trees, parser = IncrementalTrees(max_files=2), FakeParser()
+        a = trees.parse(parser, 'a.py', b'a = 1\n')
+        trees.parse(parser, 'b.py', b'b = 1\n')
+        self.assertIs(trees.parse(parser, 'a.py', b'a = 1\n'), a)    # hit moves a.py to the back
+        trees.parse(parser, 'c.py', b'c = 1\n')                       # evicts b.py
+        self.assertEqual(list(trees.trees), ['a.py', 'c.py'])
+        trees.parse(parser, 'b.py', b'b = 2\n')
+        self.assertIsNone(parser.old_tree)                             # full parse, no old tree kept
+        none = IncrementalTrees(max_files=0)
+        none.parse(parser, 'a.py', b'a = 1\n')
+        self.assertEqual(len(none.trees), 0)
+
+if __name__ == '__main__':
+    unittest.main()
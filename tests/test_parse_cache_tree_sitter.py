@@ -0,0 +1,114 @@
+"""Fragment cache, incremental re-parse and process-pool parse_directory of the tree-sitter analyzers.
+
+Skipped unless the tree_sitter package and the grammar libraries built by pyCruncher.tree_sitter_utils are available.
+"""
+
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+tree_sitter = pytest.importorskip("tree_sitter")
+
+from pyCruncher.parse_cache import FragmentCache
+from pyCruncher.tree_sitter_utils import get_parser
+
+VENDOR_PYTHON_PATH = '/home/prokophapala/SW/vendor/tree-sitter-python'
+
+CPP_CODE = """
+namespace math {
+    struct Vec { double x, y; };
+    class Body { public: Vec pos; double mass; };
+    double dot(Vec a, Vec b) { return a.x * b.x + a.y * b.y; }
+}
+"""
+
+PY_CODE = """
+import os
+
+class Loader:
+    def load(self, path):
+        return os.path.exists(path)
+
+def main():
+    Loader().load("x")
+"""
+
+@pytest.fixture(scope="module")
+def cpp_parser():
+    try:
+        return get_parser("cpp")
+    except (FileNotFoundError, OSError) as e:
+        pytest.skip(f"C++ grammar not available: {e}")
+
+@pytest.fixture(scope="module")
+def py_language(tmp_path_factory):
+    if not os.path.exists(VENDOR_PYTHON_PATH):
+        pytest.skip(f"Python grammar not available at {VENDOR_PYTHON_PATH}")
+    lib = str(tmp_path_factory.mktemp("build") / "python.so")
+    tree_sitter.Language.build_library(lib, [VENDOR_PYTHON_PATH])
+    language = tree_sitter.Language(lib, 'python')
+    parser = tree_sitter.Parser()
+    parser.set_language(language)
+    return parser, language
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+def test_cpp_types_cache_and_edit(cpp_parser, tmp_path):
+    from pyCruncher.cpp_type_analyzer import TypeCollector
+    src = write(tmp_path / "body.h", CPP_CODE)
+    cache = FragmentCache(tmp_path / "cache")
+    first = TypeCollector(cpp_parser, cache=cache)
+    first.process_file(src)
+    second = TypeCollector(cpp_parser, cache=cache)
+    second.process_file(src)                                    # cache hit, no parse
+    assert cache.hits == 1 and not second.trees.trees
+    assert set(second.registry.types) == set(first.registry.types)
+
+    edited = CPP_CODE.replace("double mass;", "double mass; int id;")
+    start = CPP_CODE.index("double mass;") + len("double mass;")
+    write(tmp_path / "body.h", edited)
+    first.process_file(src, edits=[(start, start, start + len(" int id;"))])    # incremental tree.edit
+    fresh = TypeCollector(cpp_parser)
+    fresh.process_file(src)
+    assert set(first.registry.types) == set(fresh.registry.types)
+
+def test_python_types_cache_and_edit(py_language, tmp_path):
+    from pyCruncher.python_type_analyzer import TypeCollector
+    parser, language = py_language
+    src = write(tmp_path / "loader.py", PY_CODE)
+    cache = FragmentCache(tmp_path / "cache")
+    first = TypeCollector(parser, language, cache=cache)
+    first.process_file(src)
+    second = TypeCollector(parser, language, cache=cache)
+    second.process_file(src)
+    assert cache.hits == 1
+    assert set(second.registry.classes) == set(first.registry.classes)
+    assert set(second.registry.functions) == set(first.registry.functions)
+
+    write(tmp_path / "loader.py", PY_CODE.replace("def main():", "def run():"))
+    first.process_file(src)                                     # no edits given: prefix/suffix diff
+    fresh = TypeCollector(parser, language)
+    fresh.process_file(src)
+    assert set(first.registry.functions) == set(fresh.registry.functions)
+
+def test_parse_directory_parallel_matches_serial(cpp_parser, tmp_path):
+    from pyCruncher.dependency_graph_tree_sitter import DependencyGraphTreeSitter
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(6):
+        write(src / f"m{i}.cpp", f"int f{i}(int a) {{ return a + {i}; }}\nint g{i}() {{ return f{i}(1); }}\n")
+    serial = DependencyGraphTreeSitter()
+    serial.parse_directory(str(src), ".cpp", jobs=1)
+    parallel = DependencyGraphTreeSitter(cache=FragmentCache(tmp_path / "cache"))
+    parallel.parse_directory(str(src), ".cpp", jobs=2, min_parallel=1)
+    assert list(parallel.files) == list(serial.files)
+    assert set(parallel.functions) == set(serial.functions)
+    assert set(parallel.classes) == set(serial.classes)
+    assert not parallel.trees.trees                             # trees stay in the workers
+    again = DependencyGraphTreeSitter(cache=FragmentCache(tmp_path / "cache"))
+    again.parse_directory(str(src), ".cpp", jobs=2, min_parallel=1)     # every file from the worker caches
+    assert set(again.functions) == set(serial.functions)
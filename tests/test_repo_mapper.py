@@ -26,9 +26,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from pyCruncher.repo_mapper import (
     run_repo_mapper, discover_files, analyze_python_file,
     run_ctags_json, parse_ctags_json, generate_skeleton,
-    git_file_stats, compute_folder_stats, generate_tech_matrix,
+    git_file_stats, git_history_stats, compute_folder_stats, generate_tech_matrix,
     tech_matrix_to_csv, generate_concept_map, generate_report,
-    build_import_edges, RepoAnalysis, FileAnalysis, SymbolInfo,
+    build_import_edges, RepoAnalysis, FileAnalysis, SymbolInfo, SymbolIndex, SymbolStore,
 )
 
 # ---------------------------------------------------------------------------
@@ -209,6 +209,40 @@ def test_llm_deepseek(repo_root, shadow_dir):
         print(f"  [FAIL] {err}")
         return False, f"DeepSeek failed: {err}", dt
 
+def test_git_history(shadow_dir, n_commits=30):
+    """Test the one-pass git history miner against per-file git_file_stats, incl. incremental extension."""
+    print("\n" + "="*60)
+    print("[TEST] Git History (single git log pass)")
+    print("="*60)
+    t0 = time.time()
+    import subprocess
+    repo = os.path.join(shadow_dir, "git_history_repo")
+    os.makedirs(os.path.join(repo, "sub dir"), exist_ok=True)
+    def git(*a): subprocess.run(['git', *a], cwd=repo, check=True, capture_output=True)
+    git('init', '-q')
+    git('config', 'user.email', 'test@example.com'); git('config', 'user.name', 'test')
+    def commit(i, date):
+        for name in (f"f{i % 7}.py", os.path.join("sub dir", f"g{i % 3}.txt")):
+            with open(os.path.join(repo, name), 'a') as f: f.write(f"{i}\n")
+        git('add', '-A')
+        subprocess.run(['git', 'commit', '-qm', f"c{i}"], cwd=repo, check=True, capture_output=True,
+                       env={**os.environ, "GIT_COMMITTER_DATE": date, "GIT_AUTHOR_DATE": date})
+    for i in range(n_commits):
+        commit(i, f"2020-01-{i % 28 + 1:02d}T12:00:00")
+    cache = os.path.join(repo, "_git_history.json")
+    first = git_history_stats(repo, cache)
+    for i in range(n_commits, n_commits + 5):
+        commit(i, f"2021-02-{i % 28 + 1:02d}T12:00:00")
+    t1 = time.time()
+    second = git_history_stats(repo, cache, verbose=True)
+    t2 = time.time()
+    fresh = git_history_stats(repo)
+    ref = {rel: git_file_stats(repo, rel) for rel in fresh}
+    t3 = time.time()
+    print(f"  {len(first)} -> {len(second)} paths; incremental {t2 - t1:.3f}s, per-file git {t3 - t2:.3f}s")
+    ok = second == fresh == ref and "sub dir/g0.txt" in fresh
+    return ok, f"{len(fresh)} paths match git_file_stats", time.time() - t0
+
 def test_rollups(repo_root):
     """Test rollup generation (folder stats, tech matrix, concept map)."""
     print("\n" + "="*60)
@@ -242,9 +276,149 @@ def test_rollups(repo_root):
     dt = time.time() - t0
     return True, f"{len(analysis.folder_stats)} folders, {len(edges)} edges", dt
 
+def test_incremental(shadow_dir, n_files=200, jobs=None):
+    """Test the analysis cache: a second run reuses everything, a small edit re-analyzes one file."""
+    print("\n" + "="*60)
+    print("[TEST] Incremental Analysis Cache")
+    print("="*60)
+    t0 = time.time()
+    repo = os.path.join(shadow_dir, "incremental_repo")
+    for i in range(n_files):
+        p = Path(repo, f"pkg{i % 10}", f"mod{i}.py")
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(f"import os\nclass C{i}:\n    def run(self, x):\n        return x\n\ndef f{i}(a, b):\n    return a\n")
+    kw = dict(shadow_dir=os.path.join(repo, "_map"), cache_path=os.path.join(repo, "_cache.json"),
+              use_ctags=False, use_git=False, verbose=False, jobs=jobs)
+    first = run_repo_mapper(repo, **kw)
+    t1 = time.time()
+    second = run_repo_mapper(repo, **kw)
+    t2 = time.time()
+    Path(repo, "pkg3", "mod3.py").write_text("def changed(q):\n    return q\n")
+    third = run_repo_mapper(repo, **kw)
+    skel = Path(kw["shadow_dir"], "skeletons", "pkg3", "mod3.py.skeleton.md").read_text()
+    print(f"  first:  {first.cache_stats} in {t1 - t0:.2f}s")
+    print(f"  second: {second.cache_stats} in {t2 - t1:.2f}s")
+    print(f"  edit:   {third.cache_stats}")
+    ok = (first.cache_stats["analyzed"] == n_files and second.cache_stats["analyzed"] == 0
+          and second.cache_stats["skeletons_written"] == 0 and third.cache_stats["analyzed"] == 1
+          and "changed(q)" in skel and len(second.symbols) == len(first.symbols))
+    return ok, f"reused {second.cache_stats['reused']}/{n_files}, edit re-analyzed {third.cache_stats['analyzed']}", time.time() - t0
+
+def test_skeleton_benchmark(n_files=10000, n_symbols=500000, n_sample=20):
+    """Benchmark skeleton emission on a synthetic repo: per-file list scan vs. one SymbolIndex.
+
+    The list scan is timed on n_sample files and extrapolated (it is O(files x symbols));
+    the sampled skeletons must be identical for both paths.
+    """
+    print("\n" + "="*60)
+    print(f"[TEST] Skeleton Benchmark ({n_files} files, {n_symbols} symbols)")
+    print("="*60)
+    t0 = time.time()
+    per_file = max(n_symbols // n_files, 4)
+    fas, syms = [], []
+    for i in range(n_files):
+        rel = f"pkg{i % 100}/mod{i}.py"
+        fas.append(FileAnalysis(rel_path=rel, language="python", line_count=10 * per_file, symbols_count=per_file))
+        n_cls = max(per_file // 10, 1)
+        for k in range(per_file):
+            c = k % n_cls
+            if k < n_cls:
+                syms.append(SymbolInfo(name=f"C{c}", kind="class", file_path=rel, line=k))
+            elif k % 3 == 0:
+                syms.append(SymbolInfo(name=f"f{k}", kind="function", file_path=rel, line=k, signature="(a, b)"))
+            elif k % 3 == 1:
+                syms.append(SymbolInfo(name=f"m{k}", kind="method", file_path=rel, line=k, scope=f"C{c}", signature="(self)"))
+            else:
+                syms.append(SymbolInfo(name=f"x{k}", kind="member", file_path=rel, line=k, scope=f"C{c}"))
+    t1 = time.time()
+    index = SymbolIndex(syms)
+    skels = [generate_skeleton(fa, index) for fa in fas]
+    t2 = time.time()
+    sample = fas[::max(n_files // n_sample, 1)][:n_sample]
+    legacy = [generate_skeleton(fa, syms) for fa in sample]
+    t3 = time.time()
+    same = all(s == skels[fas.index(fa)] for fa, s in zip(sample, legacy))
+    est = (t3 - t2) / len(sample) * n_files
+    print(f"  synthetic repo built in {t1 - t0:.2f}s")
+    print(f"  indexed:   {len(skels)} skeletons in {t2 - t1:.2f}s (index build included)")
+    print(f"  list scan: {len(sample)} skeletons in {t3 - t2:.2f}s -> ~{est:.0f}s for all files")
+    print(f"  identical on sample: {same}")
+    return same, f"indexed {t2 - t1:.2f}s vs list scan ~{est:.0f}s ({est / max(t2 - t1, 1e-9):.0f}x)", time.time() - t0
+
+def test_ctags_stream(shadow_dir, n_tags=200000):
+    """Streamed ctags ingestion on a fake ctags (a Python process printing JSON tags): same result as the tags file."""
+    print("\n" + "="*60)
+    print(f"[TEST] Streaming ctags ingestion ({n_tags} tags)")
+    print("="*60)
+    from pyCruncher.ctags import stream_ctags
+    t0 = time.time()
+    fake = (
+        "import json, sys\n"
+        "print(json.dumps({'_type': 'ptag', 'name': 'JSON_OUTPUT_VERSION'}))\n"
+        f"for i in range({n_tags}):\n"
+        "    kind = ('class', 'function', 'member', 'function')[i % 4]\n"
+        "    print(json.dumps({'_type': 'tag', 'name': f'n{i % 97}', 'path': f'src/f{i % 500}.cpp', 'line': i,\n"
+        "                      'kind': kind, 'scope': '' if kind == 'class' else f'C{i % 13}'}))\n"
+        "sys.exit(int(sys.argv[1]))\n"
+    )
+    tee = os.path.join(shadow_dir, "fake_ctags.json")
+    seen = []
+    files, syms = parse_ctags_json(stream_ctags([sys.executable, "-c", fake, "0"], tee=tee,
+                                                progress=lambda n, dt: seen.append(n), every=50000), shadow_dir)
+    t1 = time.time()
+    ref_files, ref_syms = parse_ctags_json(tee, shadow_dir)
+    ok = syms == ref_syms and list(files) == list(ref_files) and len(syms) == n_tags and seen[-1] == n_tags
+    gen = stream_ctags([sys.executable, "-c", fake, "0"])
+    next(gen); gen.close()                                   # early close kills the process, no error
+    try:
+        list(stream_ctags([sys.executable, "-c", fake.replace(str(n_tags), "10"), "3"]))
+        ok = False
+    except RuntimeError:
+        pass
+    print(f"  {len(syms)} symbols in {len(files)} files streamed in {t1 - t0:.2f}s; progress at {seen}")
+    return ok, f"{len(syms)} tags streamed in {t1 - t0:.2f}s, identical to file parse", time.time() - t0
+
+def test_symbol_store(shadow_dir, n_files=2000, per_file=50):
+    """SymbolStore round trip and lookups against a list filter; size vs. symbols.json; __slots__ on the records."""
+    print("\n" + "="*60)
+    print(f"[TEST] Symbol Store ({n_files * per_file} symbols)")
+    print("="*60)
+    import json
+    from dataclasses import asdict
+    t0 = time.time()
+    symbols = {}
+    for i in range(n_files):
+        rel = f"src{i % 50}/unit{i}.cpp"
+        for k in range(per_file):
+            kind = ("class", "method", "member", "function")[k % 4]
+            scope = "" if kind in ("class", "function") else f"C{i}_{k // 8}"
+            s = SymbolInfo(name=f"s{k % 20}", kind=kind, file_path=rel, line=k, scope=scope, signature="(int)", language="cpp")
+            symbols[f"{rel}::{scope}::{s.name}::{k}"] = s
+    db_path = os.path.join(shadow_dir, "symbols_test.db")
+    json_path = os.path.join(shadow_dir, "symbols_test.json")
+    t1 = time.time()
+    SymbolStore.write(db_path, symbols)
+    t2 = time.time()
+    Path(json_path).write_text(json.dumps({k: asdict(v) for k, v in symbols.items()}, indent=1))
+    t3 = time.time()
+    values = list(symbols.values())
+    with SymbolStore(db_path) as store:
+        ok = len(store) == len(symbols)
+        ok &= store.members("C7_1", "method") == [s for s in values if s.scope == "C7_1" and s.kind == "method"]
+        ok &= store.find("s3") == [s for s in values if s.name == "s3"]
+        ok &= store.in_file("src9/unit9.cpp") == [s for s in values if s.file_path == "src9/unit9.cpp"]
+        t4 = time.time()
+        for i in range(1000): store.members(f"C{i}_2", "method")
+        t5 = time.time()
+    ok &= not hasattr(values[0], "__dict__") and not hasattr(FileAnalysis(rel_path="x"), "__dict__")
+    db_mb, json_mb = os.path.getsize(db_path) / 1e6, os.path.getsize(json_path) / 1e6
+    print(f"  write: db {t2 - t1:.2f}s ({db_mb:.1f} MB), json {t3 - t2:.2f}s ({json_mb:.1f} MB)")
+    print(f"  1000 'methods of class' lookups: {t5 - t4:.3f}s")
+    return ok, f"db {db_mb:.1f} MB vs json {json_mb:.1f} MB, {(t5 - t4):.3f}s / 1000 lookups", time.time() - t0
+
 def test_full_pipeline(repo_root, shadow_dir, use_llm=False, llm_backend="lmstudio",
                        lmstudio_url=LMSTUDIO_URL, lmstudio_model=LMSTUDIO_MODEL,
-                       max_files=None, max_llm_files=5):
+                       max_files=None, max_llm_files=5, use_cache=True, jobs=None):
     """Test the full pipeline end-to-end."""
     print("\n" + "="*60)
     print("[TEST] Full Pipeline")
@@ -264,6 +438,8 @@ def test_full_pipeline(repo_root, shadow_dir, use_llm=False, llm_backend="lmstud
         deepseek_key=key,
         max_llm_files=max_llm_files,
         verbose=True,
+        use_cache=use_cache,
+        jobs=jobs,
     )
     dt = time.time() - t0
     nfiles = len(analysis.files)
@@ -286,7 +462,11 @@ def main():
     parser.add_argument("--llm-backend", choices=["lmstudio", "deepseek", "none"], default="lmstudio")
     parser.add_argument("--lmstudio-url", default=LMSTUDIO_URL, help="LM Studio API URL")
     parser.add_argument("--lmstudio-model", default=LMSTUDIO_MODEL, help="LM Studio model name")
-    parser.add_argument("--skip-stages", nargs='*', default=[], help="Stages to skip: discovery ast ctags skeleton git llm_lm llm_ds rollups full")
+    parser.add_argument("--skip-stages", nargs='*', default=[], help="Stages to skip: discovery ast ctags skeleton git git_history incremental ctags_stream symbol_store llm_lm llm_ds rollups bench full")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes for parsing changed files (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-analyze every file instead of reusing .shadow/cache/analysis.json")
+    parser.add_argument("--bench-files", type=int, default=10000, help="Synthetic files for the skeleton benchmark")
+    parser.add_argument("--bench-symbols", type=int, default=500000, help="Synthetic symbols for the skeleton benchmark")
     parser.add_argument("--only-full", action="store_true", help="Only run the full pipeline test")
     args = parser.parse_args()
 
@@ -309,7 +489,7 @@ def main():
             args.repo_root, shadow_dir, use_llm=args.use_llm,
             llm_backend=args.llm_backend, lmstudio_url=args.lmstudio_url,
             lmstudio_model=args.lmstudio_model, max_files=args.max_files,
-            max_llm_files=args.max_llm_files,
+            max_llm_files=args.max_llm_files, use_cache=not args.no_cache, jobs=args.jobs,
         )
     else:
         skip = set(args.skip_stages)
@@ -329,9 +509,24 @@ def main():
         if "git" not in skip:
             results["git_metadata"] = test_git(args.repo_root, max_files=5)
 
+        if "git_history" not in skip:
+            results["git_history"] = test_git_history(shadow_dir)
+
         if "rollups" not in skip:
             results["rollups"] = test_rollups(args.repo_root)
 
+        if "incremental" not in skip:
+            results["incremental"] = test_incremental(shadow_dir, jobs=args.jobs)
+
+        if "ctags_stream" not in skip:
+            results["ctags_stream"] = test_ctags_stream(shadow_dir)
+
+        if "symbol_store" not in skip:
+            results["symbol_store"] = test_symbol_store(shadow_dir)
+
+        if "bench" not in skip:
+            results["skeleton_bench"] = test_skeleton_benchmark(args.bench_files, args.bench_symbols)
+
         if "llm_lm" not in skip and args.use_llm and args.llm_backend == "lmstudio":
             results["llm_lmstudio"] = test_llm_lmstudio(args.repo_root, shadow_dir,
                                                           url=args.lmstudio_url, model=args.lmstudio_model)
@@ -344,7 +539,7 @@ def main():
                 args.repo_root, shadow_dir, use_llm=args.use_llm,
                 llm_backend=args.llm_backend, lmstudio_url=args.lmstudio_url,
                 lmstudio_model=args.lmstudio_model, max_files=args.max_files,
-                max_llm_files=args.max_llm_files,
+                max_llm_files=args.max_llm_files, use_cache=not args.no_cache, jobs=args.jobs,
             )
 
     # --- Final summary table ---